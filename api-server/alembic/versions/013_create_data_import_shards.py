@@ -0,0 +1,52 @@
+"""create data_import_shards table for sharded imports
+
+Revision ID: 013_create_data_import_shards
+Revises: 012_add_prediction_fetch_tracking
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+revision = "013_create_data_import_shards"
+down_revision = "012_add_prediction_fetch_tracking"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_import_shards",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "import_job_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("data_import_jobs.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("shard_index", sa.Integer, nullable=False),
+        sa.Column("start_offset", sa.BigInteger, nullable=False),
+        sa.Column("end_offset", sa.BigInteger, nullable=False),
+        sa.Column("first_row", sa.Integer, nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default=sa.text("'pending'")),
+        sa.Column("total_records", sa.Integer, server_default=sa.text("0")),
+        sa.Column("processed_records", sa.Integer, server_default=sa.text("0")),
+        sa.Column("success_records", sa.Integer, server_default=sa.text("0")),
+        sa.Column("failed_records", sa.Integer, server_default=sa.text("0")),
+        sa.Column("last_processed_row", sa.Integer, server_default=sa.text("0")),
+        sa.Column("trading_dates", JSONB, nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column("celery_task_id", sa.String(255), nullable=True),
+        sa.Column("error_message", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint("import_job_id", "shard_index", name="uq_data_import_shards_job_index"),
+        sa.CheckConstraint(
+            "status IN ('pending', 'processing', 'completed', 'failed')",
+            name="ck_data_import_shards_status",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("data_import_shards")
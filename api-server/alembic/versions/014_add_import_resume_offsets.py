@@ -0,0 +1,30 @@
+"""add resume_offset to data import jobs and shards
+
+Revision ID: 014_add_import_resume_offsets
+Revises: 013_create_data_import_shards
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "014_add_import_resume_offsets"
+down_revision = "013_create_data_import_shards"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "data_import_jobs",
+        sa.Column("resume_offset", sa.BigInteger, nullable=True),
+    )
+    op.add_column(
+        "data_import_shards",
+        sa.Column("resume_offset", sa.BigInteger, nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("data_import_shards", "resume_offset")
+    op.drop_column("data_import_jobs", "resume_offset")
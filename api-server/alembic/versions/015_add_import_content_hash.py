@@ -0,0 +1,25 @@
+"""add content_hash to data_import_jobs
+
+Revision ID: 015_add_import_content_hash
+Revises: 014_add_import_resume_offsets
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "015_add_import_content_hash"
+down_revision = "014_add_import_resume_offsets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "data_import_jobs",
+        sa.Column("content_hash", sa.String(64), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("data_import_jobs", "content_hash")
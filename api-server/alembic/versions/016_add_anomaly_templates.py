@@ -0,0 +1,61 @@
+"""store import anomaly descriptions as template id + params
+
+Revision ID: 016_add_anomaly_templates
+Revises: 015_add_import_content_hash
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "016_add_anomaly_templates"
+down_revision = "015_add_import_content_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "import_anomalies",
+        sa.Column("template_id", sa.SmallInteger, nullable=True),
+    )
+    op.add_column(
+        "import_anomalies",
+        sa.Column("template_params", JSONB, nullable=True),
+    )
+    op.alter_column("import_anomalies", "description", nullable=True)
+    op.create_check_constraint(
+        "ck_import_anomalies_description",
+        "import_anomalies",
+        "description IS NOT NULL OR template_id IS NOT NULL",
+    )
+
+
+def downgrade() -> None:
+    # 将模板行渲染回 description 后恢复 NOT NULL
+    op.drop_constraint("ck_import_anomalies_description", "import_anomalies", type_="check")
+    op.execute(
+        """
+        UPDATE import_anomalies SET description = CASE template_id
+            WHEN 1 THEN '交易日期格式错误: ' || COALESCE(raw_value, '')
+            WHEN 2 THEN '时段编号超出范围(1-96): ' || COALESCE(raw_value, '')
+            WHEN 3 THEN '出清价格格式错误: ' || COALESCE(raw_value, '')
+            WHEN 4 THEN '出清价格超出省份限价范围(' || (template_params->>'lower') || '~'
+                || (template_params->>'upper') || '): ' || COALESCE(raw_value, '')
+            WHEN 5 THEN '实际出力格式错误或为负值: ' || COALESCE(raw_value, '')
+            WHEN 6 THEN 'SOC 值无效或超出范围(0-1): ' || COALESCE(raw_value, '')
+            WHEN 7 THEN '充电功率格式错误: ' || COALESCE(raw_value, '')
+            WHEN 8 THEN '放电功率格式错误: ' || COALESCE(raw_value, '')
+            WHEN 9 THEN '循环次数格式错误: ' || COALESCE(raw_value, '')
+            WHEN 10 THEN '本批次中 ' || (template_params->>'skipped') || ' 条重复记录已跳过'
+            WHEN 11 THEN '交易日 ' || (template_params->>'trading_date') || ' '
+                || (template_params->>'entity_label') || '缺少时段: '
+                || (template_params->>'missing')
+        END
+        WHERE description IS NULL
+        """
+    )
+    op.alter_column("import_anomalies", "description", nullable=False)
+    op.drop_column("import_anomalies", "template_params")
+    op.drop_column("import_anomalies", "template_id")
@@ -0,0 +1,29 @@
+"""add period_coverage bitmap to data_import_shards
+
+Revision ID: 017_add_shard_period_coverage
+Revises: 016_add_anomaly_templates
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "017_add_shard_period_coverage"
+down_revision = "016_add_anomaly_templates"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "data_import_shards",
+        sa.Column(
+            "period_coverage", JSONB, nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("data_import_shards", "period_coverage")
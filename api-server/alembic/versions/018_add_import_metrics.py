@@ -0,0 +1,31 @@
+"""add per-phase import metrics to data_import_jobs and data_import_shards
+
+Revision ID: 018_add_import_metrics
+Revises: 017_add_shard_period_coverage
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "018_add_import_metrics"
+down_revision = "017_add_shard_period_coverage"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("data_import_jobs", sa.Column("metrics", JSONB, nullable=True))
+    op.add_column(
+        "data_import_shards",
+        sa.Column(
+            "metrics", JSONB, nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("data_import_shards", "metrics")
+    op.drop_column("data_import_jobs", "metrics")
@@ -0,0 +1,80 @@
+"""create market_data_backfill_jobs for resumable month-chunked price backfill
+
+Revision ID: 019_add_market_data_backfill_jobs
+Revises: 018_add_import_metrics
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "019_add_market_data_backfill_jobs"
+down_revision = "018_add_import_metrics"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "market_data_backfill_jobs",
+        sa.Column(
+            "id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            nullable=False,
+            server_default=sa.text("gen_random_uuid()"),
+            primary_key=True,
+        ),
+        sa.Column("province", sa.String(50), nullable=False),
+        sa.Column("start_date", sa.Date, nullable=False),
+        sa.Column("end_date", sa.Date, nullable=False),
+        sa.Column(
+            "status",
+            sa.String(20),
+            nullable=False,
+            server_default=sa.text("'pending'"),
+        ),
+        sa.Column("completed_through", sa.Date, nullable=True),
+        sa.Column("total_chunks", sa.Integer, server_default=sa.text("0")),
+        sa.Column("completed_chunks", sa.Integer, server_default=sa.text("0")),
+        sa.Column("total_records", sa.Integer, server_default=sa.text("0")),
+        sa.Column("celery_task_id", sa.String(255), nullable=True),
+        sa.Column("error_message", sa.Text, nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_by",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.CheckConstraint(
+            "status IN ('pending', 'processing', 'completed', 'failed')",
+            name="ck_market_data_backfill_jobs_status",
+        ),
+        sa.CheckConstraint(
+            "end_date >= start_date",
+            name="ck_market_data_backfill_jobs_range",
+        ),
+    )
+    op.create_index(
+        "ix_market_data_backfill_jobs_province",
+        "market_data_backfill_jobs",
+        ["province"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_market_data_backfill_jobs_province", table_name="market_data_backfill_jobs")
+    op.drop_table("market_data_backfill_jobs")
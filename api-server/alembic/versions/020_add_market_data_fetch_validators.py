@@ -0,0 +1,29 @@
+"""add conditional fetch validators and content hash to market_data_sources
+
+Revision ID: 020_add_market_data_fetch_validators
+Revises: 019_add_market_data_backfill_jobs
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "020_add_market_data_fetch_validators"
+down_revision = "019_add_market_data_backfill_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 定时取数的条件请求校验值（ETag / Last-Modified）与曲线内容哈希，均针对 fetch_validated_date 当日
+    op.add_column("market_data_sources", sa.Column("fetch_validated_date", sa.Date, nullable=True))
+    op.add_column("market_data_sources", sa.Column("fetch_etag", sa.String(200), nullable=True))
+    op.add_column("market_data_sources", sa.Column("fetch_last_modified", sa.String(64), nullable=True))
+    op.add_column("market_data_sources", sa.Column("fetch_content_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("market_data_sources", "fetch_content_hash")
+    op.drop_column("market_data_sources", "fetch_last_modified")
+    op.drop_column("market_data_sources", "fetch_etag")
+    op.drop_column("market_data_sources", "fetch_validated_date")
@@ -0,0 +1,35 @@
+"""add per-source fetch scheduling columns to market_data_sources
+
+Revision ID: 021_add_market_data_fetch_scheduling
+Revises: 020_add_market_data_fetch_validators
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "021_add_market_data_fetch_scheduling"
+down_revision = "020_add_market_data_fetch_validators"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 调度器按 next_fetch_at 扫描到期数据源；为空的数据源首次扫描时按 fetch_schedule 初始化
+    op.add_column(
+        "market_data_sources",
+        sa.Column("next_fetch_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "market_data_sources",
+        sa.Column("fast_poll_until", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_market_data_sources_next_fetch_at", "market_data_sources", ["next_fetch_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_market_data_sources_next_fetch_at", table_name="market_data_sources")
+    op.drop_column("market_data_sources", "fast_poll_until")
+    op.drop_column("market_data_sources", "next_fetch_at")
@@ -0,0 +1,32 @@
+"""create market_data_freshness per-province state for cheap freshness queries
+
+Revision ID: 022_add_market_data_freshness
+Revises: 021_add_market_data_fetch_scheduling
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "022_add_market_data_freshness"
+down_revision = "021_add_market_data_fetch_scheduling"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "market_data_freshness",
+        sa.Column("province", sa.String(50), primary_key=True),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    # 一次性从历史数据初始化，之后随价格 upsert 维护
+    op.execute(
+        "INSERT INTO market_data_freshness (province, last_fetched_at) "
+        "SELECT province, max(fetched_at) FROM timeseries.market_clearing_prices "
+        "GROUP BY province"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("market_data_freshness")
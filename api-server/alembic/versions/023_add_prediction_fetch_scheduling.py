@@ -0,0 +1,46 @@
+"""add per-model fetch scheduling columns to prediction_models
+
+Revision ID: 023_add_prediction_fetch_scheduling
+Revises: 022_add_market_data_freshness
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "023_add_prediction_fetch_scheduling"
+down_revision = "022_add_market_data_freshness"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "prediction_models",
+        sa.Column(
+            "prediction_horizon",
+            sa.String(20),
+            nullable=False,
+            server_default=sa.text("'day_ahead'"),
+        ),
+    )
+    op.create_check_constraint(
+        "ck_prediction_models_horizon",
+        "prediction_models",
+        "prediction_horizon IN ('day_ahead', 'intraday')",
+    )
+    # 调度器按 next_fetch_at 扫描到期模型；为空的模型首次扫描时按 call_frequency_cron 初始化
+    op.add_column(
+        "prediction_models",
+        sa.Column("next_fetch_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_prediction_models_next_fetch_at", "prediction_models", ["next_fetch_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prediction_models_next_fetch_at", table_name="prediction_models")
+    op.drop_column("prediction_models", "next_fetch_at")
+    op.drop_constraint("ck_prediction_models_horizon", "prediction_models", type_="check")
+    op.drop_column("prediction_models", "prediction_horizon")
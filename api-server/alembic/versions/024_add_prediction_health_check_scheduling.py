@@ -0,0 +1,31 @@
+"""add adaptive health check columns to prediction_models
+
+Revision ID: 024_add_prediction_health_check_scheduling
+Revises: 023_add_prediction_fetch_scheduling
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "024_add_prediction_health_check_scheduling"
+down_revision = "023_add_prediction_fetch_scheduling"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 为空的模型在下一轮健康检查时立即探测
+    op.add_column(
+        "prediction_models",
+        sa.Column("next_check_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "prediction_models",
+        sa.Column("check_interval_seconds", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("prediction_models", "check_interval_seconds")
+    op.drop_column("prediction_models", "next_check_at")
@@ -0,0 +1,64 @@
+"""create import_metric_counters pre-aggregated import statistics for /metrics
+
+Revision ID: 025_add_import_metric_counters
+Revises: 024_add_prediction_health_check_scheduling
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "025_add_import_metric_counters"
+down_revision = "024_add_prediction_health_check_scheduling"
+branch_labels = None
+depends_on = None
+
+# 与 app.tasks.import_metrics.BATCH_LATENCY_BUCKETS 一致；桶边界不同的历史数据只计 sum/count
+_BUCKETS = ("0.01", "0.025", "0.05", "0.1", "0.25", "0.5", "1.0", "2.5", "5.0", "10.0", "+Inf")
+
+_COMPLETED = (
+    "FROM data_import_jobs j "
+    "WHERE j.status = 'completed' AND j.metrics IS NOT NULL"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "import_metric_counters",
+        sa.Column("import_type", sa.String(20), primary_key=True),
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("value", sa.Float(), nullable=False, server_default=sa.text("0")),
+    )
+    # 一次性从历史任务初始化，之后随任务完成累加
+    scalar_counters = " UNION ALL ".join(
+        f"SELECT j.import_type, '{name}', sum(({expr})::float8) {_COMPLETED} GROUP BY j.import_type"
+        for name, expr in (
+            ("jobs", "1"),
+            ("rows", "j.metrics->>'rows'"),
+            ("batches", "j.metrics->>'batches'"),
+            ("elapsed_seconds", "j.metrics->>'elapsed_seconds'"),
+            ("batch_seconds", "j.metrics->'batch_latency'->>'sum'"),
+        )
+    )
+    buckets_json = "[" + ", ".join(_BUCKETS[:-1]) + "]"
+    labels = "ARRAY[" + ", ".join(f"'{b}'" for b in _BUCKETS) + "]"
+    op.execute(
+        "INSERT INTO import_metric_counters (import_type, name, value) "
+        f"SELECT import_type, name, coalesce(value, 0) FROM ({scalar_counters}) AS s(import_type, name, value) "
+        "UNION ALL "
+        "SELECT j.import_type, 'phase_seconds:' || p.key, sum(p.value::float8) "
+        f"FROM data_import_jobs j, jsonb_each_text(j.metrics->'phase_seconds') p "
+        "WHERE j.status = 'completed' AND j.metrics IS NOT NULL "
+        "GROUP BY j.import_type, p.key "
+        "UNION ALL "
+        f"SELECT j.import_type, 'batch_count:' || ({labels})[c.ord], sum(c.value::float8) "
+        "FROM data_import_jobs j, "
+        "jsonb_array_elements_text(j.metrics->'batch_latency'->'counts') WITH ORDINALITY c(value, ord) "
+        "WHERE j.status = 'completed' AND j.metrics IS NOT NULL "
+        f"AND j.metrics->'batch_latency'->'buckets' = '{buckets_json}'::jsonb "
+        "GROUP BY j.import_type, c.ord"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("import_metric_counters")
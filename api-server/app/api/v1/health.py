@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
 
 from app.core.database import async_session_factory
@@ -19,3 +20,19 @@ async def health_check() -> dict:
         "status": "ok",
         "database": db_status,
     }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def import_metrics() -> PlainTextResponse:
+    """Prometheus 文本格式：按导入类型输出已完成任务的分阶段耗时与批次耗时直方图
+    （读取任务完成时累加的 import_metric_counters），以及本 API 进程的市场数据 L1 缓存命中/未命中计数。"""
+    from app.repositories.data_import import DataImportJobRepository
+    from app.services import market_data_cache
+    from app.tasks.import_metrics import CONTENT_TYPE, aggregate_counters, render_prometheus
+
+    async with async_session_factory() as session:
+        rows = await DataImportJobRepository(session).list_metric_counters()
+    return PlainTextResponse(
+        render_prometheus(aggregate_counters(rows)) + market_data_cache.render_prometheus(),
+        media_type=CONTENT_TYPE,
+    )
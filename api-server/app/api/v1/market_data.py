@@ -1,23 +1,26 @@
 from datetime import date
 from uuid import UUID
 
-import redis.asyncio as aioredis
 from fastapi import APIRouter, Depends, Query, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
 from app.core.database import get_db_session
 from app.core.dependencies import require_roles
 from app.core.ip_utils import get_client_ip
+from app.core.redis import get_redis_client
 from app.models.user import User
 from app.repositories.audit import AuditLogRepository
 from app.repositories.market_data import (
     MarketClearingPriceRepository,
+    MarketDataBackfillJobRepository,
     MarketDataSourceRepository,
 )
 from app.schemas.market_data import (
     MarketClearingPriceListResponse,
     MarketClearingPriceRead,
+    MarketDataBackfillCreate,
+    MarketDataBackfillJobRead,
+    MarketDataBatchResponse,
     MarketDataFetchResult,
     MarketDataFreshnessListResponse,
     MarketDataSourceCreate,
@@ -31,15 +34,6 @@ from app.services.market_data_service import MarketDataService
 router = APIRouter()
 
 
-async def _get_redis_client() -> aioredis.Redis | None:
-    try:
-        client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
-        await client.ping()
-        return client
-    except Exception:
-        return None
-
-
 async def _get_market_data_service(
     session: AsyncSession = Depends(get_db_session),
 ) -> MarketDataService:
@@ -47,8 +41,10 @@ async def _get_market_data_service(
     source_repo = MarketDataSourceRepository(session)
     audit_repo = AuditLogRepository(session)
     audit_service = AuditService(audit_repo)
-    redis_client = await _get_redis_client()
-    return MarketDataService(price_repo, source_repo, audit_service, redis_client)
+    # 曲线以二进制格式缓存，使用返回 bytes 的客户端
+    redis_client = await get_redis_client(decode_responses=False)
+    backfill_repo = MarketDataBackfillJobRepository(session)
+    return MarketDataService(price_repo, source_repo, audit_service, redis_client, backfill_repo)
 
 
 # --- 市场数据查询 ---
@@ -77,6 +73,17 @@ async def list_market_data(
     )
 
 
+@router.get("/batch", response_model=MarketDataBatchResponse)
+async def get_market_data_batch(
+    provinces: list[str] = Query(..., min_length=1),
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    current_user: User = Depends(require_roles(["admin", "trader"])),
+    service: MarketDataService = Depends(_get_market_data_service),
+) -> MarketDataBatchResponse:
+    return await service.get_market_data_batch(provinces, start_date, end_date)
+
+
 # --- 数据新鲜度 ---
 
 
@@ -121,6 +128,44 @@ async def trigger_fetch(
         )
 
 
+# --- 历史回补 ---
+
+
+@router.post("/backfill", response_model=MarketDataBackfillJobRead, status_code=202)
+async def start_backfill(
+    body: MarketDataBackfillCreate,
+    current_user: User = Depends(require_roles(["admin"])),
+    service: MarketDataService = Depends(_get_market_data_service),
+) -> MarketDataBackfillJobRead:
+    job = await service.start_backfill(
+        province=body.province,
+        start_date=body.start_date,
+        end_date=body.end_date,
+        user_id=current_user.id,
+    )
+    return MarketDataBackfillJobRead.model_validate(job)
+
+
+@router.get("/backfill/{job_id}", response_model=MarketDataBackfillJobRead)
+async def get_backfill_job(
+    job_id: UUID,
+    current_user: User = Depends(require_roles(["admin"])),
+    service: MarketDataService = Depends(_get_market_data_service),
+) -> MarketDataBackfillJobRead:
+    job = await service.get_backfill_job(job_id)
+    return MarketDataBackfillJobRead.model_validate(job)
+
+
+@router.post("/backfill/{job_id}/resume", response_model=MarketDataBackfillJobRead)
+async def resume_backfill(
+    job_id: UUID,
+    current_user: User = Depends(require_roles(["admin"])),
+    service: MarketDataService = Depends(_get_market_data_service),
+) -> MarketDataBackfillJobRead:
+    job = await service.resume_backfill(job_id, user_id=current_user.id)
+    return MarketDataBackfillJobRead.model_validate(job)
+
+
 # --- 手动上传 ---
 
 
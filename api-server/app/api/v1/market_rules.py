@@ -5,6 +5,7 @@ from app.core.data_access import require_write_permission
 from app.core.database import get_db_session
 from app.core.dependencies import require_roles
 from app.core.ip_utils import get_client_ip
+from app.core.redis import get_redis_client
 from app.models.user import User
 from app.repositories.audit import AuditLogRepository
 from app.repositories.market_rule import MarketRuleRepository
@@ -16,13 +17,14 @@ from app.services.market_rule_service import MarketRuleService
 router = APIRouter()
 
 
-def _get_market_rule_service(
+async def _get_market_rule_service(
     session: AsyncSession = Depends(get_db_session),
 ) -> MarketRuleService:
     market_rule_repo = MarketRuleRepository(session)
     audit_repo = AuditLogRepository(session)
     audit_service = AuditService(audit_repo)
-    return MarketRuleService(market_rule_repo, audit_service)
+    redis_client = await get_redis_client()
+    return MarketRuleService(market_rule_repo, audit_service, redis_client)
 
 
 @router.get("", response_model=list[MarketRuleRead])
@@ -88,6 +88,7 @@ async def create_prediction_model(
         call_frequency_cron=body.call_frequency_cron,
         timeout_seconds=body.timeout_seconds,
         station_id=body.station_id,
+        prediction_horizon=body.prediction_horizon,
         user_id=current_user.id,
     )
     return PredictionModelRead.from_model(model)
@@ -10,10 +10,14 @@ from app.core.dependencies import require_roles
 from app.core.ip_utils import get_client_ip
 from app.models.user import User
 from app.repositories.audit import AuditLogRepository
-from app.repositories.prediction import PowerPredictionRepository
+from app.repositories.prediction import PowerPredictionRepository, PredictionModelRepository
 from app.repositories.station import StationRepository
 from app.repositories.storage import StorageDeviceRepository
-from app.schemas.prediction import PowerPredictionListResponse, PowerPredictionRead
+from app.schemas.prediction import (
+    PowerPredictionListResponse,
+    PowerPredictionRead,
+    PredictionCurveRangeResponse,
+)
 from app.schemas.station import (
     StationCreate,
     StationListResponse,
@@ -23,6 +27,7 @@ from app.schemas.station import (
 )
 from app.schemas.storage import StorageDeviceAddInput, StorageDeviceRead, StorageDeviceUpdate
 from app.services.audit_service import AuditService
+from app.services.prediction_service import PredictionService
 from app.services.station_service import StationService
 from app.services.wizard_service import WizardService  # noqa: TC002 — 端点类型注解需要
 # M2: 复用 wizard 模块的工厂函数，避免重复定义
@@ -39,6 +44,18 @@ def _get_station_service(session: AsyncSession = Depends(get_db_session)) -> Sta
     return StationService(station_repo, audit_service, storage_repo=storage_repo)
 
 
+def _get_prediction_service(
+    session: AsyncSession = Depends(get_db_session),
+    station_service: StationService = Depends(_get_station_service),
+) -> PredictionService:
+    return PredictionService(
+        PredictionModelRepository(session),
+        AuditService(AuditLogRepository(session)),
+        prediction_repo=PowerPredictionRepository(session),
+        station_service=station_service,
+    )
+
+
 @router.get("", response_model=StationListResponse)
 async def list_stations(
     page: int = Query(1, ge=1),
@@ -225,3 +242,18 @@ async def get_station_predictions(
     )
     items = [PowerPredictionRead.model_validate(p) for p in predictions]
     return PowerPredictionListResponse(items=items, total=len(items))
+
+
+@router.get("/{station_id}/prediction-curves", response_model=PredictionCurveRangeResponse)
+async def get_station_prediction_curves(
+    station_id: UUID,
+    start_date: date = Query(...),
+    end_date: date = Query(...),
+    model_ids: list[UUID] | None = Query(None),
+    access_ctx: DataAccessContext = Depends(get_data_access_context),
+    prediction_service: PredictionService = Depends(_get_prediction_service),
+) -> PredictionCurveRangeResponse:
+    """多模型、多日预测曲线对比（单次查询，列式返回）。"""
+    return await prediction_service.get_prediction_curves(
+        access_ctx, station_id, start_date, end_date, model_ids,
+    )
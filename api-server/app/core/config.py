@@ -47,6 +47,26 @@ class Settings:
     # Data Import
     DATA_IMPORT_DIR: str = config("DATA_IMPORT_DIR", default="./data/imports")
     MAX_IMPORT_FILE_SIZE: int = config("MAX_IMPORT_FILE_SIZE", default=104857600, cast=int)  # 100MB
+    # 解析/校验引擎：row（逐行，默认）| columnar（NumPy 列式分块）
+    IMPORT_ENGINE: str = config("IMPORT_ENGINE", default="row")
+    IMPORT_COLUMNAR_CHUNK_SIZE: int = config("IMPORT_COLUMNAR_CHUNK_SIZE", default=50000, cast=int)
+    # 批量写入方式：copy（COPY + 临时暂存表，默认）| insert（多值 INSERT）
+    IMPORT_BULK_LOADER: str = config("IMPORT_BULK_LOADER", default="copy")
+    # 分片并行导入：CSV 文件不小于 IMPORT_SHARD_MIN_BYTES 时按字节切分为 IMPORT_SHARD_COUNT 片
+    IMPORT_SHARD_COUNT: int = config("IMPORT_SHARD_COUNT", default=4, cast=int)
+    IMPORT_SHARD_MIN_BYTES: int = config("IMPORT_SHARD_MIN_BYTES", default=33554432, cast=int)  # 32MB
+    # xlsx 首次导入时在 worker 中转换为 Arrow 列式缓存（按内容哈希复用）
+    IMPORT_XLSX_CACHE: bool = config("IMPORT_XLSX_CACHE", default=True, cast=bool)
+    # 自适应批次：按写入耗时向 IMPORT_FLUSH_TARGET_SECONDS 调整，范围 [MIN, MAX] 且不超过内存预算
+    IMPORT_BATCH_ADAPTIVE: bool = config("IMPORT_BATCH_ADAPTIVE", default=True, cast=bool)
+    IMPORT_BATCH_SIZE_MIN: int = config("IMPORT_BATCH_SIZE_MIN", default=200, cast=int)
+    IMPORT_BATCH_SIZE_MAX: int = config("IMPORT_BATCH_SIZE_MAX", default=20000, cast=int)
+    IMPORT_FLUSH_TARGET_SECONDS: float = config("IMPORT_FLUSH_TARGET_SECONDS", default=0.5, cast=float)
+    IMPORT_BATCH_MEMORY_BYTES: int = config("IMPORT_BATCH_MEMORY_BYTES", default=67108864, cast=int)  # 64MB
+    # 每写入多少个批次保存一次进度并提交事务（越大提交越少，断点恢复粒度越粗）
+    IMPORT_COMMIT_EVERY_BATCHES: int = config("IMPORT_COMMIT_EVERY_BATCHES", default=1, cast=int)
+    # Celery worker 导入指标 /metrics 端口（每个子进程监听 端口 + 子进程序号；0 为关闭）
+    IMPORT_METRICS_PORT: int = config("IMPORT_METRICS_PORT", default=0, cast=int)
 
     # Market Data
     MARKET_DATA_FETCH_TIMEOUT: int = config("MARKET_DATA_FETCH_TIMEOUT", default=30, cast=int)
@@ -54,6 +74,54 @@ class Settings:
     MARKET_DATA_RETRY_COUNT: int = config("MARKET_DATA_RETRY_COUNT", default=2, cast=int)
     MARKET_DATA_RETRY_BACKOFF: float = config("MARKET_DATA_RETRY_BACKOFF", default=1.0, cast=float)
     MARKET_DATA_ENCRYPTION_KEY: str = config("MARKET_DATA_ENCRYPTION_KEY", default="changeme-use-32-byte-key-here!!")
+    # 定时取数时同时在途的省份请求数上限
+    MARKET_DATA_FETCH_CONCURRENCY: int = config("MARKET_DATA_FETCH_CONCURRENCY", default=8, cast=int)
+    # 区间取数：上游支持区间查询时每次请求最多 RANGE_MAX_DAYS 天；否则逐日并发请求，
+    # 并发上限 RANGE_CONCURRENCY、速率上限 RANGE_RATE_LIMIT 次/秒
+    MARKET_DATA_RANGE_MAX_DAYS: int = config("MARKET_DATA_RANGE_MAX_DAYS", default=31, cast=int)
+    MARKET_DATA_RANGE_CONCURRENCY: int = config("MARKET_DATA_RANGE_CONCURRENCY", default=4, cast=int)
+    MARKET_DATA_RANGE_RATE_LIMIT: float = config("MARKET_DATA_RANGE_RATE_LIMIT", default=5.0, cast=float)
+    # 进程内 L1 曲线缓存（位于 Redis 之前，见 app.services.market_data_cache；任一为 0 时关闭）
+    MARKET_DATA_L1_CACHE_SIZE: int = config("MARKET_DATA_L1_CACHE_SIZE", default=1024, cast=int)
+    MARKET_DATA_L1_CACHE_TTL: float = config("MARKET_DATA_L1_CACHE_TTL", default=30.0, cast=float)
+    # 按数据源调度：每轮最多派发的数据源数；发布窗口内数据未到时的轮询间隔（秒）与最长轮询时长（分钟）
+    MARKET_DATA_DISPATCH_BATCH_SIZE: int = config("MARKET_DATA_DISPATCH_BATCH_SIZE", default=500, cast=int)
+    MARKET_DATA_FAST_POLL_SECONDS: int = config("MARKET_DATA_FAST_POLL_SECONDS", default=300, cast=int)
+    MARKET_DATA_FAST_POLL_WINDOW_MINUTES: int = config("MARKET_DATA_FAST_POLL_WINDOW_MINUTES", default=180, cast=int)
+    # 缓存未命中时的回填锁租约（秒），同一 (省份, 交易日) 跨进程只有一个调用方回填
+    MARKET_DATA_FILL_LOCK_SECONDS: float = config("MARKET_DATA_FILL_LOCK_SECONDS", default=10.0, cast=float)
+    # Redis 条目提前刷新窗口（秒，XFetch 的 delta×beta）；剩余 TTL 越短提前刷新概率越大，0 关闭
+    MARKET_DATA_EARLY_REFRESH_SECONDS: float = config("MARKET_DATA_EARLY_REFRESH_SECONDS", default=2.0, cast=float)
+    # 全部省份数据新鲜度汇总的 Redis 缓存秒数（0 关闭）
+    MARKET_DATA_FRESHNESS_CACHE_TTL: int = config("MARKET_DATA_FRESHNESS_CACHE_TTL", default=30, cast=int)
+    # 批量查询接口单次最多返回的 省份 × 天数
+    MARKET_DATA_BATCH_MAX_KEYS: int = config("MARKET_DATA_BATCH_MAX_KEYS", default=3100, cast=int)
+    # 历史回补单个任务允许的最大天数
+    MARKET_DATA_BACKFILL_MAX_DAYS: int = config("MARKET_DATA_BACKFILL_MAX_DAYS", default=1096, cast=int)
+
+    # Prediction
+    # 多模型区间曲线查询单次最多返回的 模型 × 天数
+    PREDICTION_RANGE_MAX_SERIES: int = config("PREDICTION_RANGE_MAX_SERIES", default=310, cast=int)
+    # 定时拉取：同时在途的模型请求数上限；同一 API 主机每秒请求数上限（0 不限速）
+    PREDICTION_FETCH_CONCURRENCY: int = config("PREDICTION_FETCH_CONCURRENCY", default=16, cast=int)
+    PREDICTION_FETCH_HOST_RATE_LIMIT: float = config("PREDICTION_FETCH_HOST_RATE_LIMIT", default=10.0, cast=float)
+    # 每累积多少个模型的结果合并为一次 upsert + 提交
+    PREDICTION_FETCH_WRITE_BATCH_MODELS: int = config("PREDICTION_FETCH_WRITE_BATCH_MODELS", default=20, cast=int)
+    # 按模型调度：每轮最多派发的模型数；同一 API 主机的到期模型每组最多多少个合并为一个任务
+    PREDICTION_DISPATCH_BATCH_SIZE: int = config("PREDICTION_DISPATCH_BATCH_SIZE", default=2000, cast=int)
+    PREDICTION_DISPATCH_GROUP_SIZE: int = config("PREDICTION_DISPATCH_GROUP_SIZE", default=50, cast=int)
+    # 健康检查（按 API 主机合并探测）：正常时从 INTERVAL 起每次翻倍直至 MAX_INTERVAL；
+    # 探测失败后按 ERROR_INTERVAL 快速复查（秒）
+    PREDICTION_HEALTH_CHECK_INTERVAL: int = config("PREDICTION_HEALTH_CHECK_INTERVAL", default=300, cast=int)
+    PREDICTION_HEALTH_CHECK_MAX_INTERVAL: int = config("PREDICTION_HEALTH_CHECK_MAX_INTERVAL", default=1800, cast=int)
+    PREDICTION_HEALTH_CHECK_ERROR_INTERVAL: int = config("PREDICTION_HEALTH_CHECK_ERROR_INTERVAL", default=60, cast=int)
+
+    # 外部 API 共享 HTTP 客户端（按 endpoint host 复用连接池，见 app.core.http_client）
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = config("HTTP_MAX_CONNECTIONS_PER_HOST", default=20, cast=int)
+    HTTP_MAX_KEEPALIVE_PER_HOST: int = config("HTTP_MAX_KEEPALIVE_PER_HOST", default=10, cast=int)
+    HTTP_KEEPALIVE_EXPIRY: float = config("HTTP_KEEPALIVE_EXPIRY", default=60.0, cast=float)
+    # 启用 HTTP/2（单连接多路复用），需 httpx[http2]；未安装 h2 时记录警告并回退 HTTP/1.1
+    HTTP_ENABLE_HTTP2: bool = config("HTTP_ENABLE_HTTP2", default=True, cast=bool)
 
     # App
     APP_ENV: str = config("APP_ENV", default="development")
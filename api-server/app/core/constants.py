@@ -0,0 +1,4 @@
+"""跨模块共享的业务常量。"""
+
+# 每个交易日的时段数（15 分钟一个时段）
+PERIODS_PER_DAY = 96
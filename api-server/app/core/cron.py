@@ -0,0 +1,58 @@
+"""五段式 cron 表达式（分 时 日 月 周）的解析与下次触发时间计算。
+
+字段解析复用 celery.schedules.crontab（支持 *、*/n、a-b、a,b），
+时间按 Celery 配置的时区（Asia/Shanghai）解释；日与周字段须同时满足（与 crontab 一致）。
+"""
+
+from datetime import UTC, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from celery.schedules import crontab
+
+CRON_TIMEZONE = ZoneInfo("Asia/Shanghai")
+
+# 覆盖闰年 2 月 29 日这类稀疏表达式
+_MAX_LOOKAHEAD_DAYS = 366 * 4 + 1
+
+
+def parse_cron(expr: str) -> crontab:
+    """解析 cron 表达式，格式错误时抛出 ValueError。"""
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError("cron 表达式须为 5 段：分 时 日 月 周")
+    minute, hour, day_of_month, month_of_year, day_of_week = fields
+    try:
+        return crontab(
+            minute=minute,
+            hour=hour,
+            day_of_month=day_of_month,
+            month_of_year=month_of_year,
+            day_of_week=day_of_week,
+        )
+    except Exception as e:
+        raise ValueError(f"无效的 cron 表达式: {expr}") from e
+
+
+def next_run_after(schedule: str | crontab, after: datetime) -> datetime:
+    """返回严格晚于 after 的下一次触发时间（UTC，精确到分钟）。"""
+    if isinstance(schedule, str):
+        schedule = parse_cron(schedule)
+    start = after.astimezone(CRON_TIMEZONE).replace(second=0, microsecond=0) + timedelta(minutes=1)
+    hours = sorted(schedule.hour)
+    minutes = sorted(schedule.minute)
+
+    for offset in range(_MAX_LOOKAHEAD_DAYS):
+        day = start.date() + timedelta(days=offset)
+        if (
+            day.month not in schedule.month_of_year
+            or day.day not in schedule.day_of_month
+            # crontab 的周字段 0 为周日
+            or day.isoweekday() % 7 not in schedule.day_of_week
+        ):
+            continue
+        for hour in hours:
+            for minute in minutes:
+                candidate = datetime.combine(day, time(hour, minute), CRON_TIMEZONE)
+                if candidate >= start:
+                    return candidate.astimezone(UTC)
+    raise ValueError("cron 表达式在 4 年内没有触发时间")
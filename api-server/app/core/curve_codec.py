@@ -0,0 +1,121 @@
+"""96 时段曲线的紧凑二进制缓存编码（版本化，可回退到 JSON）。
+
+格式 v1（小端）：
+    b"C1" | 头部长度 uint16 | 头部 JSON（meta、列名、定点倍数）
+          | 时段位图 12 字节（第 p 时段对应第 p-1 位）| 每列 96 × int32 定点值
+
+头部 JSON 只出现一次，每时段的数值为 int32（值 × scale），缺失时段在位图中为 0、数值为 0。
+一条 96 时段价格曲线约 500 字节（等价 JSON 列表约 10KB）。
+数值不能精确表示为 int32 定点值（小数位超出 scale 或溢出）时 encode_curve 返回 None，
+调用方回退到 JSON；decode_curve 对非 v1 数据返回 None，调用方按旧 JSON 条目解析。
+市场出清价格与功率预测曲线共用此格式（列名区分）。
+"""
+
+import json
+import struct
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+PERIODS = 96
+MAGIC = b"C1"
+_BITMAP_BYTES = PERIODS // 8
+_HEADER_LEN = struct.Struct("<H")
+_INT32_MIN, _INT32_MAX = -(2 ** 31), 2 ** 31 - 1
+
+
+@dataclass
+class PackedCurve:
+    meta: dict
+    scale: int
+    # 已有数据的时段号（升序，1-96）
+    periods: np.ndarray
+    # 列名 -> 与 periods 对齐的 int32 定点值
+    columns: dict[str, np.ndarray]
+
+    def decimal_strings(self, name: str) -> list[str]:
+        """按 scale 的小数位格式化列值（与 str(Numeric) 输出一致）。"""
+        digits = len(str(self.scale)) - 1
+        values = self.columns[name]
+        return [str(Decimal(int(v)).scaleb(-digits)) for v in values]
+
+
+def _to_fixed(value, scale: int) -> int | None:
+    try:
+        scaled = Decimal(str(value)) * scale
+    except (InvalidOperation, ValueError):
+        return None
+    if scaled != scaled.to_integral_value():
+        return None
+    fixed = int(scaled)
+    if not _INT32_MIN <= fixed <= _INT32_MAX:
+        return None
+    return fixed
+
+
+def encode_curve(
+    meta: dict,
+    periods: list[int],
+    columns: dict[str, list],
+    scale: int = 100,
+) -> bytes | None:
+    """编码一条曲线；periods 与各列等长且时段不重复。不可精确表示时返回 None。"""
+    if len(set(periods)) != len(periods) or any(not 1 <= p <= PERIODS for p in periods):
+        return None
+    index = np.asarray(periods, dtype=np.int64) - 1
+    bitmap = np.zeros(PERIODS, dtype=bool)
+    bitmap[index] = True
+
+    packed_columns = []
+    for values in columns.values():
+        if len(values) != len(periods):
+            return None
+        fixed = [_to_fixed(v, scale) for v in values]
+        if any(v is None for v in fixed):
+            return None
+        array = np.zeros(PERIODS, dtype="<i4")
+        array[index] = fixed
+        packed_columns.append(array.tobytes())
+
+    header = json.dumps(
+        {"meta": meta, "columns": list(columns), "scale": scale},
+        separators=(",", ":"), ensure_ascii=False, default=str,
+    ).encode()
+    return b"".join((
+        MAGIC,
+        _HEADER_LEN.pack(len(header)),
+        header,
+        np.packbits(bitmap, bitorder="little").tobytes(),
+        *packed_columns,
+    ))
+
+
+def decode_curve(raw: bytes | str | None) -> PackedCurve | None:
+    """解码 v1 曲线；非 v1（如旧 JSON 条目）或数据损坏时返回 None。"""
+    if not isinstance(raw, bytes | bytearray) or not raw.startswith(MAGIC):
+        return None
+    try:
+        offset = len(MAGIC)
+        (header_len,) = _HEADER_LEN.unpack_from(raw, offset)
+        offset += _HEADER_LEN.size
+        header = json.loads(raw[offset:offset + header_len])
+        offset += header_len
+        bitmap = np.unpackbits(
+            np.frombuffer(raw, dtype=np.uint8, count=_BITMAP_BYTES, offset=offset),
+            bitorder="little",
+        ).astype(bool)
+        offset += _BITMAP_BYTES
+        columns = {}
+        for name in header["columns"]:
+            values = np.frombuffer(raw, dtype="<i4", count=PERIODS, offset=offset)
+            columns[name] = values[bitmap]
+            offset += PERIODS * 4
+    except (ValueError, KeyError, TypeError, struct.error):
+        return None
+    return PackedCurve(
+        meta=header["meta"],
+        scale=int(header["scale"]),
+        periods=np.flatnonzero(bitmap) + 1,
+        columns=columns,
+    )
@@ -0,0 +1,164 @@
+"""进程级共享 httpx.AsyncClient 注册表。
+
+市场数据与功率预测适配器按 endpoint 的 scheme://host:port 取共享客户端，
+同一主机的请求复用 keep-alive 连接（每主机连接数上限 HTTP_MAX_CONNECTIONS_PER_HOST），
+HTTP_ENABLE_HTTP2 时启用 HTTP/2（依赖 httpx[http2] 安装的 h2）。各请求的超时由调用方按请求传入。
+
+httpx 客户端绑定创建它的事件循环：
+- API 进程只有一个事件循环，lifespan 关闭时调用 close_http_clients()
+- Celery worker 通过 run_sync() 在每个子进程的常驻事件循环中执行异步代码，
+  跨任务复用连接，worker 子进程退出时关闭
+事件循环切换（如测试中每个用例新建循环）时关闭旧循环上的客户端：旧循环仍在其他线程运行时
+在旧循环上关闭，否则在当前循环上关闭（旧循环已关闭时 aclose 仍会关闭套接字，只是会报错）。
+
+TokenBucket 用于限制对同一上游的请求速率（如历史数据回补时的逐日请求、按主机限速的预测拉取）。
+"""
+
+import asyncio
+import os
+import time
+
+import httpx
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_clients_loop: asyncio.AbstractEventLoop | None = None
+# 持有切换循环时的关闭任务引用，避免事件循环只保留弱引用时任务被提前回收
+_close_tasks: set[asyncio.Task] = set()
+
+_worker_loop: asyncio.AbstractEventLoop | None = None
+_worker_loop_pid: int | None = None
+_h2_missing_warned = False
+
+
+def _http2_enabled() -> bool:
+    global _h2_missing_warned
+    if not settings.HTTP_ENABLE_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        if not _h2_missing_warned:
+            _h2_missing_warned = True
+            logger.warning("http2_unavailable", hint="未安装 h2（httpx[http2]），回退到 HTTP/1.1")
+        return False
+    return True
+
+
+def host_key(url: str) -> str:
+    """返回 url 的 scheme://host[:port]，作为共享客户端与限速令牌桶的分组键。"""
+    parsed = httpx.URL(url)
+    port = f":{parsed.port}" if parsed.port else ""
+    return f"{parsed.scheme}://{parsed.host}{port}"
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """返回 url 所在主机的共享客户端（须在事件循环中调用）。"""
+    global _clients_loop
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        # 旧循环上的连接无法在新循环中使用，关闭以释放连接池
+        stale = list(_clients.values())
+        _clients.clear()
+        old_loop, _clients_loop = _clients_loop, loop
+        if stale:
+            _close_stale_clients(stale, old_loop, loop)
+
+    key = host_key(url)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        http2 = _http2_enabled()
+        client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_PER_HOST,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        _clients[key] = client
+        logger.debug("http_client_created", host=key, http2=http2)
+    return client
+
+
+async def _aclose_all(clients: list[httpx.AsyncClient]) -> None:
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("http_client_close_failed", error=str(e))
+
+
+def _close_stale_clients(
+    clients: list[httpx.AsyncClient],
+    old_loop: asyncio.AbstractEventLoop | None,
+    loop: asyncio.AbstractEventLoop,
+) -> None:
+    if old_loop is not None and old_loop.is_running() and not old_loop.is_closed():
+        asyncio.run_coroutine_threadsafe(_aclose_all(clients), old_loop)
+        return
+    task = loop.create_task(_aclose_all(clients))
+    _close_tasks.add(task)
+    task.add_done_callback(_close_tasks.discard)
+
+
+async def close_http_clients() -> None:
+    """关闭当前事件循环上的全部共享客户端。"""
+    clients = list(_clients.values())
+    _clients.clear()
+    await _aclose_all(clients)
+
+
+class TokenBucket:
+    """异步令牌桶：平均每秒 rate 个令牌，最多累积 burst 个（rate <= 0 表示不限速）。
+
+    仅在单个事件循环内使用；检查与扣减之间没有 await，无需加锁。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def run_sync(coro):
+    """在当前进程的常驻事件循环中执行协程（Celery 任务使用，替代 asyncio.run）。
+
+    asyncio.run 每次新建并关闭事件循环，共享客户端的连接随之失效；
+    常驻循环使同一 worker 子进程内的任务复用连接。fork 后的子进程会新建自己的循环。
+    """
+    global _worker_loop, _worker_loop_pid
+    pid = os.getpid()
+    if _worker_loop is None or _worker_loop.is_closed() or _worker_loop_pid != pid:
+        _worker_loop = asyncio.new_event_loop()
+        _worker_loop_pid = pid
+    return _worker_loop.run_until_complete(coro)
+
+
+def shutdown_worker_loop() -> None:
+    """关闭常驻事件循环上的客户端并关闭循环（worker 子进程退出时调用）。"""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed() or _worker_loop_pid != os.getpid():
+        return
+    try:
+        _worker_loop.run_until_complete(close_http_clients())
+    finally:
+        _worker_loop.close()
+        _worker_loop = None
@@ -5,6 +5,7 @@ M4 fix: 从 prediction_service.py 提取到独立模块，打破 schemas ↔ ser
 
 import base64
 import hashlib
+from functools import lru_cache
 
 import structlog
 from cryptography.fernet import Fernet
@@ -14,6 +15,13 @@ from app.core.config import settings
 logger = structlog.get_logger()
 
 
+@lru_cache(maxsize=4)
+def _fernet_for_key(key: str) -> Fernet:
+    """按密钥缓存 Fernet 实例（批量解密时不再逐次派生密钥）。"""
+    key_bytes = hashlib.sha256(key.encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(key_bytes))
+
+
 def _get_fernet() -> Fernet:
     """获取 Fernet 加密实例（基于 ENCRYPTION_KEY 派生密钥）。"""
     prediction_key = getattr(settings, "PREDICTION_ENCRYPTION_KEY", None)
@@ -25,8 +33,7 @@ def _get_fernet() -> Fernet:
             "prediction_encryption_key_fallback",
             msg="PREDICTION_ENCRYPTION_KEY 未配置，回退使用 MARKET_DATA_ENCRYPTION_KEY",
         )
-    key_bytes = hashlib.sha256(key.encode()).digest()
-    return Fernet(base64.urlsafe_b64encode(key_bytes))
+    return _fernet_for_key(key)
 
 
 def encrypt_api_key(api_key: str) -> bytes:
@@ -0,0 +1,55 @@
+"""进程级共享 Redis 客户端。
+
+客户端内部维护连接池，同一事件循环内所有请求复用；事件循环切换（如测试）时重建。
+Redis 不可达时在 _RETRY_SECONDS 内直接返回 None，不再每个请求重新 ping。
+decode_responses=False 的客户端返回 bytes，供存放二进制值的缓存（如市场数据曲线）使用。
+"""
+
+import asyncio
+import time
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_RETRY_SECONDS = 5.0
+
+_clients: dict[bool, aioredis.Redis] = {}
+_clients_loop: asyncio.AbstractEventLoop | None = None
+_unavailable_until = 0.0
+
+
+async def get_redis_client(decode_responses: bool = True) -> aioredis.Redis | None:
+    """返回共享 Redis 客户端；Redis 不可用时返回 None（缓存/通知降级）。"""
+    global _clients_loop, _unavailable_until
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        _clients.clear()
+        _clients_loop = loop
+        _unavailable_until = 0.0
+    client = _clients.get(decode_responses)
+    if client is not None:
+        return client
+    if time.monotonic() < _unavailable_until:
+        return None
+
+    try:
+        client = aioredis.from_url(settings.REDIS_URL, decode_responses=decode_responses)
+        await client.ping()
+    except Exception:
+        _unavailable_until = time.monotonic() + _RETRY_SECONDS
+        return None
+    _clients[decode_responses] = client
+    return client
+
+
+async def close_redis_clients() -> None:
+    global _clients_loop
+    clients = list(_clients.values())
+    _clients.clear()
+    _clients_loop = None
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception:
+            pass
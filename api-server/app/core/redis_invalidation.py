@@ -0,0 +1,76 @@
+"""进程内缓存的 Redis 失效通知监听。
+
+每个进程（fork 之后）启动一个守护线程订阅失效频道，收到消息交给 on_message 处理。
+监听未连上期间 listening 未置位，调用方应绕过进程内缓存；断线时调用 on_disconnect
+清空缓存（期间可能错过失效消息），之后按 RECONNECT_SECONDS 间隔重连。
+"""
+
+import os
+import threading
+import time
+from collections.abc import Callable
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+RECONNECT_SECONDS = 5.0
+
+
+class InvalidationListener:
+    """模块级创建，使用缓存前调用 ensure_started()（不在 import 时启动线程）。"""
+
+    def __init__(
+        self,
+        channel: str,
+        on_message: Callable[[bytes], None],
+        on_disconnect: Callable[[], None],
+        thread_name: str,
+    ):
+        self.channel = channel
+        self.on_message = on_message
+        self.on_disconnect = on_disconnect
+        self.thread_name = thread_name
+        self.listening = threading.Event()
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        """本进程尚未启动监听线程时启动（fork 继承的状态先清空）。"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self.listening.clear()
+            self.on_disconnect()
+        threading.Thread(target=self._run, name=self.thread_name, daemon=True).start()
+
+    def _run(self) -> None:
+        import redis
+
+        warned = False
+        while True:
+            try:
+                client = redis.Redis.from_url(settings.REDIS_URL)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self.listening.set()
+                warned = False
+                for message in pubsub.listen():
+                    self.on_message(message["data"])
+            except Exception as e:
+                if not warned:
+                    logger.warning(
+                        "invalidation_listener_disconnected", channel=self.channel, error=str(e)[:200],
+                    )
+                    warned = True
+            finally:
+                self.listening.clear()
+                self.on_disconnect()
+            time.sleep(RECONNECT_SECONDS)
+
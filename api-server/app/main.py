@@ -14,6 +14,11 @@ from app.api.v1.router import api_v1_router
 async def lifespan(app: FastAPI):
     setup_logging()
     yield
+    from app.core.http_client import close_http_clients
+    from app.core.redis import close_redis_clients
+
+    await close_http_clients()
+    await close_redis_clients()
 
 
 app = FastAPI(
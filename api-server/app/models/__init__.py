@@ -1,7 +1,12 @@
 from app.models.audit import AuditLog
 from app.models.binding import UserDeviceBinding, UserStationBinding
 from app.models.data_import import DataImportJob, ImportAnomaly, TradingRecord
-from app.models.market_data import MarketClearingPrice, MarketDataSource
+from app.models.market_data import (
+    MarketClearingPrice,
+    MarketDataBackfillJob,
+    MarketDataFreshnessState,
+    MarketDataSource,
+)
 from app.models.market_rule import ProvinceMarketRule
 from app.models.prediction import PowerPrediction, PredictionModel
 from app.models.station import PowerStation
@@ -13,6 +18,8 @@ __all__ = [
     "DataImportJob",
     "ImportAnomaly",
     "MarketClearingPrice",
+    "MarketDataBackfillJob",
+    "MarketDataFreshnessState",
     "MarketDataSource",
     "PowerPrediction",
     "PowerStation",
@@ -7,18 +7,20 @@ from sqlalchemy import (
     CheckConstraint,
     Date,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
     Numeric,
     PrimaryKeyConstraint,
+    SmallInteger,
     String,
     Text,
     UniqueConstraint,
     func,
     text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base, IdMixin, TimestampMixin
@@ -30,6 +32,8 @@ class DataImportJob(Base, IdMixin, TimestampMixin):
     file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     original_file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     file_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # 文件内容 SHA-256（xlsx 列式缓存键）
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     station_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("power_stations.id"), nullable=False,
     )
@@ -50,6 +54,10 @@ class DataImportJob(Base, IdMixin, TimestampMixin):
         Numeric(5, 2), server_default=text("0"),
     )
     last_processed_row: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    # CSV 断点：last_processed_row 之后下一条记录的字节偏移（xlsx 为空）
+    resume_offset: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # 分阶段耗时、吞吐量与批次耗时直方图（见 app.tasks.import_metrics）
+    metrics: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     celery_task_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     started_at: Mapped[datetime | None] = mapped_column(
@@ -178,6 +186,36 @@ class StorageOperationRecord(Base):
     )
 
 
+# 异常描述模板：template_id -> (anomaly_type, field_name, 模板)。
+# 导入时只存 template_id + 参数，读取时再渲染；{raw} 取自 raw_value。
+# 已发布的 id 不可修改含义，只能追加。
+ANOMALY_TEMPLATES: dict[int, tuple[str, str, str]] = {
+    1: ("format_error", "trading_date", "交易日期格式错误: {raw}"),
+    2: ("format_error", "period", "时段编号超出范围(1-96): {raw}"),
+    3: ("format_error", "clearing_price", "出清价格格式错误: {raw}"),
+    4: ("out_of_range", "clearing_price", "出清价格超出省份限价范围({lower}~{upper}): {raw}"),
+    5: ("format_error", "actual_output_kw", "实际出力格式错误或为负值: {raw}"),
+    6: ("out_of_range", "soc", "SOC 值无效或超出范围(0-1): {raw}"),
+    7: ("format_error", "charge_power_kw", "充电功率格式错误: {raw}"),
+    8: ("format_error", "discharge_power_kw", "放电功率格式错误: {raw}"),
+    9: ("format_error", "cycle_count", "循环次数格式错误: {raw}"),
+    10: ("duplicate", "record", "本批次中 {skipped} 条重复记录已跳过"),
+    11: ("missing", "period", "交易日 {trading_date} {entity_label}缺少时段: {missing}"),
+}
+
+# (anomaly_type, field_name) -> template_id
+ANOMALY_TEMPLATE_IDS: dict[tuple[str, str], int] = {
+    (anomaly_type, field_name): template_id
+    for template_id, (anomaly_type, field_name, _) in ANOMALY_TEMPLATES.items()
+}
+
+
+def render_anomaly_description(
+    template_id: int, raw_value: str | None, params: dict | None,
+) -> str:
+    return ANOMALY_TEMPLATES[template_id][2].format(raw=raw_value or "", **(params or {}))
+
+
 class ImportAnomaly(Base, IdMixin, TimestampMixin):
     __tablename__ = "import_anomalies"
 
@@ -188,7 +226,10 @@ class ImportAnomaly(Base, IdMixin, TimestampMixin):
     anomaly_type: Mapped[str] = mapped_column(String(20), nullable=False)
     field_name: Mapped[str] = mapped_column(String(50), nullable=False)
     raw_value: Mapped[str | None] = mapped_column(Text, nullable=True)
-    description: Mapped[str] = mapped_column(Text, nullable=False)
+    # 批量导入只写 template_id/template_params，description 为空，由 ImportAnomalyRepository 读取时渲染
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    template_id: Mapped[int | None] = mapped_column(SmallInteger, nullable=True)
+    template_params: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     status: Mapped[str] = mapped_column(
         String(20), nullable=False, server_default=text("'pending'"),
     )
@@ -204,4 +245,66 @@ class ImportAnomaly(Base, IdMixin, TimestampMixin):
             "status IN ('pending', 'confirmed_normal', 'corrected', 'deleted')",
             name="ck_import_anomalies_status",
         ),
+        CheckConstraint(
+            "description IS NOT NULL OR template_id IS NOT NULL",
+            name="ck_import_anomalies_description",
+        ),
+    )
+
+
+class DataImportShard(Base, IdMixin, TimestampMixin):
+    """大文件分片导入的分片状态（按 CSV 字节范围切分，每片由独立 worker 处理）。"""
+
+    __tablename__ = "data_import_shards"
+
+    import_job_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("data_import_jobs.id", ondelete="CASCADE"), nullable=False,
+    )
+    shard_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    end_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # 分片首行的全局行号（不含列头，从 1 开始），异常记录沿用全局行号
+    first_row: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=text("'pending'"),
+    )
+    total_records: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    processed_records: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    success_records: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    failed_records: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    last_processed_row: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    resume_offset: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    trading_dates: Mapped[list] = mapped_column(
+        JSONB, nullable=False, server_default=text("'[]'::jsonb"),
+    )
+    # 分片已写入时段位图 {ISO 日期: 12 字节十六进制}，汇总时按位或合并
+    period_coverage: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb"),
+    )
+    metrics: Mapped[dict] = mapped_column(
+        JSONB, nullable=False, server_default=text("'{}'::jsonb"),
+    )
+    celery_task_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("import_job_id", "shard_index", name="uq_data_import_shards_job_index"),
+        CheckConstraint(
+            "status IN ('pending', 'processing', 'completed', 'failed')",
+            name="ck_data_import_shards_status",
+        ),
     )
+
+
+class ImportMetricCounter(Base):
+    """按导入类型累加的已完成任务统计计数器（任务完成时与 job 状态同一事务内累加）。
+
+    API 的 /metrics 读取此表，不再逐次扫描全部已完成任务的 metrics 列。
+    name 取值见 app.tasks.import_metrics.to_counters。
+    """
+
+    __tablename__ = "import_metric_counters"
+
+    import_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[float] = mapped_column(Float, nullable=False, server_default=text("0"))
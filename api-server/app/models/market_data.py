@@ -68,6 +68,18 @@ class MarketClearingPrice(Base):
     )
 
 
+class MarketDataFreshnessState(Base):
+    """各省份出清价格的最近写入时间（随价格 upsert 在同一事务内更新）。
+
+    数据新鲜度查询读取此表，不再对 market_clearing_prices 全表做 max(fetched_at)。
+    """
+
+    __tablename__ = "market_data_freshness"
+
+    province: Mapped[str] = mapped_column(String(50), primary_key=True)
+    last_fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class MarketDataSource(Base, IdMixin, TimestampMixin):
     """市场数据源配置 - 省级电力交易中心 API 接入参数。"""
 
@@ -85,6 +97,7 @@ class MarketDataSource(Base, IdMixin, TimestampMixin):
             "cache_ttl_seconds > 0",
             name="ck_market_data_sources_cache_ttl",
         ),
+        Index("ix_market_data_sources_next_fetch_at", "next_fetch_at"),
     )
 
     province: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
@@ -110,3 +123,56 @@ class MarketDataSource(Base, IdMixin, TimestampMixin):
     cache_ttl_seconds: Mapped[int] = mapped_column(
         Integer, nullable=False, server_default=text("3600"),
     )
+    # 定时取数的条件请求校验值与曲线内容哈希（仅对 fetch_validated_date 当日有效）
+    fetch_validated_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    fetch_etag: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    fetch_last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    fetch_content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # 按 fetch_schedule 计算的下次取数时间（调度器按此列索引扫描到期数据源）
+    next_fetch_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    # 发布窗口内数据未到时的加密轮询截止时间，为空表示未在轮询
+    fast_poll_until: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+
+
+class MarketDataBackfillJob(Base, IdMixin, TimestampMixin):
+    """出清价格历史回补任务 - 按自然月分块获取并写入，completed_through 为断点。"""
+
+    __tablename__ = "market_data_backfill_jobs"
+    __table_args__ = (
+        Index("ix_market_data_backfill_jobs_province", "province"),
+        CheckConstraint(
+            "status IN ('pending', 'processing', 'completed', 'failed')",
+            name="ck_market_data_backfill_jobs_status",
+        ),
+        CheckConstraint(
+            "end_date >= start_date",
+            name="ck_market_data_backfill_jobs_range",
+        ),
+    )
+
+    province: Mapped[str] = mapped_column(String(50), nullable=False)
+    start_date: Mapped[date] = mapped_column(Date, nullable=False)
+    end_date: Mapped[date] = mapped_column(Date, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=text("'pending'"),
+    )
+    # 已完整写入的最后一天（含），恢复时从次日所在月份继续
+    completed_through: Mapped[date | None] = mapped_column(Date, nullable=True)
+    total_chunks: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    completed_chunks: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    total_records: Mapped[int] = mapped_column(Integer, server_default=text("0"))
+    celery_task_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    created_by: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False,
+    )
@@ -43,6 +43,11 @@ class PredictionModel(Base, IdMixin, TimestampMixin):
             "api_auth_type IN ('api_key', 'bearer', 'none')",
             name="ck_prediction_models_auth_type",
         ),
+        CheckConstraint(
+            "prediction_horizon IN ('day_ahead', 'intraday')",
+            name="ck_prediction_models_horizon",
+        ),
+        Index("ix_prediction_models_next_fetch_at", "next_fetch_at"),
     )
 
     station_id: Mapped[uuid.UUID] = mapped_column(
@@ -65,6 +70,14 @@ class PredictionModel(Base, IdMixin, TimestampMixin):
     timeout_seconds: Mapped[int] = mapped_column(
         Integer, nullable=False, server_default=text("30"),
     )
+    # 拉取目标日：day_ahead 为 T+1 日前预测，intraday 为 T+0 日内滚动预测
+    prediction_horizon: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=text("'day_ahead'"),
+    )
+    # 按 call_frequency_cron 计算的下次拉取时间（调度器按此列索引扫描到期模型）
+    next_fetch_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
     is_active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, server_default=text("true"),
     )
@@ -76,6 +89,11 @@ class PredictionModel(Base, IdMixin, TimestampMixin):
     )
     last_check_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
     last_check_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # 自适应健康检查：下次探测时间与当前探测间隔（秒），为空表示尚未按新策略探测
+    next_check_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    check_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
     last_fetch_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True,
     )
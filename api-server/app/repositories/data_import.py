@@ -4,17 +4,33 @@ from uuid import UUID
 from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.data_import import (
     DataImportJob,
+    DataImportShard,
     ImportAnomaly,
+    ImportMetricCounter,
     StationOutputRecord,
     StorageOperationRecord,
     TradingRecord,
+    render_anomaly_description,
 )
 from app.repositories.base import BaseRepository
 
 
+def build_metric_counters_upsert_stmt(import_type: str, counters: dict[str, float]):
+    """将完成任务的统计增量累加到 import_metric_counters（供 Repository 和 Celery 任务共享）。"""
+    stmt = pg_insert(ImportMetricCounter).values([
+        {"import_type": import_type, "name": name, "value": value}
+        for name, value in counters.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=["import_type", "name"],
+        set_={"value": ImportMetricCounter.value + stmt.excluded.value},
+    )
+
+
 class DataImportJobRepository(BaseRepository[DataImportJob]):
     def __init__(self, session: AsyncSession):
         super().__init__(DataImportJob, session)
@@ -122,6 +138,35 @@ class DataImportJobRepository(BaseRepository[DataImportJob]):
                 job.completed_at = completed_at
             await self.session.flush()
 
+    async def has_shards(self, job_id: UUID) -> bool:
+        stmt = (
+            select(func.count())
+            .select_from(DataImportShard)
+            .where(DataImportShard.import_job_id == job_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one() > 0
+
+    async def has_processing_shards(self, job_id: UUID) -> bool:
+        stmt = (
+            select(func.count())
+            .select_from(DataImportShard)
+            .where(
+                DataImportShard.import_job_id == job_id,
+                DataImportShard.status == "processing",
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one() > 0
+
+    async def list_shard_task_ids(self, job_id: UUID) -> list[str]:
+        stmt = select(DataImportShard.celery_task_id).where(
+            DataImportShard.import_job_id == job_id,
+            DataImportShard.celery_task_id.is_not(None),
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def has_processing_job(self, station_id: UUID) -> bool:
         stmt = (
             select(func.count())
@@ -150,6 +195,14 @@ class DataImportJobRepository(BaseRepository[DataImportJob]):
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def list_metric_counters(self) -> list[tuple[str, str, float]]:
+        """已完成任务的预聚合统计 (import_type, name, value)。"""
+        stmt = select(
+            ImportMetricCounter.import_type, ImportMetricCounter.name, ImportMetricCounter.value,
+        )
+        result = await self.session.execute(stmt)
+        return [tuple(row) for row in result.all()]
+
 
 class TradingRecordRepository:
     def __init__(self, session: AsyncSession):
@@ -232,10 +285,32 @@ class TradingRecordRepository:
         return result.rowcount
 
 
+def _render_descriptions(anomalies):
+    """为模板存储的异常渲染 description。
+
+    使用 set_committed_value 赋值，不标记为脏数据，渲染结果不会被写回数据库。
+    """
+    for anomaly in anomalies:
+        if anomaly.description is None and anomaly.template_id is not None:
+            set_committed_value(
+                anomaly, "description",
+                render_anomaly_description(
+                    anomaly.template_id, anomaly.raw_value, anomaly.template_params,
+                ),
+            )
+    return anomalies
+
+
 class ImportAnomalyRepository(BaseRepository[ImportAnomaly]):
     def __init__(self, session: AsyncSession):
         super().__init__(ImportAnomaly, session)
 
+    async def get_by_id(self, id: UUID) -> ImportAnomaly | None:
+        anomaly = await super().get_by_id(id)
+        if anomaly:
+            _render_descriptions([anomaly])
+        return anomaly
+
     async def bulk_create(self, anomalies: list[dict]) -> None:
         if not anomalies:
             return
@@ -271,7 +346,7 @@ class ImportAnomalyRepository(BaseRepository[ImportAnomaly]):
             .limit(page_size)
         )
         result = await self.session.execute(stmt)
-        anomalies = list(result.scalars().all())
+        anomalies = _render_descriptions(list(result.scalars().all()))
 
         return anomalies, total
 
@@ -293,7 +368,7 @@ class ImportAnomalyRepository(BaseRepository[ImportAnomaly]):
             return []
         stmt = select(ImportAnomaly).where(ImportAnomaly.id.in_(anomaly_ids))
         result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+        return _render_descriptions(list(result.scalars().all()))
 
     async def get_by_id_for_update(self, anomaly_id: UUID) -> ImportAnomaly | None:
         stmt = (
@@ -302,7 +377,10 @@ class ImportAnomalyRepository(BaseRepository[ImportAnomaly]):
             .with_for_update()
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        anomaly = result.scalar_one_or_none()
+        if anomaly:
+            _render_descriptions([anomaly])
+        return anomaly
 
     async def list_all_anomalies(
         self,
@@ -338,7 +416,7 @@ class ImportAnomalyRepository(BaseRepository[ImportAnomaly]):
             .limit(page_size)
         )
         result = await self.session.execute(stmt)
-        anomalies = list(result.scalars().all())
+        anomalies = _render_descriptions(list(result.scalars().all()))
 
         return anomalies, total
 
@@ -1,14 +1,40 @@
 from datetime import date, datetime
 from uuid import UUID
 
-from sqlalchemy import func, select, update
+from sqlalchemy import func, select, tuple_, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.market_data import MarketClearingPrice, MarketDataSource
+from app.models.market_data import (
+    MarketClearingPrice,
+    MarketDataBackfillJob,
+    MarketDataFreshnessState,
+    MarketDataSource,
+)
 from app.repositories.base import BaseRepository
 
 
+def build_freshness_upsert_stmt(rows: list[dict]):
+    """按写入的价格行更新各省最近写入时间（只前进不后退；供 Repository 和 Celery 任务共享）。"""
+    latest: dict[str, datetime] = {}
+    for row in rows:
+        province, fetched_at = row["province"], row["fetched_at"]
+        if province not in latest or fetched_at > latest[province]:
+            latest[province] = fetched_at
+    stmt = pg_insert(MarketDataFreshnessState).values([
+        {"province": province, "last_fetched_at": fetched_at}
+        for province, fetched_at in latest.items()
+    ])
+    return stmt.on_conflict_do_update(
+        index_elements=["province"],
+        set_={
+            "last_fetched_at": func.greatest(
+                MarketDataFreshnessState.last_fetched_at, stmt.excluded.last_fetched_at,
+            ),
+        },
+    )
+
+
 class MarketClearingPriceRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -27,6 +53,7 @@ class MarketClearingPriceRepository:
             },
         )
         result = await self.session.execute(stmt)
+        await self.session.execute(build_freshness_upsert_stmt(records))
         return result.rowcount
 
     async def get_by_province_date(
@@ -63,6 +90,36 @@ class MarketClearingPriceRepository:
         records = list(result.scalars().all())
         return records, total
 
+    async def get_by_province_date_pairs(
+        self, pairs: list[tuple[str, date]],
+    ) -> dict[tuple[str, date], list]:
+        """一次查询多个 (省份, 交易日) 的全部时段，按 (省份, 交易日) 分组返回（仅取所需列）。"""
+        if not pairs:
+            return {}
+        stmt = (
+            select(
+                MarketClearingPrice.province,
+                MarketClearingPrice.trading_date,
+                MarketClearingPrice.period,
+                MarketClearingPrice.clearing_price,
+                MarketClearingPrice.source,
+                MarketClearingPrice.fetched_at,
+            )
+            .where(
+                tuple_(MarketClearingPrice.province, MarketClearingPrice.trading_date).in_(pairs)
+            )
+            .order_by(
+                MarketClearingPrice.province,
+                MarketClearingPrice.trading_date,
+                MarketClearingPrice.period,
+            )
+        )
+        result = await self.session.execute(stmt)
+        grouped: dict[tuple[str, date], list] = {}
+        for row in result.all():
+            grouped.setdefault((row.province, row.trading_date), []).append(row)
+        return grouped
+
     async def get_latest_by_province(self, province: str) -> MarketClearingPrice | None:
         stmt = (
             select(MarketClearingPrice)
@@ -77,12 +134,17 @@ class MarketClearingPriceRepository:
         return result.scalar_one_or_none()
 
     async def check_freshness(self, province: str) -> datetime | None:
-        stmt = (
-            select(func.max(MarketClearingPrice.fetched_at))
-            .where(MarketClearingPrice.province == province)
-        )
+        return (await self.get_last_fetched([province])).get(province)
+
+    async def get_last_fetched(self, provinces: list[str]) -> dict[str, datetime]:
+        """一次查询多个省份的最近写入时间（读 market_data_freshness 状态表）；无数据的省份不在结果中。"""
+        if not provinces:
+            return {}
+        stmt = select(
+            MarketDataFreshnessState.province, MarketDataFreshnessState.last_fetched_at,
+        ).where(MarketDataFreshnessState.province.in_(provinces))
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return {row.province: row.last_fetched_at for row in result.all()}
 
     async def list_paginated(
         self,
@@ -129,6 +191,16 @@ class MarketDataSourceRepository(BaseRepository[MarketDataSource]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_cache_ttls(self, provinces: list[str]) -> dict[str, int]:
+        """返回 {省份: cache_ttl_seconds}（未配置数据源的省份不在结果中）。"""
+        if not provinces:
+            return {}
+        stmt = select(MarketDataSource.province, MarketDataSource.cache_ttl_seconds).where(
+            MarketDataSource.province.in_(provinces)
+        )
+        result = await self.session.execute(stmt)
+        return {row.province: row.cache_ttl_seconds for row in result.all()}
+
     async def get_active_sources(self) -> list[MarketDataSource]:
         stmt = (
             select(MarketDataSource)
@@ -184,3 +256,22 @@ class MarketDataSourceRepository(BaseRepository[MarketDataSource]):
         result = await self.session.execute(stmt)
         sources = list(result.scalars().all())
         return sources, total
+
+
+class MarketDataBackfillJobRepository(BaseRepository[MarketDataBackfillJob]):
+    def __init__(self, session: AsyncSession):
+        super().__init__(MarketDataBackfillJob, session)
+
+    async def get_active_by_province(self, province: str) -> MarketDataBackfillJob | None:
+        """返回该省份未结束（pending/processing）的回补任务。"""
+        stmt = (
+            select(MarketDataBackfillJob)
+            .where(
+                MarketDataBackfillJob.province == province,
+                MarketDataBackfillJob.status.in_(["pending", "processing"]),
+            )
+            .order_by(MarketDataBackfillJob.created_at.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
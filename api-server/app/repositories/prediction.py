@@ -1,10 +1,11 @@
 from datetime import date, datetime
 from uuid import UUID
 
-from sqlalchemy import func, select, update
+from sqlalchemy import Float, cast, func, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.constants import PERIODS_PER_DAY
 from app.models.prediction import PowerPrediction, PredictionModel
 from app.models.station import PowerStation
 from app.repositories.base import BaseRepository
@@ -192,6 +193,48 @@ class PowerPredictionRepository:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_curves(
+        self,
+        station_id: UUID,
+        start_date: date,
+        end_date: date,
+        model_ids: list[UUID] | None = None,
+    ) -> dict[tuple[UUID, date], dict[str, list[float | None]]]:
+        """一次查询 电站 × 模型 × 日期区间 的预测曲线，按 (模型, 预测日) 打包为 96 长度数组。
+
+        只取所需列并在 SQL 中转为浮点数，不实例化 ORM 对象、不构造 Decimal。
+        """
+        stmt = select(
+            PowerPrediction.model_id,
+            PowerPrediction.prediction_date,
+            PowerPrediction.period,
+            cast(PowerPrediction.predicted_power_kw, Float),
+            cast(PowerPrediction.confidence_upper_kw, Float),
+            cast(PowerPrediction.confidence_lower_kw, Float),
+        ).where(
+            PowerPrediction.station_id == station_id,
+            PowerPrediction.prediction_date >= start_date,
+            PowerPrediction.prediction_date <= end_date,
+        )
+        if model_ids:
+            stmt = stmt.where(PowerPrediction.model_id.in_(model_ids))
+        result = await self.session.execute(stmt)
+
+        curves: dict[tuple[UUID, date], dict[str, list[float | None]]] = {}
+        for model_id, prediction_date, period, predicted, upper, lower in result.all():
+            curve = curves.get((model_id, prediction_date))
+            if curve is None:
+                curve = curves[(model_id, prediction_date)] = {
+                    "predicted": [None] * PERIODS_PER_DAY,
+                    "upper": [None] * PERIODS_PER_DAY,
+                    "lower": [None] * PERIODS_PER_DAY,
+                }
+            index = period - 1
+            curve["predicted"][index] = predicted
+            curve["upper"][index] = upper
+            curve["lower"][index] = lower
+        return curves
+
     async def get_latest_by_station(
         self, station_id: UUID,
     ) -> PowerPrediction | None:
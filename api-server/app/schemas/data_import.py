@@ -77,12 +77,30 @@ class ImportAnomalySummary(BaseModel):
     count: int
 
 
+class ImportBatchLatencyRead(BaseModel):
+    buckets: list[float]
+    # 各桶（非累计）批次数，最后一项为 +Inf 桶
+    counts: list[int]
+    sum: float
+    count: int
+
+
+class ImportMetricsRead(BaseModel):
+    phase_seconds: dict[str, float]
+    rows: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    batch_latency: ImportBatchLatencyRead
+
+
 class ImportResultRead(BaseModel):
     total_records: int
     success_records: int
     failed_records: int
     data_completeness: Decimal
     anomaly_summary: list[ImportAnomalySummary]
+    metrics: ImportMetricsRead | None = None
 
 
 class ImportAnomalyListResponse(BaseModel):
@@ -5,12 +5,11 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, field_validator
 
-PERIODS_PER_DAY = 96
-
 FreshnessStatus = Literal["fresh", "stale", "expired", "critical"]
 FetchStatus = Literal["pending", "success", "failed"]
 PriceSource = Literal["api", "manual_import"]
 ApiAuthType = Literal["api_key", "bearer", "none"]
+BackfillStatus = Literal["pending", "processing", "completed", "failed"]
 
 
 # --- 出清价格 schemas ---
@@ -37,6 +36,28 @@ class MarketClearingPriceListResponse(BaseModel):
     page_size: int
 
 
+# --- 批量查询 schemas ---
+
+
+class MarketDataPeriodPrice(BaseModel):
+    period: int
+    clearing_price: Decimal
+    source: PriceSource
+    fetched_at: datetime
+
+
+class MarketDataDaySeries(BaseModel):
+    province: str
+    trading_date: date
+    records: list[MarketDataPeriodPrice]
+
+
+class MarketDataBatchResponse(BaseModel):
+    items: list[MarketDataDaySeries]
+    cache_hits: int
+    cache_misses: int
+
+
 # --- 数据源配置 schemas ---
 
 
@@ -64,6 +85,14 @@ class MarketDataSourceCreate(BaseModel):
             raise ValueError("缓存TTL必须大于0")
         return v
 
+    @field_validator("fetch_schedule")
+    @classmethod
+    def validate_fetch_schedule(cls, v: str) -> str:
+        from app.core.cron import parse_cron
+
+        parse_cron(v)
+        return v.strip()
+
 
 class MarketDataSourceUpdate(BaseModel):
     source_name: str | None = None
@@ -81,6 +110,16 @@ class MarketDataSourceUpdate(BaseModel):
             raise ValueError("缓存TTL必须大于0")
         return v
 
+    @field_validator("fetch_schedule")
+    @classmethod
+    def validate_fetch_schedule(cls, v: str | None) -> str | None:
+        from app.core.cron import parse_cron
+
+        if v is None:
+            return v
+        parse_cron(v)
+        return v.strip()
+
 
 class MarketDataSourceRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -96,6 +135,7 @@ class MarketDataSourceRead(BaseModel):
     last_fetch_status: FetchStatus
     last_fetch_error: str | None
     cache_ttl_seconds: int
+    next_fetch_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -130,3 +170,45 @@ class MarketDataFetchResult(BaseModel):
     records_count: int
     status: str
     error_message: str | None = None
+
+
+# --- 历史回补 schemas ---
+
+
+class MarketDataBackfillCreate(BaseModel):
+    province: str
+    start_date: date
+    end_date: date
+
+    @field_validator("province")
+    @classmethod
+    def validate_province(cls, v: str) -> str:
+        if not v.strip():
+            raise ValueError("省份标识不能为空")
+        return v.strip()
+
+    @field_validator("end_date")
+    @classmethod
+    def validate_end_date(cls, v: date, info) -> date:
+        start = info.data.get("start_date")
+        if start and v < start:
+            raise ValueError("结束日期不能早于起始日期")
+        return v
+
+
+class MarketDataBackfillJobRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    province: str
+    start_date: date
+    end_date: date
+    status: BackfillStatus
+    completed_through: date | None
+    total_chunks: int
+    completed_chunks: int
+    total_records: int
+    error_message: str | None
+    started_at: datetime | None
+    completed_at: datetime | None
+    created_at: datetime
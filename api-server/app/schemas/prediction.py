@@ -13,6 +13,7 @@ ModelType = Literal["wind", "solar", "hybrid"]
 ModelStatus = Literal["running", "error", "disabled"]
 ApiAuthType = Literal["api_key", "bearer", "none"]
 CheckStatus = Literal["success", "failed", "timeout"]
+PredictionHorizon = Literal["day_ahead", "intraday"]
 
 # 禁止访问的内部主机名
 _BLOCKED_HOSTS = {"localhost", "127.0.0.1", "0.0.0.0", "[::1]"}
@@ -65,6 +66,7 @@ class PredictionModelCreate(BaseModel):
     api_auth_type: ApiAuthType = "api_key"
     call_frequency_cron: str = "0 6,12 * * *"
     timeout_seconds: int = 30
+    prediction_horizon: PredictionHorizon = "day_ahead"
     station_id: UUID
 
     @field_validator("model_name")
@@ -86,6 +88,14 @@ class PredictionModelCreate(BaseModel):
             raise ValueError("超时时间必须在1-300秒之间")
         return v
 
+    @field_validator("call_frequency_cron")
+    @classmethod
+    def validate_call_frequency_cron(cls, v: str) -> str:
+        from app.core.cron import parse_cron
+
+        parse_cron(v)
+        return v.strip()
+
 
 class PredictionModelUpdate(BaseModel):
     model_name: str | None = None
@@ -95,6 +105,7 @@ class PredictionModelUpdate(BaseModel):
     api_auth_type: ApiAuthType | None = None
     call_frequency_cron: str | None = None
     timeout_seconds: int | None = None
+    prediction_horizon: PredictionHorizon | None = None
     is_active: bool | None = None
 
     @field_validator("api_endpoint")
@@ -111,6 +122,16 @@ class PredictionModelUpdate(BaseModel):
             raise ValueError("超时时间必须在1-300秒之间")
         return v
 
+    @field_validator("call_frequency_cron")
+    @classmethod
+    def validate_call_frequency_cron(cls, v: str | None) -> str | None:
+        from app.core.cron import parse_cron
+
+        if v is None:
+            return v
+        parse_cron(v)
+        return v.strip()
+
 
 class PredictionModelRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -124,6 +145,8 @@ class PredictionModelRead(BaseModel):
     api_auth_type: ApiAuthType
     call_frequency_cron: str
     timeout_seconds: int
+    prediction_horizon: PredictionHorizon = "day_ahead"
+    next_fetch_at: datetime | None = None
     is_active: bool
     status: ModelStatus
     last_check_at: datetime | None
@@ -147,6 +170,8 @@ class PredictionModelRead(BaseModel):
             "api_auth_type": model.api_auth_type,  # type: ignore[attr-defined]
             "call_frequency_cron": model.call_frequency_cron,  # type: ignore[attr-defined]
             "timeout_seconds": model.timeout_seconds,  # type: ignore[attr-defined]
+            "prediction_horizon": model.prediction_horizon,  # type: ignore[attr-defined]
+            "next_fetch_at": model.next_fetch_at,  # type: ignore[attr-defined]
             "is_active": model.is_active,  # type: ignore[attr-defined]
             "status": model.status,  # type: ignore[attr-defined]
             "last_check_at": model.last_check_at,  # type: ignore[attr-defined]
@@ -259,6 +284,23 @@ class PowerPredictionListResponse(BaseModel):
     total: int
 
 
+class PredictionCurveSeries(BaseModel):
+    """单个模型单日的预测曲线（列式）：数组下标 i 对应第 i+1 时段，缺失时段为 null。"""
+
+    model_id: UUID
+    prediction_date: date
+    predicted: list[float | None]
+    upper: list[float | None]
+    lower: list[float | None]
+
+
+class PredictionCurveRangeResponse(BaseModel):
+    station_id: UUID
+    start_date: date
+    end_date: date
+    series: list[PredictionCurveSeries]
+
+
 class FetchResult(BaseModel):
     model_id: UUID
     model_name: str
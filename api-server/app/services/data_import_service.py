@@ -1,3 +1,4 @@
+import hashlib
 import json
 import re
 import uuid
@@ -109,6 +110,7 @@ class DataImportService:
         file_path = upload_dir / safe_name
 
         file_size = 0
+        digest = hashlib.sha256()
         try:
             with open(file_path, "wb") as f:
                 while True:
@@ -116,6 +118,7 @@ class DataImportService:
                     if not chunk:
                         break
                     file_size += len(chunk)
+                    digest.update(chunk)
                     if file_size > settings.MAX_IMPORT_FILE_SIZE:
                         raise BusinessError(
                             code="FILE_TOO_LARGE",
@@ -129,6 +132,8 @@ class DataImportService:
             upload_dir.rmdir()
             raise
 
+        content_hash = digest.hexdigest()
+
         # 创建导入任务记录（失败时清理已写入的孤儿文件）
         try:
             job = DataImportJob(
@@ -136,6 +141,7 @@ class DataImportService:
                 file_name=f"{job_id}/{safe_name}",
                 original_file_name=file.filename or safe_name,
                 file_size=file_size,
+                content_hash=content_hash,
                 station_id=station_id,
                 import_type=import_type,
                 ems_format=ems_format if import_type == "storage_operation" else None,
@@ -183,6 +189,12 @@ class DataImportService:
         }
         celery_task = task_map[import_type]
 
+        # 大 CSV 文件走分片并行导入（协调任务切分后以 chord 派发）
+        from app.tasks.import_sharding import coordinate_sharded_import, should_shard_import
+
+        if should_shard_import(import_type, safe_name, file_size):
+            celery_task = coordinate_sharded_import
+
         try:
             task_kwargs = {"job_id": str(created_job.id)}
             if import_type == "storage_operation" and ems_format:
@@ -248,6 +260,7 @@ class DataImportService:
             "failed_records": job.failed_records,
             "data_completeness": job.data_completeness,
             "anomaly_summary": anomaly_summary,
+            "metrics": job.metrics,
         }
 
     async def list_output_records(
@@ -307,11 +320,15 @@ class DataImportService:
                 status_code=409,
             )
 
-        # Revoke Celery 任务
+        # Revoke Celery 任务（分片导入时同时终止各分片任务）
+        task_ids = await self.import_job_repo.list_shard_task_ids(job.id)
         if job.celery_task_id:
+            task_ids = [job.celery_task_id, *task_ids]
+        if task_ids:
             from app.tasks.celery_app import celery_app
 
-            celery_app.control.revoke(job.celery_task_id, terminate=True)
+            for task_id in task_ids:
+                celery_app.control.revoke(task_id, terminate=True)
 
         job.status = "cancelled"
         await self.import_job_repo.session.flush()
@@ -359,6 +376,14 @@ class DataImportService:
                 status_code=409,
             )
 
+        # 分片导入中某分片失败时兄弟分片可能仍在运行，此时恢复会重复处理同一字节范围
+        if await self.import_job_repo.has_processing_shards(job.id):
+            raise BusinessError(
+                code="IMPORT_SHARDS_RUNNING",
+                message="仍有分片在处理中，请等待其结束后再恢复",
+                status_code=409,
+            )
+
         previous_status = job.status
         resume_from_row = job.last_processed_row
         job.status = "processing"
@@ -396,11 +421,18 @@ class DataImportService:
                 status_code=400,
             )
         celery_task = task_map[job.import_type]
+        task_kwargs: dict = {"job_id": str(job.id), "resume_from_row": resume_from_row}
+        if job.import_type == "storage_operation" and job.ems_format:
+            task_kwargs["ems_format"] = job.ems_format
+
+        # 分片导入由协调任务恢复：只重新派发未完成的分片，分片内各自断点续传
+        if await self.import_job_repo.has_shards(job.id):
+            from app.tasks.import_sharding import coordinate_sharded_import
+
+            celery_task = coordinate_sharded_import
+            task_kwargs = {"job_id": str(job.id)}
 
         try:
-            task_kwargs: dict = {"job_id": str(job.id), "resume_from_row": resume_from_row}
-            if job.import_type == "storage_operation" and job.ems_format:
-                task_kwargs["ems_format"] = job.ems_format
             task = celery_task.apply_async(
                 kwargs=task_kwargs,
             )
@@ -467,6 +499,13 @@ class DataImportService:
                 cleaned += 1
                 logger.info("import_file_cleaned", job_id=str(job.id))
 
+        # 列式缓存按内容共享，依据最近一次使用时间（mtime）单独过期
+        from app.tasks.import_xlsx_cache import cleanup_expired_cache
+
+        cache_removed = cleanup_expired_cache(cutoff.timestamp())
+        if cache_removed:
+            logger.info("xlsx_cache_cleaned", removed=cache_removed)
+
         return cleaned
 
     # --- 异常管理 (Story 2.4) ---
@@ -1,8 +1,13 @@
+import asyncio
+import hashlib
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 
+from app.core.config import settings
+from app.core.http_client import TokenBucket
+
 
 @dataclass
 class MarketPriceRecord:
@@ -11,6 +16,25 @@ class MarketPriceRecord:
     clearing_price: Decimal  # 元/MWh
 
 
+@dataclass
+class ConditionalFetchResult:
+    """条件请求结果：not_modified 为 True 时上游返回 304，records 为空。"""
+
+    records: list[MarketPriceRecord]
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+
+
+def content_hash(records: list[MarketPriceRecord]) -> str:
+    """曲线内容哈希（与记录顺序、价格小数位写法无关）。"""
+    digest = hashlib.sha256()
+    for r in sorted(records, key=lambda r: (r.trading_date, r.period)):
+        price = Decimal(str(r.clearing_price)).quantize(Decimal("0.01"))
+        digest.update(f"{r.trading_date.isoformat()}|{r.period}|{price}\n".encode())
+    return digest.hexdigest()
+
+
 class BaseMarketDataAdapter(ABC):
     """市场数据适配器基类 - 省级交易中心 API 接入。"""
 
@@ -19,6 +43,34 @@ class BaseMarketDataAdapter(ABC):
         """获取指定交易日的96时段出清价格。"""
         ...
 
+    async def fetch_if_changed(
+        self,
+        trading_date: date,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> ConditionalFetchResult:
+        """带上次的 ETag / Last-Modified 发起条件请求；默认不支持，等同于 fetch。"""
+        return ConditionalFetchResult(records=await self.fetch(trading_date))
+
+    async def fetch_range(self, start_date: date, end_date: date) -> list[MarketPriceRecord]:
+        """获取 [start_date, end_date] 区间（含两端）的出清价格。
+
+        默认逐日并发调用 fetch，并发上限 MARKET_DATA_RANGE_CONCURRENCY，
+        速率上限 MARKET_DATA_RANGE_RATE_LIMIT 次/秒；上游支持区间查询的适配器应覆盖此方法。
+        任一日期失败即抛出异常（由调用方按区间整体重试）。
+        """
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        semaphore = asyncio.Semaphore(max(1, settings.MARKET_DATA_RANGE_CONCURRENCY))
+        bucket = TokenBucket(settings.MARKET_DATA_RANGE_RATE_LIMIT)
+
+        async def _fetch_day(trading_date: date) -> list[MarketPriceRecord]:
+            async with semaphore:
+                await bucket.acquire()
+                return await self.fetch(trading_date)
+
+        results = await asyncio.gather(*[_fetch_day(d) for d in days])
+        return [record for records in results for record in records]
+
     @abstractmethod
     async def health_check(self) -> bool:
         """检查 API 可用性。"""
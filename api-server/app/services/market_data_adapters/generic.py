@@ -1,15 +1,31 @@
 import asyncio
-from datetime import date
+from collections.abc import Callable
+from datetime import date, timedelta
 from decimal import Decimal
+from typing import TypeVar
 
 import httpx
 import structlog
 
 from app.core.config import settings
-from app.services.market_data_adapters.base import BaseMarketDataAdapter, MarketPriceRecord
+from app.core.http_client import get_http_client
+from app.services.market_data_adapters.base import (
+    BaseMarketDataAdapter,
+    ConditionalFetchResult,
+    MarketPriceRecord,
+)
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+# 区间接口返回这些状态码时视为上游不支持区间查询，回退为逐日请求
+_RANGE_UNSUPPORTED_STATUS = {404, 405, 501}
+
+
+class _RangeNotSupported(Exception):
+    pass
+
 
 class GenericMarketDataAdapter(BaseMarketDataAdapter):
     """通用市场数据适配器 - 标准 JSON API 格式。
@@ -22,6 +38,12 @@ class GenericMarketDataAdapter(BaseMarketDataAdapter):
             ...
         ]
     }
+
+    区间查询：GET {api_endpoint}/range?start_date=&end_date=，
+    每条记录额外带 "trading_date"。上游不提供该接口时回退为逐日请求。
+
+    条件请求：fetch_if_changed 发送 If-None-Match / If-Modified-Since，
+    上游返回 304 时不下载数据；上游不支持时按普通 200 响应处理。
     """
 
     def __init__(
@@ -33,6 +55,12 @@ class GenericMarketDataAdapter(BaseMarketDataAdapter):
         self.api_endpoint = api_endpoint
         self.api_key = api_key
         self.api_auth_type = api_auth_type
+        # None 表示尚未探测
+        self._range_supported: bool | None = None
+
+    @property
+    def range_endpoint(self) -> str:
+        return f"{self.api_endpoint.rstrip('/')}/range"
 
     def _build_headers(self) -> dict[str, str]:
         headers: dict[str, str] = {"Accept": "application/json"}
@@ -43,33 +71,45 @@ class GenericMarketDataAdapter(BaseMarketDataAdapter):
                 headers["X-API-Key"] = self.api_key
         return headers
 
-    async def fetch(self, trading_date: date) -> list[MarketPriceRecord]:
-        """从外部 API 获取出清价格，含重试逻辑（最多2次，指数退避）。"""
-        params = {"trading_date": trading_date.isoformat()}
-        headers = self._build_headers()
+    async def _get_with_retry(
+        self,
+        url: str,
+        params: dict[str, str],
+        parse: Callable[[httpx.Response], T],
+        unsupported_status: set[int] | None = None,
+        extra_headers: dict[str, str] | None = None,
+        **log_context,
+    ) -> T:
+        """GET 并解析响应，含重试逻辑（最多 MARKET_DATA_RETRY_COUNT 次，指数退避）。
+
+        304 响应不视为错误，直接交给 parse（仅条件请求会收到）。
+        """
+        headers = {**self._build_headers(), **(extra_headers or {})}
         last_error: Exception | None = None
+        # 共享连接池：重试复用已建立的连接
+        client = get_http_client(url)
 
         for attempt in range(1, settings.MARKET_DATA_RETRY_COUNT + 2):
             try:
-                async with httpx.AsyncClient(
+                response = await client.get(
+                    url,
+                    params=params,
+                    headers=headers,
                     timeout=settings.MARKET_DATA_FETCH_TIMEOUT,
-                ) as client:
-                    response = await client.get(
-                        self.api_endpoint,
-                        params=params,
-                        headers=headers,
-                    )
+                )
+                if unsupported_status and response.status_code in unsupported_status:
+                    raise _RangeNotSupported(response.status_code)
+                if response.status_code != 304:
                     response.raise_for_status()
-                    data = response.json()
-                    return self._parse_response(trading_date, data)
+                return parse(response)
             except (httpx.HTTPError, KeyError, ValueError) as e:
                 last_error = e
                 logger.warning(
                     "market_data_fetch_attempt_failed",
                     attempt=attempt,
                     error=str(e),
-                    endpoint=self.api_endpoint,
-                    trading_date=trading_date.isoformat(),
+                    endpoint=url,
+                    **log_context,
                 )
                 if attempt <= settings.MARKET_DATA_RETRY_COUNT:
                     backoff = settings.MARKET_DATA_RETRY_BACKOFF * (2 ** (attempt - 1))
@@ -79,6 +119,83 @@ class GenericMarketDataAdapter(BaseMarketDataAdapter):
             f"市场数据获取失败（已重试{settings.MARKET_DATA_RETRY_COUNT}次）: {last_error}"
         )
 
+    async def fetch(self, trading_date: date) -> list[MarketPriceRecord]:
+        """从外部 API 获取出清价格，含重试逻辑（最多2次，指数退避）。"""
+        return await self._get_with_retry(
+            self.api_endpoint,
+            {"trading_date": trading_date.isoformat()},
+            lambda response: self._parse_response(trading_date, response.json()),
+            trading_date=trading_date.isoformat(),
+        )
+
+    async def fetch_if_changed(
+        self,
+        trading_date: date,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> ConditionalFetchResult:
+        """条件请求：带上次响应的 ETag / Last-Modified，未变化时上游返回 304。"""
+        conditional_headers = {}
+        if etag:
+            conditional_headers["If-None-Match"] = etag
+        if last_modified:
+            conditional_headers["If-Modified-Since"] = last_modified
+
+        def _parse(response: httpx.Response) -> ConditionalFetchResult:
+            if response.status_code == 304:
+                return ConditionalFetchResult(
+                    records=[],
+                    etag=response.headers.get("ETag") or etag,
+                    last_modified=response.headers.get("Last-Modified") or last_modified,
+                    not_modified=True,
+                )
+            return ConditionalFetchResult(
+                records=self._parse_response(trading_date, response.json()),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+
+        return await self._get_with_retry(
+            self.api_endpoint,
+            {"trading_date": trading_date.isoformat()},
+            _parse,
+            extra_headers=conditional_headers,
+            trading_date=trading_date.isoformat(),
+        )
+
+    async def fetch_range(self, start_date: date, end_date: date) -> list[MarketPriceRecord]:
+        """优先使用上游区间接口（按 MARKET_DATA_RANGE_MAX_DAYS 天分窗口），不支持时逐日并发获取。"""
+        if self._range_supported is not False:
+            try:
+                records = await self._fetch_range_windows(start_date, end_date)
+                self._range_supported = True
+                return records
+            except _RangeNotSupported as e:
+                self._range_supported = False
+                logger.info(
+                    "market_data_range_not_supported",
+                    endpoint=self.range_endpoint,
+                    status_code=e.args[0],
+                )
+        return await super().fetch_range(start_date, end_date)
+
+    async def _fetch_range_windows(self, start_date: date, end_date: date) -> list[MarketPriceRecord]:
+        window = max(1, settings.MARKET_DATA_RANGE_MAX_DAYS)
+        records: list[MarketPriceRecord] = []
+        window_start = start_date
+        while window_start <= end_date:
+            window_end = min(end_date, window_start + timedelta(days=window - 1))
+            records.extend(await self._get_with_retry(
+                self.range_endpoint,
+                {"start_date": window_start.isoformat(), "end_date": window_end.isoformat()},
+                lambda response: self._parse_range_response(response.json()),
+                unsupported_status=_RANGE_UNSUPPORTED_STATUS,
+                start_date=window_start.isoformat(),
+                end_date=window_end.isoformat(),
+            ))
+            window_start = window_end + timedelta(days=1)
+        return records
+
     def _parse_response(self, trading_date: date, data: dict) -> list[MarketPriceRecord]:
         records = []
         items = data.get("data", [])
@@ -94,13 +211,23 @@ class GenericMarketDataAdapter(BaseMarketDataAdapter):
             )
         return records
 
+    def _parse_range_response(self, data: dict) -> list[MarketPriceRecord]:
+        return [
+            MarketPriceRecord(
+                trading_date=date.fromisoformat(item["trading_date"]),
+                period=int(item["period"]),
+                clearing_price=Decimal(str(item["clearing_price"])),
+            )
+            for item in data.get("data", [])
+        ]
+
     async def health_check(self) -> bool:
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.head(
-                    self.api_endpoint,
-                    headers=self._build_headers(),
-                )
-                return response.status_code < 500
+            response = await get_http_client(self.api_endpoint).head(
+                self.api_endpoint,
+                headers=self._build_headers(),
+                timeout=10,
+            )
+            return response.status_code < 500
         except httpx.HTTPError:
             return False
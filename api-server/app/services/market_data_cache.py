@@ -0,0 +1,223 @@
+"""市场出清价格曲线的进程内 L1 缓存（位于 Redis 之前）。
+
+- 按 (省份, 交易日) 缓存已解码的 96 时段记录，LRU 淘汰（最多 MARKET_DATA_L1_CACHE_SIZE 条），
+  条目存活 MARKET_DATA_L1_CACHE_TTL 秒（为 0 时关闭）。
+- 价格写入方（fetch_market_data、手动导入、定时取数与回补任务）提交后删除对应 Redis 键，
+  并向 MARKET_DATA_CHANNEL 发布 {"keys": [[省份, ISO 日期], ...]}；
+  各进程的监听线程收到后丢弃对应条目。
+- 监听未连上 Redis 时不使用 L1（监听由 app.core.redis_invalidation 提供，与 import_validators 共用），TTL 兜底发布失败的情况。
+- 缓存的列表供只读使用，调用方不得修改。
+- SingleFlight 合并本进程内对同一键的并发加载；跨进程由 Redis 短租约锁（lock_key）协调。
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import structlog
+
+from app.core.config import settings
+from app.core.redis_invalidation import InvalidationListener
+
+logger = structlog.get_logger()
+
+CACHE_PREFIX = "market_data"
+MARKET_DATA_CHANNEL = "market_data_changed"
+# 全部省份新鲜度汇总的短 TTL 缓存，价格写入时随曲线键一起删除
+FRESHNESS_CACHE_KEY = f"{CACHE_PREFIX}:freshness"
+
+
+CacheKey = tuple[str, date]
+
+
+def redis_key(province: str, trading_date: date) -> str:
+    """L2（Redis）缓存键。"""
+    return f"{CACHE_PREFIX}:{province}:{trading_date.isoformat()}"
+
+
+def lock_key(province: str, trading_date: date) -> str:
+    """回填锁键：同一 (省份, 交易日) 同时只有一个调用方查库/调外部 API。"""
+    return f"{CACHE_PREFIX}:lock:{province}:{trading_date.isoformat()}"
+
+
+class SingleFlight:
+    """进程内请求合并：同一键的并发调用只执行一次 loader，其余等待并共享其结果。
+
+    loader 抛出异常时等待方收到同一异常；执行方被取消时等待方各自重新发起。
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: dict[CacheKey, asyncio.Future] = {}
+
+    async def do(self, key: CacheKey, loader):
+        loop = asyncio.get_running_loop()
+        future = self._calls.get(key)
+        if future is not None and future.get_loop() is loop:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self.do(key, loader)
+
+        future = loop.create_future()
+        self._calls[key] = future
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待方时避免 "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+class CurveCache:
+    """线程安全的 LRU + TTL 缓存，带命中/未命中计数。"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # 每次失效递增；读取期间发生失效时不回填，避免写入旧值
+        self.generation = 0
+        self._entries: OrderedDict[CacheKey, tuple[list[dict], float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: CacheKey) -> list[dict] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[1]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: CacheKey, records: list[dict], generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (records, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: list[CacheKey] | None = None) -> None:
+        with self._lock:
+            self.generation += 1
+            if keys is None:
+                self._entries.clear()
+                return
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+_cache = CurveCache(settings.MARKET_DATA_L1_CACHE_SIZE, settings.MARKET_DATA_L1_CACHE_TTL)
+_flights = SingleFlight()
+
+
+def encode_message(keys: list[CacheKey]) -> str:
+    return json.dumps({"keys": [[province, d.isoformat()] for province, d in keys]})
+
+
+def _handle_message(data) -> None:
+    try:
+        payload = json.loads(data)
+        _cache.invalidate([(p, date.fromisoformat(d)) for p, d in payload["keys"]])
+    except (ValueError, KeyError, TypeError):
+        logger.warning("market_data_cache_bad_message", data=str(data)[:200])
+        _cache.invalidate()
+
+
+# 断线期间可能错过失效消息：停用并清空，重连后重新加载
+_listener = InvalidationListener(
+    MARKET_DATA_CHANNEL, _handle_message, _cache.invalidate, "market-data-cache-listener",
+)
+
+
+def get_curve_cache() -> CurveCache | None:
+    """返回可用的 L1 缓存；未启用或失效通道未连上时返回 None。"""
+    if not _cache.enabled:
+        return None
+    _listener.ensure_started()
+    return _cache if _listener.listening.is_set() else None
+
+
+def get_single_flight() -> SingleFlight:
+    return _flights
+
+
+def cache_stats() -> dict:
+    return {
+        **_cache.stats(),
+        "enabled": _cache.enabled,
+        "listening": _listener.listening.is_set(),
+        "coalesced": _flights.coalesced,
+    }
+
+
+def render_prometheus() -> str:
+    """本进程 L1 缓存计数（Prometheus 文本格式）。"""
+    stats = _cache.stats()
+    lines = []
+    for name, kind, help_text, value in (
+        ("market_data_l1_cache_hits_total", "counter", "Market data L1 cache hits.", stats["hits"]),
+        ("market_data_l1_cache_misses_total", "counter", "Market data L1 cache misses.", stats["misses"]),
+        ("market_data_l1_cache_entries", "gauge", "Market data L1 cache entries.", stats["size"]),
+        ("market_data_fill_coalesced_total", "counter",
+         "Market data cache fills shared with a concurrent caller.", _flights.coalesced),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def notify_market_data_changed_sync(keys: list[CacheKey]) -> None:
+    """Celery 任务提交价格写入后调用：删除对应 Redis 键并发布失效通知。"""
+    if not keys:
+        return
+    try:
+        import redis
+
+        client = redis.Redis.from_url(settings.REDIS_URL)
+        try:
+            pipe = client.pipeline(transaction=False)
+            pipe.delete(*[redis_key(province, d) for province, d in keys], FRESHNESS_CACHE_KEY)
+            pipe.publish(MARKET_DATA_CHANNEL, encode_message(keys))
+            pipe.execute()
+        finally:
+            client.close()
+    except Exception as e:
+        logger.warning("market_data_change_publish_failed", keys=len(keys), error=str(e)[:200])
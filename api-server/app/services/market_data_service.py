@@ -1,5 +1,10 @@
+import asyncio
 import json
-from datetime import UTC, date, datetime
+import math
+import random
+import time
+import uuid
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from uuid import UUID
 
@@ -7,20 +12,47 @@ import redis.asyncio as aioredis
 import structlog
 
 from app.core.config import settings
+from app.core.cron import next_run_after
+from app.core.curve_codec import decode_curve, encode_curve
 from app.core.exceptions import BusinessError
-from app.models.market_data import MarketDataSource
+from app.models.market_data import MarketDataBackfillJob, MarketDataSource
 from app.repositories.market_data import (
     MarketClearingPriceRepository,
+    MarketDataBackfillJobRepository,
     MarketDataSourceRepository,
 )
-from app.schemas.market_data import FreshnessStatus, MarketDataFreshness
+from app.schemas.market_data import (
+    FreshnessStatus,
+    MarketDataBatchResponse,
+    MarketDataDaySeries,
+    MarketDataFreshness,
+)
 from app.services.audit_service import AuditService
 from app.services.market_data_adapters import get_adapter
 from app.services.market_data_adapters.base import MarketPriceRecord
+from app.services.market_data_cache import (
+    FRESHNESS_CACHE_KEY,
+    MARKET_DATA_CHANNEL,
+    encode_message,
+    get_curve_cache,
+    get_single_flight,
+    lock_key,
+    redis_key,
+)
 
 logger = structlog.get_logger()
 
-CACHE_PREFIX = "market_data"
+# 等待其他调用方回填缓存时的轮询间隔
+_FILL_POLL_SECONDS = 0.05
+
+# 仅删除自己持有的锁（租约过期后可能已被他人获取）
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
 FRESHNESS_THRESHOLDS_HOURS = {
     "fresh": 2,
     "stale": 12,
@@ -50,6 +82,89 @@ def _decrypt_api_key(encrypted: bytes) -> str:
     return f.decrypt(encrypted).decode()
 
 
+def _encode_curve(records: list[dict]) -> bytes | str:
+    """缓存编码：同一曲线 source/fetched_at 一致时用紧凑二进制格式，否则回退 JSON。"""
+    if records:
+        first = records[0]
+        if all(
+            r["source"] == first["source"] and r["fetched_at"] == first["fetched_at"]
+            for r in records
+        ):
+            packed = encode_curve(
+                {"source": first["source"], "fetched_at": first["fetched_at"]},
+                [r["period"] for r in records],
+                {"clearing_price": [r["clearing_price"] for r in records]},
+            )
+            if packed is not None:
+                return packed
+    return json.dumps(records, default=str)
+
+
+def _decode_curve(value: bytes | str) -> list[dict] | None:
+    """解码缓存条目（二进制 v1 或旧 JSON）；无法解析时返回 None（视为未命中）。"""
+    packed = decode_curve(value)
+    if packed is not None:
+        source = packed.meta["source"]
+        fetched_at = packed.meta["fetched_at"]
+        return [
+            {
+                "period": int(period),
+                "clearing_price": price,
+                "source": source,
+                "fetched_at": fetched_at,
+            }
+            for period, price in zip(
+                packed.periods, packed.decimal_strings("clearing_price"),
+            )
+        ]
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def _should_refresh_early(ttl_ms: int | None) -> bool:
+    """XFetch：剩余 TTL 小于 -window·ln(U) 时提前刷新，越接近过期概率越大。"""
+    window = settings.MARKET_DATA_EARLY_REFRESH_SECONDS
+    if window <= 0 or ttl_ms is None or ttl_ms < 0:
+        return False
+    return -window * math.log(1.0 - random.random()) >= ttl_ms / 1000
+
+
+def _freshness(
+    province: str, last_updated: datetime | None, now: datetime,
+) -> MarketDataFreshness:
+    if last_updated is None:
+        return MarketDataFreshness(
+            province=province,
+            last_updated=None,
+            hours_ago=None,
+            status="critical",
+        )
+
+    if last_updated.tzinfo is None:
+        hours_ago = (now.replace(tzinfo=None) - last_updated).total_seconds() / 3600
+    else:
+        hours_ago = (now - last_updated).total_seconds() / 3600
+
+    status: FreshnessStatus
+    if hours_ago < FRESHNESS_THRESHOLDS_HOURS["fresh"]:
+        status = "fresh"
+    elif hours_ago < FRESHNESS_THRESHOLDS_HOURS["stale"]:
+        status = "stale"
+    elif hours_ago < FRESHNESS_THRESHOLDS_HOURS["expired"]:
+        status = "expired"
+    else:
+        status = "critical"
+
+    return MarketDataFreshness(
+        province=province,
+        last_updated=last_updated,
+        hours_ago=round(hours_ago, 1),
+        status=status,
+    )
+
+
 class MarketDataService:
     def __init__(
         self,
@@ -57,11 +172,13 @@ class MarketDataService:
         source_repo: MarketDataSourceRepository,
         audit_service: AuditService,
         redis_client: aioredis.Redis | None = None,
+        backfill_repo: MarketDataBackfillJobRepository | None = None,
     ):
         self.price_repo = price_repo
         self.source_repo = source_repo
         self.audit_service = audit_service
         self.redis_client = redis_client
+        self.backfill_repo = backfill_repo
 
     # --- 数据获取 ---
 
@@ -126,9 +243,6 @@ class MarketDataService:
         ]
         count = await self.price_repo.bulk_upsert(db_records)
 
-        # 更新 Redis 缓存
-        await self._set_cache(province, trading_date, records, source.cache_ttl_seconds)
-
         # 更新数据源状态
         await self.source_repo.update_fetch_status(
             source.id, "success", last_fetch_at=now,
@@ -148,6 +262,10 @@ class MarketDataService:
                 },
             )
 
+        # 提交并通知各进程失效 L1，再写入新的 Redis 缓存
+        await self._commit_and_notify([(province, trading_date)])
+        await self._set_cache(province, trading_date, records, source.cache_ttl_seconds)
+
         logger.info(
             "market_data_fetched",
             province=province,
@@ -161,29 +279,62 @@ class MarketDataService:
         province: str,
         trading_date: date,
     ) -> list[dict]:
-        """获取市场数据：Redis 缓存 → DB → API 获取。"""
-        # Level 1: Redis 缓存
-        cached = await self._get_cache(province, trading_date)
-        if cached is not None:
-            return cached
+        """获取市场数据：L1 → Redis 缓存 → DB → API 获取。
+
+        未命中时本进程内的并发请求合并为一次加载（single-flight），跨进程由 Redis
+        短租约锁保证只有一个调用方查库/调用外部 API，其余等待其回填缓存；
+        Redis 条目临近过期时按概率提前刷新（XFetch），避免过期瞬间的未命中尖峰。
+        """
+        key = (province, trading_date)
+        l1 = get_curve_cache()
+        if l1:
+            records = l1.get(key)
+            if records is not None:
+                return records
+        generation = l1.generation if l1 else 0
+
+        records = await get_single_flight().do(key, lambda: self._get_or_fill(key))
+        if records:
+            self._fill_l1(l1, {key: records}, generation)
+        return records
 
-        # Level 2: 数据库查询
-        records, _ = await self.price_repo.get_by_province_date(province, trading_date)
+    async def _get_or_fill(self, key: tuple[str, date]) -> list[dict]:
+        cached, ttl_ms = await self._get_cache_with_ttl(key)
+        if cached is not None:
+            if not _should_refresh_early(ttl_ms):
+                return cached
+            # 提前刷新：拿不到锁说明已有其他调用方在刷新，直接返回当前缓存
+            token = await self._acquire_fill_lock(key)
+            if token is None:
+                return cached
+            try:
+                return (await self._load_from_db([key])).get(key) or cached
+            finally:
+                await self._release_fill_lock(key, token)
+
+        deadline = time.monotonic() + settings.MARKET_DATA_FILL_LOCK_SECONDS
+        while (token := await self._acquire_fill_lock(key)) is None:
+            await asyncio.sleep(_FILL_POLL_SECONDS)
+            filled = (await self._get_cache_many([key])).get(key)
+            if filled is not None:
+                return filled
+            if time.monotonic() >= deadline:
+                # 持锁方超过租约仍未回填，不再等待，自行加载
+                token = ""
+                break
+        try:
+            return await self._fill(*key)
+        finally:
+            await self._release_fill_lock(key, token)
+
+    async def _fill(self, province: str, trading_date: date) -> list[dict]:
+        """缓存未命中：DB → API 获取（两者都会回填 Redis 缓存）。"""
+        # Level 2: 数据库
+        records = (await self._load_from_db([(province, trading_date)])).get(
+            (province, trading_date)
+        )
         if records:
-            record_dicts = [
-                {
-                    "period": r.period,
-                    "clearing_price": str(r.clearing_price),
-                    "source": r.source,
-                    "fetched_at": r.fetched_at.isoformat(),
-                }
-                for r in records
-            ]
-            # 回填缓存
-            source = await self.source_repo.get_by_province(province)
-            ttl = source.cache_ttl_seconds if source else settings.MARKET_DATA_DEFAULT_CACHE_TTL
-            await self._set_cache_raw(province, trading_date, record_dicts, ttl)
-            return record_dicts
+            return records
 
         # Level 3: 触发 API 获取
         try:
@@ -201,49 +352,303 @@ class MarketDataService:
             # Level 4: 获取失败，返回空
             return []
 
-    # --- 数据新鲜度 ---
+    async def _acquire_fill_lock(self, key: tuple[str, date]) -> str | None:
+        """获取回填锁，返回持有令牌；已被他人持有时返回 None。
 
-    async def check_data_freshness(self, province: str) -> MarketDataFreshness:
-        """检查指定省份的数据新鲜度。"""
-        last_updated = await self.price_repo.check_freshness(province)
-        if last_updated is None:
-            return MarketDataFreshness(
-                province=province,
-                last_updated=None,
-                hours_ago=None,
-                status="critical",
+        Redis 不可用时不做跨进程协调，直接视为获取成功（进程内仍有 single-flight）。
+        """
+        if not self.redis_client:
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis_client.set(
+                lock_key(*key), token, nx=True,
+                px=int(settings.MARKET_DATA_FILL_LOCK_SECONDS * 1000),
             )
+        except Exception as e:
+            logger.warning("market_data_fill_lock_failed", error=str(e))
+            return ""
+        return token if acquired else None
 
-        now = datetime.now(UTC)
-        if last_updated.tzinfo is None:
-            hours_ago = (now.replace(tzinfo=None) - last_updated).total_seconds() / 3600
-        else:
-            hours_ago = (now - last_updated).total_seconds() / 3600
-
-        status: FreshnessStatus
-        if hours_ago < FRESHNESS_THRESHOLDS_HOURS["fresh"]:
-            status = "fresh"
-        elif hours_ago < FRESHNESS_THRESHOLDS_HOURS["stale"]:
-            status = "stale"
-        elif hours_ago < FRESHNESS_THRESHOLDS_HOURS["expired"]:
-            status = "expired"
-        else:
-            status = "critical"
+    async def _release_fill_lock(self, key: tuple[str, date], token: str) -> None:
+        if not self.redis_client or not token:
+            return
+        try:
+            await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key(*key), token)
+        except Exception as e:
+            logger.warning("market_data_fill_unlock_failed", error=str(e))
 
-        return MarketDataFreshness(
+    async def get_market_data_batch(
+        self,
+        provinces: list[str],
+        start_date: date,
+        end_date: date,
+    ) -> MarketDataBatchResponse:
+        """批量获取多省份 × 日期区间的出清价格（仅读缓存与数据库，不触发 API 获取）。
+
+        Redis MGET 一次取回全部键；未命中的 (省份, 交易日) 用一次 SQL 查询加载，
+        再以一个 pipeline 批量 SETEX 回填缓存。
+        """
+        provinces = list(dict.fromkeys(p.strip() for p in provinces if p.strip()))
+        days = (end_date - start_date).days + 1
+        if not provinces or days < 1:
+            raise BusinessError(
+                code="BATCH_QUERY_INVALID",
+                message="省份不能为空，且结束日期不能早于起始日期",
+                status_code=422,
+            )
+        if len(provinces) * days > settings.MARKET_DATA_BATCH_MAX_KEYS:
+            raise BusinessError(
+                code="BATCH_QUERY_TOO_LARGE",
+                message=f"单次最多查询 {settings.MARKET_DATA_BATCH_MAX_KEYS} 个省份·日",
+                status_code=422,
+            )
+
+        keys = [
+            (province, start_date + timedelta(days=offset))
+            for province in provinces
+            for offset in range(days)
+        ]
+        series, hits = await self._load_series(keys)
+        return MarketDataBatchResponse(
+            items=[
+                MarketDataDaySeries(
+                    province=province,
+                    trading_date=trading_date,
+                    records=series.get((province, trading_date), []),
+                )
+                for province, trading_date in keys
+            ],
+            cache_hits=hits,
+            cache_misses=len(keys) - hits,
+        )
+
+    async def _load_series(
+        self, keys: list[tuple[str, date]],
+    ) -> tuple[dict[tuple[str, date], list[dict]], int]:
+        """按 (省份, 交易日) 读取全部时段：缓存命中直接返回，未命中一次查库并回填缓存。
+
+        返回 ({(省份, 交易日): 时段记录}, 缓存命中数)；数据库也没有的键不在结果中。
+        """
+        series: dict[tuple[str, date], list[dict]] = {}
+        l1 = get_curve_cache()
+        generation = l1.generation if l1 else 0
+        if l1:
+            for key in keys:
+                records = l1.get(key)
+                if records is not None:
+                    series[key] = records
+
+        remaining = [key for key in keys if key not in series]
+        from_redis = await self._get_cache_many(remaining)
+        series.update(from_redis)
+        hits = len(series)
+        misses = [key for key in remaining if key not in from_redis]
+
+        loaded = await self._load_from_db(misses)
+        series.update(loaded)
+        self._fill_l1(l1, {**from_redis, **loaded}, generation)
+        return series, hits
+
+    async def _load_from_db(
+        self, keys: list[tuple[str, date]],
+    ) -> dict[tuple[str, date], list[dict]]:
+        """一次查库加载多个 (省份, 交易日) 并批量回填 Redis；数据库没有的键不在结果中。"""
+        grouped = await self.price_repo.get_by_province_date_pairs(keys) if keys else {}
+        if not grouped:
+            return {}
+
+        loaded = {
+            key: [
+                {
+                    "period": r.period,
+                    "clearing_price": str(r.clearing_price),
+                    "source": r.source,
+                    "fetched_at": r.fetched_at.isoformat(),
+                }
+                for r in rows
+            ]
+            for key, rows in grouped.items()
+        }
+        ttls = await self.source_repo.get_cache_ttls(sorted({province for province, _ in loaded}))
+        await self._set_cache_many({
+            key: (records, ttls.get(key[0], settings.MARKET_DATA_DEFAULT_CACHE_TTL))
+            for key, records in loaded.items()
+        })
+        return loaded
+
+    @staticmethod
+    def _fill_l1(l1, entries: dict[tuple[str, date], list[dict]], generation: int) -> None:
+        if l1:
+            for key, records in entries.items():
+                l1.put(key, records, generation)
+
+    async def _commit_and_notify(self, keys: list[tuple[str, date]]) -> None:
+        """提交价格写入，删除对应 Redis 键并发布失效通知（各进程丢弃 L1 条目）。
+
+        先提交再发布，确保其他进程收到通知后重新加载时能读到新数据；
+        发布失败只记录日志，L1 条目有 TTL 兜底。
+        """
+        await self.price_repo.session.commit()
+        l1 = get_curve_cache()
+        if l1:
+            l1.invalidate(keys)
+        if not self.redis_client or not keys:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.delete(*[redis_key(p, d) for p, d in keys], FRESHNESS_CACHE_KEY)
+            pipe.publish(MARKET_DATA_CHANNEL, encode_message(keys))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("market_data_change_publish_failed", keys=len(keys), error=str(e))
+
+    # --- 历史回补 ---
+
+    async def start_backfill(
+        self,
+        province: str,
+        start_date: date,
+        end_date: date,
+        user_id: UUID,
+    ) -> MarketDataBackfillJob:
+        """创建历史回补任务并派发 Celery 任务（按自然月分块写入，可断点恢复）。"""
+        source = await self.source_repo.get_by_province(province)
+        if not source:
+            raise BusinessError(
+                code="SOURCE_NOT_FOUND",
+                message=f"未找到省份 {province} 的数据源配置",
+            )
+        if not source.api_endpoint:
+            raise BusinessError(
+                code="SOURCE_NO_ENDPOINT",
+                message=f"省份 {province} 的数据源未配置API端点",
+            )
+        days = (end_date - start_date).days + 1
+        if days < 1 or days > settings.MARKET_DATA_BACKFILL_MAX_DAYS:
+            raise BusinessError(
+                code="BACKFILL_RANGE_INVALID",
+                message=f"回补区间须为 1~{settings.MARKET_DATA_BACKFILL_MAX_DAYS} 天",
+                status_code=422,
+            )
+        active = await self.backfill_repo.get_active_by_province(province)
+        if active:
+            raise BusinessError(
+                code="BACKFILL_IN_PROGRESS",
+                message=f"省份 {province} 已有进行中的回补任务",
+                status_code=409,
+            )
+
+        job = await self.backfill_repo.create(MarketDataBackfillJob(
             province=province,
-            last_updated=last_updated,
-            hours_ago=round(hours_ago, 1),
-            status=status,
+            start_date=start_date,
+            end_date=end_date,
+            status="pending",
+            created_by=user_id,
+        ))
+        await self.audit_service.log_action(
+            user_id=user_id,
+            action="backfill_market_data",
+            resource_type="market_data_backfill_job",
+            resource_id=job.id,
+            changes_after={
+                "province": province,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+            },
+        )
+        return await self._dispatch_backfill(job)
+
+    async def resume_backfill(self, job_id: UUID, user_id: UUID) -> MarketDataBackfillJob:
+        """重新派发失败的回补任务，从 completed_through 的次日继续。"""
+        job = await self.get_backfill_job(job_id)
+        if job.status != "failed":
+            raise BusinessError(
+                code="BACKFILL_NOT_RESUMABLE",
+                message=f"回补任务状态为 {job.status}，仅失败的任务可恢复",
+                status_code=409,
+            )
+        job.status = "pending"
+        job.error_message = None
+        await self.audit_service.log_action(
+            user_id=user_id,
+            action="resume_market_data_backfill",
+            resource_type="market_data_backfill_job",
+            resource_id=job.id,
+            changes_after={
+                "completed_through": (
+                    job.completed_through.isoformat() if job.completed_through else None
+                ),
+            },
         )
+        return await self._dispatch_backfill(job)
+
+    async def get_backfill_job(self, job_id: UUID) -> MarketDataBackfillJob:
+        job = await self.backfill_repo.get_by_id(job_id)
+        if not job:
+            raise BusinessError(
+                code="BACKFILL_NOT_FOUND",
+                message="回补任务不存在",
+                status_code=404,
+            )
+        return job
+
+    async def _dispatch_backfill(self, job: MarketDataBackfillJob) -> MarketDataBackfillJob:
+        # 提交事务，确保 Celery worker 能看到 job
+        await self.backfill_repo.session.commit()
+
+        from app.tasks.market_data_tasks import backfill_market_data
+
+        try:
+            task = backfill_market_data.apply_async(kwargs={"job_id": str(job.id)})
+        except Exception as e:
+            job.status = "failed"
+            job.error_message = f"任务派发失败: {str(e)[:500]}"
+            await self.backfill_repo.session.commit()
+            logger.error("celery_dispatch_failed", job_id=str(job.id), error=str(e))
+            raise BusinessError(
+                code="BACKFILL_DISPATCH_FAILED",
+                message="回补任务派发失败，请稍后重试",
+                status_code=500,
+            )
+
+        job.celery_task_id = task.id
+        await self.backfill_repo.session.commit()
+
+        logger.info(
+            "market_data_backfill_dispatched",
+            job_id=str(job.id),
+            province=job.province,
+            start_date=job.start_date.isoformat(),
+            end_date=job.end_date.isoformat(),
+        )
+        return job
+
+    # --- 数据新鲜度 ---
+
+    async def check_data_freshness(self, province: str) -> MarketDataFreshness:
+        """检查指定省份的数据新鲜度。"""
+        last_updated = await self.price_repo.check_freshness(province)
+        return _freshness(province, last_updated, datetime.now(UTC))
 
     async def check_all_freshness(self) -> list[MarketDataFreshness]:
-        """检查所有活跃省份的数据新鲜度。"""
+        """检查所有活跃省份的数据新鲜度。
+
+        一次查询读取各省的 market_data_freshness 状态行（与价格历史量无关），
+        结果在 Redis 缓存 MARKET_DATA_FRESHNESS_CACHE_TTL 秒，价格写入时删除。
+        """
+        cached = await self._get_freshness_cache()
+        if cached is not None:
+            return cached
+
         sources = await self.source_repo.get_active_sources()
-        results = []
-        for source in sources:
-            freshness = await self.check_data_freshness(source.province)
-            results.append(freshness)
+        provinces = [source.province for source in sources]
+        last_fetched = await self.price_repo.get_last_fetched(provinces)
+        now = datetime.now(UTC)
+        results = [
+            _freshness(province, last_fetched.get(province), now) for province in provinces
+        ]
+        await self._set_freshness_cache(results)
         return results
 
     # --- 手动导入降级 ---
@@ -284,6 +689,10 @@ class MarketDataService:
                 },
             )
 
+        await self._commit_and_notify(
+            sorted({(province, r["trading_date"]) for r in records})
+        )
+
         logger.info(
             "market_data_imported",
             province=province,
@@ -321,6 +730,7 @@ class MarketDataService:
             fetch_schedule=fetch_schedule,
             is_active=is_active,
             cache_ttl_seconds=cache_ttl_seconds,
+            next_fetch_at=next_run_after(fetch_schedule, datetime.now(UTC)),
         )
         created = await self.source_repo.create(source)
 
@@ -361,6 +771,11 @@ class MarketDataService:
             if value is not None and hasattr(source, key):
                 setattr(source, key, value)
 
+        if update_data.get("fetch_schedule"):
+            # 调度变更：按新表达式重新计算下次取数时间，并退出发布窗口轮询
+            source.next_fetch_at = next_run_after(source.fetch_schedule, datetime.now(UTC))
+            source.fast_poll_until = None
+
         await self.source_repo.session.flush()
         await self.source_repo.session.refresh(source)
 
@@ -401,15 +816,78 @@ class MarketDataService:
 
     # --- Redis 缓存 ---
 
-    async def _get_cache(self, province: str, trading_date: date) -> list[dict] | None:
+    async def _get_cache_many(
+        self, keys: list[tuple[str, date]],
+    ) -> dict[tuple[str, date], list[dict]]:
+        """MGET 一次取回多个 (省份, 交易日) 的缓存，只返回命中的键。"""
+        if not self.redis_client or not keys:
+            return {}
+        try:
+            values = await self.redis_client.mget([redis_key(p, d) for p, d in keys])
+        except Exception as e:
+            logger.warning("redis_cache_mget_failed", keys=len(keys), error=str(e))
+            return {}
+        cached: dict[tuple[str, date], list[dict]] = {}
+        for key, value in zip(keys, values):
+            if value:
+                records = _decode_curve(value)
+                if records is not None:
+                    cached[key] = records
+        return cached
+
+    async def _get_cache_with_ttl(
+        self, key: tuple[str, date],
+    ) -> tuple[list[dict] | None, int | None]:
+        """GET + PTTL 一次往返，返回 (缓存记录, 剩余毫秒)；未命中返回 (None, None)。"""
         if not self.redis_client:
-            return None
-        key = f"{CACHE_PREFIX}:{province}:{trading_date.isoformat()}"
+            return None, None
         try:
-            data = await self.redis_client.get(key)
-            return json.loads(data) if data else None
-        except Exception:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.get(redis_key(*key))
+            pipe.pttl(redis_key(*key))
+            value, ttl_ms = await pipe.execute()
+        except Exception as e:
+            logger.warning("redis_cache_get_failed", error=str(e))
+            return None, None
+        records = _decode_curve(value) if value else None
+        return records, ttl_ms if records is not None else None
+
+    async def _get_freshness_cache(self) -> list[MarketDataFreshness] | None:
+        if not self.redis_client:
             return None
+        try:
+            value = await self.redis_client.get(FRESHNESS_CACHE_KEY)
+            if value:
+                return [MarketDataFreshness.model_validate(item) for item in json.loads(value)]
+        except Exception as e:
+            logger.warning("redis_freshness_cache_get_failed", error=str(e))
+        return None
+
+    async def _set_freshness_cache(self, items: list[MarketDataFreshness]) -> None:
+        if not self.redis_client or settings.MARKET_DATA_FRESHNESS_CACHE_TTL <= 0:
+            return
+        try:
+            await self.redis_client.setex(
+                FRESHNESS_CACHE_KEY,
+                settings.MARKET_DATA_FRESHNESS_CACHE_TTL,
+                json.dumps([item.model_dump(mode="json") for item in items]),
+            )
+        except Exception as e:
+            logger.warning("redis_freshness_cache_set_failed", error=str(e))
+
+    async def _set_cache_many(
+        self, entries: dict[tuple[str, date], tuple[list[dict], int]],
+    ) -> None:
+        """以一个非事务 pipeline 批量 SETEX（一次往返）。"""
+        if not self.redis_client or not entries:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for (province, trading_date), (records, ttl) in entries.items():
+                pipe.setex(redis_key(province, trading_date), ttl, _encode_curve(records))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning("redis_cache_pipeline_set_failed", keys=len(entries), error=str(e))
 
     async def _set_cache(
         self,
@@ -418,28 +896,14 @@ class MarketDataService:
         records: list[MarketPriceRecord],
         ttl: int,
     ) -> None:
+        fetched_at = datetime.now(UTC).isoformat()
         record_dicts = [
             {
                 "period": r.period,
                 "clearing_price": str(r.clearing_price),
                 "source": "api",
-                "fetched_at": datetime.now(UTC).isoformat(),
+                "fetched_at": fetched_at,
             }
             for r in records
         ]
-        await self._set_cache_raw(province, trading_date, record_dicts, ttl)
-
-    async def _set_cache_raw(
-        self,
-        province: str,
-        trading_date: date,
-        records: list[dict],
-        ttl: int,
-    ) -> None:
-        if not self.redis_client:
-            return
-        key = f"{CACHE_PREFIX}:{province}:{trading_date.isoformat()}"
-        try:
-            await self.redis_client.setex(key, ttl, json.dumps(records, default=str))
-        except Exception as e:
-            logger.warning("redis_cache_set_failed", key=key, error=str(e))
+        await self._set_cache_many({(province, trading_date): (record_dicts, ttl)})
@@ -1,5 +1,7 @@
+import json
 from uuid import UUID
 
+import redis.asyncio as aioredis
 import structlog
 from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
@@ -74,14 +76,41 @@ class MarketRuleService:
         self,
         market_rule_repo: MarketRuleRepository,
         audit_service: AuditService,
+        redis_client: aioredis.Redis | None = None,
     ):
         self.market_rule_repo = market_rule_repo
         self.audit_service = audit_service
+        self.redis_client = redis_client
 
     def _warn_if_no_ip(self, action: str, ip_address: str | None) -> None:
         if ip_address is None:
             logger.warning("audit_ip_missing", action=action, hint="非 HTTP 上下文调用，IP 地址缺失")
 
+    async def _commit_and_notify(self, rule: ProvinceMarketRule) -> None:
+        """提交规则变更，并通知导入 worker 失效该省份的校验器缓存。
+
+        先提交再发布，确保 worker 收到通知后重新查询时能读到新规则；
+        flush 会使 onupdate 的 updated_at 过期，提交前先 refresh 再读取，避免 AsyncSession 隐式懒加载。
+        发布失败只记录日志，worker 侧缓存有最长存活时间兜底。
+        """
+        from app.tasks.import_validators import MARKET_RULE_CHANNEL
+
+        session = self.market_rule_repo.session
+        payload = None
+        if self.redis_client:
+            await session.refresh(rule)
+            payload = {
+                "province": rule.province,
+                "updated_at": rule.updated_at.isoformat() if rule.updated_at else None,
+            }
+        await session.commit()
+        if payload is None:
+            return
+        try:
+            await self.redis_client.publish(MARKET_RULE_CHANNEL, json.dumps(payload))
+        except Exception as e:
+            logger.warning("market_rule_change_publish_failed", province=rule.province, error=str(e))
+
     def _validate_deviation_params(
         self, formula_type: str, params: dict
     ) -> None:
@@ -154,6 +183,7 @@ class MarketRuleService:
                     changes_after=changes_after,
                     ip_address=client_ip,
                 )
+                await self._commit_and_notify(existing)
                 logger.info(
                     "market_rule_updated",
                     province=province,
@@ -195,6 +225,7 @@ class MarketRuleService:
             },
             ip_address=client_ip,
         )
+        await self._commit_and_notify(created)
 
         logger.info(
             "market_rule_created",
@@ -243,6 +274,7 @@ class MarketRuleService:
             changes_after={"is_active": False},
             ip_address=client_ip,
         )
+        await self._commit_and_notify(rule)
 
         logger.info(
             "market_rule_deactivated",
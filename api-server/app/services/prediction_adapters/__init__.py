@@ -1,5 +1,5 @@
 from app.models.prediction import PredictionModel
-from app.services.prediction_adapters.base import BasePredictionAdapter, PredictionRecord
+from app.services.prediction_adapters.base import BasePredictionAdapter, PredictionBatch, PredictionRecord
 from app.services.prediction_adapters.generic import GenericPredictionAdapter
 
 
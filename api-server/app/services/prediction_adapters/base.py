@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import date
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
 
 
 @dataclass
@@ -12,6 +14,87 @@ class PredictionRecord:
     confidence_lower_kw: Decimal  # 置信区间下限 kW
 
 
+@dataclass
+class PredictionBatch:
+    """一次预测结果的列式表示：每个字段一个 NumPy 数组，下标对应响应中的第 i 条。
+
+    功率列为 float64（库表为 Numeric(12,2)，远小于 2^53，比较结果与 Decimal 一致）。
+    *_raw 保留响应中的原始值，用于生成错误信息与 to_records 构造 Decimal，
+    避免经 float 往返后的数值与逐条解析结果不同。
+    """
+
+    period: np.ndarray  # int64
+    predicted: np.ndarray  # float64，预测功率 kW
+    upper: np.ndarray  # float64，置信区间上限 kW
+    lower: np.ndarray  # float64，置信区间下限 kW
+    predicted_raw: list
+    upper_raw: list
+    lower_raw: list
+
+    def __len__(self) -> int:
+        return len(self.period)
+
+    @classmethod
+    def from_items(cls, items: list[dict]) -> "PredictionBatch":
+        """直接从 JSON 条目构建，不逐值构造 Decimal。
+
+        缺字段抛 KeyError；功率值无法解析或非有限值时抛 InvalidOperation，
+        与逐条 Decimal 解析一致，不触发重试（响应内容重试也不会变）。
+        """
+        period = np.array([int(item["period"]) for item in items], dtype=np.int64)
+        predicted_raw = [item["predicted_power_kw"] for item in items]
+        upper_raw = [item["confidence_upper_kw"] for item in items]
+        lower_raw = [item["confidence_lower_kw"] for item in items]
+        try:
+            predicted = np.array(predicted_raw, dtype=np.float64)
+            upper = np.array(upper_raw, dtype=np.float64)
+            lower = np.array(lower_raw, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise InvalidOperation(f"预测值不是数值: {e}") from e
+        if not (np.isfinite(predicted).all() and np.isfinite(upper).all() and np.isfinite(lower).all()):
+            raise InvalidOperation("预测值包含 NaN 或无穷大")
+        return cls(period, predicted, upper, lower, predicted_raw, upper_raw, lower_raw)
+
+    @classmethod
+    def from_records(cls, records: list[PredictionRecord]) -> "PredictionBatch":
+        return cls(
+            period=np.array([r.period for r in records], dtype=np.int64),
+            predicted=np.array([r.predicted_power_kw for r in records], dtype=np.float64),
+            upper=np.array([r.confidence_upper_kw for r in records], dtype=np.float64),
+            lower=np.array([r.confidence_lower_kw for r in records], dtype=np.float64),
+            predicted_raw=[r.predicted_power_kw for r in records],
+            upper_raw=[r.confidence_upper_kw for r in records],
+            lower_raw=[r.confidence_lower_kw for r in records],
+        )
+
+    def take(self, mask: np.ndarray) -> "PredictionBatch":
+        """按布尔掩码取子集。"""
+        indices = np.flatnonzero(mask).tolist()
+        return PredictionBatch(
+            period=self.period[indices],
+            predicted=self.predicted[indices],
+            upper=self.upper[indices],
+            lower=self.lower[indices],
+            predicted_raw=[self.predicted_raw[i] for i in indices],
+            upper_raw=[self.upper_raw[i] for i in indices],
+            lower_raw=[self.lower_raw[i] for i in indices],
+        )
+
+    def to_records(self) -> list[PredictionRecord]:
+        """转换为逐条记录（功率值按原始值构造 Decimal，与逐条解析结果一致）。"""
+        return [
+            PredictionRecord(
+                period=period,
+                predicted_power_kw=Decimal(str(predicted)),
+                confidence_upper_kw=Decimal(str(upper)),
+                confidence_lower_kw=Decimal(str(lower)),
+            )
+            for period, predicted, upper, lower in zip(
+                self.period.tolist(), self.predicted_raw, self.upper_raw, self.lower_raw,
+            )
+        ]
+
+
 class BasePredictionAdapter(ABC):
     """功率预测模型适配器基类。"""
 
@@ -22,6 +105,14 @@ class BasePredictionAdapter(ABC):
         """获取指定电站指定日期的96时段功率预测。"""
         ...
 
+    async def fetch_prediction_batch(
+        self, station_id: str, prediction_date: date,
+    ) -> PredictionBatch:
+        """以列式批次获取预测（定时拉取使用）；默认由 fetch_predictions 的结果转换。"""
+        return PredictionBatch.from_records(
+            await self.fetch_predictions(station_id, prediction_date),
+        )
+
     @abstractmethod
     async def health_check(self) -> bool:
         """检查预测模型API可用性。"""
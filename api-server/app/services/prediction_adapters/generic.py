@@ -1,11 +1,15 @@
 import asyncio
 from datetime import date
-from decimal import Decimal
 
 import httpx
 import structlog
 
-from app.services.prediction_adapters.base import BasePredictionAdapter, PredictionRecord
+from app.core.http_client import get_http_client
+from app.services.prediction_adapters.base import (
+    BasePredictionAdapter,
+    PredictionBatch,
+    PredictionRecord,
+)
 
 logger = structlog.get_logger()
 
@@ -54,6 +58,13 @@ class GenericPredictionAdapter(BasePredictionAdapter):
         self, station_id: str, prediction_date: date,
     ) -> list[PredictionRecord]:
         """从外部 API 获取功率预测，含重试逻辑（最多2次，指数退避 1s→2s）。"""
+        batch = await self.fetch_prediction_batch(station_id, prediction_date)
+        return batch.to_records()
+
+    async def fetch_prediction_batch(
+        self, station_id: str, prediction_date: date,
+    ) -> PredictionBatch:
+        """获取功率预测并直接解析为列式批次，重试逻辑同 fetch_predictions。"""
         params = {
             "station_id": station_id,
             "prediction_date": prediction_date.isoformat(),
@@ -61,62 +72,53 @@ class GenericPredictionAdapter(BasePredictionAdapter):
         headers = self._build_headers()
         last_error: Exception | None = None
 
-        async with httpx.AsyncClient(
-            timeout=self.timeout_seconds,
-        ) as client:
-            for attempt in range(1, MAX_RETRIES + 2):
-                try:
-                    response = await client.get(
-                        self.api_endpoint,
-                        params=params,
-                        headers=headers,
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                    return self._parse_response(data)
-                except (httpx.HTTPError, KeyError, ValueError) as e:
-                    last_error = e
-                    logger.warning(
-                        "prediction_fetch_attempt_failed",
-                        attempt=attempt,
-                        error=str(e),
-                        endpoint=self.api_endpoint,
-                        station_id=station_id,
-                        prediction_date=prediction_date.isoformat(),
-                    )
-                    if attempt <= MAX_RETRIES:
-                        backoff = INITIAL_BACKOFF * (2 ** (attempt - 1))
-                        await asyncio.sleep(backoff)
+        # 共享连接池：同一主机的模型与重试复用已建立的连接
+        client = get_http_client(self.api_endpoint)
+        for attempt in range(1, MAX_RETRIES + 2):
+            try:
+                response = await client.get(
+                    self.api_endpoint,
+                    params=params,
+                    headers=headers,
+                    timeout=self.timeout_seconds,
+                )
+                response.raise_for_status()
+                data = response.json()
+                return self._parse_batch(data)
+            except (httpx.HTTPError, KeyError, ValueError) as e:
+                last_error = e
+                logger.warning(
+                    "prediction_fetch_attempt_failed",
+                    attempt=attempt,
+                    error=str(e),
+                    endpoint=self.api_endpoint,
+                    station_id=station_id,
+                    prediction_date=prediction_date.isoformat(),
+                )
+                if attempt <= MAX_RETRIES:
+                    backoff = INITIAL_BACKOFF * (2 ** (attempt - 1))
+                    await asyncio.sleep(backoff)
 
         raise RuntimeError(
             f"功率预测获取失败（已重试{MAX_RETRIES}次）: {last_error}"
         )
 
-    def _parse_response(self, data: list | dict) -> list[PredictionRecord]:
+    def _parse_batch(self, data: list | dict) -> PredictionBatch:
         items = data if isinstance(data, list) else data.get("data", [])
-        records = []
-        for item in items:
-            records.append(
-                PredictionRecord(
-                    period=int(item["period"]),
-                    predicted_power_kw=Decimal(str(item["predicted_power_kw"])),
-                    confidence_upper_kw=Decimal(str(item["confidence_upper_kw"])),
-                    confidence_lower_kw=Decimal(str(item["confidence_lower_kw"])),
-                )
-            )
-        return records
+        return PredictionBatch.from_items(items)
 
     async def health_check(self) -> bool:
         """检查预测模型 API 可用性，超时5秒。"""
         try:
-            async with httpx.AsyncClient(timeout=HEALTH_CHECK_TIMEOUT) as client:
-                response = await asyncio.wait_for(
-                    client.head(
-                        self.api_endpoint,
-                        headers=self._build_headers(),
-                    ),
+            client = get_http_client(self.api_endpoint)
+            response = await asyncio.wait_for(
+                client.head(
+                    self.api_endpoint,
+                    headers=self._build_headers(),
                     timeout=HEALTH_CHECK_TIMEOUT,
-                )
-                return response.status_code < 500
+                ),
+                timeout=HEALTH_CHECK_TIMEOUT,
+            )
+            return response.status_code < 500
         except (httpx.HTTPError, asyncio.TimeoutError):
             return False
@@ -1,17 +1,29 @@
 import time
 from datetime import UTC, date, datetime
+from decimal import Decimal
 from uuid import UUID
 
+import numpy as np
 import structlog
 
+from app.core.config import settings
+from app.core.cron import next_run_after
+from app.core.data_access import DataAccessContext
 from app.core.exceptions import BusinessError
 from app.core.prediction_encryption import decrypt_api_key, encrypt_api_key
 from app.models.prediction import PredictionModel
 from app.repositories.prediction import PowerPredictionRepository, PredictionModelRepository
-from app.schemas.prediction import ConnectionTestResult, FetchResult, PredictionModelStatus
+from app.schemas.prediction import (
+    ConnectionTestResult,
+    FetchResult,
+    PredictionCurveRangeResponse,
+    PredictionCurveSeries,
+    PredictionModelStatus,
+)
 from app.services.audit_service import AuditService
 from app.services.prediction_adapters import get_adapter
-from app.services.prediction_adapters.base import PredictionRecord
+from app.services.prediction_adapters.base import PredictionBatch, PredictionRecord
+from app.services.station_service import StationService
 
 logger = structlog.get_logger()
 
@@ -20,22 +32,48 @@ _encrypt_api_key = encrypt_api_key
 _decrypt_api_key = decrypt_api_key
 
 
+def _invalid_rows(batch: PredictionBatch) -> tuple[np.ndarray, list[str]]:
+    """整列校验，返回 (无效行掩码, 逐行错误信息)。
+
+    每行按 时段 → 非负 → 置信区间 的顺序取第一个不满足的规则，
+    错误信息的内容与顺序与逐条校验一致；只有出错的行才逐个格式化。
+    """
+    bad_period = (batch.period < 1) | (batch.period > 96)
+    negative = ~bad_period & (batch.predicted < 0)
+    violation = ~bad_period & ~negative & ~(
+        (batch.lower <= batch.predicted) & (batch.predicted <= batch.upper)
+    )
+    invalid = bad_period | negative | violation
+
+    errors = []
+    for i in np.flatnonzero(invalid).tolist():
+        period = int(batch.period[i])
+        if bad_period[i]:
+            errors.append(f"Invalid period {period}")
+        elif negative[i]:
+            errors.append(f"Period {period}: negative power {Decimal(str(batch.predicted_raw[i]))}")
+        else:
+            errors.append(f"Period {period}: confidence violation")
+    return invalid, errors
+
+
+def validate_prediction_batch(
+    batch: PredictionBatch,
+) -> tuple[PredictionBatch, list[str]]:
+    """校验预测批次数据质量，返回 (有效行组成的批次, 错误信息列表)。"""
+    invalid, errors = _invalid_rows(batch)
+    valid = batch.take(~invalid) if errors else batch
+    if len(valid) < 96:
+        errors.append(f"Incomplete: {len(valid)}/96 valid records")
+    return valid, errors
+
+
 def validate_prediction_records(
     records: list[PredictionRecord],
 ) -> tuple[list[PredictionRecord], list[str]]:
     """校验预测记录数据质量，返回 (有效记录, 错误信息列表)。"""
-    valid, errors = [], []
-    for r in records:
-        if not (1 <= r.period <= 96):
-            errors.append(f"Invalid period {r.period}")
-            continue
-        if r.predicted_power_kw < 0:
-            errors.append(f"Period {r.period}: negative power {r.predicted_power_kw}")
-            continue
-        if not (r.confidence_lower_kw <= r.predicted_power_kw <= r.confidence_upper_kw):
-            errors.append(f"Period {r.period}: confidence violation")
-            continue
-        valid.append(r)
+    invalid, errors = _invalid_rows(PredictionBatch.from_records(records))
+    valid = [r for r, bad in zip(records, invalid.tolist()) if not bad]
     if len(valid) < 96:
         errors.append(f"Incomplete: {len(valid)}/96 valid records")
     return valid, errors
@@ -47,10 +85,12 @@ class PredictionService:
         model_repo: PredictionModelRepository,
         audit_service: AuditService,
         prediction_repo: PowerPredictionRepository | None = None,
+        station_service: StationService | None = None,
     ):
         self.model_repo = model_repo
         self.audit_service = audit_service
         self.prediction_repo = prediction_repo
+        self.station_service = station_service
 
     # --- CRUD ---
 
@@ -65,6 +105,7 @@ class PredictionService:
         timeout_seconds: int,
         station_id: UUID,
         user_id: UUID | None = None,
+        prediction_horizon: str = "day_ahead",
     ) -> PredictionModel:
         model = PredictionModel(
             station_id=station_id,
@@ -75,6 +116,8 @@ class PredictionService:
             api_auth_type=api_auth_type,
             call_frequency_cron=call_frequency_cron,
             timeout_seconds=timeout_seconds,
+            prediction_horizon=prediction_horizon,
+            next_fetch_at=next_run_after(call_frequency_cron, datetime.now(UTC)),
         )
         created = await self.model_repo.create(model)
 
@@ -141,6 +184,10 @@ class PredictionService:
             if value is not None and hasattr(model, key):
                 setattr(model, key, value)
 
+        if update_data.get("call_frequency_cron"):
+            # 调度变更：按新表达式重新计算下次拉取时间
+            model.next_fetch_at = next_run_after(model.call_frequency_cron, datetime.now(UTC))
+
         await self.model_repo.session.flush()
         await self.model_repo.session.refresh(model)
 
@@ -210,6 +257,53 @@ class PredictionService:
             page_size=page_size,
         )
 
+    # --- 预测曲线 ---
+
+    async def get_prediction_curves(
+        self,
+        access_ctx: DataAccessContext,
+        station_id: UUID,
+        start_date: date,
+        end_date: date,
+        model_ids: list[UUID] | None = None,
+    ) -> PredictionCurveRangeResponse:
+        """多模型、多日预测曲线（单次查询，列式返回）；未指定模型时取电站下全部模型。"""
+        await self.station_service.get_station_for_user(access_ctx, station_id)
+        if end_date < start_date:
+            raise BusinessError(
+                code="PREDICTION_RANGE_INVALID",
+                message="结束日期不能早于起始日期",
+                status_code=422,
+            )
+        if not model_ids:
+            models = await self.model_repo.get_by_station_id(station_id)
+            model_ids = [m.id for m in models]
+        days = (end_date - start_date).days + 1
+        if len(model_ids) * days > settings.PREDICTION_RANGE_MAX_SERIES:
+            raise BusinessError(
+                code="PREDICTION_RANGE_TOO_LARGE",
+                message=f"单次最多查询 {settings.PREDICTION_RANGE_MAX_SERIES} 条模型·日曲线",
+                status_code=422,
+            )
+
+        curves = await self.prediction_repo.get_curves(
+            station_id=station_id,
+            start_date=start_date,
+            end_date=end_date,
+            model_ids=model_ids,
+        ) if model_ids else {}
+        return PredictionCurveRangeResponse(
+            station_id=station_id,
+            start_date=start_date,
+            end_date=end_date,
+            series=[
+                PredictionCurveSeries(model_id=model_id, prediction_date=prediction_date, **curve)
+                for (model_id, prediction_date), curve in sorted(
+                    curves.items(), key=lambda item: (str(item[0][0]), item[0][1]),
+                )
+            ],
+        )
+
     # --- 连接测试 ---
 
     async def test_connection(self, model_id: UUID) -> ConnectionTestResult:
@@ -1,5 +1,6 @@
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.core.config import settings
 
@@ -15,19 +16,48 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="Asia/Shanghai",
     enable_utc=True,
-    include=["app.tasks.import_tasks", "app.tasks.market_data_tasks", "app.tasks.prediction_tasks"],
+    include=[
+        "app.tasks.import_tasks",
+        "app.tasks.import_sharding",
+        "app.tasks.market_data_tasks",
+        "app.tasks.prediction_tasks",
+    ],
     beat_schedule={
-        "fetch-market-data-periodic": {
-            "task": "app.tasks.market_data_tasks.fetch_market_data_periodic",
-            "schedule": crontab(hour="7,12,17", minute=0),
+        # 按各数据源的 fetch_schedule 派发取数任务（见 dispatch_market_data_fetches）
+        "dispatch-market-data-fetches": {
+            "task": "app.tasks.market_data_tasks.dispatch_market_data_fetches",
+            "schedule": crontab(minute="*"),
         },
+        # 每分钟扫描，仅探测到达各自 next_check_at 的 API 主机（间隔自适应）
         "check-prediction-models-health": {
             "task": "app.tasks.prediction_tasks.check_prediction_models_health",
-            "schedule": crontab(minute="*/5"),
+            "schedule": crontab(minute="*"),
         },
-        "fetch-prediction-data-periodic": {
-            "task": "app.tasks.prediction_tasks.fetch_prediction_data_for_all_models",
-            "schedule": crontab(hour="6,12", minute=0),
+        # 按各模型的 call_frequency_cron 派发预测拉取（见 dispatch_prediction_fetches）
+        "dispatch-prediction-fetches": {
+            "task": "app.tasks.prediction_tasks.dispatch_prediction_fetches",
+            "schedule": crontab(minute="*"),
         },
     },
 )
+
+
+@worker_process_init.connect
+def _start_import_metrics_server(**kwargs):
+    """每个 prefork 子进程在 IMPORT_METRICS_PORT + 子进程序号上暴露导入指标。"""
+    if not settings.IMPORT_METRICS_PORT:
+        return
+    from billiard.process import current_process
+
+    from app.tasks.import_metrics import start_metrics_server
+
+    index = getattr(current_process(), "index", 0) or 0
+    start_metrics_server(settings.IMPORT_METRICS_PORT + index)
+
+
+@worker_process_shutdown.connect
+def _close_http_clients(**kwargs):
+    """子进程退出时关闭共享 HTTP 客户端与常驻事件循环。"""
+    from app.core.http_client import shutdown_worker_loop
+
+    shutdown_worker_loop()
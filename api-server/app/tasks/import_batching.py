@@ -0,0 +1,62 @@
+"""导入批次大小自适应。
+
+固定的 BATCH_SIZE 对窄行（交易数据）偏小、对宽行（储能数据）或慢数据库偏大。
+AdaptiveBatchSizer 在每次 flush 后按实测写入吞吐（行/秒）把批次大小调整到
+“写入耗时约为 IMPORT_FLUSH_TARGET_SECONDS”的规模：
+
+- 只用写满的批次调整（收尾的零头批次耗时不具代表性）
+- 每次最多放大 2 倍 / 缩小一半，并与当前值取平均，避免单次抖动造成振荡
+- 结果限制在 [IMPORT_BATCH_SIZE_MIN, IMPORT_BATCH_SIZE_MAX]，
+  且批次记录占用的内存（按首条记录估算单行大小）不超过 IMPORT_BATCH_MEMORY_BYTES
+"""
+
+import sys
+
+from app.core.config import settings
+
+
+def estimate_record_bytes(record: dict) -> int:
+    """单条记录 dict 及其值对象的大致内存占用（字节）。"""
+    return sys.getsizeof(record) + sum(sys.getsizeof(v) for v in record.values())
+
+
+class AdaptiveBatchSizer:
+    def __init__(
+        self,
+        initial: int,
+        min_size: int | None = None,
+        max_size: int | None = None,
+        target_seconds: float | None = None,
+        memory_budget: int | None = None,
+        adaptive: bool | None = None,
+    ):
+        self.size = initial
+        self.min_size = min_size if min_size is not None else settings.IMPORT_BATCH_SIZE_MIN
+        self.max_size = max_size if max_size is not None else settings.IMPORT_BATCH_SIZE_MAX
+        self.target_seconds = (
+            target_seconds if target_seconds is not None else settings.IMPORT_FLUSH_TARGET_SECONDS
+        )
+        self.memory_budget = (
+            memory_budget if memory_budget is not None else settings.IMPORT_BATCH_MEMORY_BYTES
+        )
+        self.adaptive = adaptive if adaptive is not None else settings.IMPORT_BATCH_ADAPTIVE
+        self.record_bytes: int | None = None
+
+    @property
+    def upper_bound(self) -> int:
+        if self.record_bytes:
+            return max(self.min_size, min(self.max_size, self.memory_budget // self.record_bytes))
+        return self.max_size
+
+    def observe(self, rows: int, seconds: float, sample_record: dict | None = None) -> int:
+        """记录一次写入（rows 行耗时 seconds 秒），返回调整后的批次大小。"""
+        if not self.adaptive or rows < self.size or seconds <= 0:
+            return self.size
+        if self.record_bytes is None and sample_record is not None:
+            self.record_bytes = estimate_record_bytes(sample_record)
+
+        target = rows / seconds * self.target_seconds
+        target = min(max(target, self.size / 2), self.size * 2)
+        size = int((self.size + target) / 2)
+        self.size = max(self.min_size, min(self.upper_bound, size))
+        return self.size
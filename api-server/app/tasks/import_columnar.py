@@ -0,0 +1,389 @@
+"""列式解析/校验引擎（IMPORT_ENGINE=columnar）。
+
+按 IMPORT_COLUMNAR_CHUNK_SIZE 行分块读取文件，将每个字段转为 NumPy 变长字符串数组后整列校验：
+- 价格、功率、时段等数值列：用 np.strings 掩码识别普通数字串，转 float64/int64 后按
+  范围掩码判定，确定有效的行直接构造 Decimal/int；只有越界、写法特殊或 float 无法判定的边界行
+  才逐行调用 _check_* 函数（得到与逐行引擎一致的解析结果与异常信息）
+- 日期、SOC、循环次数等高重复且规则不便向量化的列：相同原始字符串只解析一次（哈希分组 + 下标回填）
+
+校验规则与 import_tasks 中的 _check_* 函数一致，批次切分点也按逐行引擎的
+should_flush 语义计算，因此生成的 ImportAnomaly 行、计数与逐行引擎一致；
+duplicate 汇总按批次生成，在批次大小相同（如 IMPORT_BATCH_ADAPTIVE=false）时也一致。
+"""
+
+import os
+import uuid
+from decimal import Decimal
+from functools import partial
+from itertools import islice
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.constants import PERIODS_PER_DAY
+from app.services.ems_adapters.base import BaseEmsAdapter
+from app.tasks.import_tasks import (
+    ImportContext,
+    _check_clearing_price,
+    _check_cycle_count,
+    _check_output_kw,
+    _check_period,
+    _check_power,
+    _check_soc,
+    _check_trading_date,
+)
+
+
+def _bulk_uuid4(n: int) -> list[uuid.UUID]:
+    """一次性读取随机字节批量生成 UUIDv4（等价于逐个调用 uuid.uuid4）。"""
+    raw = os.urandom(16 * n)
+    return [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, 16 * n, 16)]
+
+
+_STRING = np.dtypes.StringDType()
+
+
+def _to_array(values: list[str]) -> np.ndarray:
+    """转为变长字符串数组（不按最长单元格定宽，个别超长单元格不会放大整列内存；保留尾部 NUL）。"""
+    return np.array(values, dtype=_STRING)
+
+
+def _factorize(values: np.ndarray) -> tuple[list[str], np.ndarray]:
+    """返回 (唯一值列表, 每行在唯一值中的下标)；按首次出现顺序，不对变长字符串排序。"""
+    raw = values.tolist()
+    index = {value: i for i, value in enumerate(dict.fromkeys(raw))}
+    return list(index), np.fromiter(map(index.__getitem__, raw), dtype=np.intp, count=len(raw))
+
+
+def _check_unique(values: np.ndarray, check_fn) -> tuple[np.ndarray, np.ndarray]:
+    """对列中的唯一值调用 check_fn，返回按行展开的 (parsed, anomaly) object 数组。"""
+    uniques, inverse = _factorize(values)
+    parsed = np.empty(len(uniques), dtype=object)
+    anomalies = np.empty(len(uniques), dtype=object)
+    for i, raw in enumerate(uniques):
+        parsed[i], anomalies[i] = check_fn(raw)
+    return parsed[inverse], anomalies[inverse]
+
+
+_DOT = np.array(".", dtype=_STRING)
+# 不超过此长度的普通小数若非零，其 float 必不为 0（最小为 1e-298，远大于 float 下溢界限）
+_FLOAT_EXACT_ZERO_MAX_LEN = 300
+
+
+def _plain_decimals(values: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """识别 [+-]数字[.数字] 形式的普通小数串，返回 (plain, as_float, is_zero) 掩码与数值。
+
+    科学计数法、NaN/Infinity、空串等其余写法 plain 为 False，由调用方交给 Python 校验。
+    """
+    lengths = np.strings.str_len(values)
+    body = np.strings.lstrip(values, "+-")
+    head, _, tail = np.strings.partition(body, _DOT)
+    plain = (
+        (lengths - np.strings.str_len(body) <= 1)
+        & (np.strings.isdecimal(head) | (head == ""))
+        & (np.strings.isdecimal(tail) | (tail == ""))
+        & ((head != "") | (tail != ""))
+    )
+    as_float = np.full(len(values), np.nan)
+    as_float[plain] = values[plain].astype(np.float64)
+    is_zero = (as_float == 0) & (lengths <= _FLOAT_EXACT_ZERO_MAX_LEN)
+    return plain, as_float, is_zero
+
+
+def _fill_checked(values: np.ndarray, ok: np.ndarray, ok_values, check_fn):
+    """确定有效的行填入 ok_values，其余行逐行调用 check_fn 取得解析结果与异常。"""
+    parsed = np.empty(len(values), dtype=object)
+    anomalies = np.full(len(values), None, dtype=object)
+    parsed[ok] = ok_values
+    for i in np.flatnonzero(~ok).tolist():
+        parsed[i], anomalies[i] = check_fn(str(values[i]))
+    return parsed, anomalies
+
+
+def _check_decimal(
+    values: np.ndarray, check_fn,
+    lower: Decimal | None = None, upper: Decimal | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """数值列整列校验（有效范围 lower <= x <= upper），返回按行的 (parsed, anomaly) object 数组。
+
+    float 舍入单调，严格小于/大于边界的 float 比较结果对原 Decimal 同样成立；
+    等于非零边界的行无法由 float 判定，与无效行一起逐行调用 check_fn。
+    """
+    plain, as_float, is_zero = _plain_decimals(values)
+    ok = plain
+    for bound, inside in ((lower, np.greater), (upper, np.less)):
+        if bound is None:
+            continue
+        within = inside(as_float, float(bound))
+        if bound == 0:
+            within |= is_zero
+        ok = ok & within
+
+    ok_raw = values[ok].tolist()
+    ok_values = np.fromiter(map(Decimal, ok_raw), dtype=object, count=len(ok_raw))
+    return _fill_checked(values, ok, ok_values, check_fn)
+
+
+def _check_integer(values: np.ndarray, check_fn, lower: int, upper: int) -> tuple[np.ndarray, np.ndarray]:
+    """整数列整列校验（纯数字串且 lower <= x <= upper），返回按行的 (parsed, anomaly) object 数组。"""
+    # 18 位以内的数字串可无溢出地转为 int64；更长或带符号的写法交给 check_fn
+    plain = np.strings.isdecimal(values) & (np.strings.str_len(values) <= 18)
+    ints = np.zeros(len(values), dtype=np.int64)
+    ints[plain] = values[plain].astype(np.int64)
+    ok = plain & (ints >= lower) & (ints <= upper)
+    return _fill_checked(values, ok, ints[ok].astype(object), check_fn)
+
+
+def _first_anomaly(*anomaly_columns: np.ndarray) -> np.ndarray:
+    """按校验顺序取每行第一个异常（与逐行引擎遇错即停的语义一致）。"""
+    result = anomaly_columns[-1].copy()
+    for column in reversed(anomaly_columns[:-1]):
+        mask = np.not_equal(column, None)
+        result[mask] = column[mask]
+    return result
+
+
+class _ColumnarValidator:
+    """列式校验器基类：子类实现 validate(columns, n) -> (anomalies, records)。"""
+
+    track_trading_dates = True
+
+    def _column(self, columns: dict[str, np.ndarray], field: str, n: int, default: str) -> np.ndarray:
+        column = columns.get(field)
+        return column if column is not None else np.full(n, default, dtype=_STRING)
+
+    def _date_period(self, columns: dict[str, np.ndarray], n: int):
+        dates, date_anomalies = _check_unique(
+            self._column(columns, "trading_date", n, ""), _check_trading_date,
+        )
+        periods, period_anomalies = _check_integer(
+            self._column(columns, "period", n, ""), _check_period, 1, PERIODS_PER_DAY,
+        )
+        return dates, date_anomalies, periods, period_anomalies
+
+
+class TradingColumnarValidator(_ColumnarValidator):
+    def __init__(self, station_id, job_uuid, price_cap_lower, price_cap_upper):
+        self.station_id = station_id
+        self.job_uuid = job_uuid
+        self.check_price = partial(
+            _check_clearing_price,
+            price_cap_lower=price_cap_lower,
+            price_cap_upper=price_cap_upper,
+        )
+        # 与 _check_clearing_price 一致：上下限都配置时才校验范围
+        has_caps = price_cap_lower is not None and price_cap_upper is not None
+        self.price_bounds = (price_cap_lower, price_cap_upper) if has_caps else (None, None)
+
+    def validate(self, columns: dict[str, np.ndarray], n: int):
+        dates, date_anomalies, periods, period_anomalies = self._date_period(columns, n)
+        prices, price_anomalies = _check_decimal(
+            self._column(columns, "clearing_price", n, ""), self.check_price, *self.price_bounds,
+        )
+        anomalies = _first_anomaly(date_anomalies, period_anomalies, price_anomalies)
+        ok = np.equal(anomalies, None)
+        ids = _bulk_uuid4(int(ok.sum()))
+        records = [
+            {
+                "id": record_id,
+                "trading_date": d,
+                "period": p,
+                "station_id": self.station_id,
+                "clearing_price": v,
+                "import_job_id": self.job_uuid,
+            }
+            for record_id, d, p, v in zip(
+                ids, dates[ok].tolist(), periods[ok].tolist(), prices[ok].tolist(),
+            )
+        ]
+        return anomalies, records
+
+
+class OutputColumnarValidator(_ColumnarValidator):
+    def __init__(self, station_id, job_uuid):
+        self.station_id = station_id
+        self.job_uuid = job_uuid
+
+    def validate(self, columns: dict[str, np.ndarray], n: int):
+        dates, date_anomalies, periods, period_anomalies = self._date_period(columns, n)
+        outputs, output_anomalies = _check_decimal(
+            self._column(columns, "actual_output_kw", n, ""), _check_output_kw, lower=Decimal(0),
+        )
+        anomalies = _first_anomaly(date_anomalies, period_anomalies, output_anomalies)
+        ok = np.equal(anomalies, None)
+        ids = _bulk_uuid4(int(ok.sum()))
+        records = [
+            {
+                "id": record_id,
+                "trading_date": d,
+                "period": p,
+                "station_id": self.station_id,
+                "actual_output_kw": v,
+                "import_job_id": self.job_uuid,
+            }
+            for record_id, d, p, v in zip(
+                ids, dates[ok].tolist(), periods[ok].tolist(), outputs[ok].tolist(),
+            )
+        ]
+        return anomalies, records
+
+
+class StorageColumnarValidator(_ColumnarValidator):
+    """储能运行数据校验，同时跟踪最新时段的 SOC。"""
+
+    # 与逐行引擎保持一致：储能导入不记录 all_trading_dates
+    track_trading_dates = False
+
+    def __init__(self, device_id, job_uuid, adapter):
+        self.device_id = device_id
+        self.job_uuid = job_uuid
+        self.adapter = adapter
+        self.latest_soc = None
+        self.latest_date_period = None
+
+    def _check_power_column(self, columns: dict[str, np.ndarray], field: str, n: int):
+        check_fn = partial(_check_power, self.adapter, field)
+        values = self._column(columns, field, n, "0")
+        if type(self.adapter).transform_power is BaseEmsAdapter.transform_power:
+            # 默认换算即 Decimal(raw)，可走整列路径；自定义换算的适配器逐个唯一值调用
+            return _check_decimal(values, check_fn, lower=Decimal(0))
+        return _check_unique(values, check_fn)
+
+    def validate(self, columns: dict[str, np.ndarray], n: int):
+        dates, date_anomalies, periods, period_anomalies = self._date_period(columns, n)
+        socs, soc_anomalies = _check_unique(
+            self._column(columns, "soc", n, ""), partial(_check_soc, self.adapter),
+        )
+        charges, charge_anomalies = self._check_power_column(columns, "charge_power_kw", n)
+        discharges, discharge_anomalies = self._check_power_column(columns, "discharge_power_kw", n)
+        cycles, cycle_anomalies = _check_unique(
+            self._column(columns, "cycle_count", n, "0"),
+            partial(_check_cycle_count, self.adapter),
+        )
+        anomalies = _first_anomaly(
+            date_anomalies, period_anomalies, soc_anomalies,
+            charge_anomalies, discharge_anomalies, cycle_anomalies,
+        )
+        ok = np.equal(anomalies, None)
+        ok_dates, ok_periods, ok_socs = dates[ok].tolist(), periods[ok].tolist(), socs[ok].tolist()
+        ids = _bulk_uuid4(len(ok_dates))
+        records = [
+            {
+                "id": record_id,
+                "trading_date": d,
+                "period": p,
+                "device_id": self.device_id,
+                "soc": soc,
+                "charge_power_kw": charge,
+                "discharge_power_kw": discharge,
+                "cycle_count": cycle,
+                "import_job_id": self.job_uuid,
+            }
+            for record_id, d, p, soc, charge, discharge, cycle in zip(
+                ids, ok_dates, ok_periods, ok_socs,
+                charges[ok].tolist(), discharges[ok].tolist(), cycles[ok].tolist(),
+            )
+        ]
+
+        # 追踪最新的 SOC 值：argmax 取首个最大值，与逐行引擎的严格大于比较一致
+        if ok_dates:
+            keys = np.fromiter(
+                (d.toordinal() * 128 + p for d, p in zip(ok_dates, ok_periods)),
+                dtype=np.int64, count=len(ok_dates),
+            )
+            i = int(keys.argmax())
+            candidate = (ok_dates[i], ok_periods[i])
+            if self.latest_date_period is None or candidate > self.latest_date_period:
+                self.latest_date_period = candidate
+                self.latest_soc = ok_socs[i]
+
+        return anomalies, records
+
+
+def _emit_chunk(ctx: ImportContext, insert_fn, anomalies: np.ndarray, records: list[dict]) -> None:
+    """按行序把校验结果写入 ctx，并在逐行引擎会 flush 的位置 flush。"""
+    n = len(anomalies)
+    bad = np.not_equal(anomalies, None)
+    bad_rows = np.flatnonzero(bad)
+    cum_bad = np.cumsum(bad)
+    cum_ok = np.arange(1, n + 1) - cum_bad
+    base_row = ctx.row_number
+
+    start = 0
+    while start < n:
+        done_bad = int(cum_bad[start - 1]) if start else 0
+        done_ok = start - done_bad
+
+        # 本段内首个使记录数或异常数达到批次大小的行（批次大小在每次 flush 后可能调整）
+        batch_size = ctx.batch_size
+        hit_ok = int(np.searchsorted(cum_ok, done_ok + batch_size - len(ctx.batch_records)))
+        hit_bad = int(np.searchsorted(cum_bad, done_bad + batch_size - len(ctx.batch_anomalies)))
+        hit = max(min(hit_ok, hit_bad), start)
+        stop = min(hit, n - 1) + 1
+
+        new_bad = int(cum_bad[stop - 1]) - done_bad
+        for i in bad_rows[done_bad:done_bad + new_bad].tolist():
+            ctx.row_number = base_row + i + 1
+            ctx.add_anomaly(*anomalies[i])
+
+        new_ok = (stop - start) - new_bad
+        ctx.batch_records.extend(records[done_ok:done_ok + new_ok])
+        ctx.processed_records += new_ok
+        ctx.total_records += stop - start
+        ctx.row_number = base_row + stop
+
+        if hit < n:
+            ctx.flush_batch(insert_fn)
+        start = stop
+
+
+def run_columnar_import(
+    ctx: ImportContext,
+    rows,
+    col_map: dict[int, str],
+    validator: _ColumnarValidator,
+    insert_fn,
+    chunk_size: int | None = None,
+) -> None:
+    """列式引擎主循环：分块读取 → 整列校验 → 按行序写入批次。
+
+    调用方负责最终的 flush_batch 与时段完整性检测（与逐行引擎相同）。
+    """
+    chunk_size = chunk_size or settings.IMPORT_COLUMNAR_CHUNK_SIZE
+    # 多列映射到同一字段时后出现的列生效，与 _parse_row_data 一致
+    field_columns = {field: idx for idx, field in col_map.items()}
+    rows = ctx.metrics.timed_rows(rows)
+
+    while True:
+        if ctx.reader is not None:
+            # 预读整块时逐行记下字节偏移，flush 时按行号取断点
+            chunk, offsets = [], []
+            for row in islice(rows, chunk_size):
+                chunk.append(row)
+                offsets.append(ctx.reader.offset)
+            ctx.row_offsets = (ctx.row_number, offsets)
+        else:
+            chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        # 断点续传：已处理的行只计数不解析
+        skip = min(len(chunk), max(0, ctx.resume_from_row - ctx.row_number))
+        if skip:
+            ctx.row_number += skip
+            ctx.total_records += skip
+            chunk = chunk[skip:]
+            if not chunk:
+                continue
+
+        with ctx.metrics.phase("parse"):
+            columns = {
+                field: _to_array([
+                    str(row[idx]).strip() if idx < len(row) else "" for row in chunk
+                ])
+                for field, idx in field_columns.items()
+            }
+        anomalies, records = validator.validate(columns, len(chunk))
+        if validator.track_trading_dates:
+            ctx.all_trading_dates.update(r["trading_date"] for r in records)
+        _emit_chunk(ctx, insert_fn, anomalies, records)
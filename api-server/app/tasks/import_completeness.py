@@ -0,0 +1,74 @@
+"""导入过程中的时段覆盖位图。
+
+每个交易日 96 个时段对应 12 字节（uint8[n_dates, 12]）的位图，flush 时按写入的记录置位。
+有效记录写入后（新插入或因冲突跳过）该时段在库中必然存在，因此位图已满的交易日无需再查询；
+_check_period_completeness 只对位图未满的交易日查询数据库（可能由历史导入补齐）。
+"""
+
+from collections.abc import Sequence
+from datetime import date
+
+import numpy as np
+
+from app.core.constants import PERIODS_PER_DAY
+
+_BYTES_PER_DAY = PERIODS_PER_DAY // 8
+
+
+class PeriodCoverage:
+    """按交易日记录已写入时段的位图。"""
+
+    def __init__(self):
+        self._index: dict[date, int] = {}
+        self._bits = np.zeros((64, _BYTES_PER_DAY), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _rows(self, dates: Sequence[date]) -> np.ndarray:
+        index = self._index
+        rows = np.fromiter(
+            (index.setdefault(d, len(index)) for d in dates), dtype=np.intp, count=len(dates),
+        )
+        if len(index) > len(self._bits):
+            grown = np.zeros((max(len(index), 2 * len(self._bits)), _BYTES_PER_DAY), dtype=np.uint8)
+            grown[:len(self._bits)] = self._bits
+            self._bits = grown
+        return rows
+
+    def add(self, dates: Sequence[date], periods: Sequence[int]) -> None:
+        """置位 (dates[i], periods[i])，periods 取值 1..96。"""
+        if not len(dates):
+            return
+        rows = self._rows(dates)
+        p = np.asarray(periods, dtype=np.intp) - 1
+        np.bitwise_or.at(
+            self._bits, (rows, p >> 3), np.left_shift(1, p & 7).astype(np.uint8),
+        )
+
+    def add_records(self, records: list[dict]) -> None:
+        self.add([r["trading_date"] for r in records], [r["period"] for r in records])
+
+    def complete_dates(self) -> set[date]:
+        full = np.all(self._bits[:len(self._index)] == 0xFF, axis=1)
+        return {d for d, row in self._index.items() if full[row]}
+
+    def merge(self, other: "PeriodCoverage") -> None:
+        if not other._index:
+            return
+        rows = self._rows(list(other._index))
+        self._bits[rows] |= other._bits[list(other._index.values())]
+
+    def to_json(self) -> dict[str, str]:
+        """{ISO 日期: 位图十六进制}，用于分片进度持久化。"""
+        return {d.isoformat(): self._bits[row].tobytes().hex() for d, row in self._index.items()}
+
+    @classmethod
+    def from_json(cls, data: dict[str, str] | None) -> "PeriodCoverage":
+        coverage = cls()
+        if data:
+            rows = coverage._rows([date.fromisoformat(d) for d in data])
+            coverage._bits[rows] = np.frombuffer(
+                bytes.fromhex("".join(data.values())), dtype=np.uint8,
+            ).reshape(-1, _BYTES_PER_DAY)
+        return coverage
@@ -0,0 +1,102 @@
+"""基于 COPY 的批量写入（IMPORT_BULK_LOADER=copy）。
+
+每个批次先以 COPY ... FROM STDIN (CSV) 流式写入会话级临时暂存表，
+再用一条 INSERT ... SELECT ... ON CONFLICT DO NOTHING 写入目标超表，
+避免每批编译并发送上千元组的 INSERT 语句。
+
+暂存表使用 TEMP 表：不写 WAL（与 UNLOGGED 相同），且按数据库连接隔离，
+多个 worker 并发导入时互不干扰。CREATE TEMP TABLE 随事务回滚，
+因此每批都执行 IF NOT EXISTS 建表（已存在时只是一次目录查询），用后 TRUNCATE。
+
+无冲突约束的表（如 import_anomalies）用 copy_records 直接 COPY 进目标表。
+"""
+
+import csv
+import io
+import json
+
+from sqlalchemy.dialects.postgresql import JSONB
+
+def _stage_table_name(table) -> str:
+    return f"_import_stage_{table.name}"
+
+
+def _ensure_stage_table(cursor, table) -> str:
+    """在当前事务中确保暂存表存在。
+
+    不在连接上缓存“已建表”标记：建表所在事务回滚后表随之消失，
+    而池化连接上的标记会残留，导致后续导入 COPY 到不存在的表。
+    """
+    stage = _stage_table_name(table)
+    cursor.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {stage} "
+        f"(LIKE {table.fullname} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    return stage
+
+
+def _to_csv_buffer(records: list[dict], columns: list[str], json_columns=()) -> io.StringIO:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = ([record[c] for c in columns] for record in records)
+    if json_columns:
+        # JSONB 列序列化为 JSON 文本；None 保持为空字段（COPY CSV 视为 NULL）
+        json_idx = [columns.index(c) for c in json_columns]
+
+        def _encode(row: list) -> list:
+            for i in json_idx:
+                if row[i] is not None:
+                    row[i] = json.dumps(row[i], ensure_ascii=False)
+            return row
+
+        rows = map(_encode, rows)
+    writer.writerows(rows)
+    buffer.seek(0)
+    return buffer
+
+
+def copy_insert_records(
+    session, model, records: list[dict], conflict_columns: list[str],
+) -> tuple[int, int]:
+    """COPY 写入暂存表后合并到目标表，返回 (inserted, skipped)。"""
+    if not records:
+        return 0, 0
+
+    table = model.__table__
+    columns = list(records[0].keys())
+    column_list = ", ".join(columns)
+
+    raw_conn = session.connection().connection
+    with raw_conn.cursor() as cursor:
+        stage = _ensure_stage_table(cursor, table)
+        cursor.copy_expert(
+            f"COPY {stage} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+            _to_csv_buffer(records, columns),
+        )
+        cursor.execute(
+            f"INSERT INTO {table.fullname} ({column_list}) "
+            f"SELECT {column_list} FROM {stage} "
+            f"ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+        )
+        inserted = cursor.rowcount
+        cursor.execute(f"TRUNCATE {stage}")
+
+    return inserted, len(records) - inserted
+
+
+def copy_records(session, model, records: list[dict]) -> int:
+    """直接 COPY 写入目标表（不处理冲突），返回写入行数。"""
+    if not records:
+        return 0
+
+    table = model.__table__
+    columns = list(records[0].keys())
+    json_columns = [c for c in columns if isinstance(table.c[c].type, JSONB)]
+
+    raw_conn = session.connection().connection
+    with raw_conn.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table.fullname} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            _to_csv_buffer(records, columns, json_columns),
+        )
+    return len(records)
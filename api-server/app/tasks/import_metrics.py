@@ -0,0 +1,288 @@
+"""导入吞吐量与分阶段耗时统计。
+
+ImportMetrics 随 ImportContext 记录单个任务（或分片）的各阶段累计耗时：
+- read：从文件迭代器取行
+- parse：原始行 → 字段字符串（列式引擎为构建列数组）
+- validate：主循环中扣除 read/parse/insert/anomaly_write 后的其余耗时（字段校验、组装记录）
+- insert：批量写入业务记录并提交进度
+- anomaly_write：批量写入异常记录
+- completeness：时段完整性检测
+- finalize：汇总统计与审计
+以及每次 flush 的批次耗时直方图。每次 flush 随进度写入 job/分片的 metrics 列，断点恢复时续接。
+
+进程内注册表按 import_type 累加本进程执行过的任务统计，Celery worker 通过
+IMPORT_METRICS_PORT 暴露为 Prometheus 文本格式；任务完成时统计同时累加到 import_metric_counters 表，
+API 的 /metrics 读取该表（行数只与导入类型数有关，不随历史任务增长）。
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import structlog
+
+logger = structlog.get_logger()
+
+PHASES = ("read", "parse", "validate", "insert", "anomaly_write", "completeness", "finalize")
+# 主循环内单独计时的阶段，validate 为循环耗时扣除这些阶段后的剩余
+_LOOP_PHASES = ("parse", "insert", "anomaly_write")
+
+# 批次耗时直方图上界（秒），最后一个桶为 +Inf
+BATCH_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class ImportMetrics:
+    """单个导入任务（或分片）的分阶段耗时、行数与批次耗时直方图。"""
+
+    def __init__(self):
+        self.phase_seconds: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.rows = 0
+        self.batches = 0
+        self.elapsed_seconds = 0.0
+        self.batch_counts = [0] * (len(BATCH_LATENCY_BUCKETS) + 1)
+        self.batch_seconds = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[name] += time.perf_counter() - started
+
+    def timed_rows(self, rows):
+        """包装行迭代器：取行耗时计入 read，消费方处理耗时扣除其余阶段后计入 validate。"""
+        rows = iter(rows)
+        phases = self.phase_seconds
+        perf_counter = time.perf_counter
+        loop_start = sum(phases[p] for p in _LOOP_PHASES)
+        consumer = 0.0
+        try:
+            while True:
+                started = perf_counter()
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    phases["read"] += perf_counter() - started
+                    return
+                yielded = perf_counter()
+                phases["read"] += yielded - started
+                yield row
+                consumer += perf_counter() - yielded
+        finally:
+            loop_phases = sum(phases[p] for p in _LOOP_PHASES) - loop_start
+            phases["validate"] += max(0.0, consumer - loop_phases)
+
+    def observe_batch(self, seconds: float, rows: int) -> None:
+        self.batches += 1
+        self.rows += rows
+        self.batch_seconds += seconds
+        self.batch_counts[bisect.bisect_left(BATCH_LATENCY_BUCKETS, seconds)] += 1
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+    def merge(self, other: "ImportMetrics") -> None:
+        for name, seconds in other.phase_seconds.items():
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + seconds
+        self.rows += other.rows
+        self.batches += other.batches
+        self.elapsed_seconds += other.elapsed_seconds
+        self.batch_seconds += other.batch_seconds
+        self.batch_counts = [a + b for a, b in zip(self.batch_counts, other.batch_counts)]
+
+    def to_json(self) -> dict:
+        return {
+            "phase_seconds": {name: round(s, 6) for name, s in self.phase_seconds.items()},
+            "rows": self.rows,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 6),
+            "rows_per_second": round(self.rows_per_second, 2),
+            "batch_latency": {
+                "buckets": list(BATCH_LATENCY_BUCKETS),
+                "counts": list(self.batch_counts),
+                "sum": round(self.batch_seconds, 6),
+                "count": self.batches,
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: dict | None) -> "ImportMetrics":
+        metrics = cls()
+        if not data:
+            return metrics
+        for name, seconds in (data.get("phase_seconds") or {}).items():
+            metrics.phase_seconds[name] = float(seconds)
+        metrics.rows = int(data.get("rows", 0))
+        metrics.batches = int(data.get("batches", 0))
+        metrics.elapsed_seconds = float(data.get("elapsed_seconds", 0.0))
+        latency = data.get("batch_latency") or {}
+        # 桶边界变更后旧数据无法对齐，只保留 sum/count
+        if latency.get("buckets") == list(BATCH_LATENCY_BUCKETS):
+            metrics.batch_counts = [int(c) for c in latency["counts"]]
+        metrics.batch_seconds = float(latency.get("sum", 0.0))
+        return metrics
+
+
+class _AggregateMetrics(ImportMetrics):
+    def __init__(self):
+        super().__init__()
+        self.jobs = 0
+
+
+def _bucket_labels() -> list[str]:
+    return [str(upper) for upper in (*BATCH_LATENCY_BUCKETS, "+Inf")]
+
+
+def to_counters(metrics: ImportMetrics, jobs: int = 0) -> dict[str, float]:
+    """展开为 import_metric_counters 的 {name: 增量}。
+
+    直方图按桶上界命名，桶边界变更后旧计数器不再匹配（与 from_json 一致只保留 sum/count）。
+    """
+    counters: dict[str, float] = {
+        "jobs": jobs,
+        "rows": metrics.rows,
+        "batches": metrics.batches,
+        "elapsed_seconds": metrics.elapsed_seconds,
+        "batch_seconds": metrics.batch_seconds,
+    }
+    for name, seconds in metrics.phase_seconds.items():
+        counters[f"phase_seconds:{name}"] = seconds
+    for label, count in zip(_bucket_labels(), metrics.batch_counts):
+        counters[f"batch_count:{label}"] = count
+    return counters
+
+
+def aggregate_counters(rows) -> dict[str, _AggregateMetrics]:
+    """按 import_type 还原 (import_type, name, value) 计数器行。"""
+    bucket_index = {label: i for i, label in enumerate(_bucket_labels())}
+    aggregated: dict[str, _AggregateMetrics] = {}
+    for import_type, name, value in rows:
+        agg = aggregated.setdefault(import_type, _AggregateMetrics())
+        kind, _, key = name.partition(":")
+        if kind == "phase_seconds":
+            agg.phase_seconds[key] = float(value)
+        elif kind == "batch_count":
+            if key in bucket_index:
+                agg.batch_counts[bucket_index[key]] = int(value)
+        elif kind in ("jobs", "rows", "batches"):
+            setattr(agg, kind, int(value))
+        elif kind in ("elapsed_seconds", "batch_seconds"):
+            setattr(agg, kind, float(value))
+    return aggregated
+
+
+# =====================================================
+# 进程内注册表（Celery worker）
+# =====================================================
+
+_registry: dict[str, _AggregateMetrics] = {}
+_registry_lock = threading.Lock()
+
+
+def record_metrics(import_type: str, metrics: ImportMetrics, job_completed: bool) -> None:
+    """累加本进程执行的任务/分片统计；job_completed 时任务数 +1。"""
+    with _registry_lock:
+        agg = _registry.setdefault(import_type, _AggregateMetrics())
+        agg.merge(metrics)
+        if job_completed:
+            agg.jobs += 1
+
+
+def registry_snapshot() -> dict[str, _AggregateMetrics]:
+    with _registry_lock:
+        snapshot = {}
+        for import_type, agg in _registry.items():
+            copy = _AggregateMetrics()
+            copy.merge(agg)
+            copy.jobs = agg.jobs
+            snapshot[import_type] = copy
+        return snapshot
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value))
+
+
+def render_prometheus(aggregated: dict[str, _AggregateMetrics]) -> str:
+    """渲染为 Prometheus 文本格式。"""
+    lines: list[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    items = sorted(aggregated.items())
+
+    family("import_jobs_total", "counter", "Completed import jobs.")
+    for import_type, agg in items:
+        lines.append(f'import_jobs_total{{import_type="{import_type}"}} {agg.jobs}')
+
+    family("import_rows_total", "counter", "Rows processed by import jobs.")
+    for import_type, agg in items:
+        lines.append(f'import_rows_total{{import_type="{import_type}"}} {agg.rows}')
+
+    family("import_elapsed_seconds_total", "counter", "Wall time spent in import workers.")
+    for import_type, agg in items:
+        lines.append(
+            f'import_elapsed_seconds_total{{import_type="{import_type}"}} {_fmt(agg.elapsed_seconds)}'
+        )
+
+    family("import_phase_seconds_total", "counter", "Time spent per import phase.")
+    for import_type, agg in items:
+        for name in PHASES:
+            lines.append(
+                f'import_phase_seconds_total{{import_type="{import_type}",phase="{name}"}} '
+                f"{_fmt(agg.phase_seconds.get(name, 0.0))}"
+            )
+
+    family("import_batch_latency_seconds", "histogram", "Import batch flush latency.")
+    for import_type, agg in items:
+        cumulative = 0
+        for upper, count in zip((*BATCH_LATENCY_BUCKETS, "+Inf"), agg.batch_counts):
+            cumulative += count
+            lines.append(
+                f'import_batch_latency_seconds_bucket{{import_type="{import_type}",le="{upper}"}} '
+                f"{cumulative}"
+            )
+        lines.append(
+            f'import_batch_latency_seconds_sum{{import_type="{import_type}"}} {_fmt(agg.batch_seconds)}'
+        )
+        lines.append(f'import_batch_latency_seconds_count{{import_type="{import_type}"}} {agg.batches}')
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus(registry_snapshot()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int) -> ThreadingHTTPServer | None:
+    """在后台线程启动 /metrics HTTP 服务；端口被占用时记录警告并返回 None。"""
+    try:
+        server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    except OSError as e:
+        logger.warning("import_metrics_server_failed", port=port, error=str(e))
+        return None
+    threading.Thread(
+        target=server.serve_forever, name="import-metrics-server", daemon=True,
+    ).start()
+    logger.info("import_metrics_server_started", port=port)
+    return server
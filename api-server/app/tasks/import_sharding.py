@@ -0,0 +1,273 @@
+"""大文件分片并行导入。
+
+协调任务扫描一次 CSV，按字节均分为 IMPORT_SHARD_COUNT 个分片（切分点落在记录边界），
+再以 Celery chord 派发分片任务。每个分片复用对应的 _execute_* 导入逻辑处理自己的字节范围，
+异常记录直接写入（行号为全局行号），进度保存在 DataImportShard。
+全部分片完成后由汇总回调合并计数、执行一次时段完整性检测并 finalize。
+
+分片失败时 chord 回调不会执行，job 标记为 failed；恢复时协调任务只重新派发 pending/failed 的分片，
+分片内部按自身的 resume_offset（last_processed_row 之后的字节偏移）直接 seek 续传。
+仍有分片在 processing（首轮 chord 中失败分片的兄弟分片仍在运行）时不允许恢复；
+分片任务开始前以条件 UPDATE 原子认领分片，同一字节范围不会被两个 worker 同时处理。
+"""
+
+import uuid
+from datetime import date
+from pathlib import Path
+
+import structlog
+from celery import chord
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.data_import import (
+    DataImportJob,
+    DataImportShard,
+    StationOutputRecord,
+    TradingRecord,
+)
+from app.tasks.celery_app import celery_app
+from app.tasks.import_completeness import PeriodCoverage
+from app.tasks.import_metrics import ImportMetrics
+from app.tasks.import_tasks import (
+    ImportContext,
+    _check_period_completeness,
+    _CsvRowReader,
+    _detect_csv_encoding,
+    _execute_import,
+    _execute_station_output_import,
+    _get_file_path,
+    _init_import,
+    _read_csv_header,
+    _run_import_task,
+)
+
+logger = structlog.get_logger()
+
+# import_type -> (导入函数, 记录模型, 完整性检测标签, 审计动作)
+_SHARD_IMPORTS = {
+    "trading_data": (_execute_import, TradingRecord, "", "complete_import_job"),
+    "station_output": (
+        _execute_station_output_import, StationOutputRecord, "出力数据",
+        "complete_station_output_import",
+    ),
+}
+
+
+def should_shard_import(import_type: str, file_name: str, file_size: int) -> bool:
+    """是否对该导入启用分片（仅 CSV；储能数据需按时序追踪 SOC，保持串行）。"""
+    return (
+        import_type in _SHARD_IMPORTS
+        and settings.IMPORT_SHARD_COUNT > 1
+        and Path(file_name).suffix.lower() == ".csv"
+        and file_size >= settings.IMPORT_SHARD_MIN_BYTES
+    )
+
+
+def _scan_shard_boundaries(file_path: Path, shard_count: int) -> list[tuple[int, int, int]]:
+    """扫描一次文件，返回各分片的 (start_offset, end_offset, first_row)。"""
+    encoding = _detect_csv_encoding(file_path)
+    header, data_start = _read_csv_header(file_path, encoding)
+    if header is None:
+        raise ValueError("文件为空，无法读取列头")
+
+    step = max(1, (file_path.stat().st_size - data_start) // shard_count)
+    reader = _CsvRowReader(file_path, data_start, encoding=encoding)
+    boundaries: list[tuple[int, int, int]] = []
+    start, first_row, row_count = data_start, 1, 0
+
+    for _ in reader:
+        row_count += 1
+        cut = data_start + step * (len(boundaries) + 1)
+        if reader.offset >= cut and len(boundaries) < shard_count - 1:
+            boundaries.append((start, reader.offset, first_row))
+            start, first_row = reader.offset, row_count + 1
+
+    if row_count >= first_row or not boundaries:
+        boundaries.append((start, reader.offset, first_row))
+    return boundaries
+
+
+def _load_shards(session, job_uuid: uuid.UUID) -> list[DataImportShard]:
+    stmt = (
+        select(DataImportShard)
+        .where(DataImportShard.import_job_id == job_uuid)
+        .order_by(DataImportShard.shard_index)
+    )
+    return list(session.execute(stmt).scalars().all())
+
+
+# 可被（重新）派发与认领的分片状态
+_DISPATCHABLE_STATUSES = ("pending", "failed")
+
+
+# =====================================================
+# 协调任务
+# =====================================================
+
+@celery_app.task(bind=True, max_retries=0)
+def coordinate_sharded_import(self, job_id: str):
+    """切分文件并派发分片任务（恢复时只派发未完成的分片）。"""
+    _run_import_task(
+        lambda session, **kw: _coordinate_shards(session, self, job_id),
+        job_id,
+    )
+
+
+def _coordinate_shards(session, task, job_id: str) -> None:
+    job = _init_import(session, task, job_id)
+
+    shards = _load_shards(session, job.id)
+    if not shards:
+        file_path = _get_file_path(job)
+        for index, (start, end, first_row) in enumerate(
+            _scan_shard_boundaries(file_path, settings.IMPORT_SHARD_COUNT),
+        ):
+            shard = DataImportShard(
+                import_job_id=job.id,
+                shard_index=index,
+                start_offset=start,
+                end_offset=end,
+                first_row=first_row,
+                last_processed_row=first_row - 1,
+                status="pending",
+                trading_dates=[],
+                period_coverage={},
+                metrics={},
+            )
+            session.add(shard)
+            shards.append(shard)
+        session.commit()
+
+    running = [s.shard_index for s in shards if s.status == "processing"]
+    if running:
+        raise ValueError(f"分片 {running} 仍在处理中，请等待其结束后再恢复")
+
+    pending = [s.shard_index for s in shards if s.status in _DISPATCHABLE_STATUSES]
+    callback = finalize_sharded_import.s(job_id=job_id)
+    if pending:
+        chord(process_import_shard.s(job_id, index) for index in pending)(callback)
+    else:
+        callback.delay([])
+
+    logger.info(
+        "import_shards_dispatched",
+        job_id=job_id,
+        shards=len(shards),
+        pending=len(pending),
+    )
+
+
+# =====================================================
+# 分片任务
+# =====================================================
+
+@celery_app.task(bind=True, max_retries=0)
+def process_import_shard(self, job_id: str, shard_index: int):
+    """处理单个分片的字节范围。"""
+    _run_import_task(
+        lambda session, **kw: _execute_shard(session, self, job_id, shard_index),
+        job_id,
+    )
+    return shard_index
+
+
+def _execute_shard(session, task, job_id: str, shard_index: int) -> None:
+    job_uuid = uuid.UUID(job_id)
+    job = session.get(DataImportJob, job_uuid)
+    if not job:
+        raise ValueError(f"Import job {job_id} not found")
+    if job.status == "cancelled":
+        logger.info("import_shard_skipped_cancelled", job_id=job_id, shard_index=shard_index)
+        return
+
+    # 原子认领：已完成或已被其他 worker 认领的分片直接跳过
+    claimed = session.execute(
+        update(DataImportShard)
+        .where(
+            DataImportShard.import_job_id == job_uuid,
+            DataImportShard.shard_index == shard_index,
+            DataImportShard.status.in_(_DISPATCHABLE_STATUSES),
+        )
+        .values(status="processing", celery_task_id=task.request.id)
+        .returning(DataImportShard.id)
+    ).scalar_one_or_none()
+    session.commit()
+    if claimed is None:
+        logger.info("import_shard_skipped_not_claimable", job_id=job_id, shard_index=shard_index)
+        return
+
+    shard = session.execute(
+        select(DataImportShard).where(DataImportShard.id == claimed)
+    ).scalar_one()
+    execute_fn = _SHARD_IMPORTS[job.import_type][0]
+
+    try:
+        execute_fn(session, task, job_id, shard.last_processed_row, shard=shard)
+    except Exception as e:
+        session.rollback()
+        shard.status = "failed"
+        shard.error_message = str(e)[:2000]
+        session.commit()
+        raise
+
+
+# =====================================================
+# 汇总回调
+# =====================================================
+
+@celery_app.task(bind=True, max_retries=0)
+def finalize_sharded_import(self, shard_results, job_id: str):
+    """合并分片计数，执行时段完整性检测并完成 job。"""
+    _run_import_task(
+        lambda session, **kw: _finalize_shards(session, job_id),
+        job_id,
+    )
+
+
+def _finalize_shards(session, job_id: str) -> None:
+    # 锁定 job 行：并发的汇总回调中只有第一个看到 processing 并完成 job
+    job = session.get(DataImportJob, uuid.UUID(job_id), with_for_update=True)
+    if not job:
+        raise ValueError(f"Import job {job_id} not found")
+    if job.status != "processing":
+        logger.warning("import_shards_finalize_skipped", job_id=job_id, status=job.status)
+        return
+
+    shards = _load_shards(session, job.id)
+    unfinished = [s.shard_index for s in shards if s.status != "completed"]
+    if unfinished:
+        logger.warning("import_shards_finalize_skipped", job_id=job_id, unfinished=unfinished)
+        return
+    _, record_model, entity_label, audit_action = _SHARD_IMPORTS[job.import_type]
+
+    ctx = ImportContext(session, job, 0)
+    ctx.total_records = sum(s.total_records for s in shards)
+    ctx.processed_records = sum(s.processed_records for s in shards)
+    ctx.success_records = sum(s.success_records for s in shards)
+    ctx.failed_records = sum(s.failed_records for s in shards)
+    ctx.row_number = max((s.last_processed_row for s in shards), default=0)
+    shard_metrics = ImportMetrics()
+    for shard in shards:
+        ctx.all_trading_dates.update(date.fromisoformat(d) for d in shard.trading_dates)
+        # 跨分片边界的交易日在合并位图后才完整
+        ctx.period_coverage.merge(PeriodCoverage.from_json(shard.period_coverage))
+        shard_metrics.merge(ImportMetrics.from_json(shard.metrics))
+
+    if ctx.all_trading_dates:
+        with ctx.metrics.phase("completeness"):
+            _check_period_completeness(
+                session, ctx.job_uuid, job.station_id, ctx.all_trading_dates,
+                record_model, "station_id", entity_label, coverage=ctx.period_coverage,
+            )
+
+    ctx.finalize(audit_action, extra_audit={"shards": len(shards)}, shard_metrics=shard_metrics)
+
+    logger.info(
+        "sharded_import_completed",
+        job_id=job_id,
+        shards=len(shards),
+        total=job.total_records,
+        success=job.success_records,
+        failed=job.failed_records,
+    )
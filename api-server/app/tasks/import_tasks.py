@@ -1,4 +1,7 @@
+import codecs
 import csv
+import itertools
+import time
 import uuid
 from datetime import date, datetime, timezone
 from decimal import Decimal, InvalidOperation
@@ -7,24 +10,30 @@ from pathlib import Path
 import structlog
 
 from app.core.config import settings
+from app.core.constants import PERIODS_PER_DAY
 from app.core.database import get_sync_session_factory
 from app.models.audit import AuditLog
 from app.models.data_import import (
+    ANOMALY_TEMPLATE_IDS,
     DataImportJob,
+    DataImportShard,
     ImportAnomaly,
     StationOutputRecord,
     StorageOperationRecord,
     TradingRecord,
 )
-from app.models.market_rule import ProvinceMarketRule
 from app.models.station import PowerStation
 from app.models.storage import StorageDevice
+from app.repositories.data_import import build_metric_counters_upsert_stmt
 from app.tasks.celery_app import celery_app
+from app.tasks.import_batching import AdaptiveBatchSizer
+from app.tasks.import_completeness import PeriodCoverage
+from app.tasks.import_metrics import ImportMetrics, record_metrics, to_counters
 
 logger = structlog.get_logger()
 
+# 初始批次大小；之后由 AdaptiveBatchSizer 按写入耗时与内存预算调整
 BATCH_SIZE = 1000
-PERIODS_PER_DAY = 96
 
 # 列头映射：支持中英文
 COLUMN_MAPPING = {
@@ -106,38 +115,135 @@ def _detect_csv_encoding(file_path: Path) -> str:
     return "utf-8"
 
 
-def _read_csv_rows(file_path: Path):
-    """生成器：逐行读取 CSV 文件。"""
-    encoding = _detect_csv_encoding(file_path)
-    with open(file_path, encoding=encoding, newline="") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            yield row
-
-
-def _read_xlsx_rows(file_path: Path):
-    """生成器：逐行读取 Excel 文件（read_only 模式）。"""
+class _CsvRowReader:
+    """逐行读取 CSV 的指定字节范围，offset 始终指向下一条记录的起始字节。
+
+    以二进制方式按物理行读取再解码后交给 csv.reader，引号内换行的记录会
+    连续消费多行，因此记录边界处的 offset 可直接用于 seek。
+    """
+
+    def __init__(
+        self, file_path: Path, start_offset: int = 0,
+        end_offset: int | None = None, encoding: str | None = None,
+    ):
+        self.file_path = file_path
+        self.encoding = encoding or _detect_csv_encoding(file_path)
+        self.offset = start_offset
+        self.end_offset = end_offset
+        self._source = None
+
+    def _lines(self):
+        end_offset = self.end_offset if self.end_offset is not None else float("inf")
+        # utf-8-sig 解码器为纯 Python 实现，逐行解码时改用 utf-8 并手动去掉文件头 BOM
+        encoding = "utf-8" if self.encoding == "utf-8-sig" else self.encoding
+        offset = self.offset
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            if offset == 0 and self.encoding == "utf-8-sig" and f.read(3) != codecs.BOM_UTF8:
+                f.seek(0)
+            offset = f.tell()
+            for raw in f:
+                if offset >= end_offset:
+                    return
+                offset += len(raw)
+                self.offset = offset
+                yield raw.decode(encoding)
+
+    def __iter__(self):
+        self._source = self._lines()
+        return csv.reader(self._source)
+
+    def close(self) -> None:
+        """提前结束读取时关闭底层文件。"""
+        if self._source is not None:
+            self._source.close()
+
+
+def _read_csv_header(file_path: Path, encoding: str) -> tuple[list[str] | None, int]:
+    """读取 CSV 列头，返回 (header, 数据区起始字节偏移)。"""
+    reader = _CsvRowReader(file_path, encoding=encoding)
+    header = next(iter(reader), None)
+    reader.close()
+    return header, reader.offset
+
+
+def _read_xlsx_rows(file_path: Path, skip_rows: int = 0):
+    """生成器：逐行读取 Excel 文件（read_only 模式）。
+
+    skip_rows > 0 时先返回列头，再从第 skip_rows + 1 个数据行开始返回；
+    被跳过的行只经过 XML 解析，不做单元格转换。
+    """
     import openpyxl
 
     wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
     try:
         ws = wb.active
-        for row in ws.iter_rows(values_only=True):
+        if skip_rows > 0:
+            for row in ws.iter_rows(min_row=1, max_row=1, values_only=True):
+                yield [str(cell) if cell is not None else "" for cell in row]
+            rows = ws.iter_rows(min_row=skip_rows + 2, values_only=True)
+        else:
+            rows = ws.iter_rows(values_only=True)
+        for row in rows:
             yield [str(cell) if cell is not None else "" for cell in row]
     finally:
         wb.close()
 
 
-def _open_file_rows(file_path: Path):
-    """根据文件扩展名选择读取方式。"""
+def _open_import_rows(
+    file_path: Path, job: DataImportJob, resume_from_row: int, shard=None,
+):
+    """打开导入文件，返回 (rows, reader, start_row)。
+
+    rows 的首行为列头，之后从第 start_row + 1 个数据行开始。
+    CSV：reader 为 _CsvRowReader，flush 时记录其字节偏移；断点与 resume_from_row
+    吻合时直接 seek 到断点。分片只读取自身字节范围。
+    xlsx：没有字节偏移（reader 为 None），以 last_processed_row 作为行块断点跳过已处理行；
+    优先读取列式缓存（首次导入时生成）。
+    """
     suffix = file_path.suffix.lower()
-    if suffix == ".csv":
-        return _read_csv_rows(file_path)
-    elif suffix == ".xlsx":
-        return _read_xlsx_rows(file_path)
-    else:
+    if suffix == ".xlsx" and shard is None:
+        from app.tasks.import_xlsx_cache import open_xlsx_rows
+
+        start_row = resume_from_row if resume_from_row > 0 else 0
+        rows = open_xlsx_rows(file_path, job.content_hash, start_row)
+        if rows is None:
+            rows = _read_xlsx_rows(file_path, start_row)
+        return rows, None, start_row
+    if suffix != ".csv":
         raise ValueError(f"不支持的文件类型: {suffix}")
 
+    encoding = _detect_csv_encoding(file_path)
+    header, data_start = _read_csv_header(file_path, encoding)
+    if header is None:
+        return iter(()), None, 0
+
+    end_offset = None
+    offset, start_row = data_start, 0
+    if shard is not None:
+        end_offset = shard.end_offset
+        if shard.resume_offset is not None:
+            offset, start_row = shard.resume_offset, shard.last_processed_row
+        else:
+            offset, start_row = shard.start_offset, shard.first_row - 1
+    elif (
+        resume_from_row > 0
+        and job.resume_offset is not None
+        and job.last_processed_row == resume_from_row
+    ):
+        offset, start_row = job.resume_offset, resume_from_row
+
+    if start_row > 0:
+        logger.info(
+            "import_resume_seek",
+            job_id=str(job.id),
+            offset=offset,
+            start_row=start_row,
+        )
+
+    reader = _CsvRowReader(file_path, offset, end_offset, encoding)
+    return itertools.chain([header], reader), reader, start_row
+
 
 def _map_columns(
     header_row: list[str],
@@ -181,9 +287,35 @@ class ImportContext:
         self.batch_records: list[dict] = []
         self.batch_anomalies: list[dict] = []
         self.all_trading_dates: set[date] = set()
+        # 本次导入已写入的时段位图，完整性检测只查询位图未满的交易日
+        self.period_coverage = PeriodCoverage()
+        # CSV 读取器及列式引擎预读块的逐行偏移，用于在 flush 时记录断点字节偏移
+        self.reader: _CsvRowReader | None = None
+        self.row_offsets: tuple[int, list[int]] | None = None
+        # 分阶段耗时与批次耗时直方图，断点恢复时续接已保存的统计
+        self.metrics = ImportMetrics.from_json(job.metrics) if resume_from_row > 0 else ImportMetrics()
+        self._restore_elapsed()
+        self.batch_sizer = AdaptiveBatchSizer(BATCH_SIZE)
+        # 未提交的已写入批次数，达到 IMPORT_COMMIT_EVERY_BATCHES 时保存进度并提交
+        self._uncommitted_batches = 0
+
+    def _restore_elapsed(self) -> None:
+        self._flushed_processed = self.processed_records
+        self._elapsed_base = self.metrics.elapsed_seconds
+        self._run_started = time.perf_counter()
+
+    def _update_elapsed(self) -> None:
+        self.metrics.elapsed_seconds = self._elapsed_base + time.perf_counter() - self._run_started
+
+    def parse_row(self, row: list[str], col_map: dict[int, str]) -> dict[str, str]:
+        started = time.perf_counter()
+        raw_data = _parse_row_data(row, col_map)
+        self.metrics.phase_seconds["parse"] += time.perf_counter() - started
+        return raw_data
 
     def add_anomaly(self, anomaly_type: str, field_name: str,
-                    raw_value: str | None, description: str) -> None:
+                    raw_value: str | None, params: dict | None = None) -> None:
+        """记录异常；描述以 (anomaly_type, field_name) 对应的模板 id + 参数存储。"""
         self.batch_anomalies.append({
             "id": uuid.uuid4(),
             "import_job_id": self.job_uuid,
@@ -191,16 +323,30 @@ class ImportContext:
             "anomaly_type": anomaly_type,
             "field_name": field_name,
             "raw_value": raw_value[:200] if raw_value else None,
-            "description": description,
+            "template_id": ANOMALY_TEMPLATE_IDS[(anomaly_type, field_name)],
+            "template_params": params,
         })
         self.failed_records += 1
         self.processed_records += 1
 
-    def flush_batch(self, insert_fn) -> None:
-        """提交当前批次的数据和异常。"""
+    @property
+    def batch_size(self) -> int:
+        return self.batch_sizer.size
+
+    def flush_batch(self, insert_fn, commit: bool = False) -> None:
+        """写入当前批次的数据和异常。
+
+        每 IMPORT_COMMIT_EVERY_BATCHES 个批次（或 commit=True 时）保存进度并提交事务；
+        中途失败时未提交的批次与进度一并回滚，恢复点仍与已提交数据一致。
+        """
+        started = time.perf_counter()
+        has_batch = bool(self.batch_records or self.batch_anomalies)
+        sample_record = self.batch_records[0] if self.batch_records else None
         if self.batch_records:
-            inserted, skipped = insert_fn(self.batch_records)
+            with self.metrics.phase("insert"):
+                inserted, skipped = insert_fn(self.batch_records)
             self.success_records += inserted
+            self.period_coverage.add_records(self.batch_records)
             if skipped > 0:
                 self.batch_anomalies.append({
                     "id": uuid.uuid4(),
@@ -209,28 +355,67 @@ class ImportContext:
                     "anomaly_type": "duplicate",
                     "field_name": "record",
                     "raw_value": None,
-                    "description": f"本批次中 {skipped} 条重复记录已跳过",
+                    "template_id": ANOMALY_TEMPLATE_IDS[("duplicate", "record")],
+                    "template_params": {"skipped": skipped},
                 })
                 self.failed_records += skipped
 
-        if self.batch_anomalies:
-            self.session.execute(
-                ImportAnomaly.__table__.insert().values(self.batch_anomalies)
-            )
+        with self.metrics.phase("anomaly_write"):
+            _write_anomalies(self.session, self.batch_anomalies)
+        rows = self.processed_records - self._flushed_processed
+        if has_batch:
+            self.batch_sizer.observe(rows, time.perf_counter() - started, sample_record)
+            self._uncommitted_batches += 1
+
+        # 进度中的 metrics 不含本批次（提交后才知道批次耗时），最终由 finalize/complete_shard 补齐
+        if commit or self._uncommitted_batches >= settings.IMPORT_COMMIT_EVERY_BATCHES:
+            with self.metrics.phase("insert"):
+                self._save_progress()
+                self.session.commit()
+            self._uncommitted_batches = 0
+        if has_batch:
+            self.metrics.observe_batch(time.perf_counter() - started, rows)
+            self._flushed_processed = self.processed_records
+        self.batch_records.clear()
+        self.batch_anomalies.clear()
 
+    def _save_progress(self) -> None:
         self.job.processed_records = self.processed_records
         self.job.success_records = self.success_records
         self.job.failed_records = self.failed_records
         self.job.last_processed_row = self.row_number
-        self.session.commit()
-        self.batch_records.clear()
-        self.batch_anomalies.clear()
+        self.job.resume_offset = self.current_offset()
+        self._update_elapsed()
+        self.job.metrics = self.metrics.to_json()
 
-    def should_flush(self) -> bool:
-        return len(self.batch_records) >= BATCH_SIZE or len(self.batch_anomalies) >= BATCH_SIZE
+    def current_offset(self) -> int | None:
+        """第 row_number 行之后的字节偏移（非 CSV 时为 None）。"""
+        if self.reader is None:
+            return None
+        if self.row_offsets is not None:
+            base_row, offsets = self.row_offsets
+            if base_row < self.row_number <= base_row + len(offsets):
+                return offsets[self.row_number - base_row - 1]
+        return self.reader.offset
+
+    def skip_to(self, row_number: int) -> None:
+        """已通过 seek 跳过前 row_number 行，计数与逐行跳过时保持一致。"""
+        self.total_records += row_number - self.row_number
+        self.row_number = row_number
 
-    def finalize(self, audit_action: str, extra_audit: dict | None = None) -> None:
-        """完成导入：更新统计、写审计日志。"""
+    def should_flush(self) -> bool:
+        size = self.batch_sizer.size
+        return len(self.batch_records) >= size or len(self.batch_anomalies) >= size
+
+    def finalize(
+        self, audit_action: str, extra_audit: dict | None = None,
+        shard_metrics: ImportMetrics | None = None,
+    ) -> None:
+        """完成导入：更新统计、写审计日志。
+
+        shard_metrics 为分片汇总时各分片合并后的统计，与本进程的完整性检测/finalize 耗时相加后写入 job。
+        """
+        started = time.perf_counter()
         self.job.total_records = self.total_records
         if self.total_records > 0:
             self.job.data_completeness = Decimal(
@@ -264,16 +449,95 @@ class ImportContext:
             changes_after=audit_data,
         )
         self.session.add(audit_log)
+
+        self.metrics.phase_seconds["finalize"] += time.perf_counter() - started
+        self._update_elapsed()
+        record_metrics(self.job.import_type, self.metrics, job_completed=True)
+        job_metrics = self.metrics
+        if shard_metrics is not None:
+            job_metrics = ImportMetrics()
+            job_metrics.merge(shard_metrics)
+            job_metrics.merge(self.metrics)
+        self.job.metrics = job_metrics.to_json()
+        self.session.execute(
+            build_metric_counters_upsert_stmt(self.job.import_type, to_counters(job_metrics, jobs=1))
+        )
         self.session.commit()
 
 
-def _init_import(session, task, job_id: str) -> DataImportJob:
-    """通用导入初始化：加载 job 并标记为 processing。"""
+class ShardImportContext(ImportContext):
+    """分片导入上下文：行号沿用文件全局行号，进度写入 DataImportShard。
+
+    job 级别的统计、时段完整性检测与审计由分片汇总回调统一完成。
+    """
+
+    def __init__(self, session, job: DataImportJob, shard: DataImportShard):
+        super().__init__(session, job, shard.last_processed_row)
+        self.shard = shard
+        self.row_number = shard.first_row - 1
+        self.success_records = shard.success_records or 0
+        self.failed_records = shard.failed_records or 0
+        self.processed_records = shard.processed_records or 0
+        self.all_trading_dates = {date.fromisoformat(d) for d in shard.trading_dates or []}
+        self.period_coverage = PeriodCoverage.from_json(shard.period_coverage)
+        self.metrics = ImportMetrics.from_json(shard.metrics)
+        self._restore_elapsed()
+
+    def _save_progress(self) -> None:
+        self.shard.processed_records = self.processed_records
+        self.shard.success_records = self.success_records
+        self.shard.failed_records = self.failed_records
+        self.shard.last_processed_row = self.row_number
+        self.shard.resume_offset = self.current_offset()
+        self.shard.trading_dates = sorted(d.isoformat() for d in self.all_trading_dates)
+        self.shard.period_coverage = self.period_coverage.to_json()
+        self._update_elapsed()
+        self.shard.metrics = self.metrics.to_json()
+
+    def complete_shard(self) -> None:
+        self.shard.total_records = self.row_number - (self.shard.first_row - 1)
+        self.shard.status = "completed"
+        self._update_elapsed()
+        self.shard.metrics = self.metrics.to_json()
+        self.session.commit()
+        record_metrics(self.job.import_type, self.metrics, job_completed=False)
+        logger.info(
+            "import_shard_completed",
+            job_id=str(self.job_uuid),
+            shard_index=self.shard.shard_index,
+            total=self.shard.total_records,
+            success=self.success_records,
+            failed=self.failed_records,
+        )
+
+
+def _make_context(
+    session, job: DataImportJob, resume_from_row: int,
+    shard=None, reader: _CsvRowReader | None = None, start_row: int = 0,
+) -> ImportContext:
+    if shard is not None:
+        ctx = ShardImportContext(session, job, shard)
+    else:
+        ctx = ImportContext(session, job, resume_from_row)
+    ctx.reader = reader
+    if start_row > ctx.row_number:
+        ctx.skip_to(start_row)
+    return ctx
+
+
+def _init_import(session, task, job_id: str, shard=None) -> DataImportJob:
+    """通用导入初始化：加载 job 并标记为 processing（分片模式只标记分片）。"""
     job_uuid = uuid.UUID(job_id)
     job = session.get(DataImportJob, job_uuid)
     if not job:
         raise ValueError(f"Import job {job_id} not found")
 
+    if shard is not None:
+        shard.status = "processing"
+        shard.celery_task_id = task.request.id
+        session.commit()
+        return job
+
     job.status = "processing"
     job.started_at = datetime.now(timezone.utc)
     job.celery_task_id = task.request.id
@@ -300,33 +564,127 @@ def _parse_row_data(row: list[str], col_map: dict[int, str]) -> dict[str, str]:
     return raw_data
 
 
+# =====================================================
+# 字段校验函数（逐行引擎与列式引擎共用）
+#
+# 每个函数返回 (parsed_value, anomaly)，anomaly 为
+# (anomaly_type, field_name, raw_value, template_params) 或 None，
+# 描述文本由 ANOMALY_TEMPLATES 在读取时渲染。
+# =====================================================
+
+def _check_trading_date(raw: str) -> tuple[date | None, tuple | None]:
+    parsed = _parse_date(raw)
+    if parsed is None:
+        return None, ("format_error", "trading_date", raw, None)
+    return parsed, None
+
+
+def _check_period(raw: str) -> tuple[int | None, tuple | None]:
+    parsed = _parse_period(raw)
+    if parsed is None:
+        return None, ("format_error", "period", raw, None)
+    return parsed, None
+
+
+def _check_clearing_price(
+    raw: str,
+    price_cap_lower: Decimal | None,
+    price_cap_upper: Decimal | None,
+) -> tuple[Decimal | None, tuple | None]:
+    parsed = _parse_price(raw)
+    if parsed is None:
+        return None, ("format_error", "clearing_price", raw, None)
+
+    # 价格范围校验
+    if price_cap_upper is not None and price_cap_lower is not None:
+        if parsed > price_cap_upper or parsed < price_cap_lower:
+            return None, (
+                "out_of_range", "clearing_price", str(parsed),
+                {"lower": str(price_cap_lower), "upper": str(price_cap_upper)},
+            )
+    return parsed, None
+
+
+def _check_output_kw(raw: str) -> tuple[Decimal | None, tuple | None]:
+    parsed = _parse_output_kw(raw)
+    if parsed is None:
+        return None, ("format_error", "actual_output_kw", raw, None)
+    return parsed, None
+
+
+def _check_soc(adapter, raw: str) -> tuple[Decimal | None, tuple | None]:
+    try:
+        parsed = adapter.transform_soc(raw)
+        if parsed < 0 or parsed > 1:
+            raise ValueError("SOC out of range")
+    except (InvalidOperation, ValueError, TypeError):
+        return None, ("out_of_range", "soc", raw, None)
+    return parsed, None
+
+
+def _check_power(adapter, field_name: str, raw: str) -> tuple[Decimal | None, tuple | None]:
+    try:
+        parsed = adapter.transform_power(raw) if raw else Decimal("0")
+        if parsed < 0:
+            raise ValueError(f"negative {field_name}")
+    except (InvalidOperation, ValueError, TypeError):
+        return None, ("format_error", field_name, raw, None)
+    return parsed, None
+
+
+def _check_cycle_count(adapter, raw: str) -> tuple[int | None, tuple | None]:
+    try:
+        parsed = adapter.transform_cycle_count(raw) if raw else 0
+        if parsed < 0:
+            raise ValueError("negative cycle")
+    except (ValueError, TypeError):
+        return None, ("format_error", "cycle_count", raw, None)
+    return parsed, None
+
+
 def _validate_date_period(ctx: ImportContext, raw_data: dict) -> tuple[date, int] | None:
     """校验 trading_date 和 period，返回 (parsed_date, parsed_period) 或 None。"""
-    raw_date = raw_data.get("trading_date", "")
-    parsed_date = _parse_date(raw_date)
-    if parsed_date is None:
-        ctx.add_anomaly("format_error", "trading_date", raw_date,
-                        f"交易日期格式错误: {raw_date}")
+    parsed_date, anomaly = _check_trading_date(raw_data.get("trading_date", ""))
+    if anomaly is not None:
+        ctx.add_anomaly(*anomaly)
         return None
 
-    raw_period = raw_data.get("period", "")
-    parsed_period = _parse_period(raw_period)
-    if parsed_period is None:
-        ctx.add_anomaly("format_error", "period", raw_period,
-                        f"时段编号超出范围(1-{PERIODS_PER_DAY}): {raw_period}")
+    parsed_period, anomaly = _check_period(raw_data.get("period", ""))
+    if anomaly is not None:
+        ctx.add_anomaly(*anomaly)
         return None
 
     return parsed_date, parsed_period
 
 
+def _use_columnar_engine() -> bool:
+    """是否启用列式解析/校验引擎（IMPORT_ENGINE=columnar 且 numpy 可用）。"""
+    if settings.IMPORT_ENGINE != "columnar":
+        return False
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        logger.warning("import_columnar_engine_unavailable", hint="numpy 未安装，回退逐行引擎")
+        return False
+    return True
+
+
 def _check_period_completeness(
     session, job_uuid: uuid.UUID, entity_id: uuid.UUID,
     trading_dates: set[date], record_model, id_field_name: str,
-    entity_label: str = "",
+    entity_label: str = "", coverage: PeriodCoverage | None = None,
 ):
-    """通用时段完整性检测。"""
+    """通用时段完整性检测。
+
+    传入 coverage 时跳过本次导入已覆盖全部 96 个时段的交易日，只查询其余交易日。
+    """
     from sqlalchemy import func, select
 
+    if coverage is not None:
+        trading_dates = set(trading_dates) - coverage.complete_dates()
+        if not trading_dates:
+            return
+
     id_col = getattr(record_model, id_field_name)
     stmt = (
         select(
@@ -349,10 +707,6 @@ def _check_period_completeness(
             missing_str = ", ".join(str(p) for p in missing[:10])
             if len(missing) > 10:
                 missing_str += f"... (共{len(missing)}个)"
-            desc = f"交易日 {row.trading_date} "
-            if entity_label:
-                desc += f"{entity_label}"
-            desc += f"缺少时段: {missing_str}"
             anomalies.append({
                 "id": uuid.uuid4(),
                 "import_job_id": job_uuid,
@@ -360,11 +714,50 @@ def _check_period_completeness(
                 "anomaly_type": "missing",
                 "field_name": "period",
                 "raw_value": None,
-                "description": desc,
+                "template_id": ANOMALY_TEMPLATE_IDS[("missing", "period")],
+                "template_params": {
+                    "trading_date": row.trading_date.isoformat(),
+                    "entity_label": entity_label,
+                    "missing": missing_str,
+                },
             })
 
-    if anomalies:
-        session.execute(ImportAnomaly.__table__.insert().values(anomalies))
+    _write_anomalies(session, anomalies)
+
+
+def _write_anomalies(session, anomalies: list[dict]) -> None:
+    """批量写入异常记录（IMPORT_BULK_LOADER=copy 时直接 COPY 进 import_anomalies）。"""
+    if not anomalies:
+        return
+    if settings.IMPORT_BULK_LOADER == "copy":
+        from app.tasks.import_copy import copy_records
+
+        copy_records(session, ImportAnomaly, anomalies)
+        return
+    session.execute(ImportAnomaly.__table__.insert().values(anomalies))
+
+
+def _bulk_insert_records(
+    session, model, records: list[dict], conflict_columns: list[str],
+) -> tuple[int, int]:
+    """批量写入记录（冲突跳过），返回 (inserted, skipped)。
+
+    IMPORT_BULK_LOADER=copy 时走 COPY + 暂存表，否则使用多值 INSERT。
+    """
+    if not records:
+        return 0, 0
+    if settings.IMPORT_BULK_LOADER == "copy":
+        from app.tasks.import_copy import copy_insert_records
+
+        return copy_insert_records(session, model, records, conflict_columns)
+
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    stmt = pg_insert(model).values(records)
+    stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+    result = session.execute(stmt)
+    inserted = result.rowcount
+    return inserted, len(records) - inserted
 
 
 def _run_import_task(task_fn, job_id: str, **kwargs):
@@ -404,39 +797,28 @@ def process_trading_data_import(self, job_id: str, resume_from_row: int = 0):
 
 def _insert_trading_records(session, records: list[dict]) -> tuple[int, int]:
     """批量插入交易记录，返回 (inserted, skipped)。"""
-    if not records:
-        return 0, 0
-    from sqlalchemy.dialects.postgresql import insert as pg_insert
-
-    stmt = pg_insert(TradingRecord).values(records)
-    stmt = stmt.on_conflict_do_nothing(
-        index_elements=["station_id", "trading_date", "period"],
+    return _bulk_insert_records(
+        session, TradingRecord, records, ["station_id", "trading_date", "period"],
     )
-    result = session.execute(stmt)
-    inserted = result.rowcount
-    return inserted, len(records) - inserted
 
 
-def _execute_import(session, task, job_id: str, resume_from_row: int):
-    """核心交易数据导入逻辑。"""
-    job = _init_import(session, task, job_id)
+def _execute_import(session, task, job_id: str, resume_from_row: int, shard=None):
+    """核心交易数据导入逻辑（shard 不为空时只处理该分片）。"""
+    job = _init_import(session, task, job_id, shard)
 
     # 获取省份市场规则
     station = session.get(PowerStation, job.station_id)
     if not station:
         raise ValueError(f"Station {job.station_id} not found")
 
-    from sqlalchemy import select as sa_select
-    market_rule_stmt = sa_select(ProvinceMarketRule).where(
-        ProvinceMarketRule.province == station.province,
-        ProvinceMarketRule.is_active.is_(True),
-    )
-    market_rule = session.execute(market_rule_stmt).scalar_one_or_none()
-    price_cap_upper = Decimal(str(market_rule.price_cap_upper)) if market_rule else None
-    price_cap_lower = Decimal(str(market_rule.price_cap_lower)) if market_rule else None
+    from app.tasks.import_validators import get_trading_validator
+
+    trading_validator = get_trading_validator(session, station.province)
+    price_cap_upper = trading_validator.price_cap_upper
+    price_cap_lower = trading_validator.price_cap_lower
 
     file_path = _get_file_path(job)
-    rows = _open_file_rows(file_path)
+    rows, reader, start_row = _open_import_rows(file_path, job, resume_from_row, shard)
 
     header_row = next(rows, None)
     if header_row is None:
@@ -447,68 +829,71 @@ def _execute_import(session, task, job_id: str, resume_from_row: int):
     if col_map is None:
         raise ValueError("列头映射失败：需要包含 trading_date/交易日期、period/时段、clearing_price/出清价格")
 
-    ctx = ImportContext(session, job, resume_from_row)
+    ctx = _make_context(session, job, resume_from_row, shard, reader, start_row)
     insert_fn = lambda records: _insert_trading_records(session, records)
 
-    for row in rows:
-        ctx.row_number += 1
-        ctx.total_records += 1
-        if ctx.row_number <= resume_from_row:
-            continue
+    if _use_columnar_engine():
+        from app.tasks.import_columnar import TradingColumnarValidator, run_columnar_import
 
-        raw_data = _parse_row_data(row, col_map)
+        validator = TradingColumnarValidator(
+            job.station_id, ctx.job_uuid, price_cap_lower, price_cap_upper,
+        )
+        run_columnar_import(ctx, rows, col_map, validator, insert_fn)
+    else:
+        for row in ctx.metrics.timed_rows(rows):
+            ctx.row_number += 1
+            ctx.total_records += 1
+            if ctx.row_number <= resume_from_row:
+                continue
 
-        dp = _validate_date_period(ctx, raw_data)
-        if dp is None:
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
-        parsed_date, parsed_period = dp
-
-        # 校验 clearing_price
-        raw_price = raw_data.get("clearing_price", "")
-        parsed_price = _parse_price(raw_price)
-        if parsed_price is None:
-            ctx.add_anomaly("format_error", "clearing_price", raw_price,
-                            f"出清价格格式错误: {raw_price}")
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
+            raw_data = ctx.parse_row(row, col_map)
 
-        # 价格范围校验
-        if price_cap_upper is not None and price_cap_lower is not None:
-            if parsed_price > price_cap_upper or parsed_price < price_cap_lower:
-                ctx.add_anomaly(
-                    "out_of_range", "clearing_price", str(parsed_price),
-                    f"出清价格超出省份限价范围({price_cap_lower}~{price_cap_upper}): {parsed_price}",
-                )
+            dp = _validate_date_period(ctx, raw_data)
+            if dp is None:
                 if ctx.should_flush():
                     ctx.flush_batch(insert_fn)
                 continue
+            parsed_date, parsed_period = dp
 
-        ctx.all_trading_dates.add(parsed_date)
-        ctx.batch_records.append({
-            "id": uuid.uuid4(),
-            "trading_date": parsed_date,
-            "period": parsed_period,
-            "station_id": job.station_id,
-            "clearing_price": parsed_price,
-            "import_job_id": ctx.job_uuid,
-        })
-        ctx.processed_records += 1
+            # 校验 clearing_price（格式 + 省份限价范围）
+            parsed_price, anomaly = _check_clearing_price(
+                raw_data.get("clearing_price", ""), price_cap_lower, price_cap_upper,
+            )
+            if anomaly is not None:
+                ctx.add_anomaly(*anomaly)
+                if ctx.should_flush():
+                    ctx.flush_batch(insert_fn)
+                continue
 
-        if ctx.should_flush():
-            ctx.flush_batch(insert_fn)
+            ctx.all_trading_dates.add(parsed_date)
+            ctx.batch_records.append({
+                "id": uuid.uuid4(),
+                "trading_date": parsed_date,
+                "period": parsed_period,
+                "station_id": job.station_id,
+                "clearing_price": parsed_price,
+                "import_job_id": ctx.job_uuid,
+            })
+            ctx.processed_records += 1
+
+            if ctx.should_flush():
+                ctx.flush_batch(insert_fn)
 
     # 处理剩余批次
-    ctx.flush_batch(insert_fn)
+    ctx.flush_batch(insert_fn, commit=True)
+
+    # 分片模式：时段完整性检测与 finalize 由汇总回调执行
+    if shard is not None:
+        ctx.complete_shard()
+        return
 
     # 时段完整性检测
     if ctx.all_trading_dates:
-        _check_period_completeness(
-            session, ctx.job_uuid, job.station_id, ctx.all_trading_dates,
-            TradingRecord, "station_id",
-        )
+        with ctx.metrics.phase("completeness"):
+            _check_period_completeness(
+                session, ctx.job_uuid, job.station_id, ctx.all_trading_dates,
+                TradingRecord, "station_id", coverage=ctx.period_coverage,
+            )
 
     ctx.finalize("complete_import_job")
 
@@ -537,24 +922,16 @@ def process_station_output_import(self, job_id: str, resume_from_row: int = 0):
 
 def _insert_output_records(session, records: list[dict]) -> tuple[int, int]:
     """批量插入电站出力记录，返回 (inserted, skipped)。"""
-    if not records:
-        return 0, 0
-    from sqlalchemy.dialects.postgresql import insert as pg_insert
-
-    stmt = pg_insert(StationOutputRecord).values(records)
-    stmt = stmt.on_conflict_do_nothing(
-        index_elements=["station_id", "trading_date", "period"],
+    return _bulk_insert_records(
+        session, StationOutputRecord, records, ["station_id", "trading_date", "period"],
     )
-    result = session.execute(stmt)
-    inserted = result.rowcount
-    return inserted, len(records) - inserted
 
 
-def _execute_station_output_import(session, task, job_id: str, resume_from_row: int):
-    job = _init_import(session, task, job_id)
+def _execute_station_output_import(session, task, job_id: str, resume_from_row: int, shard=None):
+    job = _init_import(session, task, job_id, shard)
 
     file_path = _get_file_path(job)
-    rows = _open_file_rows(file_path)
+    rows, reader, start_row = _open_import_rows(file_path, job, resume_from_row, shard)
 
     header_row = next(rows, None)
     if header_row is None:
@@ -565,57 +942,68 @@ def _execute_station_output_import(session, task, job_id: str, resume_from_row:
     if col_map is None:
         raise ValueError("列头映射失败：需要包含 trading_date/交易日期、period/时段、actual_output_kw/实际出力")
 
-    ctx = ImportContext(session, job, resume_from_row)
+    ctx = _make_context(session, job, resume_from_row, shard, reader, start_row)
     insert_fn = lambda records: _insert_output_records(session, records)
 
-    for row in rows:
-        ctx.row_number += 1
-        ctx.total_records += 1
-        if ctx.row_number <= resume_from_row:
-            continue
+    if _use_columnar_engine():
+        from app.tasks.import_columnar import OutputColumnarValidator, run_columnar_import
 
-        raw_data = _parse_row_data(row, col_map)
+        validator = OutputColumnarValidator(job.station_id, ctx.job_uuid)
+        run_columnar_import(ctx, rows, col_map, validator, insert_fn)
+    else:
+        for row in ctx.metrics.timed_rows(rows):
+            ctx.row_number += 1
+            ctx.total_records += 1
+            if ctx.row_number <= resume_from_row:
+                continue
 
-        dp = _validate_date_period(ctx, raw_data)
-        if dp is None:
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
-        parsed_date, parsed_period = dp
-
-        # 校验 actual_output_kw
-        raw_output = raw_data.get("actual_output_kw", "")
-        parsed_output = _parse_output_kw(raw_output)
-        if parsed_output is None:
-            ctx.add_anomaly("format_error", "actual_output_kw", raw_output,
-                            f"实际出力格式错误或为负值: {raw_output}")
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
+            raw_data = ctx.parse_row(row, col_map)
 
-        ctx.all_trading_dates.add(parsed_date)
-        ctx.batch_records.append({
-            "id": uuid.uuid4(),
-            "trading_date": parsed_date,
-            "period": parsed_period,
-            "station_id": job.station_id,
-            "actual_output_kw": parsed_output,
-            "import_job_id": ctx.job_uuid,
-        })
-        ctx.processed_records += 1
+            dp = _validate_date_period(ctx, raw_data)
+            if dp is None:
+                if ctx.should_flush():
+                    ctx.flush_batch(insert_fn)
+                continue
+            parsed_date, parsed_period = dp
 
-        if ctx.should_flush():
-            ctx.flush_batch(insert_fn)
+            # 校验 actual_output_kw
+            parsed_output, anomaly = _check_output_kw(raw_data.get("actual_output_kw", ""))
+            if anomaly is not None:
+                ctx.add_anomaly(*anomaly)
+                if ctx.should_flush():
+                    ctx.flush_batch(insert_fn)
+                continue
+
+            ctx.all_trading_dates.add(parsed_date)
+            ctx.batch_records.append({
+                "id": uuid.uuid4(),
+                "trading_date": parsed_date,
+                "period": parsed_period,
+                "station_id": job.station_id,
+                "actual_output_kw": parsed_output,
+                "import_job_id": ctx.job_uuid,
+            })
+            ctx.processed_records += 1
+
+            if ctx.should_flush():
+                ctx.flush_batch(insert_fn)
 
     # 处理剩余批次
-    ctx.flush_batch(insert_fn)
+    ctx.flush_batch(insert_fn, commit=True)
+
+    # 分片模式：时段完整性检测与 finalize 由汇总回调执行
+    if shard is not None:
+        ctx.complete_shard()
+        return
 
     # 时段完整性检测
     if ctx.all_trading_dates:
-        _check_period_completeness(
-            session, ctx.job_uuid, job.station_id, ctx.all_trading_dates,
-            StationOutputRecord, "station_id", "出力数据",
-        )
+        with ctx.metrics.phase("completeness"):
+            _check_period_completeness(
+                session, ctx.job_uuid, job.station_id, ctx.all_trading_dates,
+                StationOutputRecord, "station_id", "出力数据",
+                coverage=ctx.period_coverage,
+            )
 
     ctx.finalize("complete_station_output_import")
 
@@ -647,23 +1035,15 @@ def process_storage_operation_import(
 
 def _insert_storage_records(session, records: list[dict]) -> tuple[int, int]:
     """批量插入储能运行记录，返回 (inserted, skipped)。"""
-    if not records:
-        return 0, 0
-    from sqlalchemy.dialects.postgresql import insert as pg_insert
-
-    stmt = pg_insert(StorageOperationRecord).values(records)
-    stmt = stmt.on_conflict_do_nothing(
-        index_elements=["device_id", "trading_date", "period"],
+    return _bulk_insert_records(
+        session, StorageOperationRecord, records, ["device_id", "trading_date", "period"],
     )
-    result = session.execute(stmt)
-    inserted = result.rowcount
-    return inserted, len(records) - inserted
 
 
 def _execute_storage_operation_import(
     session, task, job_id: str, resume_from_row: int, ems_format: str,
 ):
-    from app.services.ems_adapters import get_adapter
+    from app.tasks.import_validators import get_ems_validator
 
     job = _init_import(session, task, job_id)
 
@@ -684,25 +1064,19 @@ def _execute_storage_operation_import(
         raise ValueError(f"电站 {job.station_id} 没有活跃的储能设备")
     device_id = device.id
 
-    # 获取 EMS 适配器
-    adapter = get_adapter(ems_format)
-    column_mapping = adapter.get_column_mapping()
+    # 获取 EMS 适配器及预编译列头查找表
+    ems_validator = get_ems_validator(ems_format)
+    adapter = ems_validator.adapter
 
     file_path = _get_file_path(job)
-    rows = _open_file_rows(file_path)
+    rows, reader, start_row = _open_import_rows(file_path, job, resume_from_row)
 
     header_row = next(rows, None)
     if header_row is None:
         raise ValueError("文件为空，无法读取列头")
 
     # 使用适配器列映射
-    col_map: dict[int, str] = {}
-    for i, col in enumerate(header_row):
-        cleaned = col.strip()
-        for vendor_col, std_field in column_mapping.items():
-            if cleaned == vendor_col or cleaned.lower() == vendor_col.lower():
-                col_map[i] = std_field
-                break
+    col_map = ems_validator.map_columns(header_row)
 
     required_fields = {"trading_date", "period", "soc"}
     found = set(col_map.values())
@@ -711,100 +1085,74 @@ def _execute_storage_operation_import(
             f"列头映射失败（{ems_format} 格式）：需要 trading_date, period, soc 对应的列"
         )
 
-    ctx = ImportContext(session, job, resume_from_row)
+    ctx = _make_context(session, job, resume_from_row, reader=reader, start_row=start_row)
     insert_fn = lambda records: _insert_storage_records(session, records)
     latest_soc: Decimal | None = None
     latest_date_period: tuple[date, int] | None = None
 
-    for row in rows:
-        ctx.row_number += 1
-        ctx.total_records += 1
-        if ctx.row_number <= resume_from_row:
-            continue
+    if _use_columnar_engine():
+        from app.tasks.import_columnar import StorageColumnarValidator, run_columnar_import
 
-        raw_data = _parse_row_data(row, col_map)
+        validator = StorageColumnarValidator(device_id, ctx.job_uuid, adapter)
+        run_columnar_import(ctx, rows, col_map, validator, insert_fn)
+        latest_date_period, latest_soc = validator.latest_date_period, validator.latest_soc
+    else:
+        for row in ctx.metrics.timed_rows(rows):
+            ctx.row_number += 1
+            ctx.total_records += 1
+            if ctx.row_number <= resume_from_row:
+                continue
 
-        dp = _validate_date_period(ctx, raw_data)
-        if dp is None:
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
-        parsed_date, parsed_period = dp
+            raw_data = ctx.parse_row(row, col_map)
 
-        # 校验并转换 SOC
-        raw_soc = raw_data.get("soc", "")
-        try:
-            parsed_soc = adapter.transform_soc(raw_soc)
-            if parsed_soc < 0 or parsed_soc > 1:
-                raise ValueError("SOC out of range")
-        except (InvalidOperation, ValueError, TypeError):
-            ctx.add_anomaly("out_of_range", "soc", raw_soc,
-                            f"SOC 值无效或超出范围(0-1): {raw_soc}")
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
+            dp = _validate_date_period(ctx, raw_data)
+            if dp is None:
+                if ctx.should_flush():
+                    ctx.flush_batch(insert_fn)
+                continue
+            parsed_date, parsed_period = dp
 
-        # 解析可选字段
-        raw_charge = raw_data.get("charge_power_kw", "0")
-        raw_discharge = raw_data.get("discharge_power_kw", "0")
-        raw_cycle = raw_data.get("cycle_count", "0")
+            # 校验并转换 SOC，再解析可选字段（缺失列按 "0" 处理）
+            parsed_soc, anomaly = _check_soc(adapter, raw_data.get("soc", ""))
+            if anomaly is None:
+                parsed_charge, anomaly = _check_power(
+                    adapter, "charge_power_kw", raw_data.get("charge_power_kw", "0"),
+                )
+            if anomaly is None:
+                parsed_discharge, anomaly = _check_power(
+                    adapter, "discharge_power_kw", raw_data.get("discharge_power_kw", "0"),
+                )
+            if anomaly is None:
+                parsed_cycle, anomaly = _check_cycle_count(adapter, raw_data.get("cycle_count", "0"))
+            if anomaly is not None:
+                ctx.add_anomaly(*anomaly)
+                if ctx.should_flush():
+                    ctx.flush_batch(insert_fn)
+                continue
 
-        try:
-            parsed_charge = adapter.transform_power(raw_charge) if raw_charge else Decimal("0")
-            if parsed_charge < 0:
-                raise ValueError("negative charge")
-        except (InvalidOperation, ValueError, TypeError):
-            ctx.add_anomaly("format_error", "charge_power_kw", raw_charge,
-                            f"充电功率格式错误: {raw_charge}")
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
+            ctx.batch_records.append({
+                "id": uuid.uuid4(),
+                "trading_date": parsed_date,
+                "period": parsed_period,
+                "device_id": device_id,
+                "soc": parsed_soc,
+                "charge_power_kw": parsed_charge,
+                "discharge_power_kw": parsed_discharge,
+                "cycle_count": parsed_cycle,
+                "import_job_id": ctx.job_uuid,
+            })
+            ctx.processed_records += 1
 
-        try:
-            parsed_discharge = adapter.transform_power(raw_discharge) if raw_discharge else Decimal("0")
-            if parsed_discharge < 0:
-                raise ValueError("negative discharge")
-        except (InvalidOperation, ValueError, TypeError):
-            ctx.add_anomaly("format_error", "discharge_power_kw", raw_discharge,
-                            f"放电功率格式错误: {raw_discharge}")
-            if ctx.should_flush():
-                ctx.flush_batch(insert_fn)
-            continue
+            # 追踪最新的 SOC 值
+            if latest_date_period is None or (parsed_date, parsed_period) > latest_date_period:
+                latest_date_period = (parsed_date, parsed_period)
+                latest_soc = parsed_soc
 
-        try:
-            parsed_cycle = adapter.transform_cycle_count(raw_cycle) if raw_cycle else 0
-            if parsed_cycle < 0:
-                raise ValueError("negative cycle")
-        except (ValueError, TypeError):
-            ctx.add_anomaly("format_error", "cycle_count", raw_cycle,
-                            f"循环次数格式错误: {raw_cycle}")
             if ctx.should_flush():
                 ctx.flush_batch(insert_fn)
-            continue
-
-        ctx.batch_records.append({
-            "id": uuid.uuid4(),
-            "trading_date": parsed_date,
-            "period": parsed_period,
-            "device_id": device_id,
-            "soc": parsed_soc,
-            "charge_power_kw": parsed_charge,
-            "discharge_power_kw": parsed_discharge,
-            "cycle_count": parsed_cycle,
-            "import_job_id": ctx.job_uuid,
-        })
-        ctx.processed_records += 1
-
-        # 追踪最新的 SOC 值
-        if latest_date_period is None or (parsed_date, parsed_period) > latest_date_period:
-            latest_date_period = (parsed_date, parsed_period)
-            latest_soc = parsed_soc
-
-        if ctx.should_flush():
-            ctx.flush_batch(insert_fn)
 
     # 处理剩余批次
-    ctx.flush_batch(insert_fn)
+    ctx.flush_batch(insert_fn, commit=True)
 
     # 更新设备最新 SOC
     if latest_soc is not None:
@@ -817,10 +1165,12 @@ def _execute_storage_operation_import(
 
     # 时段完整性检测
     if ctx.all_trading_dates:
-        _check_period_completeness(
-            session, ctx.job_uuid, device_id, ctx.all_trading_dates,
-            StorageOperationRecord, "device_id", "储能运行数据",
-        )
+        with ctx.metrics.phase("completeness"):
+            _check_period_completeness(
+                session, ctx.job_uuid, device_id, ctx.all_trading_dates,
+                StorageOperationRecord, "device_id", "储能运行数据",
+                coverage=ctx.period_coverage,
+            )
 
     ctx.finalize(
         "complete_storage_operation_import",
@@ -0,0 +1,140 @@
+"""导入 worker 进程内的校验器缓存。
+
+- 交易数据：按省份缓存 ProvinceMarketRule 的限价（已转为 Decimal），条目带规则 updated_at。
+  MarketRuleService 修改/删除规则并提交后向 MARKET_RULE_CHANNEL 发布
+  {"province", "updated_at"}，各 worker 进程的监听线程丢弃 updated_at 不一致的条目。
+  监听未连上 Redis 时不使用缓存（每次查询）；条目最长存活 _MAX_AGE_SECONDS，
+  兜底 API 侧发布失败的情况。
+- 储能数据：按 ems_format 缓存适配器实例与预编译的列头查找表（适配器由代码定义，无需失效）。
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+import structlog
+
+from app.core.redis_invalidation import InvalidationListener
+
+logger = structlog.get_logger()
+
+MARKET_RULE_CHANNEL = "market_rule_changed"
+
+_MAX_AGE_SECONDS = 300.0
+
+
+@dataclass(frozen=True)
+class TradingValidatorConfig:
+    province: str
+    updated_at: datetime | None
+    price_cap_lower: Decimal | None
+    price_cap_upper: Decimal | None
+
+
+@dataclass(frozen=True)
+class EmsValidatorConfig:
+    ems_format: str
+    adapter: object
+    # 小写厂商列名 -> 标准字段名（同名时保留映射中靠前的列）
+    column_lookup: dict[str, str]
+
+    def map_columns(self, header_row: list[str]) -> dict[int, str]:
+        lookup = self.column_lookup
+        return {
+            i: lookup[cleaned]
+            for i, cleaned in enumerate(col.strip().lower() for col in header_row)
+            if cleaned in lookup
+        }
+
+
+# province -> (配置, 加载时刻 monotonic)
+_trading_cache: dict[str, tuple[TradingValidatorConfig, float]] = {}
+_ems_cache: dict[str, EmsValidatorConfig] = {}
+_lock = threading.Lock()
+# 每次失效递增；查询期间发生失效时不写入缓存，避免回填旧值
+_generation = 0
+
+
+def _invalidate(province: str | None = None, updated_at: str | None = None) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        if province is None:
+            _trading_cache.clear()
+            return
+        cached = _trading_cache.get(province)
+        if cached is not None and (
+            updated_at is None
+            or cached[0].updated_at is None
+            or cached[0].updated_at != datetime.fromisoformat(updated_at)
+        ):
+            del _trading_cache[province]
+
+
+def _handle_message(data) -> None:
+    try:
+        payload = json.loads(data)
+        _invalidate(payload["province"], payload.get("updated_at"))
+    except (ValueError, KeyError, TypeError):
+        logger.warning("validator_cache_bad_message", data=str(data)[:200])
+        _invalidate()
+
+
+# 断线期间可能错过失效消息：停用并清空缓存，重连后重新加载
+_listener = InvalidationListener(
+    MARKET_RULE_CHANNEL, _handle_message, _invalidate, "validator-cache-listener",
+)
+
+
+def get_trading_validator(session, province: str) -> TradingValidatorConfig:
+    """返回省份限价配置（进程内缓存，规则变更时经 Redis 通知失效）。"""
+    from sqlalchemy import select
+
+    from app.models.market_rule import ProvinceMarketRule
+
+    _listener.ensure_started()
+    use_cache = _listener.listening.is_set()
+    if use_cache:
+        cached = _trading_cache.get(province)
+        if cached is not None and time.monotonic() - cached[1] < _MAX_AGE_SECONDS:
+            return cached[0]
+        generation = _generation
+
+    rule = session.execute(
+        select(ProvinceMarketRule).where(
+            ProvinceMarketRule.province == province,
+            ProvinceMarketRule.is_active.is_(True),
+        )
+    ).scalar_one_or_none()
+    config = TradingValidatorConfig(
+        province=province,
+        updated_at=rule.updated_at if rule else None,
+        price_cap_lower=Decimal(str(rule.price_cap_lower)) if rule else None,
+        price_cap_upper=Decimal(str(rule.price_cap_upper)) if rule else None,
+    )
+
+    if use_cache:
+        with _lock:
+            if generation == _generation and _listener.listening.is_set():
+                _trading_cache[province] = (config, time.monotonic())
+    return config
+
+
+def get_ems_validator(ems_format: str) -> EmsValidatorConfig:
+    """返回 EMS 适配器与预编译列头查找表（按 ems_format 缓存）。"""
+    cached = _ems_cache.get(ems_format)
+    if cached is not None:
+        return cached
+
+    from app.services.ems_adapters import get_adapter
+
+    adapter = get_adapter(ems_format)
+    lookup: dict[str, str] = {}
+    for vendor_col, std_field in adapter.get_column_mapping().items():
+        lookup.setdefault(vendor_col.lower(), std_field)
+    config = EmsValidatorConfig(ems_format, adapter, lookup)
+    _ems_cache[ems_format] = config
+    return config
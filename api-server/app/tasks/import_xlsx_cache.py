@@ -0,0 +1,159 @@
+"""xlsx 列式转换缓存。
+
+openpyxl 逐行解析 xlsx 是最慢的读取路径，且每次恢复/重新导入同一文件都会重复解析。
+导入任务首次读取时（在 Celery worker 中，不占用上传请求）将 xlsx 转为 Arrow IPC 文件，
+以文件内容 SHA-256 为键存放在 DATA_IMPORT_DIR/_columnar_cache/ 下；
+之后的断点恢复以及内容相同文件的重新导入都直接内存映射读取该缓存。
+
+缓存中所有单元格均为字符串（与 _read_xlsx_rows 的转换规则一致），首行为列头；
+宽于列头的单元格无法映射到任何字段，转换时截断。
+每次复用或读取都会刷新缓存文件的 mtime，过期清理按最近使用时间判断。
+"""
+
+import os
+import uuid
+from pathlib import Path
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+CACHE_DIR_NAME = "_columnar_cache"
+
+# 每个 record batch 的行数
+_BATCH_ROWS = 65536
+
+
+def cache_path(content_hash: str) -> Path:
+    return Path(settings.DATA_IMPORT_DIR) / CACHE_DIR_NAME / f"{content_hash}.arrow"
+
+
+def _write_batch(writer, schema, columns: list[list[str]]) -> None:
+    import pyarrow as pa
+
+    writer.write_batch(pa.record_batch(
+        [pa.array(col, type=pa.string()) for col in columns], schema=schema,
+    ))
+
+
+def write_columnar_cache(rows, target: Path) -> int:
+    """将行迭代器（首行为列头）流式写为 Arrow IPC 文件，返回写入行数（含列头）。
+
+    先写临时文件再原子替换，并发转换同一内容时不会读到半截文件。
+    """
+    import pyarrow as pa
+
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("文件为空，无法读取列头")
+
+    width = len(header)
+    schema = pa.schema([pa.field(f"c{i}", pa.string()) for i in range(width)])
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+
+    written = 0
+    try:
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            columns: list[list[str]] = [[cell] for cell in header]
+            pending = 1
+            for row in rows:
+                if len(row) < width:
+                    row = [*row, *([""] * (width - len(row)))]
+                for col, cell in zip(columns, row):
+                    col.append(cell)
+                pending += 1
+                if pending == _BATCH_ROWS:
+                    _write_batch(writer, schema, columns)
+                    written += pending
+                    columns, pending = [[] for _ in range(width)], 0
+            if pending:
+                _write_batch(writer, schema, columns)
+                written += pending
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return written
+
+
+def ensure_xlsx_cache(file_path: Path, content_hash: str) -> Path:
+    """确保内容哈希对应的缓存存在（已存在时只刷新 mtime 供过期清理判断）。"""
+    target = cache_path(content_hash)
+    if target.exists():
+        os.utime(target)
+        logger.info("xlsx_cache_reused", content_hash=content_hash)
+        return target
+
+    from app.tasks.import_tasks import _read_xlsx_rows
+
+    written = write_columnar_cache(_read_xlsx_rows(file_path), target)
+    logger.info("xlsx_cache_created", content_hash=content_hash, rows=written)
+    return target
+
+
+def _iter_cached_rows(path: Path, skip_rows: int):
+    import pyarrow as pa
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        # 全局行 0 为列头；跳过时从全局行 skip_rows + 1 继续
+        next_row = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            batch_start = next_row
+            next_row += batch.num_rows
+            if batch_start == 0:
+                yield [batch.column(j)[0].as_py() for j in range(batch.num_columns)]
+                batch_start, batch = 1, batch.slice(1)
+            skip = max(0, skip_rows + 1 - batch_start)
+            if skip >= batch.num_rows:
+                continue
+            if skip:
+                batch = batch.slice(skip)
+            for row in zip(*(col.to_pylist() for col in batch.columns)):
+                yield list(row)
+
+
+def read_cached_rows(content_hash: str | None, skip_rows: int = 0):
+    """返回缓存行迭代器（首行为列头，之后从第 skip_rows + 1 个数据行开始）；无缓存时返回 None。"""
+    if not content_hash:
+        return None
+    path = cache_path(content_hash)
+    try:
+        # 刷新 mtime：频繁读取（重试、断点恢复）的缓存不会按上传时间被清理
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return _iter_cached_rows(path, skip_rows)
+
+
+def open_xlsx_rows(file_path: Path, content_hash: str | None, skip_rows: int = 0):
+    """读取缓存行；缓存不存在时先转换一次再读取。
+
+    未启用缓存、没有内容哈希或转换失败时返回 None，调用方回退到 openpyxl 逐行读取。
+    """
+    rows = read_cached_rows(content_hash, skip_rows)
+    if rows is not None or not content_hash or not settings.IMPORT_XLSX_CACHE:
+        return rows
+    try:
+        ensure_xlsx_cache(file_path, content_hash)
+    except Exception as e:
+        logger.warning("xlsx_cache_build_failed", content_hash=content_hash, error=str(e)[:500])
+        return None
+    return read_cached_rows(content_hash, skip_rows)
+
+
+def cleanup_expired_cache(cutoff_timestamp: float) -> int:
+    """删除最近使用时间（mtime）早于 cutoff 的缓存文件，返回删除数。"""
+    cache_dir = Path(settings.DATA_IMPORT_DIR) / CACHE_DIR_NAME
+    if not cache_dir.exists():
+        return 0
+    removed = 0
+    for path in cache_dir.glob("*.arrow"):
+        if path.stat().st_mtime < cutoff_timestamp:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -1,26 +1,308 @@
 import asyncio
-from datetime import date, timezone
+import calendar
+import uuid
+from collections import Counter
+from datetime import UTC, date, datetime, timedelta
 
 import structlog
-from sqlalchemy import select
+from sqlalchemy import or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.core.config import settings
+from app.core.constants import PERIODS_PER_DAY
+from app.core.cron import CRON_TIMEZONE, next_run_after
 from app.core.database import get_sync_session_factory
-from app.models.market_data import MarketDataSource
+from app.core.http_client import run_sync
+from app.models.market_data import MarketClearingPrice, MarketDataBackfillJob, MarketDataSource
+from app.repositories.market_data import build_freshness_upsert_stmt
 from app.services.market_data_adapters import get_adapter
-from app.services.market_data_adapters.base import MarketPriceRecord
+from app.services.market_data_adapters.base import (
+    BaseMarketDataAdapter,
+    ConditionalFetchResult,
+    MarketPriceRecord,
+    content_hash,
+)
+from app.services.market_data_cache import notify_market_data_changed_sync
 from app.tasks.celery_app import celery_app
 
 logger = structlog.get_logger()
 
+# fetch_schedule 无法解析时（升级前的脏数据）使用的默认调度
+_DEFAULT_FETCH_SCHEDULE = "0 7,12,17 * * *"
 
-@celery_app.task(name="app.tasks.market_data_tasks.fetch_market_data_periodic")
-def fetch_market_data_periodic() -> dict:
-    """Celery beat 定时任务：遍历所有活跃数据源，逐省份获取市场数据。
+# 单条 upsert 语句的最大行数（每行 6 个参数，低于 PostgreSQL 的 32767 参数上限）
+_UPSERT_CHUNK_ROWS = 5000
+
+
+async def _fetch_all(
+    targets: list[tuple[str, BaseMarketDataAdapter, str | None, str | None]],
+    trading_date: date,
+    concurrency: int,
+) -> list[ConditionalFetchResult | BaseException]:
+    """在同一事件循环中并发获取各省数据，最多 concurrency 个请求同时进行。
 
-    使用同步会话包裹异步适配器调用。
+    targets 为 (省份, 适配器, 上次 ETag, 上次 Last-Modified)，有校验值时发起条件请求。
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _fetch_one(
+        adapter: BaseMarketDataAdapter, etag: str | None, last_modified: str | None,
+    ) -> ConditionalFetchResult:
+        async with semaphore:
+            return await adapter.fetch_if_changed(trading_date, etag, last_modified)
+
+    return await asyncio.gather(
+        *[_fetch_one(adapter, etag, last_modified) for _, adapter, etag, last_modified in targets],
+        return_exceptions=True,
+    )
+
+
+def _upsert_prices(session, rows: list[dict]) -> Counter:
+    """分块 upsert，仅写入新增或价格/来源有变化的行（未变化的行保留原 fetched_at）。
+
+    有写入的省份同时更新 market_data_freshness；返回 {省份: 实际写入行数}。
+    """
+    written: Counter = Counter()
+    for start in range(0, len(rows), _UPSERT_CHUNK_ROWS):
+        stmt = pg_insert(MarketClearingPrice).values(rows[start:start + _UPSERT_CHUNK_ROWS])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["province", "trading_date", "period"],
+            set_={
+                "clearing_price": stmt.excluded.clearing_price,
+                "source": stmt.excluded.source,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+            where=tuple_(
+                MarketClearingPrice.clearing_price, MarketClearingPrice.source,
+            ).is_distinct_from(tuple_(stmt.excluded.clearing_price, stmt.excluded.source)),
+        ).returning(MarketClearingPrice.province)
+        written.update(province for (province,) in session.execute(stmt))
+    if written:
+        session.execute(build_freshness_upsert_stmt([r for r in rows if written[r["province"]]]))
+    return written
+
+
+def _price_rows(province: str, records: list[MarketPriceRecord], now: datetime) -> list[dict]:
+    """转换为 upsert 行；同一 (交易日, 时段) 重复出现时保留最后一条（单条 upsert 不允许重复键）。"""
+    rows = {
+        (r.trading_date, r.period): {
+            "trading_date": r.trading_date,
+            "period": r.period,
+            "province": province,
+            "clearing_price": r.clearing_price,
+            "source": "api",
+            "fetched_at": now,
+        }
+        for r in records
+    }
+    return list(rows.values())
+
+
+def _write_prices(
+    session, records_by_province: dict[str, list[MarketPriceRecord]], now: datetime,
+) -> tuple[Counter, dict[str, str]]:
+    """多省合并 upsert；整体失败时逐省重试以隔离问题省份。
+
+    返回 ({province: 实际写入行数}, {province: 错误})。
+    """
+    rows_by_province = {
+        province: _price_rows(province, records, now)
+        for province, records in records_by_province.items()
+    }
+    all_rows = [row for rows in rows_by_province.values() for row in rows]
+    if not all_rows:
+        return Counter(), {}
+
+    try:
+        with session.begin_nested():
+            return _upsert_prices(session, all_rows), {}
+    except Exception as e:
+        logger.warning("market_data_bulk_upsert_failed", error=str(e)[:500])
+
+    written: Counter = Counter()
+    errors: dict[str, str] = {}
+    for province, rows in rows_by_province.items():
+        try:
+            with session.begin_nested():
+                written.update(_upsert_prices(session, rows))
+        except Exception as e:
+            errors[province] = str(e)
+    return written, errors
+
+
+def _fetch_sources(
+    session, sources: list[MarketDataSource], today: date,
+) -> tuple[dict[str, str], set[str]]:
+    """并发获取一批数据源当日的出清价格并写入，返回 (各省结果, 当日完整曲线已到的省份)。
+
+    各省请求在 worker 常驻事件循环中并发执行（最多 MARKET_DATA_FETCH_CONCURRENCY 个），
+    单个省份的慢响应/重试不再拖慢其他省份；结果以多省合并 upsert 写入，
+    数据源的 last_fetch_* 状态按主键批量更新，最后一次提交。
+
+    增量取数：同一交易日内带上次的 ETag / Last-Modified 发起条件请求（304 不下载），
+    曲线内容哈希与上次一致时跳过 upsert，否则只写入价格有变化的时段。
+    结果为 success:写入行数[,unchanged:未变化行数]、unchanged:行数 或 not_modified。
+    曲线不足 96 时段时不保存校验值，下次请求重新完整获取。
+    每次成功取数都推进 market_data_freshness（304 / 内容未变也说明数据是最新的）。
     """
-    session_factory = get_sync_session_factory()
     results: dict[str, str] = {}
+    targets: list[tuple[str, BaseMarketDataAdapter, str | None, str | None]] = []
+    sources_by_province: dict[str, MarketDataSource] = {}
+    errors: dict[str, str] = {}
+
+    for source in sources:
+        province = source.province
+        sources_by_province[province] = source
+        if not source.api_endpoint:
+            logger.warning(
+                "market_data_periodic_no_endpoint",
+                province=province,
+            )
+            results[province] = "skipped_no_endpoint"
+            continue
+        try:
+            api_key = None
+            if source.api_key_encrypted:
+                from app.services.market_data_service import _decrypt_api_key
+                api_key = _decrypt_api_key(source.api_key_encrypted)
+
+            # 校验值只对当日曲线有效，跨日后重新完整获取
+            validated = source.fetch_validated_date == today
+            targets.append((
+                province,
+                get_adapter(
+                    api_endpoint=source.api_endpoint,
+                    api_key=api_key,
+                    api_auth_type=source.api_auth_type,
+                ),
+                source.fetch_etag if validated else None,
+                source.fetch_last_modified if validated else None,
+            ))
+        except Exception as e:
+            errors[province] = str(e)
+
+    outcomes = run_sync(
+        _fetch_all(targets, today, settings.MARKET_DATA_FETCH_CONCURRENCY)
+    ) if targets else []
+
+    responses: dict[str, ConditionalFetchResult] = {}
+    hashes: dict[str, str | None] = {}
+    fetched: dict[str, list[MarketPriceRecord]] = {}
+    for (province, _adapter, _etag, _last_modified), outcome in zip(targets, outcomes):
+        if isinstance(outcome, BaseException):
+            errors[province] = str(outcome)
+            continue
+        responses[province] = outcome
+        source = sources_by_province[province]
+        previous_hash = source.fetch_content_hash if source.fetch_validated_date == today else None
+        if outcome.not_modified:
+            hashes[province] = previous_hash
+            continue
+        hashes[province] = content_hash(outcome.records)
+        # 内容与上次一致：整体跳过 upsert
+        if hashes[province] != previous_hash:
+            fetched[province] = outcome.records
+
+    now = datetime.now(UTC)
+    written: Counter = Counter()
+    try:
+        written, write_errors = _write_prices(session, fetched, now)
+        errors.update(write_errors)
+    except Exception as e:
+        session.rollback()
+        errors.update({province: str(e) for province in fetched})
+
+    # 批量更新数据源状态与条件请求校验值（按主键的 executemany）
+    succeeded = [province for province in responses if province not in errors]
+    arrived = {
+        province for province in succeeded
+        if responses[province].not_modified
+        or len(responses[province].records) >= PERIODS_PER_DAY
+    }
+    status_updates = [
+        {
+            "id": sources_by_province[province].id,
+            "last_fetch_at": now,
+            "last_fetch_status": "success",
+            "last_fetch_error": None,
+            "fetch_validated_date": today,
+            "fetch_etag": responses[province].etag if province in arrived else None,
+            "fetch_last_modified": (
+                responses[province].last_modified if province in arrived else None
+            ),
+            "fetch_content_hash": hashes[province],
+        }
+        for province in succeeded
+    ]
+    failure_updates = [
+        {
+            "id": sources_by_province[province].id,
+            "last_fetch_status": "failed",
+            "last_fetch_error": error[:500],
+        }
+        for province, error in errors.items()
+    ]
+    # 有写入的省份已在 upsert 中推进新鲜度
+    fresh_rows = [
+        {"province": province, "fetched_at": now}
+        for province in succeeded if not written[province]
+    ]
+    try:
+        for params in (status_updates, failure_updates):
+            if params:
+                session.execute(update(MarketDataSource), params)
+        if fresh_rows:
+            session.execute(build_freshness_upsert_stmt(fresh_rows))
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error("market_data_periodic_status_update_failed", error=str(e))
+        raise
+
+    notify_market_data_changed_sync(sorted({
+        (province, r.trading_date)
+        for province in succeeded if written[province]
+        for r in fetched[province]
+    }))
+
+    for province in succeeded:
+        response = responses[province]
+        if response.not_modified:
+            results[province] = "not_modified"
+        else:
+            unchanged = len(response.records) - written[province]
+            results[province] = (
+                f"success:{written[province]}" if not unchanged
+                else f"unchanged:{unchanged}" if not written[province]
+                else f"success:{written[province]},unchanged:{unchanged}"
+            )
+        logger.info(
+            "market_data_periodic_fetched",
+            province=province,
+            not_modified=response.not_modified,
+            records_count=len(response.records),
+            written_count=written[province],
+        )
+    for province, error in errors.items():
+        results[province] = f"failed:{error}"
+        logger.warning(
+            "market_data_periodic_failed",
+            province=province,
+            error=error,
+        )
+
+    return results, arrived
+
+
+def _trading_date(now: datetime) -> date:
+    """当前交易日（北京时间），不依赖 worker 主机时区。"""
+    return now.astimezone(CRON_TIMEZONE).date()
+
+
+@celery_app.task(name="app.tasks.market_data_tasks.fetch_market_data_periodic")
+def fetch_market_data_periodic() -> dict:
+    """一次获取所有活跃数据源的市场数据（手动补取；定时取数由 dispatch_market_data_fetches 按数据源调度）。"""
+    session_factory = get_sync_session_factory()
 
     with session_factory() as session:
         stmt = select(MarketDataSource).where(MarketDataSource.is_active.is_(True))
@@ -30,91 +312,263 @@ def fetch_market_data_periodic() -> dict:
             logger.info("market_data_periodic_no_active_sources")
             return {"status": "no_active_sources"}
 
-        today = date.today()
+        results, _ = _fetch_sources(session, sources, _trading_date(datetime.now(UTC)))
 
-        for source in sources:
-            province = source.province
-            try:
-                api_key = None
-                if source.api_key_encrypted:
-                    from app.services.market_data_service import _decrypt_api_key
-                    api_key = _decrypt_api_key(source.api_key_encrypted)
-
-                if not source.api_endpoint:
-                    logger.warning(
-                        "market_data_periodic_no_endpoint",
-                        province=province,
-                    )
-                    results[province] = "skipped_no_endpoint"
-                    continue
-
-                adapter = get_adapter(
-                    api_endpoint=source.api_endpoint,
-                    api_key=api_key,
-                    api_auth_type=source.api_auth_type,
-                )
+    return results
 
-                # 在事件循环中运行异步适配器
-                records = asyncio.run(adapter.fetch(today))
-
-                # 使用同步方式写入数据库
-                from datetime import datetime, UTC
-                from sqlalchemy.dialects.postgresql import insert as pg_insert
-                from app.models.market_data import MarketClearingPrice
-
-                now = datetime.now(UTC)
-                db_records = [
-                    {
-                        "trading_date": r.trading_date,
-                        "period": r.period,
-                        "province": province,
-                        "clearing_price": r.clearing_price,
-                        "source": "api",
-                        "fetched_at": now,
-                    }
-                    for r in records
-                ]
-
-                if db_records:
-                    insert_stmt = pg_insert(MarketClearingPrice).values(db_records)
-                    insert_stmt = insert_stmt.on_conflict_do_update(
-                        index_elements=["province", "trading_date", "period"],
-                        set_={
-                            "clearing_price": insert_stmt.excluded.clearing_price,
-                            "source": insert_stmt.excluded.source,
-                            "fetched_at": insert_stmt.excluded.fetched_at,
-                        },
-                    )
-                    session.execute(insert_stmt)
-
-                # 更新数据源状态
-                source.last_fetch_at = now
-                source.last_fetch_status = "success"
-                source.last_fetch_error = None
-                session.commit()
 
-                results[province] = f"success:{len(records)}"
-                logger.info(
-                    "market_data_periodic_fetched",
+def _schedule_next(source: MarketDataSource, arrived: bool, now: datetime) -> str:
+    """按取数结果推进 next_fetch_at。
+
+    当日完整曲线已到：回到 fetch_schedule 的下一个时间点；
+    未到：进入发布窗口加密轮询（每 MARKET_DATA_FAST_POLL_SECONDS 秒一次，
+    最长 MARKET_DATA_FAST_POLL_WINDOW_MINUTES 分钟），超出窗口后回到 cron 时间。
+    """
+    try:
+        cron_next = next_run_after(source.fetch_schedule, now)
+    except ValueError:
+        cron_next = next_run_after(_DEFAULT_FETCH_SCHEDULE, now)
+
+    if arrived:
+        source.fast_poll_until = None
+        source.next_fetch_at = cron_next
+        return "scheduled"
+    if source.fast_poll_until is None:
+        source.fast_poll_until = now + timedelta(minutes=settings.MARKET_DATA_FAST_POLL_WINDOW_MINUTES)
+    if now >= source.fast_poll_until:
+        source.fast_poll_until = None
+        source.next_fetch_at = cron_next
+        return "window_exhausted"
+    source.next_fetch_at = min(
+        cron_next, now + timedelta(seconds=settings.MARKET_DATA_FAST_POLL_SECONDS),
+    )
+    return "fast_poll"
+
+
+@celery_app.task(name="app.tasks.market_data_tasks.fetch_market_data_for_source")
+def fetch_market_data_for_source(source_id: str) -> dict:
+    """单个数据源取数（由 dispatch_market_data_fetches 派发），完成后计算下次取数时间。"""
+    session_factory = get_sync_session_factory()
+
+    with session_factory() as session:
+        source = session.get(MarketDataSource, uuid.UUID(source_id))
+        if source is None or not source.is_active:
+            return {"status": "skipped"}
+
+        now = datetime.now(UTC)
+        results, arrived = _fetch_sources(session, [source], _trading_date(now))
+        schedule = _schedule_next(source, source.province in arrived, now)
+        session.commit()
+
+        logger.info(
+            "market_data_source_scheduled",
+            province=source.province,
+            schedule=schedule,
+            next_fetch_at=source.next_fetch_at.isoformat(),
+        )
+    return {**results, "schedule": schedule}
+
+
+@celery_app.task(name="app.tasks.market_data_tasks.dispatch_market_data_fetches")
+def dispatch_market_data_fetches() -> dict:
+    """Celery beat 每分钟触发：为 next_fetch_at 已到期的数据源各派发一个取数任务。
+
+    只扫描 next_fetch_at 索引上的到期行（每轮最多 MARKET_DATA_DISPATCH_BATCH_SIZE 个），
+    以 FOR UPDATE SKIP LOCKED 锁定并先推进到下一个 cron 时间再提交、派发，
+    多个 beat 实例也不会重复派发；取数任务完成后可能按结果改为加密轮询。
+    next_fetch_at 为空（新增或升级前的数据源）时只按 fetch_schedule 初始化，不立即取数。
+    """
+    session_factory = get_sync_session_factory()
+    now = datetime.now(UTC)
+
+    with session_factory() as session:
+        rows = session.execute(
+            select(
+                MarketDataSource.id,
+                MarketDataSource.province,
+                MarketDataSource.fetch_schedule,
+                MarketDataSource.next_fetch_at,
+            )
+            .where(
+                MarketDataSource.is_active.is_(True),
+                MarketDataSource.api_endpoint.is_not(None),
+                or_(
+                    MarketDataSource.next_fetch_at.is_(None),
+                    MarketDataSource.next_fetch_at <= now,
+                ),
+            )
+            .order_by(MarketDataSource.next_fetch_at.asc().nulls_first())
+            .limit(settings.MARKET_DATA_DISPATCH_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return {"dispatched": 0, "initialized": 0}
+
+        due: list[tuple[object, str]] = []
+        updates: list[dict] = []
+        for source_id, province, fetch_schedule, next_fetch_at in rows:
+            try:
+                next_at = next_run_after(fetch_schedule, now)
+            except ValueError:
+                logger.warning(
+                    "market_data_invalid_fetch_schedule",
                     province=province,
-                    records_count=len(records),
+                    fetch_schedule=fetch_schedule,
                 )
+                next_at = next_run_after(_DEFAULT_FETCH_SCHEDULE, now)
+            updates.append({"id": source_id, "next_fetch_at": next_at})
+            if next_fetch_at is not None:
+                due.append((source_id, province))
+
+        session.execute(update(MarketDataSource), updates)
+        session.commit()
 
+        failed = []
+        for source_id, province in due:
+            try:
+                fetch_market_data_for_source.apply_async(kwargs={"source_id": str(source_id)})
             except Exception as e:
-                session.rollback()
-                # 更新失败状态
-                try:
-                    source.last_fetch_status = "failed"
-                    source.last_fetch_error = str(e)[:500]
-                    session.commit()
-                except Exception:
-                    session.rollback()
-
-                results[province] = f"failed:{e}"
-                logger.warning(
-                    "market_data_periodic_failed",
-                    province=province,
-                    error=str(e),
+                failed.append(source_id)
+                logger.error("celery_dispatch_failed", province=province, error=str(e))
+        if failed:
+            # 派发失败的数据源下一轮重新派发
+            session.execute(
+                update(MarketDataSource),
+                [{"id": source_id, "next_fetch_at": now} for source_id in failed],
+            )
+            session.commit()
+
+    logger.info(
+        "market_data_fetches_dispatched",
+        dispatched=len(due) - len(failed),
+        failed=len(failed),
+        initialized=len(rows) - len(due),
+    )
+    return {
+        "dispatched": len(due) - len(failed),
+        "failed": len(failed),
+        "initialized": len(rows) - len(due),
+    }
+
+
+def month_chunks(start_date: date, end_date: date) -> list[tuple[date, date]]:
+    """把 [start_date, end_date] 按自然月切分为 (块首日, 块末日) 列表。"""
+    chunks: list[tuple[date, date]] = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        last_day = calendar.monthrange(chunk_start.year, chunk_start.month)[1]
+        chunk_end = min(end_date, chunk_start.replace(day=last_day))
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _fail_backfill(session, job: MarketDataBackfillJob, error: str) -> dict:
+    job.status = "failed"
+    job.error_message = error[:500]
+    session.commit()
+    logger.warning(
+        "market_data_backfill_failed",
+        job_id=str(job.id),
+        province=job.province,
+        completed_through=job.completed_through.isoformat() if job.completed_through else None,
+        error=error,
+    )
+    return {"status": "failed", "error": error}
+
+
+@celery_app.task(bind=True, max_retries=0, name="app.tasks.market_data_tasks.backfill_market_data")
+def backfill_market_data(self, job_id: str) -> dict:
+    """历史出清价格回补：按自然月分块调用 adapter.fetch_range 并逐块 upsert 提交。
+
+    每块写入后在同一事务中推进 completed_through，失败时 job 标记为 failed；
+    重新派发（恢复）时跳过已完成的月份，从断点所在月份继续。
+    """
+    session_factory = get_sync_session_factory()
+
+    with session_factory() as session:
+        job = session.get(MarketDataBackfillJob, uuid.UUID(job_id))
+        if job is None:
+            logger.error("market_data_backfill_job_not_found", job_id=job_id)
+            return {"status": "not_found"}
+        if job.status == "completed":
+            return {"status": "completed", "records": job.total_records}
+
+        source = session.execute(
+            select(MarketDataSource).where(MarketDataSource.province == job.province)
+        ).scalar_one_or_none()
+        if source is None or not source.api_endpoint:
+            return _fail_backfill(session, job, f"省份 {job.province} 的数据源未配置API端点")
+
+        try:
+            api_key = None
+            if source.api_key_encrypted:
+                from app.services.market_data_service import _decrypt_api_key
+                api_key = _decrypt_api_key(source.api_key_encrypted)
+            adapter = get_adapter(
+                api_endpoint=source.api_endpoint,
+                api_key=api_key,
+                api_auth_type=source.api_auth_type,
+            )
+        except Exception as e:
+            return _fail_backfill(session, job, str(e))
+
+        resume_from = (
+            job.completed_through + timedelta(days=1) if job.completed_through else job.start_date
+        )
+        pending = month_chunks(resume_from, job.end_date)
+        job.total_chunks = len(month_chunks(job.start_date, job.end_date))
+        job.completed_chunks = job.total_chunks - len(pending)
+        job.status = "processing"
+        job.error_message = None
+        job.celery_task_id = self.request.id
+        if job.started_at is None:
+            job.started_at = datetime.now(UTC)
+        session.commit()
+
+        logger.info(
+            "market_data_backfill_started",
+            job_id=job_id,
+            province=job.province,
+            resume_from=resume_from.isoformat(),
+            pending_chunks=len(pending),
+        )
+
+        for chunk_start, chunk_end in pending:
+            try:
+                records = run_sync(adapter.fetch_range(chunk_start, chunk_end))
+                rows = _price_rows(
+                    job.province,
+                    [r for r in records if chunk_start <= r.trading_date <= chunk_end],
+                    datetime.now(UTC),
                 )
+                _upsert_prices(session, rows)
+                job.completed_through = chunk_end
+                job.completed_chunks += 1
+                job.total_records += len(rows)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                return _fail_backfill(session, job, str(e))
+            notify_market_data_changed_sync(sorted({(job.province, r["trading_date"]) for r in rows}))
 
-    return results
+            logger.info(
+                "market_data_backfill_chunk_done",
+                job_id=job_id,
+                province=job.province,
+                chunk_start=chunk_start.isoformat(),
+                chunk_end=chunk_end.isoformat(),
+                records_count=len(rows),
+            )
+
+        job.status = "completed"
+        job.completed_at = datetime.now(UTC)
+        session.commit()
+
+        logger.info(
+            "market_data_backfill_completed",
+            job_id=job_id,
+            province=job.province,
+            total_records=job.total_records,
+        )
+        return {"status": "completed", "records": job.total_records}
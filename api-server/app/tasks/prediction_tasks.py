@@ -1,33 +1,109 @@
 import asyncio
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import UTC, date, datetime, timedelta
 
 import structlog
-from sqlalchemy import select, update
+from sqlalchemy import DateTime, Integer, String, Text, column, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 
+from app.core.config import settings
+from app.core.cron import CRON_TIMEZONE, next_run_after
 from app.core.database import get_sync_session_factory
+from app.core.http_client import TokenBucket, host_key, run_sync
+from app.core.prediction_encryption import decrypt_api_key
 from app.models.prediction import PredictionModel
 from app.repositories.prediction import build_prediction_upsert_stmt
-from app.core.prediction_encryption import decrypt_api_key
-from app.services.prediction_adapters import get_adapter
-from app.services.prediction_service import validate_prediction_records
+from app.services.prediction_adapters import PredictionBatch, get_adapter
+from app.services.prediction_service import validate_prediction_batch
 from app.tasks.celery_app import celery_app
 
 logger = structlog.get_logger()
 
+# call_frequency_cron 无法解析时（升级前的脏数据）使用的默认调度
+_DEFAULT_CALL_FREQUENCY_CRON = "0 6,12 * * *"
+
+# 单条 upsert 语句的最大行数（每行 9 个参数，低于 PostgreSQL 的 32767 参数上限）
+_UPSERT_CHUNK_ROWS = 3000
+
+# 单条批量 UPDATE 的最大行数（每行 7 个参数，低于 PostgreSQL 的 32767 参数上限）
+_HEALTH_UPDATE_CHUNK_ROWS = 4000
+
 
 async def _check_single_model_health(adapter) -> bool:
     """执行单个模型健康检查（在共享事件循环中运行）。"""
     return await adapter.health_check()
 
 
+def _next_check_interval(previous: int | None, healthy: bool) -> int:
+    """自适应探测间隔：失败后快速复查；正常时从基础间隔起每次翻倍，直至上限。"""
+    if not healthy:
+        return settings.PREDICTION_HEALTH_CHECK_ERROR_INTERVAL
+    if previous is None or previous < settings.PREDICTION_HEALTH_CHECK_INTERVAL:
+        return settings.PREDICTION_HEALTH_CHECK_INTERVAL
+    return min(previous * 2, settings.PREDICTION_HEALTH_CHECK_MAX_INTERVAL)
+
+
+def _bulk_update_health(session, rows: list[dict]) -> None:
+    """以 UPDATE ... FROM (VALUES ...) 一次写入多个模型的检查结果。
+
+    只更新仍处于 running/error 的模型，探测期间被管理员停用的模型保持 disabled。
+    """
+    for start in range(0, len(rows), _HEALTH_UPDATE_CHUNK_ROWS):
+        checked = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("status", String),
+            column("last_check_at", DateTime(timezone=True)),
+            column("last_check_status", String),
+            column("last_check_error", Text),
+            column("next_check_at", DateTime(timezone=True)),
+            column("check_interval_seconds", Integer),
+            name="checked",
+        ).data([
+            (
+                row["id"],
+                row["status"],
+                row["last_check_at"],
+                row["last_check_status"],
+                row["last_check_error"],
+                row["next_check_at"],
+                row["check_interval_seconds"],
+            )
+            for row in rows[start:start + _HEALTH_UPDATE_CHUNK_ROWS]
+        ])
+        session.execute(
+            update(PredictionModel)
+            .where(
+                PredictionModel.id == checked.c.id,
+                PredictionModel.status.in_(["running", "error"]),
+            )
+            .values(
+                status=checked.c.status,
+                last_check_at=checked.c.last_check_at,
+                last_check_status=checked.c.last_check_status,
+                last_check_error=checked.c.last_check_error,
+                next_check_at=checked.c.next_check_at,
+                check_interval_seconds=checked.c.check_interval_seconds,
+            )
+        )
+
+
 @celery_app.task(name="app.tasks.prediction_tasks.check_prediction_models_health")
 def check_prediction_models_health() -> dict:
-    """Celery beat 定时任务：每5分钟检查所有活跃预测模型的健康状态。
+    """Celery beat 每分钟触发：按探测目标合并探测活跃预测模型的健康状态。
 
+    端点、认证方式与 API Key 都相同的模型只探测一次，结果应用到该组的全部模型
+    （同一主机的不同端点或凭据分别探测，共享连接池）；
+    只要组内有模型到达 next_check_at 即探测。正常目标的探测间隔逐次翻倍，
+    失败后按 PREDICTION_HEALTH_CHECK_ERROR_INTERVAL 快速复查。
+    全部结果以一条批量 UPDATE 写入并提交一次。
     状态机：running ↔ error，disabled 需管理员手动切换。
     """
     session_factory = get_sync_session_factory()
     results: dict[str, str] = {}
+    now = datetime.now(UTC)
 
     with session_factory() as session:
         session.expire_on_commit = False
@@ -42,99 +118,302 @@ def check_prediction_models_health() -> dict:
             logger.info("prediction_health_check_no_active_models")
             return {"status": "no_active_models"}
 
-        # 准备所有适配器
-        adapters: list[tuple[PredictionModel, object]] = []
+        # 探测目标：(端点, 认证方式, API Key)；相同密文只解密一次
+        api_keys: dict[str, str] = {}
+        by_target: dict[tuple, list[PredictionModel]] = defaultdict(list)
         for model in models:
             api_key = None
             if model.api_key_encrypted:
-                api_key = decrypt_api_key(model.api_key_encrypted)
-            adapter = get_adapter(model, api_key=api_key)
-            adapters.append((model, adapter))
-
-        # 单次 asyncio.run 批量执行所有健康检查
+                if model.api_key_encrypted not in api_keys:
+                    api_keys[model.api_key_encrypted] = decrypt_api_key(model.api_key_encrypted)
+                api_key = api_keys[model.api_key_encrypted]
+            by_target[(model.api_endpoint, model.api_auth_type, api_key)].append(model)
+        due_targets = [
+            (target, target_models)
+            for target, target_models in by_target.items()
+            if any(m.next_check_at is None or m.next_check_at <= now for m in target_models)
+        ]
+        if not due_targets:
+            return {"status": "not_due"}
+
+        adapters = [
+            get_adapter(target_models[0], api_key=api_key)
+            for (_endpoint, _auth_type, api_key), target_models in due_targets
+        ]
+
+        # 单次 run_sync 并发探测所有目标（同一主机共享连接池）
         async def _batch_health_check():
             return await asyncio.gather(
-                *[_check_single_model_health(a) for _, a in adapters],
+                *[_check_single_model_health(a) for a in adapters],
                 return_exceptions=True,
             )
 
-        health_results = asyncio.run(_batch_health_check())
+        health_results = run_sync(_batch_health_check())
 
-        for (model, _adapter), health_result in zip(adapters, health_results):
-            model_id = str(model.id)
-            try:
-                if isinstance(health_result, Exception):
-                    raise health_result
-
-                is_healthy = health_result
-                now = datetime.now(UTC)
-
-                old_status = model.status
-                new_status = "running" if is_healthy else "error"
-                session.execute(
-                    update(PredictionModel)
-                    .where(PredictionModel.id == model.id)
-                    .values(
-                        status=new_status,
-                        last_check_at=now,
-                        last_check_status="success" if is_healthy else "failed",
-                        last_check_error=None if is_healthy else "健康检查失败",
-                    )
+        rows: list[dict] = []
+        for ((endpoint, _auth_type, _api_key), target_models), health_result in zip(
+            due_targets, health_results,
+        ):
+            if isinstance(health_result, BaseException):
+                healthy, error_msg = False, str(health_result)[:500]
+                result_value = f"error:{error_msg}"
+                logger.warning(
+                    "prediction_health_check_exception",
+                    endpoint=endpoint,
+                    models=len(target_models),
+                    error=error_msg,
                 )
-                session.commit()
-
+            else:
+                healthy = bool(health_result)
+                error_msg = None if healthy else "健康检查失败"
+                result_value = "running" if healthy else "error"
+
+            # 同组模型共用一个间隔，取其中最短者为基准
+            intervals = [m.check_interval_seconds for m in target_models if m.check_interval_seconds]
+            interval = _next_check_interval(min(intervals) if intervals else None, healthy)
+            new_status = "running" if healthy else "error"
+            for model in target_models:
+                rows.append({
+                    "id": model.id,
+                    "status": new_status,
+                    "last_check_at": now,
+                    "last_check_status": "success" if healthy else "failed",
+                    "last_check_error": error_msg,
+                    "next_check_at": now + timedelta(seconds=interval),
+                    "check_interval_seconds": interval,
+                })
                 # 状态变更为 error 时发出 WARNING 告警
-                if new_status == "error" and old_status != "error":
+                if new_status == "error" and model.status != "error":
                     logger.warning(
                         "prediction_model_status_changed_to_error",
-                        model_id=model_id,
+                        model_id=str(model.id),
                         model_name=model.model_name,
-                        previous_status=old_status,
+                        previous_status=model.status,
                     )
+                results[str(model.id)] = result_value
+
+            logger.info(
+                "prediction_health_check_result",
+                endpoint=endpoint,
+                models=len(target_models),
+                status=new_status,
+                next_check_in_seconds=interval,
+            )
 
-                results[model_id] = new_status
-                logger.info(
-                    "prediction_health_check_result",
-                    model_id=model_id,
-                    model_name=model.model_name,
-                    status=new_status,
-                )
+        try:
+            _bulk_update_health(session, rows)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error("prediction_health_check_write_failed", error=str(e)[:500])
+            raise
+
+    return results
 
+
+@dataclass
+class _FetchOutcome:
+    """单个模型的拉取结果（待写入）。"""
+
+    model: PredictionModel
+    fetched_at: datetime
+    latency_ms: int
+    status: str
+    error: str | None = None
+    rows: list[dict] | None = None
+
+
+def _to_outcome(
+    model: PredictionModel,
+    prediction_date: date,
+    fetch_result: PredictionBatch | BaseException,
+    fetched_at: datetime,
+    latency_ms: int,
+) -> _FetchOutcome:
+    """校验单个模型的拉取结果，转换为待写入的行与状态。"""
+    if isinstance(fetch_result, BaseException):
+        error_msg = str(fetch_result)[:500]
+        logger.warning(
+            "prediction_fetch_exception",
+            model_id=str(model.id),
+            model_name=model.model_name,
+            error=error_msg,
+            latency_ms=latency_ms,
+        )
+        return _FetchOutcome(model, fetched_at, latency_ms, "failed", error_msg)
+
+    valid, quality_errors = validate_prediction_batch(fetch_result)
+    error_msg = "; ".join(quality_errors[:5]) if quality_errors else None
+    if not len(valid):
+        logger.warning(
+            "prediction_fetch_quality_failed",
+            model_id=str(model.id),
+            model_name=model.model_name,
+            errors=quality_errors,
+        )
+        return _FetchOutcome(model, fetched_at, latency_ms, "failed", error_msg)
+
+    rows = [
+        {
+            "prediction_date": prediction_date,
+            "period": period,
+            "station_id": model.station_id,
+            "model_id": model.id,
+            "predicted_power_kw": predicted,
+            "confidence_upper_kw": upper,
+            "confidence_lower_kw": lower,
+            "source": "api",
+        }
+        for period, predicted, upper, lower in zip(
+            valid.period.tolist(), valid.predicted.tolist(), valid.upper.tolist(), valid.lower.tolist(),
+        )
+    ]
+    fetch_status = "success" if len(valid) == 96 else "partial"
+    return _FetchOutcome(model, fetched_at, latency_ms, fetch_status, error_msg, rows)
+
+
+def _write_outcomes(session, outcomes: list[_FetchOutcome]) -> None:
+    """执行 upsert 与模型拉取状态更新（不提交）。多个模型的预测行合并为一条 upsert。"""
+    rows = [row for outcome in outcomes if outcome.rows for row in outcome.rows]
+    for start in range(0, len(rows), _UPSERT_CHUNK_ROWS):
+        session.execute(build_prediction_upsert_stmt(rows[start:start + _UPSERT_CHUNK_ROWS]))
+    for outcome in outcomes:
+        session.execute(
+            update(PredictionModel)
+            .where(PredictionModel.id == outcome.model.id)
+            .values(
+                last_fetch_at=outcome.fetched_at,
+                last_fetch_status=outcome.status,
+                last_fetch_error=outcome.error,
+            )
+        )
+
+
+def _flush_outcomes(session, outcomes: list[_FetchOutcome], results: dict[str, str]) -> None:
+    """提交一批模型的写入；整批失败时回滚并逐个模型重试，隔离出错的模型。"""
+    try:
+        _write_outcomes(session, outcomes)
+        session.commit()
+    except Exception:
+        session.rollback()
+        for outcome in outcomes:
+            try:
+                _write_outcomes(session, [outcome])
+                session.commit()
             except Exception as e:
                 session.rollback()
-                error_msg = str(e)[:500]
+                outcome.status, outcome.error, outcome.rows = "failed", str(e)[:500], None
+                logger.warning(
+                    "prediction_fetch_exception",
+                    model_id=str(outcome.model.id),
+                    model_name=outcome.model.model_name,
+                    error=outcome.error,
+                )
                 try:
-                    session.execute(
-                        update(PredictionModel)
-                        .where(PredictionModel.id == model.id)
-                        .values(
-                            status="error",
-                            last_check_at=datetime.now(UTC),
-                            last_check_status="failed",
-                            last_check_error=error_msg,
-                        )
-                    )
+                    _write_outcomes(session, [outcome])
                     session.commit()
                 except Exception:
                     session.rollback()
 
-                results[model_id] = f"error:{error_msg}"
-                logger.warning(
-                    "prediction_health_check_exception",
-                    model_id=model_id,
-                    model_name=model.model_name,
-                    error=error_msg,
-                )
+    for outcome in outcomes:
+        model_id = str(outcome.model.id)
+        results[model_id] = outcome.status
+        if outcome.status != "failed":
+            logger.info(
+                "prediction_fetch_result",
+                model_id=model_id,
+                model_name=outcome.model.model_name,
+                status=outcome.status,
+                records_count=len(outcome.rows or ()),
+                latency_ms=outcome.latency_ms,
+            )
 
-    return results
+
+def _business_date(now: datetime) -> date:
+    """按 call_frequency_cron 所用的北京时间取当日（容器默认 UTC，00:00–08:00 时本地日期仍是前一天）。"""
+    return now.astimezone(CRON_TIMEZONE).date()
+
+
+def _prediction_date(model: PredictionModel, today: date) -> date:
+    """模型本次拉取的目标日：日内滚动预测为当日，日前预测为次日。"""
+    if model.prediction_horizon == "intraday":
+        return today
+    return today + timedelta(days=1)
+
+
+def _build_targets(
+    models: list[PredictionModel], today: date,
+) -> list[tuple[PredictionModel, object, date]]:
+    """为各模型准备 (模型, 适配器, 目标日)。"""
+    targets: list[tuple[PredictionModel, object, date]] = []
+    for model in models:
+        api_key = None
+        if model.api_key_encrypted:
+            api_key = decrypt_api_key(model.api_key_encrypted)
+        adapter = get_adapter(model, api_key=api_key)
+        targets.append((model, adapter, _prediction_date(model, today)))
+    return targets
+
+
+async def _fetch_and_store(
+    session,
+    targets: list[tuple[PredictionModel, object, date]],
+) -> tuple[dict[str, str], dict[str, int]]:
+    """有界并发拉取各模型预测，结果到达即校验并按批写入。
+
+    同时在途的请求不超过 PREDICTION_FETCH_CONCURRENCY，同一 API 主机共享一个令牌桶。
+    写入在事件循环内同步执行，期间其余请求的响应在连接上等待，不会丢失。
+    返回 ({模型 ID: 状态}, {模型 ID: 请求耗时毫秒})。
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.PREDICTION_FETCH_CONCURRENCY))
+    buckets: dict[str, TokenBucket] = {}
+    for model, _adapter, _date in targets:
+        buckets.setdefault(
+            host_key(model.api_endpoint),
+            TokenBucket(settings.PREDICTION_FETCH_HOST_RATE_LIMIT),
+        )
+
+    async def _fetch_one(model: PredictionModel, adapter, prediction_date: date) -> _FetchOutcome:
+        async with semaphore:
+            # 在并发槽位内取令牌，保证实际发出的请求速率不超过上限
+            await buckets[host_key(model.api_endpoint)].acquire()
+            start = time.monotonic()
+            try:
+                fetch_result = await adapter.fetch_prediction_batch(str(model.station_id), prediction_date)
+            except Exception as e:
+                fetch_result = e
+            latency_ms = round((time.monotonic() - start) * 1000)
+        now = datetime.now(UTC)
+        try:
+            return _to_outcome(model, prediction_date, fetch_result, now, latency_ms)
+        except Exception as e:
+            return _to_outcome(model, prediction_date, e, now, latency_ms)
+
+    results: dict[str, str] = {}
+    latencies: dict[str, int] = {}
+    pending: list[_FetchOutcome] = []
+    batch_size = max(1, settings.PREDICTION_FETCH_WRITE_BATCH_MODELS)
+    fetches = [_fetch_one(model, adapter, prediction_date) for model, adapter, prediction_date in targets]
+    for future in asyncio.as_completed(fetches):
+        outcome = await future
+        latencies[str(outcome.model.id)] = outcome.latency_ms
+        pending.append(outcome)
+        if len(pending) >= batch_size:
+            _flush_outcomes(session, pending, results)
+            pending = []
+    if pending:
+        _flush_outcomes(session, pending, results)
+    return results, latencies
 
 
 @celery_app.task(name="app.tasks.prediction_tasks.fetch_prediction_data_for_all_models")
 def fetch_prediction_data_for_all_models() -> dict:
-    """每日自动拉取所有 running 模型的预测数据（T+1日）。"""
+    """立即拉取所有 running 模型的预测数据（按各模型 prediction_horizon 取 T+1 或 T+0）。
+
+    定时拉取由 dispatch_prediction_fetches 按模型调度，本任务用于手动补拉。
+    返回 {模型 ID: 状态}，另含 latency_ms: {模型 ID: 请求耗时毫秒}。
+    """
     session_factory = get_sync_session_factory()
-    results: dict[str, str] = {}
-    prediction_date = date.today() + timedelta(days=1)
 
     with session_factory() as session:
         session.expire_on_commit = False
@@ -149,124 +428,128 @@ def fetch_prediction_data_for_all_models() -> dict:
             logger.info("prediction_fetch_no_running_models")
             return {"status": "no_running_models"}
 
-        # 准备适配器
-        adapters: list[tuple[PredictionModel, object]] = []
-        for model in models:
-            api_key = None
-            if model.api_key_encrypted:
-                api_key = decrypt_api_key(model.api_key_encrypted)
-            adapter = get_adapter(model, api_key=api_key)
-            adapters.append((model, adapter))
+        targets = _build_targets(models, _business_date(datetime.now(UTC)))
+        results, latencies = run_sync(_fetch_and_store(session, targets))
 
-        # 批量并发拉取
-        async def _batch_fetch():
-            return await asyncio.gather(
-                *[
-                    adapter.fetch_predictions(str(model.station_id), prediction_date)
-                    for model, adapter in adapters
-                ],
-                return_exceptions=True,
-            )
+    return {**results, "latency_ms": latencies}
 
-        fetch_results = asyncio.run(_batch_fetch())
 
-        for (model, _adapter), fetch_result in zip(adapters, fetch_results):
-            model_id = str(model.id)
-            now = datetime.now(UTC)
+@celery_app.task(name="app.tasks.prediction_tasks.fetch_prediction_data_for_models")
+def fetch_prediction_data_for_models(model_ids: list[str]) -> dict:
+    """拉取一组模型的预测数据（由 dispatch_prediction_fetches 按 API 主机分组派发）。
 
-            try:
-                if isinstance(fetch_result, Exception):
-                    raise fetch_result
-
-                records = fetch_result
-                valid_records, quality_errors = validate_prediction_records(records)
-
-                if not valid_records:
-                    error_msg = "; ".join(quality_errors[:5])
-                    session.execute(
-                        update(PredictionModel)
-                        .where(PredictionModel.id == model.id)
-                        .values(
-                            last_fetch_at=now,
-                            last_fetch_status="failed",
-                            last_fetch_error=error_msg,
-                        )
-                    )
-                    session.commit()
-                    results[model_id] = "failed"
-                    logger.warning(
-                        "prediction_fetch_quality_failed",
-                        model_id=model_id,
-                        model_name=model.model_name,
-                        errors=quality_errors,
-                    )
-                    continue
-
-                # 写入有效数据
-                record_dicts = [
-                    {
-                        "prediction_date": prediction_date,
-                        "period": r.period,
-                        "station_id": model.station_id,
-                        "model_id": model.id,
-                        "predicted_power_kw": r.predicted_power_kw,
-                        "confidence_upper_kw": r.confidence_upper_kw,
-                        "confidence_lower_kw": r.confidence_lower_kw,
-                        "source": "api",
-                    }
-                    for r in valid_records
-                ]
-
-                upsert_stmt = build_prediction_upsert_stmt(record_dicts)
-                session.execute(upsert_stmt)
-
-                fetch_status = "success" if len(valid_records) == 96 else "partial"
-                error_msg = "; ".join(quality_errors[:5]) if quality_errors else None
-
-                session.execute(
-                    update(PredictionModel)
-                    .where(PredictionModel.id == model.id)
-                    .values(
-                        last_fetch_at=now,
-                        last_fetch_status=fetch_status,
-                        last_fetch_error=error_msg,
-                    )
-                )
-                session.commit()
+    派发后被停用或转为非 running 状态的模型跳过。
+    """
+    session_factory = get_sync_session_factory()
 
-                results[model_id] = fetch_status
-                logger.info(
-                    "prediction_fetch_result",
-                    model_id=model_id,
-                    model_name=model.model_name,
-                    status=fetch_status,
-                    records_count=len(valid_records),
-                    prediction_date=prediction_date.isoformat(),
-                )
+    with session_factory() as session:
+        session.expire_on_commit = False
 
-            except Exception as e:
-                session.rollback()
-                error_msg = str(e)[:500]
-                try:
-                    session.execute(
-                        update(PredictionModel)
-                        .where(PredictionModel.id == model.id)
-                        .values(
-                            last_fetch_at=now,
-                            last_fetch_status="failed",
-                            last_fetch_error=error_msg,
-                        )
-                    )
-                    session.commit()
-                except Exception:
-                    session.rollback()
+        stmt = select(PredictionModel).where(
+            PredictionModel.id.in_([uuid.UUID(model_id) for model_id in model_ids]),
+            PredictionModel.is_active.is_(True),
+            PredictionModel.status == "running",
+        )
+        models = list(session.execute(stmt).scalars().all())
+        if not models:
+            return {"status": "skipped"}
+
+        targets = _build_targets(models, _business_date(datetime.now(UTC)))
+        results, latencies = run_sync(_fetch_and_store(session, targets))
+
+    return {**results, "latency_ms": latencies}
 
-                results[model_id] = "failed"
+
+@celery_app.task(name="app.tasks.prediction_tasks.dispatch_prediction_fetches")
+def dispatch_prediction_fetches() -> dict:
+    """Celery beat 每分钟触发：按各模型的 call_frequency_cron 派发到期的预测拉取。
+
+    只扫描 next_fetch_at 索引上的到期行（每轮最多 PREDICTION_DISPATCH_BATCH_SIZE 个），
+    以 FOR UPDATE SKIP LOCKED 锁定并先推进到下一个 cron 时间再提交、派发，
+    多个 beat 实例也不会重复派发；beat 停机期间错过的多次触发只补拉一次。
+    到期模型按 API 主机分组，每组最多 PREDICTION_DISPATCH_GROUP_SIZE 个合并为一个任务，
+    使同一主机的请求共享连接池与令牌桶。
+    next_fetch_at 为空（新增或升级前的模型）时只按 call_frequency_cron 初始化，不立即拉取。
+    """
+    session_factory = get_sync_session_factory()
+    now = datetime.now(UTC)
+
+    with session_factory() as session:
+        rows = session.execute(
+            select(
+                PredictionModel.id,
+                PredictionModel.api_endpoint,
+                PredictionModel.call_frequency_cron,
+                PredictionModel.next_fetch_at,
+            )
+            .where(
+                PredictionModel.is_active.is_(True),
+                PredictionModel.status == "running",
+                or_(
+                    PredictionModel.next_fetch_at.is_(None),
+                    PredictionModel.next_fetch_at <= now,
+                ),
+            )
+            .order_by(PredictionModel.next_fetch_at.asc().nulls_first())
+            .limit(settings.PREDICTION_DISPATCH_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return {"dispatched": 0, "initialized": 0}
+
+        by_host: dict[str, list] = defaultdict(list)
+        updates: list[dict] = []
+        for model_id, api_endpoint, call_frequency_cron, next_fetch_at in rows:
+            try:
+                next_at = next_run_after(call_frequency_cron, now)
+            except ValueError:
                 logger.warning(
-                    "prediction_fetch_exception",
-                    model_id=model_id,
-                    model_name=model.model_name,
-                    error=error_msg,
+                    "prediction_invalid_call_frequency_cron",
+                    model_id=str(model_id),
+                    call_frequency_cron=call_frequency_cron,
                 )
-
-    return results
+                next_at = next_run_after(_DEFAULT_CALL_FREQUENCY_CRON, now)
+            updates.append({"id": model_id, "next_fetch_at": next_at})
+            if next_fetch_at is not None:
+                by_host[host_key(api_endpoint)].append(model_id)
+
+        session.execute(update(PredictionModel), updates)
+        session.commit()
+
+        group_size = max(1, settings.PREDICTION_DISPATCH_GROUP_SIZE)
+        groups = [
+            model_ids[start:start + group_size]
+            for model_ids in by_host.values()
+            for start in range(0, len(model_ids), group_size)
+        ]
+        due = sum(len(group) for group in groups)
+        failed = []
+        for group in groups:
+            try:
+                fetch_prediction_data_for_models.apply_async(
+                    kwargs={"model_ids": [str(model_id) for model_id in group]},
+                )
+            except Exception as e:
+                failed.extend(group)
+                logger.error("celery_dispatch_failed", models=len(group), error=str(e))
+        if failed:
+            # 派发失败的模型下一轮重新派发
+            session.execute(
+                update(PredictionModel),
+                [{"id": model_id, "next_fetch_at": now} for model_id in failed],
+            )
+            session.commit()
+
+    logger.info(
+        "prediction_fetches_dispatched",
+        dispatched=due - len(failed),
+        failed=len(failed),
+        tasks=len(groups),
+        initialized=len(rows) - due,
+    )
+    return {
+        "dispatched": due - len(failed),
+        "failed": len(failed),
+        "tasks": len(groups),
+        "initialized": len(rows) - due,
+    }
@@ -0,0 +1,98 @@
+"""外部 API 客户端基准测试 — 对比每次请求新建 httpx.AsyncClient 与共享连接池的取数延迟
+
+用法：
+    # 先启动 mock-market-api（可设置 MOCK_DELAY_SECONDS 模拟交易中心响应延迟）
+    cd mock-market-api && uvicorn main:app --port 8080
+    cd api-server
+    python -m scripts.benchmark_http_clients [--endpoint http://localhost:8080/market-data]
+        [--requests 500] [--concurrency 10]
+
+两种模式各发送 --requests 次 GenericMarketDataAdapter 等价的取数请求（并发 --concurrency）：
+- per_request：每次请求新建并关闭 AsyncClient（改造前的行为，每次重新建立 TCP/TLS 连接）
+- shared：通过 app.core.http_client.get_http_client 复用按主机共享的连接池
+输出 p50/p99/最大延迟与吞吐量。
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from app.core.http_client import close_http_clients, get_http_client
+from app.services.market_data_adapters.generic import GenericMarketDataAdapter
+
+
+async def _per_request(adapter: GenericMarketDataAdapter, trading_date: date) -> None:
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.get(
+            adapter.api_endpoint,
+            params={"trading_date": trading_date.isoformat()},
+            headers=adapter._build_headers(),
+        )
+        response.raise_for_status()
+        adapter._parse_response(trading_date, response.json())
+
+
+async def _shared(adapter: GenericMarketDataAdapter, trading_date: date) -> None:
+    response = await get_http_client(adapter.api_endpoint).get(
+        adapter.api_endpoint,
+        params={"trading_date": trading_date.isoformat()},
+        headers=adapter._build_headers(),
+        timeout=30,
+    )
+    response.raise_for_status()
+    adapter._parse_response(trading_date, response.json())
+
+
+async def run_mode(fetch_fn, adapter, total: int, concurrency: int) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    start_date = date(2025, 1, 1)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch_fn(adapter, start_date + timedelta(days=i % 365))
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies, time.perf_counter() - started
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def main_async(args) -> None:
+    adapter = GenericMarketDataAdapter(args.endpoint, api_key=args.api_key)
+    # 预热：确保服务可达
+    await _per_request(adapter, date(2025, 1, 1))
+
+    print(f"endpoint: {args.endpoint}  requests: {args.requests}  concurrency: {args.concurrency}")
+    print(f"{'mode':>12} {'p50(ms)':>9} {'p99(ms)':>9} {'max(ms)':>9} {'mean(ms)':>9} {'req/s':>9}")
+    for name, fetch_fn in (("per_request", _per_request), ("shared", _shared)):
+        latencies, elapsed = await run_mode(fetch_fn, adapter, args.requests, args.concurrency)
+        print(
+            f"{name:>12} {_percentile(latencies, 0.50) * 1000:>9.1f} "
+            f"{_percentile(latencies, 0.99) * 1000:>9.1f} {max(latencies) * 1000:>9.1f} "
+            f"{statistics.mean(latencies) * 1000:>9.1f} {args.requests / elapsed:>9.0f}"
+        )
+    await close_http_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoint", default="http://localhost:8080/market-data")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""导入批次大小基准测试 — 对比固定批次大小与自适应批次在三种导入类型下的吞吐量
+
+用法：
+    cd api-server
+    python -m scripts.benchmark_import_batch_sizes [--rows 200000] [--sizes 250,1000,4000,16000]
+        [--rtt-ms 2] [--cell-us 0.5] [--commit-ms 5] [--commit-every 1,4]
+
+生成交易数据、电站出力、储能运行（standard 格式）三种 CSV，使用内存中的 stub session
+（不连接数据库），以“每次写入固定往返耗时 --rtt-ms + 每个单元格 --cell-us”的模型
+模拟批量写入（储能记录列数更多，单行写入更慢），--commit-ms 模拟每次提交的耗时。
+调大 --rtt-ms 模拟远端/慢数据库，调大 --cell-us 模拟宽行或写入瓶颈。
+
+对每种导入类型分别以固定批次大小（关闭自适应）和自适应批次执行逐行引擎，
+输出耗时、吞吐量、批次数与自适应最终批次大小。
+"""
+
+import argparse
+import csv
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from app.core.config import settings
+from app.models.data_import import DataImportJob
+from app.models.station import PowerStation
+from app.tasks import import_tasks
+
+START_DATE = date(2025, 1, 1)
+
+
+def _trading_row(i: int, day: date, period: int) -> list:
+    price = "abc" if i % 500 == 7 else f"{300 + (i % 200) * 0.5:.2f}"
+    return [day.isoformat(), period, price]
+
+
+def _output_row(i: int, day: date, period: int) -> list:
+    return [day.isoformat(), period, f"{(i % 400) * 12.5:.2f}"]
+
+
+def _storage_row(i: int, day: date, period: int) -> list:
+    soc = "1.5" if i % 500 == 7 else f"{(i % 100) / 100:.2f}"
+    return [day.isoformat(), period, soc, f"{(i % 50) * 10:.1f}", f"{(i % 30) * 10:.1f}", i // 96]
+
+
+# import_type -> (列头, 行生成函数, 执行函数, 插入函数名, 额外参数, 单行写入列数)
+IMPORT_TYPES = {
+    "trading_data": (
+        ["trading_date", "period", "clearing_price"], _trading_row,
+        import_tasks._execute_import, "_insert_trading_records", {}, 6,
+    ),
+    "station_output": (
+        ["trading_date", "period", "actual_output_kw"], _output_row,
+        import_tasks._execute_station_output_import, "_insert_output_records", {}, 6,
+    ),
+    "storage_operation": (
+        ["trading_date", "period", "soc", "charge_power_kw", "discharge_power_kw", "cycle_count"],
+        _storage_row, import_tasks._execute_storage_operation_import, "_insert_storage_records",
+        {"ems_format": "standard"}, 9,
+    ),
+}
+
+
+def build_csv(target: Path, header: list[str], row_fn, total_rows: int) -> None:
+    with open(target, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(total_rows):
+            day, period = divmod(i, 96)
+            writer.writerow(row_fn(i, START_DATE + timedelta(days=day), period + 1))
+
+
+class _WriteModel:
+    """模拟批量写入耗时：每次调用 rtt + 行数 × 列数 × 单元格耗时。"""
+
+    def __init__(self, rtt: float, cell: float, commit: float):
+        self.rtt, self.cell, self.commit_cost = rtt, cell, commit
+        self.calls = 0
+
+    def write(self, rows: int, columns: int) -> None:
+        self.calls += 1
+        time.sleep(self.rtt + rows * columns * self.cell)
+
+    def commit(self) -> None:
+        time.sleep(self.commit_cost)
+
+
+def _stub_session(job: DataImportJob, model: _WriteModel) -> MagicMock:
+    station = MagicMock()
+    station.province = "广东"
+    # 省份规则与储能设备共用同一个查询结果对象
+    found = MagicMock()
+    found.price_cap_lower, found.price_cap_upper = -100, 1500
+    found.id = uuid.uuid4()
+
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = found
+    result.all.return_value = []
+
+    session = MagicMock()
+    session.get.side_effect = lambda m, _id: (
+        job if m is DataImportJob else station if m is PowerStation else None
+    )
+    session.execute.return_value = result
+    session.commit.side_effect = model.commit
+    return session
+
+
+def run_once(
+    import_type: str, data_dir: Path, file_name: str, model: _WriteModel,
+    batch_size: int | None, commit_every: int,
+) -> tuple[float, int, int]:
+    _, _, execute_fn, insert_name, kwargs, columns = IMPORT_TYPES[import_type]
+    job = MagicMock()
+    job.id = uuid.uuid4()
+    job.station_id = uuid.uuid4()
+    job.file_name = file_name
+    job.original_file_name = file_name
+    job.import_type = import_type
+    session = _stub_session(job, model)
+
+    contexts = []
+    original_init = import_tasks.ImportContext.__init__
+
+    def tracking_init(ctx, *args, **kw):
+        original_init(ctx, *args, **kw)
+        contexts.append(ctx)
+
+    def insert(_session, records):
+        model.write(len(records), columns)
+        return len(records), 0
+
+    with patch.object(settings, "DATA_IMPORT_DIR", str(data_dir)), \
+            patch.object(settings, "IMPORT_ENGINE", "row"), \
+            patch.object(settings, "IMPORT_BATCH_ADAPTIVE", batch_size is None), \
+            patch.object(settings, "IMPORT_COMMIT_EVERY_BATCHES", commit_every), \
+            patch.object(import_tasks, "BATCH_SIZE", batch_size or import_tasks.BATCH_SIZE), \
+            patch.object(import_tasks.ImportContext, "__init__", tracking_init), \
+            patch.object(import_tasks, insert_name, insert), \
+            patch.object(import_tasks, "_write_anomalies", lambda _s, a: a and model.write(len(a), 8)), \
+            patch.object(import_tasks, "_check_period_completeness"), \
+            patch("app.tasks.import_validators._ensure_listener"):
+        started = time.perf_counter()
+        execute_fn(session, MagicMock(), str(job.id), 0, **kwargs)
+        elapsed = time.perf_counter() - started
+
+    return elapsed, contexts[-1].metrics.batches, contexts[-1].batch_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--sizes", default="250,1000,4000,16000")
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--cell-us", type=float, default=0.5)
+    parser.add_argument("--commit-ms", type=float, default=5.0)
+    parser.add_argument("--commit-every", default="1,4")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    commit_everies = [int(c) for c in args.commit_every.split(",")]
+    model = _WriteModel(args.rtt_ms / 1000, args.cell_us / 1e6, args.commit_ms / 1000)
+    print(
+        f"行数: {args.rows}  写入往返: {args.rtt_ms}ms  单元格: {args.cell_us}us  "
+        f"提交: {args.commit_ms}ms  目标 flush 耗时: {settings.IMPORT_FLUSH_TARGET_SECONDS}s"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        for import_type, (header, row_fn, *_rest) in IMPORT_TYPES.items():
+            file_name = f"{import_type}.csv"
+            build_csv(data_dir / file_name, header, row_fn, args.rows)
+            print(f"\n[{import_type}]")
+            print(f"{'批次大小':>10} {'提交间隔':>8} {'耗时':>9} {'吞吐量(rows/s)':>16} {'批次数':>7} {'最终批次':>8}")
+            for commit_every in commit_everies:
+                for size in [*sizes, None]:
+                    elapsed, batches, final_size = run_once(
+                        import_type, data_dir, file_name, model, size, commit_every,
+                    )
+                    label = str(size) if size else "adaptive"
+                    print(
+                        f"{label:>10} {commit_every:>8} {elapsed:8.2f}s "
+                        f"{args.rows / elapsed:>16,.0f} {batches:>7} {final_size:>8}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""预测解析/校验基准测试 — 对比逐条 Decimal 路径与 PredictionBatch 列式路径
+
+用法：
+    cd api-server
+    python -m scripts.benchmark_prediction_validation [--models 500] [--error-rate 0.02] [--repeat 5]
+
+为 --models 个模型各生成一份 96 时段的 JSON 响应（按 --error-rate 注入时段越界、
+负功率、置信区间倒挂），两种路径分别完成 “JSON 条目 → 解析 → 校验”：
+- decimal：改造前的 GenericPredictionAdapter._parse_response + validate_prediction_records
+  （每个功率值构造 Decimal，逐条比较）
+- batch：PredictionBatch.from_items + validate_prediction_batch（NumPy 整列掩码）
+输出每种路径 --repeat 次中的最短耗时、每模型耗时，并校验两者的错误信息与有效时段完全一致。
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from app.services.prediction_adapters.base import PredictionBatch, PredictionRecord
+from app.services.prediction_service import validate_prediction_batch
+
+
+def build_responses(models: int, error_rate: float, seed: int = 42) -> list[list[dict]]:
+    """生成 models 份 96 时段的预测响应，按 error_rate 注入三类错误。"""
+    rng = random.Random(seed)
+    responses = []
+    for _ in range(models):
+        items = []
+        for period in range(1, 97):
+            predicted = round(rng.uniform(0, 5000), 2)
+            item = {
+                "period": period,
+                "predicted_power_kw": predicted,
+                "confidence_upper_kw": round(predicted * 1.1, 2),
+                "confidence_lower_kw": round(predicted * 0.9, 2),
+            }
+            if rng.random() < error_rate:
+                kind = rng.randrange(3)
+                if kind == 0:
+                    item["period"] = 97
+                elif kind == 1:
+                    item["predicted_power_kw"] = -round(rng.uniform(1, 100), 2)
+                    item["confidence_lower_kw"] = -200
+                else:
+                    item["confidence_upper_kw"] = round(predicted * 0.5, 2)
+            items.append(item)
+        responses.append(items)
+    return responses
+
+
+def _legacy_parse(items: list[dict]) -> list[PredictionRecord]:
+    return [
+        PredictionRecord(
+            period=int(item["period"]),
+            predicted_power_kw=Decimal(str(item["predicted_power_kw"])),
+            confidence_upper_kw=Decimal(str(item["confidence_upper_kw"])),
+            confidence_lower_kw=Decimal(str(item["confidence_lower_kw"])),
+        )
+        for item in items
+    ]
+
+
+def _legacy_validate(records: list[PredictionRecord]) -> tuple[list[PredictionRecord], list[str]]:
+    valid, errors = [], []
+    for r in records:
+        if not (1 <= r.period <= 96):
+            errors.append(f"Invalid period {r.period}")
+            continue
+        if r.predicted_power_kw < 0:
+            errors.append(f"Period {r.period}: negative power {r.predicted_power_kw}")
+            continue
+        if not (r.confidence_lower_kw <= r.predicted_power_kw <= r.confidence_upper_kw):
+            errors.append(f"Period {r.period}: confidence violation")
+            continue
+        valid.append(r)
+    if len(valid) < 96:
+        errors.append(f"Incomplete: {len(valid)}/96 valid records")
+    return valid, errors
+
+
+def run_decimal(responses: list[list[dict]]) -> list[tuple[list[int], list[str]]]:
+    results = []
+    for items in responses:
+        valid, errors = _legacy_validate(_legacy_parse(items))
+        results.append(([r.period for r in valid], errors))
+    return results
+
+
+def run_batch(responses: list[list[dict]]) -> list[tuple[list[int], list[str]]]:
+    results = []
+    for items in responses:
+        valid, errors = validate_prediction_batch(PredictionBatch.from_items(items))
+        results.append((valid.period.tolist(), errors))
+    return results
+
+
+def _best_of(fn, responses, repeat: int) -> tuple[float, list]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(responses)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", type=int, default=500)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    responses = build_responses(args.models, args.error_rate)
+    print(f"models: {args.models}  periods: {args.models * 96}  error_rate: {args.error_rate}")
+    print(f"{'path':>8} {'best(ms)':>10} {'per model(us)':>14}")
+    results = {}
+    for name, fn in (("decimal", run_decimal), ("batch", run_batch)):
+        elapsed, results[name] = _best_of(fn, responses, args.repeat)
+        print(f"{name:>8} {elapsed * 1000:>10.1f} {elapsed / args.models * 1e6:>14.1f}")
+
+    if results["decimal"] != results["batch"]:
+        raise SystemExit("两种路径的校验结果不一致")
+    print("校验结果一致")
+
+
+if __name__ == "__main__":
+    main()
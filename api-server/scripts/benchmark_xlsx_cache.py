@@ -0,0 +1,79 @@
+"""xlsx 列式缓存基准测试 — 对比 openpyxl 逐行读取与 Arrow 缓存读取
+
+用法：
+    cd api-server
+    python -m scripts.benchmark_xlsx_cache [--rows 200000] [--resume-from 150000]
+
+生成指定行数的交易数据 xlsx，分别计时：
+openpyxl 全量读取、一次性转换为缓存、缓存全量读取，以及从 --resume-from 行断点恢复时
+openpyxl（min_row 跳过）与缓存（按 batch 跳过）的读取耗时，并校验两者行内容一致。
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.tasks.import_tasks import _read_xlsx_rows
+from app.tasks.import_xlsx_cache import ensure_xlsx_cache, read_cached_rows
+
+
+def build_xlsx(target: Path, total_rows: int) -> None:
+    import openpyxl
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(["交易日期", "时段", "出清价格"])
+    start = date(2025, 1, 1)
+    for i in range(total_rows):
+        day, period = divmod(i, 96)
+        ws.append([(start + timedelta(days=day)).isoformat(), period + 1, 300 + (i % 200) * 0.5])
+    wb.save(target)
+
+
+def _timed(label: str, fn, rows: int):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:>24}: {elapsed:8.2f}s  {rows / elapsed:>12,.0f} rows/s")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--resume-from", type=int, default=None)
+    args = parser.parse_args()
+    resume_from = args.resume_from if args.resume_from is not None else args.rows * 3 // 4
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            patch.object(settings, "DATA_IMPORT_DIR", tmp):
+        path = Path(tmp) / "benchmark.xlsx"
+        build_xlsx(path, args.rows)
+        print(f"行数: {args.rows}  文件大小: {path.stat().st_size / 1024 / 1024:.1f}MB")
+
+        openpyxl_rows = _timed("openpyxl 全量读取", lambda: list(_read_xlsx_rows(path)), args.rows)
+        _timed("转换为 Arrow 缓存", lambda: ensure_xlsx_cache(path, "benchmark"), args.rows)
+        cached_rows = _timed("缓存全量读取", lambda: list(read_cached_rows("benchmark")), args.rows)
+        if cached_rows != openpyxl_rows:
+            raise SystemExit("缓存读取结果与 openpyxl 不一致")
+
+        remaining = args.rows - resume_from
+        resumed_openpyxl = _timed(
+            f"openpyxl 断点恢复({resume_from})",
+            lambda: list(_read_xlsx_rows(path, resume_from)), remaining,
+        )
+        resumed_cached = _timed(
+            f"缓存断点恢复({resume_from})",
+            lambda: list(read_cached_rows("benchmark", resume_from)), remaining,
+        )
+        if resumed_cached != resumed_openpyxl:
+            raise SystemExit("断点恢复读取结果不一致")
+        print("读取结果一致")
+
+
+if __name__ == "__main__":
+    main()
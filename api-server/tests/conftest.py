@@ -1,3 +1,4 @@
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 
@@ -9,3 +10,9 @@ async def client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+
+
+@pytest.fixture(autouse=True)
+def _no_validator_cache_listener(monkeypatch):
+    """测试中不启动校验器缓存的 Redis 监听线程（未监听时缓存不生效）。"""
+    monkeypatch.setattr("app.tasks.import_validators._listener.ensure_started", lambda: None)
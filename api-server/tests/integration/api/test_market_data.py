@@ -76,6 +76,7 @@ def _make_source():
     source.last_fetch_status = "success"
     source.last_fetch_error = None
     source.cache_ttl_seconds = 3600
+    source.next_fetch_at = None
     source.created_at = "2026-03-01T00:00:00+08:00"
     source.updated_at = "2026-03-01T07:00:00+08:00"
     return source
@@ -274,3 +275,106 @@ class TestSourceCRUD:
 
         response = await api_client.delete(f"/api/v1/market-data/sources/{_SOURCE_ID}")
         assert response.status_code == 403
+
+
+class TestBackfill:
+    """历史回补端点测试。"""
+
+    @staticmethod
+    def _make_job():
+        job = MagicMock()
+        job.id = uuid.uuid4()
+        job.province = "guangdong"
+        job.start_date = date(2025, 1, 1)
+        job.end_date = date(2025, 12, 31)
+        job.status = "pending"
+        job.completed_through = None
+        job.total_chunks = 0
+        job.completed_chunks = 0
+        job.total_records = 0
+        job.error_message = None
+        job.started_at = None
+        job.completed_at = None
+        job.created_at = "2026-03-01T07:00:00+08:00"
+        return job
+
+    @pytest.mark.asyncio
+    async def test_admin_can_start_backfill(self, api_client):
+        _override_auth(_make_admin())
+
+        mock_service = AsyncMock()
+        mock_service.start_backfill.return_value = self._make_job()
+        _override_service(mock_service)
+
+        response = await api_client.post(
+            "/api/v1/market-data/backfill",
+            json={"province": "guangdong", "start_date": "2025-01-01", "end_date": "2025-12-31"},
+        )
+        assert response.status_code == 202
+        assert response.json()["status"] == "pending"
+        mock_service.start_backfill.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_rejects_inverted_range(self, api_client):
+        _override_auth(_make_admin())
+        _override_service(AsyncMock())
+
+        response = await api_client.post(
+            "/api/v1/market-data/backfill",
+            json={"province": "guangdong", "start_date": "2025-02-01", "end_date": "2025-01-01"},
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_trader_forbidden(self, api_client):
+        _override_auth(_make_trader())
+        _override_service(AsyncMock())
+
+        response = await api_client.post(
+            "/api/v1/market-data/backfill",
+            json={"province": "guangdong", "start_date": "2025-01-01", "end_date": "2025-01-31"},
+        )
+        assert response.status_code == 403
+
+
+class TestBatchQuery:
+    """GET /api/v1/market-data/batch 测试。"""
+
+    @pytest.mark.asyncio
+    async def test_trader_can_query_batch(self, api_client):
+        _override_auth(_make_trader())
+
+        from app.schemas.market_data import MarketDataBatchResponse, MarketDataDaySeries
+
+        mock_service = AsyncMock()
+        mock_service.get_market_data_batch.return_value = MarketDataBatchResponse(
+            items=[MarketDataDaySeries(province="guangdong", trading_date=date(2026, 3, 1), records=[])],
+            cache_hits=0,
+            cache_misses=1,
+        )
+        _override_service(mock_service)
+
+        response = await api_client.get(
+            "/api/v1/market-data/batch",
+            params={
+                "provinces": ["guangdong", "shandong"],
+                "start_date": "2026-03-01",
+                "end_date": "2026-03-30",
+            },
+        )
+        assert response.status_code == 200
+        assert response.json()["cache_misses"] == 1
+        mock_service.get_market_data_batch.assert_awaited_once_with(
+            ["guangdong", "shandong"], date(2026, 3, 1), date(2026, 3, 30),
+        )
+
+    @pytest.mark.asyncio
+    async def test_operator_forbidden(self, api_client):
+        _override_auth(_make_operator())
+        _override_service(AsyncMock())
+
+        response = await api_client.get(
+            "/api/v1/market-data/batch",
+            params={"provinces": ["guangdong"], "start_date": "2026-03-01", "end_date": "2026-03-01"},
+        )
+        assert response.status_code == 403
@@ -60,6 +60,8 @@ def _make_model():
     model.api_auth_type = "api_key"
     model.call_frequency_cron = "0 6,12 * * *"
     model.timeout_seconds = 30
+    model.prediction_horizon = "day_ahead"
+    model.next_fetch_at = None
     model.is_active = True
     model.status = "running"
     model.last_check_at = "2026-03-01T07:00:00+08:00"
@@ -518,3 +520,80 @@ class TestGetStationPredictions:
             params={"prediction_date": "2026-03-06"},
         )
         assert response.status_code == 403
+
+
+class TestGetStationPredictionCurves:
+    """GET /api/v1/stations/{station_id}/prediction-curves 测试。"""
+
+    @pytest.mark.asyncio
+    async def test_returns_columnar_series(self, api_client):
+        _override_auth(_make_admin())
+
+        from app.core.database import get_db_session
+        app.dependency_overrides[get_db_session] = lambda: AsyncMock()
+
+        curve = {
+            "predicted": [1500.0] + [None] * 95,
+            "upper": [1650.0] + [None] * 95,
+            "lower": [1350.0] + [None] * 95,
+        }
+        mock_repo = AsyncMock()
+        mock_repo.get_curves.return_value = {
+            (_MODEL_ID, date(2026, 3, 7)): curve,
+            (_MODEL_ID, date(2026, 3, 6)): curve,
+        }
+
+        import app.api.v1.stations as stations_module
+        original_repo_class = stations_module.PowerPredictionRepository
+        stations_module.PowerPredictionRepository = lambda session: mock_repo
+
+        try:
+            response = await api_client.get(
+                f"/api/v1/stations/{_STATION_ID}/prediction-curves",
+                params={
+                    "start_date": "2026-03-06",
+                    "end_date": "2026-03-07",
+                    "model_ids": [str(_MODEL_ID)],
+                },
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert [s["prediction_date"] for s in data["series"]] == ["2026-03-06", "2026-03-07"]
+            assert data["series"][0]["predicted"][0] == 1500.0
+            assert len(data["series"][0]["lower"]) == 96
+            kwargs = mock_repo.get_curves.await_args.kwargs
+            assert kwargs["model_ids"] == [_MODEL_ID]
+        finally:
+            stations_module.PowerPredictionRepository = original_repo_class
+
+    @pytest.mark.asyncio
+    async def test_rejects_range_over_limit(self, api_client):
+        _override_auth(_make_admin())
+
+        from app.core.database import get_db_session
+        app.dependency_overrides[get_db_session] = lambda: AsyncMock()
+
+        response = await api_client.get(
+            f"/api/v1/stations/{_STATION_ID}/prediction-curves",
+            params={
+                "start_date": "2026-01-01",
+                "end_date": "2026-12-31",
+                "model_ids": [str(_MODEL_ID)],
+            },
+        )
+        assert response.status_code == 422
+        assert response.json()["code"] == "PREDICTION_RANGE_TOO_LARGE"
+
+    @pytest.mark.asyncio
+    async def test_rejects_reversed_range(self, api_client):
+        _override_auth(_make_admin())
+
+        from app.core.database import get_db_session
+        app.dependency_overrides[get_db_session] = lambda: AsyncMock()
+
+        response = await api_client.get(
+            f"/api/v1/stations/{_STATION_ID}/prediction-curves",
+            params={"start_date": "2026-03-07", "end_date": "2026-03-06"},
+        )
+        assert response.status_code == 422
+        assert response.json()["code"] == "PREDICTION_RANGE_INVALID"
@@ -0,0 +1,32 @@
+"""cron 表达式解析与下次触发时间测试。"""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from app.core.cron import next_run_after, parse_cron
+
+
+class TestNextRunAfter:
+    def test_uses_shanghai_local_time(self):
+        # 16:00 北京时间之后的下一个 7/12/17 点
+        after = datetime(2026, 3, 1, 8, 0, tzinfo=UTC)
+        assert next_run_after("0 7,12,17 * * *", after) == datetime(2026, 3, 1, 9, 0, tzinfo=UTC)
+
+    def test_strictly_after_and_rolls_over_days(self):
+        after = datetime(2026, 3, 1, 9, 0, tzinfo=UTC)  # 正好 17:00 北京时间
+        assert next_run_after("0 7,12,17 * * *", after) == datetime(2026, 3, 1, 23, 0, tzinfo=UTC)
+
+    def test_day_of_week(self):
+        # 2026-10-17 为周六，下一个工作日 9:30 为周一
+        after = datetime(2026, 10, 17, 3, 0, tzinfo=UTC)
+        assert next_run_after("30 9 * * 1-5", after) == datetime(2026, 10, 19, 1, 30, tzinfo=UTC)
+
+    def test_sparse_expression(self):
+        after = datetime(2026, 3, 1, tzinfo=UTC)
+        assert next_run_after("0 0 29 2 *", after) == datetime(2028, 2, 28, 16, 0, tzinfo=UTC)
+
+    @pytest.mark.parametrize("expr", ["", "0 7 * *", "61 * * * *", "0 7,12,17 * * * *"])
+    def test_invalid_expression(self, expr):
+        with pytest.raises(ValueError):
+            parse_cron(expr)
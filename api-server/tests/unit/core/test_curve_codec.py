@@ -0,0 +1,53 @@
+"""96 时段曲线二进制编码测试。"""
+
+import json
+from decimal import Decimal
+
+from app.core.curve_codec import MAGIC, decode_curve, encode_curve
+
+META = {"source": "api", "fetched_at": "2026-03-01T07:00:00+00:00"}
+
+
+class TestCurveCodec:
+    def test_roundtrip_full_curve_is_compact(self):
+        prices = [f"{300 + p * 0.37:.2f}" for p in range(1, 97)]
+        raw = encode_curve(META, list(range(1, 97)), {"clearing_price": prices})
+
+        assert raw.startswith(MAGIC)
+        legacy = json.dumps([
+            {"period": p, "clearing_price": price, **META}
+            for p, price in zip(range(1, 97), prices)
+        ])
+        assert len(raw) * 10 < len(legacy)
+
+        curve = decode_curve(raw)
+        assert curve.meta == META
+        assert curve.periods.tolist() == list(range(1, 97))
+        assert curve.decimal_strings("clearing_price") == prices
+
+    def test_sparse_periods_and_negative_values(self):
+        raw = encode_curve(META, [96, 3], {"clearing_price": [Decimal("-80.5"), "0"]})
+
+        curve = decode_curve(raw)
+        assert curve.periods.tolist() == [3, 96]
+        assert curve.decimal_strings("clearing_price") == ["0.00", "-80.50"]
+
+    def test_multiple_columns(self):
+        raw = encode_curve(
+            {}, [1, 2],
+            {"predicted_power_kw": ["100.25", "0"], "confidence_upper_kw": ["110", "0"]},
+        )
+        curve = decode_curve(raw)
+        assert curve.decimal_strings("confidence_upper_kw") == ["110.00", "0.00"]
+
+    def test_unrepresentable_values_return_none(self):
+        assert encode_curve(META, [1], {"clearing_price": ["1.005"]}) is None
+        assert encode_curve(META, [1], {"clearing_price": ["99999999.99"]}) is None
+        assert encode_curve(META, [1], {"clearing_price": ["abc"]}) is None
+        assert encode_curve(META, [1, 1], {"clearing_price": ["1", "2"]}) is None
+        assert encode_curve(META, [97], {"clearing_price": ["1"]}) is None
+
+    def test_non_binary_input_returns_none(self):
+        assert decode_curve("[]") is None
+        assert decode_curve(b"[]") is None
+        assert decode_curve(MAGIC + b"\x05\x00{") is None
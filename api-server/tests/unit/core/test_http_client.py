@@ -0,0 +1,153 @@
+"""共享 HTTP 客户端注册表单元测试。"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core import http_client
+from app.core.http_client import TokenBucket, close_http_clients, get_http_client, run_sync
+
+
+@pytest.fixture(autouse=True)
+def _reset_registry():
+    http_client._clients.clear()
+    http_client._clients_loop = None
+    yield
+    http_client._clients.clear()
+    http_client._clients_loop = None
+
+
+class TestHttp2Enabled:
+    def test_missing_h2_warns_once_and_falls_back(self, monkeypatch):
+        import builtins
+
+        real_import = builtins.__import__
+
+        def _no_h2(name, *args, **kwargs):
+            if name == "h2":
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(http_client.settings, "HTTP_ENABLE_HTTP2", True)
+        monkeypatch.setattr(http_client, "_h2_missing_warned", False)
+        monkeypatch.setattr(builtins, "__import__", _no_h2)
+        warnings = []
+        monkeypatch.setattr(http_client.logger, "warning", lambda event, **kw: warnings.append(event))
+
+        assert http_client._http2_enabled() is False
+        assert http_client._http2_enabled() is False
+        assert warnings == ["http2_unavailable"]
+
+    def test_disabled_by_setting(self, monkeypatch):
+        monkeypatch.setattr(http_client.settings, "HTTP_ENABLE_HTTP2", False)
+        assert http_client._http2_enabled() is False
+
+
+class TestGetHttpClient:
+    @pytest.mark.asyncio
+    async def test_same_host_shares_client(self):
+        a = get_http_client("http://mock-market-api:8080/market-data")
+        b = get_http_client("http://mock-market-api:8080/other?x=1")
+        c = get_http_client("http://mock-market-api:9090/market-data")
+        d = get_http_client("https://predict.example.com/v1")
+
+        assert a is b
+        assert a is not c
+        assert a is not d
+        await close_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_limits_from_settings(self):
+        client = get_http_client("http://host/path")
+        pool = client._transport._pool
+
+        assert pool._max_connections == http_client.settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        assert pool._max_keepalive_connections == http_client.settings.HTTP_MAX_KEEPALIVE_PER_HOST
+        await close_http_clients()
+
+    @pytest.mark.asyncio
+    async def test_closed_client_is_replaced(self):
+        client = get_http_client("http://host/path")
+        await client.aclose()
+
+        assert get_http_client("http://host/path") is not client
+        await close_http_clients()
+
+    def test_new_event_loop_closes_old_clients(self):
+        async def _get():
+            client = get_http_client("http://host/path")
+            await asyncio.sleep(0)
+            return client
+
+        first = asyncio.run(_get())
+        second = asyncio.run(_get())
+
+        assert first is not second
+        assert first.is_closed
+        assert not second.is_closed
+
+    def test_old_loop_still_running_closes_on_its_own_loop(self):
+        import threading
+
+        old_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=old_loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            async def _get():
+                return asyncio.get_running_loop(), get_http_client("http://host/path")
+
+            _, first = asyncio.run_coroutine_threadsafe(_get(), old_loop).result()
+            closed_on = []
+            original_aclose = first.aclose
+
+            async def _record_aclose():
+                closed_on.append(asyncio.get_running_loop())
+                await original_aclose()
+
+            first.aclose = _record_aclose
+            asyncio.run(_get())
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0), old_loop).result()
+
+            assert closed_on == [old_loop]
+            assert first.is_closed
+        finally:
+            old_loop.call_soon_threadsafe(old_loop.stop)
+            thread.join()
+            old_loop.close()
+
+
+class TestRunSync:
+    def test_reuses_loop_and_clients_across_calls(self):
+        async def _get():
+            return asyncio.get_running_loop(), get_http_client("http://host/path")
+
+        loop_a, client_a = run_sync(_get())
+        loop_b, client_b = run_sync(_get())
+
+        assert loop_a is loop_b
+        assert client_a is client_b
+        http_client.shutdown_worker_loop()
+        assert client_a.is_closed
+
+
+class TestTokenBucket:
+    @pytest.mark.asyncio
+    async def test_limits_rate_after_burst(self):
+        bucket = TokenBucket(rate=20, burst=2)
+
+        started = time.perf_counter()
+        for _ in range(6):
+            await bucket.acquire()
+        elapsed = time.perf_counter() - started
+
+        # 前 2 个令牌立即可用，其余 4 个按 20/s 补充
+        assert 0.18 <= elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_non_positive_rate_is_unlimited(self):
+        bucket = TokenBucket(rate=0)
+        started = time.perf_counter()
+        for _ in range(100):
+            await bucket.acquire()
+        assert time.perf_counter() - started < 0.05
@@ -0,0 +1,53 @@
+"""Redis 失效通知监听测试。"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core.redis_invalidation import InvalidationListener
+
+
+def _make_listener():
+    return InvalidationListener("ch", MagicMock(), MagicMock(), "test-listener")
+
+
+class TestEnsureStarted:
+    @patch("app.core.redis_invalidation.threading.Thread")
+    def test_starts_once_per_process(self, mock_thread):
+        listener = _make_listener()
+
+        listener.ensure_started()
+        listener.ensure_started()
+
+        mock_thread.assert_called_once()
+        mock_thread.return_value.start.assert_called_once()
+        listener.on_disconnect.assert_called_once()
+
+    @patch("app.core.redis_invalidation.threading.Thread")
+    def test_restarts_after_fork(self, mock_thread):
+        listener = _make_listener()
+        listener.ensure_started()
+        listener.listening.set()
+
+        with patch("app.core.redis_invalidation.os.getpid", return_value=-1):
+            listener.ensure_started()
+
+        assert mock_thread.call_count == 2
+        assert not listener.listening.is_set()
+
+
+class TestRun:
+    @patch("app.core.redis_invalidation.time.sleep", side_effect=KeyboardInterrupt)
+    def test_dispatches_messages_and_clears_on_disconnect(self, _sleep):
+        listener = _make_listener()
+        pubsub = MagicMock()
+        pubsub.listen.side_effect = lambda: iter([{"data": b"a"}, {"data": b"b"}])
+
+        with patch("redis.Redis.from_url") as mock_from_url, pytest.raises(KeyboardInterrupt):
+            mock_from_url.return_value.pubsub.return_value = pubsub
+            listener._run()
+
+        pubsub.subscribe.assert_called_once_with("ch")
+        assert [c.args[0] for c in listener.on_message.call_args_list] == [b"a", b"b"]
+        listener.on_disconnect.assert_called_once()
+        assert not listener.listening.is_set()
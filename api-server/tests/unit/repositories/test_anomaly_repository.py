@@ -0,0 +1,101 @@
+"""ImportAnomalyRepository 单元测试 — 验证模板存储的异常描述在读取时渲染。"""
+
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import inspect
+
+from app.models.data_import import ANOMALY_TEMPLATES, ImportAnomaly, render_anomaly_description
+from app.repositories.data_import import ImportAnomalyRepository
+
+
+@pytest.fixture
+def mock_session():
+    return AsyncMock()
+
+
+@pytest.fixture
+def anomaly_repo(mock_session):
+    return ImportAnomalyRepository(mock_session)
+
+
+def _make_anomaly(**kwargs):
+    defaults = {
+        "id": uuid4(),
+        "import_job_id": uuid4(),
+        "row_number": 3,
+        "anomaly_type": "out_of_range",
+        "field_name": "clearing_price",
+        "raw_value": "2000.00",
+        "description": None,
+        "template_id": 4,
+        "template_params": {"lower": "-100", "upper": "1500"},
+        "status": "pending",
+    }
+    defaults.update(kwargs)
+    return ImportAnomaly(**defaults)
+
+
+def _scalars_result(items):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = items
+    result.scalar_one.return_value = len(items)
+    result.scalar_one_or_none.return_value = items[0] if items else None
+    return result
+
+
+class TestRenderAnomalyDescription:
+    @pytest.mark.parametrize("template_id,raw_value,params,expected", [
+        (1, "2025-13-01", None, "交易日期格式错误: 2025-13-01"),
+        (2, None, None, "时段编号超出范围(1-96): "),
+        (4, "2000.00", {"lower": "-100", "upper": "1500"},
+         "出清价格超出省份限价范围(-100~1500): 2000.00"),
+        (10, None, {"skipped": 3}, "本批次中 3 条重复记录已跳过"),
+        (11, None, {"trading_date": "2025-01-01", "entity_label": "出力数据", "missing": "1, 2"},
+         "交易日 2025-01-01 出力数据缺少时段: 1, 2"),
+    ])
+    def test_render(self, template_id, raw_value, params, expected):
+        assert render_anomaly_description(template_id, raw_value, params) == expected
+
+    def test_template_keys_unique(self):
+        keys = [(t, f) for t, f, _ in ANOMALY_TEMPLATES.values()]
+        assert len(keys) == len(set(keys))
+
+
+class TestLazyDescriptions:
+    @pytest.mark.asyncio
+    async def test_list_by_job_renders_without_dirtying(self, anomaly_repo, mock_session):
+        templated = _make_anomaly()
+        legacy = _make_anomaly(description="旧描述", template_id=None, template_params=None)
+        mock_session.execute.side_effect = [
+            _scalars_result([templated, legacy]),
+            _scalars_result([templated, legacy]),
+        ]
+
+        anomalies, total = await anomaly_repo.list_by_job(uuid4())
+
+        assert total == 2
+        assert anomalies[0].description == "出清价格超出省份限价范围(-100~1500): 2000.00"
+        assert anomalies[1].description == "旧描述"
+        assert not inspect(templated).attrs.description.history.has_changes()
+
+    @pytest.mark.asyncio
+    async def test_get_by_id_renders(self, anomaly_repo, mock_session):
+        anomaly = _make_anomaly(template_id=1, raw_value="abc", template_params=None,
+                                anomaly_type="format_error", field_name="trading_date")
+        mock_session.get.return_value = anomaly
+
+        result = await anomaly_repo.get_by_id(anomaly.id)
+
+        assert result.description == "交易日期格式错误: abc"
+
+    @pytest.mark.asyncio
+    async def test_get_by_id_for_update_and_get_by_ids_render(self, anomaly_repo, mock_session):
+        anomaly = _make_anomaly()
+        mock_session.execute.return_value = _scalars_result([anomaly])
+
+        assert (await anomaly_repo.get_by_id_for_update(anomaly.id)).description
+        other = _make_anomaly()
+        mock_session.execute.return_value = _scalars_result([other])
+        assert (await anomaly_repo.get_by_ids([other.id]))[0].description
@@ -0,0 +1,55 @@
+"""PowerPredictionRepository 单元测试 — Mock 数据库会话，验证区间曲线打包。"""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.repositories.prediction import PowerPredictionRepository
+
+
+class TestGetCurves:
+    @pytest.mark.asyncio
+    async def test_groups_rows_into_columnar_curves(self):
+        session = AsyncMock()
+        model_a, model_b = uuid4(), uuid4()
+        mock_result = MagicMock()
+        mock_result.all.return_value = [
+            (model_a, date(2026, 3, 6), 1, 100.0, 110.0, 90.0),
+            (model_a, date(2026, 3, 6), 96, 200.0, 220.0, 180.0),
+            (model_a, date(2026, 3, 7), 2, 300.0, None, None),
+            (model_b, date(2026, 3, 6), 1, 50.0, 55.0, 45.0),
+        ]
+        session.execute.return_value = mock_result
+
+        curves = await PowerPredictionRepository(session).get_curves(
+            uuid4(), date(2026, 3, 6), date(2026, 3, 7), [model_a, model_b],
+        )
+
+        assert set(curves) == {
+            (model_a, date(2026, 3, 6)),
+            (model_a, date(2026, 3, 7)),
+            (model_b, date(2026, 3, 6)),
+        }
+        day = curves[(model_a, date(2026, 3, 6))]
+        assert len(day["predicted"]) == 96
+        assert day["predicted"][0] == 100.0
+        assert day["predicted"][95] == 200.0
+        assert day["upper"][95] == 220.0
+        assert day["predicted"][1] is None
+        assert curves[(model_a, date(2026, 3, 7))]["predicted"][1] == 300.0
+        session.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_empty_result(self):
+        session = AsyncMock()
+        mock_result = MagicMock()
+        mock_result.all.return_value = []
+        session.execute.return_value = mock_result
+
+        curves = await PowerPredictionRepository(session).get_curves(
+            uuid4(), date(2026, 3, 6), date(2026, 3, 6),
+        )
+
+        assert curves == {}
@@ -173,6 +173,25 @@ class TestImportResultRead:
         assert result.total_records == 1000
         assert result.data_completeness == Decimal("98.00")
         assert result.anomaly_summary == []
+        assert result.metrics is None
+
+    def test_with_metrics(self):
+        from app.tasks.import_metrics import ImportMetrics
+
+        metrics = ImportMetrics()
+        metrics.observe_batch(0.2, 1000)
+        metrics.elapsed_seconds = 2.0
+        result = ImportResultRead(
+            total_records=1000,
+            success_records=1000,
+            failed_records=0,
+            data_completeness=Decimal("100.00"),
+            anomaly_summary=[],
+            metrics=metrics.to_json(),
+        )
+        assert result.metrics.rows_per_second == 500.0
+        assert result.metrics.batch_latency.count == 1
+        assert "insert" in result.metrics.phase_seconds
 
 
 class TestImportAnomalyListResponse:
@@ -153,6 +153,15 @@ class TestPredictionModelUpdate:
         result = PredictionModelUpdate(is_active=False)
         assert result.is_active is False
 
+    def test_invalid_cron_rejected(self):
+        with pytest.raises(ValidationError):
+            PredictionModelUpdate(call_frequency_cron="every hour")
+
+    def test_intraday_horizon(self):
+        result = PredictionModelUpdate(call_frequency_cron=" 0 * * * * ", prediction_horizon="intraday")
+        assert result.call_frequency_cron == "0 * * * *"
+        assert result.prediction_horizon == "intraday"
+
 
 class TestPredictionModelRead:
     """PredictionModelRead schema 测试。"""
@@ -170,6 +179,8 @@ class TestPredictionModelRead:
         model.api_auth_type = "api_key"
         model.call_frequency_cron = "0 6,12 * * *"
         model.timeout_seconds = 30
+        model.prediction_horizon = "day_ahead"
+        model.next_fetch_at = None
         model.is_active = True
         model.status = "running"
         model.last_check_at = "2026-03-01T07:00:00+08:00"
@@ -199,6 +210,8 @@ class TestPredictionModelRead:
         model.api_auth_type = "none"
         model.call_frequency_cron = "0 6,12 * * *"
         model.timeout_seconds = 30
+        model.prediction_horizon = "day_ahead"
+        model.next_fetch_at = None
         model.is_active = True
         model.status = "disabled"
         model.last_check_at = None
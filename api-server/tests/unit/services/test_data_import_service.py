@@ -40,7 +40,11 @@ def _make_job(job_id=None, status="pending", station_id=None, import_type="tradi
 
 @pytest.fixture
 def mock_import_job_repo():
-    return AsyncMock()
+    repo = AsyncMock()
+    repo.has_shards.return_value = False
+    repo.list_shard_task_ids.return_value = []
+    repo.has_processing_shards.return_value = False
+    return repo
 
 
 @pytest.fixture
@@ -168,6 +172,68 @@ class TestCreateImportJob:
         mock_import_job_repo.create.assert_called_once()
         mock_audit_service.log_action.assert_called_once()
 
+    @pytest.mark.asyncio
+    @patch("app.services.data_import_service.settings")
+    async def test_create_large_csv_dispatches_sharded_import(
+        self, mock_settings,
+        service, mock_station_repo, mock_import_job_repo, tmp_path,
+    ):
+        station = _make_station()
+        mock_station_repo.session.execute.return_value = _mock_station_query_result(station)
+        mock_import_job_repo.has_processing_job.return_value = False
+        created_job = _make_job(station_id=station.id)
+        mock_import_job_repo.create.return_value = created_job
+        mock_import_job_repo.session = AsyncMock()
+        mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+        mock_settings.MAX_IMPORT_FILE_SIZE = 100 * 1024 * 1024
+
+        file = MagicMock()
+        file.filename = "big.csv"
+        file.read = AsyncMock(side_effect=[b"trading_date,period,clearing_price\n", b""])
+
+        with patch("app.tasks.import_sharding.should_shard_import", return_value=True), \
+                patch("app.tasks.import_sharding.coordinate_sharded_import") as mock_coordinator, \
+                patch("app.tasks.import_tasks.process_trading_data_import") as mock_task:
+            mock_coordinator.apply_async.return_value = MagicMock(id="celery-coordinator")
+            await service.create_import_job(station.id, file, _make_admin(), "127.0.0.1")
+
+        mock_coordinator.apply_async.assert_called_once_with(
+            kwargs={"job_id": str(created_job.id)},
+        )
+        mock_task.apply_async.assert_not_called()
+        assert created_job.celery_task_id == "celery-coordinator"
+
+    @pytest.mark.asyncio
+    @patch("app.services.data_import_service.settings")
+    async def test_create_xlsx_does_not_convert_in_request(
+        self, mock_settings,
+        service, mock_station_repo, mock_import_job_repo, tmp_path,
+    ):
+        """xlsx 列式转换在 Celery 任务中进行，上传请求只记录内容哈希。"""
+        import hashlib
+
+        station = _make_station()
+        mock_station_repo.session.execute.return_value = _mock_station_query_result(station)
+        mock_import_job_repo.has_processing_job.return_value = False
+        mock_import_job_repo.create.side_effect = lambda job: job
+        mock_import_job_repo.session = AsyncMock()
+        mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+        mock_settings.MAX_IMPORT_FILE_SIZE = 100 * 1024 * 1024
+
+        file_data = b"PK fake xlsx"
+        file = MagicMock()
+        file.filename = "data.xlsx"
+        file.read = AsyncMock(side_effect=[file_data, b""])
+
+        with patch("app.tasks.import_xlsx_cache.ensure_xlsx_cache") as mock_cache, \
+                patch("app.tasks.import_tasks.process_trading_data_import") as mock_task:
+            mock_task.apply_async.return_value = MagicMock(id="celery-task-abc")
+            job = await service.create_import_job(station.id, file, _make_admin(), "127.0.0.1")
+
+        assert job.content_hash == hashlib.sha256(file_data).hexdigest()
+        mock_cache.assert_not_called()
+        mock_task.apply_async.assert_called_once()
+
 
 class TestCancelImportJob:
     """cancel_import_job 测试。"""
@@ -220,6 +286,20 @@ class TestCancelImportJob:
         mock_audit_service.log_action.assert_called_once()
         assert result == job
 
+    @pytest.mark.asyncio
+    @patch("app.tasks.celery_app.celery_app")
+    async def test_cancel_revokes_shard_tasks(
+        self, mock_celery_app, service, mock_import_job_repo,
+    ):
+        job = _make_job(status="processing")
+        mock_import_job_repo.get_by_id_for_update.return_value = job
+        mock_import_job_repo.list_shard_task_ids.return_value = ["shard-0", "shard-1"]
+
+        await service.cancel_import_job(job.id, _make_admin(), "127.0.0.1")
+
+        revoked = [c.args[0] for c in mock_celery_app.control.revoke.call_args_list]
+        assert revoked == [job.celery_task_id, "shard-0", "shard-1"]
+
 
 class TestResumeImportJob:
     """resume_import_job 测试。"""
@@ -296,6 +376,40 @@ class TestResumeImportJob:
         assert result == job
 
 
+    @pytest.mark.asyncio
+    async def test_resume_sharded_job_dispatches_coordinator(
+        self, service, mock_import_job_repo,
+    ):
+        job = _make_job(status="failed")
+        job.last_processed_row = 0
+        mock_import_job_repo.get_by_id_for_update.return_value = job
+        mock_import_job_repo.has_shards.return_value = True
+
+        with patch("app.tasks.import_sharding.coordinate_sharded_import") as mock_coordinator:
+            mock_coordinator.apply_async.return_value = MagicMock(id="celery-coordinator")
+            await service.resume_import_job(job.id, _make_admin(), "127.0.0.1")
+
+        mock_coordinator.apply_async.assert_called_once_with(kwargs={"job_id": str(job.id)})
+        assert job.celery_task_id == "celery-coordinator"
+
+    @pytest.mark.asyncio
+    async def test_resume_while_shard_processing_rejected(
+        self, service, mock_import_job_repo,
+    ):
+        job = _make_job(status="failed")
+        mock_import_job_repo.get_by_id_for_update.return_value = job
+        mock_import_job_repo.has_shards.return_value = True
+        mock_import_job_repo.has_processing_shards.return_value = True
+
+        with patch("app.tasks.import_sharding.coordinate_sharded_import") as mock_coordinator:
+            with pytest.raises(BusinessError) as exc_info:
+                await service.resume_import_job(job.id, _make_admin(), "127.0.0.1")
+
+        assert exc_info.value.code == "IMPORT_SHARDS_RUNNING"
+        assert job.status == "failed"
+        mock_coordinator.apply_async.assert_not_called()
+
+
 class TestGetImportResult:
     """get_import_result 测试。"""
 
@@ -306,6 +420,7 @@ class TestGetImportResult:
         job.success_records = 980
         job.failed_records = 20
         job.data_completeness = 98.00
+        job.metrics = {"rows": 1000, "rows_per_second": 5000.0}
         mock_import_job_repo.get_by_id.return_value = job
 
         mock_anomaly_repo.get_summary_by_job.return_value = [
@@ -322,3 +437,4 @@ class TestGetImportResult:
         assert len(result["anomaly_summary"]) == 3
         assert result["anomaly_summary"][0]["anomaly_type"] == "format_error"
         assert result["anomaly_summary"][0]["count"] == 10
+        assert result["metrics"]["rows_per_second"] == 5000.0
@@ -80,11 +80,10 @@ class TestGenericAdapter:
             "data": [{"period": i, "clearing_price": 350.0} for i in range(1, 97)]
         }
 
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.get.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             records = await adapter.fetch(date(2026, 3, 1))
             assert len(records) == 96
@@ -108,11 +107,10 @@ class TestGenericAdapter:
                 raise httpx.ConnectError("连接失败")
             return mock_success_response
 
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.get = mock_get
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             records = await adapter.fetch(date(2026, 3, 1))
             assert len(records) == 1
@@ -121,35 +119,120 @@ class TestGenericAdapter:
     @pytest.mark.asyncio
     async def test_fetch_all_retries_exhausted(self, adapter):
         """验证所有重试耗尽后抛出 RuntimeError。"""
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.get.side_effect = httpx.ConnectError("连接失败")
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             with pytest.raises(RuntimeError, match="市场数据获取失败"):
                 await adapter.fetch(date(2026, 3, 1))
 
+    @pytest.mark.asyncio
+    async def test_fetch_if_changed_sends_validators_and_handles_304(self, adapter):
+        mock_response = MagicMock()
+        mock_response.status_code = 304
+        mock_response.headers = {"ETag": '"abc"'}
+
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.return_value = mock_response
+            mock_get_client.return_value = mock_client
+
+            result = await adapter.fetch_if_changed(
+                date(2026, 3, 1), etag='"abc"', last_modified="Sat, 28 Feb 2026 17:00:00 GMT",
+            )
+
+        headers = mock_client.get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Sat, 28 Feb 2026 17:00:00 GMT"
+        assert headers["X-API-Key"] == "test-key-123"
+        assert result.not_modified is True
+        assert result.records == []
+        assert result.last_modified == "Sat, 28 Feb 2026 17:00:00 GMT"
+        mock_response.raise_for_status.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_health_check_success(self, adapter):
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_response = AsyncMock()
             mock_response.status_code = 200
             mock_client.head.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             result = await adapter.health_check()
             assert result is True
 
     @pytest.mark.asyncio
     async def test_health_check_failure(self, adapter):
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.head.side_effect = httpx.ConnectError("连接失败")
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             result = await adapter.health_check()
             assert result is False
+
+
+class TestFetchRange:
+    """fetch_range 区间取数测试。"""
+
+    @staticmethod
+    def _response(status_code=200, data=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.raise_for_status = MagicMock()
+        response.json.return_value = {"data": data or []}
+        return response
+
+    @pytest.mark.asyncio
+    async def test_uses_range_endpoint_in_windows(self, adapter):
+        calls = []
+
+        async def mock_get(url, params=None, **kwargs):
+            calls.append((url, params))
+            return self._response(data=[
+                {"trading_date": params["start_date"], "period": 1, "clearing_price": 300.0},
+            ])
+
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client, \
+                patch("app.services.market_data_adapters.generic.settings") as mock_settings:
+            mock_settings.MARKET_DATA_RANGE_MAX_DAYS = 31
+            mock_settings.MARKET_DATA_RETRY_COUNT = 0
+            mock_client = AsyncMock()
+            mock_client.get = mock_get
+            mock_get_client.return_value = mock_client
+
+            records = await adapter.fetch_range(date(2025, 1, 1), date(2025, 2, 15))
+
+        assert [c[0] for c in calls] == ["https://example.com/api/prices/range"] * 2
+        assert calls[0][1] == {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+        assert calls[1][1] == {"start_date": "2025-02-01", "end_date": "2025-02-15"}
+        assert [r.trading_date for r in records] == [date(2025, 1, 1), date(2025, 2, 1)]
+        assert adapter._range_supported is True
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_daily_fetch_when_range_unsupported(self, adapter):
+        urls = []
+
+        async def mock_get(url, params=None, **kwargs):
+            urls.append(url)
+            if url.endswith("/range"):
+                return self._response(status_code=404)
+            return self._response(data=[{"period": 1, "clearing_price": 300.0}])
+
+        with patch("app.services.market_data_adapters.generic.get_http_client") as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get = mock_get
+            mock_get_client.return_value = mock_client
+
+            records = await adapter.fetch_range(date(2025, 1, 1), date(2025, 1, 3))
+            assert sorted(r.trading_date for r in records) == [
+                date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3),
+            ]
+            assert adapter._range_supported is False
+
+            # 已探测为不支持，后续直接逐日获取
+            urls.clear()
+            await adapter.fetch_range(date(2025, 1, 4), date(2025, 1, 4))
+            assert urls == ["https://example.com/api/prices"]
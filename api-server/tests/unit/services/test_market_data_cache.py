@@ -0,0 +1,142 @@
+"""市场数据进程内 L1 缓存测试。"""
+
+import asyncio
+import json
+import time
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services import market_data_cache
+from app.services.market_data_cache import CurveCache, SingleFlight, encode_message
+from app.services.market_data_service import MarketDataService
+
+D1 = date(2026, 3, 1)
+D2 = date(2026, 3, 2)
+CURVE = [{"period": 1, "clearing_price": "300.00", "source": "api",
+          "fetched_at": "2026-03-01T00:00:00+00:00"}]
+
+
+class TestCurveCache:
+    def test_lru_eviction_and_counters(self):
+        cache = CurveCache(maxsize=2, ttl=60)
+        cache.put(("gd", D1), CURVE, cache.generation)
+        cache.put(("gd", D2), CURVE, cache.generation)
+        assert cache.get(("gd", D1)) is CURVE
+        cache.put(("sd", D1), CURVE, cache.generation)
+
+        # gd/D2 最久未使用，被淘汰
+        assert cache.get(("gd", D2)) is None
+        assert cache.get(("gd", D1)) is CURVE
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (2, 1, 2)
+
+    def test_ttl_expiry(self):
+        cache = CurveCache(maxsize=8, ttl=0.05)
+        cache.put(("gd", D1), CURVE, cache.generation)
+        time.sleep(0.06)
+        assert cache.get(("gd", D1)) is None
+
+    def test_invalidation_during_load_skips_stale_fill(self):
+        cache = CurveCache(maxsize=8, ttl=60)
+        generation = cache.generation
+        cache.invalidate([("gd", D1)])
+        cache.put(("gd", D1), CURVE, generation)
+        assert cache.get(("gd", D1)) is None
+
+    def test_message_invalidates_listed_keys(self):
+        cache = CurveCache(maxsize=8, ttl=60)
+        cache.put(("gd", D1), CURVE, cache.generation)
+        cache.put(("gd", D2), CURVE, cache.generation)
+
+        with patch.object(market_data_cache, "_cache", cache):
+            market_data_cache._handle_message(encode_message([("gd", D1)]))
+            assert cache.get(("gd", D1)) is None
+            assert cache.get(("gd", D2)) is CURVE
+
+            market_data_cache._handle_message("not json")
+            assert cache.get(("gd", D2)) is None
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_load(self):
+        flights = SingleFlight()
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return CURVE
+
+        results = await asyncio.gather(*[flights.do(("gd", D1), loader) for _ in range(10)])
+
+        assert calls == 1
+        assert all(r is CURVE for r in results)
+        assert flights.coalesced == 9
+
+    @pytest.mark.asyncio
+    async def test_error_is_shared_and_next_call_reloads(self):
+        flights = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(
+            flights.do(("gd", D1), failing), flights.do(("gd", D1), failing),
+            return_exceptions=True,
+        )
+        assert [str(r) for r in results] == ["db down", "db down"]
+
+        async def ok():
+            return CURVE
+
+        assert await flights.do(("gd", D1), ok) is CURVE
+
+
+class TestServiceL1:
+    @pytest.fixture
+    def l1(self):
+        cache = CurveCache(maxsize=16, ttl=60)
+        with patch("app.services.market_data_service.get_curve_cache", return_value=cache):
+            yield cache
+
+    @pytest.fixture
+    def service(self):
+        redis = AsyncMock()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        redis.pipeline = MagicMock(return_value=pipe)
+        return MarketDataService(AsyncMock(), AsyncMock(), AsyncMock(), redis)
+
+    @pytest.mark.asyncio
+    async def test_second_read_served_from_l1(self, service, l1):
+        pipe = service.redis_client.pipeline.return_value
+        pipe.execute.return_value = [json.dumps(CURVE), 600_000]
+
+        first = await service.get_market_data("gd", D1)
+        second = await service.get_market_data("gd", D1)
+
+        assert first == second == CURVE
+        pipe.execute.assert_awaited_once()
+        assert l1.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_import_commits_then_invalidates_and_publishes(self, service, l1):
+        l1.put(("gd", D1), CURVE, l1.generation)
+        service.price_repo.bulk_upsert.return_value = 1
+
+        await service.import_market_data_from_records(
+            "gd", [{"trading_date": D1, "period": 1, "clearing_price": "310.00"}],
+        )
+
+        service.price_repo.session.commit.assert_awaited_once()
+        assert l1.get(("gd", D1)) is None
+        pipe = service.redis_client.pipeline.return_value
+        pipe.delete.assert_called_once_with("market_data:gd:2026-03-01", "market_data:freshness")
+        pipe.publish.assert_called_once_with(
+            market_data_cache.MARKET_DATA_CHANNEL, encode_message([("gd", D1)]),
+        )
@@ -1,3 +1,4 @@
+import json
 import uuid
 from datetime import UTC, date, datetime
 from decimal import Decimal
@@ -48,7 +49,12 @@ def mock_audit_service():
 
 @pytest.fixture
 def mock_redis():
-    return AsyncMock()
+    redis = AsyncMock()
+    # pipeline() 为同步方法，命令在 execute() 时一次发送
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    redis.pipeline = MagicMock(return_value=pipe)
+    return redis
 
 
 @pytest.fixture
@@ -193,6 +199,34 @@ class TestCheckDataFreshness:
         assert result.status == "critical"
 
 
+class TestCheckAllFreshness:
+    @pytest.mark.asyncio
+    async def test_single_query_for_all_sources_then_cached(
+        self, service, mock_source_repo, mock_price_repo, mock_redis,
+    ):
+        mock_redis.get.return_value = None
+        mock_source_repo.get_active_sources.return_value = [
+            _make_source(province="guangdong"), _make_source(province="shandong"),
+        ]
+        now = datetime.now(UTC)
+        mock_price_repo.get_last_fetched.return_value = {"guangdong": now}
+
+        result = await service.check_all_freshness()
+
+        mock_price_repo.get_last_fetched.assert_awaited_once_with(["guangdong", "shandong"])
+        mock_price_repo.check_freshness.assert_not_called()
+        assert [(r.province, r.status) for r in result] == [
+            ("guangdong", "fresh"), ("shandong", "critical"),
+        ]
+        key, ttl, payload = mock_redis.setex.call_args.args
+        assert key == "market_data:freshness"
+
+        mock_redis.get.return_value = payload
+        mock_source_repo.get_active_sources.reset_mock()
+        assert await service.check_all_freshness() == result
+        mock_source_repo.get_active_sources.assert_not_awaited()
+
+
 class TestSourceCRUD:
     """数据源 CRUD 操作测试。"""
 
@@ -219,6 +253,20 @@ class TestSourceCRUD:
             )
         assert exc_info.value.code == "SOURCE_EXISTS"
 
+    @pytest.mark.asyncio
+    async def test_schedule_change_recomputes_next_fetch(self, service, mock_source_repo):
+        source = _make_source()
+        source.fast_poll_until = datetime(2026, 3, 1, tzinfo=UTC)
+        mock_source_repo.get_by_id.return_value = source
+        mock_source_repo.session = AsyncMock()
+
+        await service.update_source(source.id, {"fetch_schedule": "30 9 * * *"})
+
+        assert source.fetch_schedule == "30 9 * * *"
+        assert source.next_fetch_at > datetime.now(UTC)
+        assert source.next_fetch_at.minute == 30
+        assert source.fast_poll_until is None
+
     @pytest.mark.asyncio
     async def test_delete_source_not_found(self, service, mock_source_repo):
         mock_source_repo.get_by_id.return_value = None
@@ -241,3 +289,254 @@ class TestImportMarketData:
         count = await service.import_market_data_from_records("guangdong", records)
         assert count == 96
         mock_price_repo.bulk_upsert.assert_called_once()
+
+
+class TestBackfill:
+    """历史回补任务创建与恢复测试。"""
+
+    @pytest.fixture
+    def mock_backfill_repo(self):
+        repo = AsyncMock()
+        repo.session = AsyncMock()
+        repo.get_active_by_province.return_value = None
+        repo.create.side_effect = lambda job: job
+        return repo
+
+    @pytest.fixture
+    def backfill_service(self, service, mock_backfill_repo):
+        service.backfill_repo = mock_backfill_repo
+        return service
+
+    @pytest.mark.asyncio
+    async def test_start_backfill_dispatches_task(
+        self, backfill_service, mock_source_repo, mock_backfill_repo,
+    ):
+        mock_source_repo.get_by_province.return_value = _make_source()
+
+        with patch("app.tasks.market_data_tasks.backfill_market_data") as mock_task:
+            mock_task.apply_async.return_value = MagicMock(id="task-1")
+            job = await backfill_service.start_backfill(
+                "guangdong", date(2025, 1, 1), date(2025, 12, 31), user_id=uuid.uuid4(),
+            )
+
+        assert job.status == "pending"
+        assert job.celery_task_id == "task-1"
+        mock_task.apply_async.assert_called_once_with(kwargs={"job_id": str(job.id)})
+        assert mock_backfill_repo.session.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_start_backfill_rejects_concurrent_job(
+        self, backfill_service, mock_source_repo, mock_backfill_repo,
+    ):
+        mock_source_repo.get_by_province.return_value = _make_source()
+        mock_backfill_repo.get_active_by_province.return_value = MagicMock()
+
+        with pytest.raises(BusinessError) as exc_info:
+            await backfill_service.start_backfill(
+                "guangdong", date(2025, 1, 1), date(2025, 1, 31), user_id=uuid.uuid4(),
+            )
+        assert exc_info.value.code == "BACKFILL_IN_PROGRESS"
+
+    @pytest.mark.asyncio
+    async def test_resume_only_failed_jobs(self, backfill_service, mock_backfill_repo):
+        job = MagicMock()
+        job.status = "completed"
+        mock_backfill_repo.get_by_id.return_value = job
+
+        with pytest.raises(BusinessError) as exc_info:
+            await backfill_service.resume_backfill(uuid.uuid4(), user_id=uuid.uuid4())
+        assert exc_info.value.code == "BACKFILL_NOT_RESUMABLE"
+
+
+class TestGetMarketDataBatch:
+    """批量查询：MGET → 一次查库 → pipeline 回填。"""
+
+    @staticmethod
+    def _row(province, trading_date, period):
+        row = MagicMock()
+        row.province = province
+        row.trading_date = trading_date
+        row.period = period
+        row.clearing_price = Decimal("350.00")
+        row.source = "api"
+        row.fetched_at = datetime(2026, 3, 1, tzinfo=UTC)
+        return row
+
+    @pytest.mark.asyncio
+    async def test_hits_and_misses_use_single_round_trips(
+        self, service, mock_redis, mock_price_repo, mock_source_repo,
+    ):
+        d1, d2 = date(2026, 3, 1), date(2026, 3, 2)
+        cached = [{"period": 1, "clearing_price": "300.00", "source": "api",
+                   "fetched_at": "2026-03-01T00:00:00+00:00"}]
+        # 键顺序：gd/d1, gd/d2, sd/d1, sd/d2
+        mock_redis.mget.return_value = [json.dumps(cached), None, None, None]
+        mock_price_repo.get_by_province_date_pairs.return_value = {
+            ("guangdong", d2): [self._row("guangdong", d2, p) for p in (1, 2)],
+            ("shandong", d1): [self._row("shandong", d1, 1)],
+        }
+        mock_source_repo.get_cache_ttls.return_value = {"guangdong": 600}
+        pipe = mock_redis.pipeline.return_value
+
+        result = await service.get_market_data_batch(["guangdong", "shandong"], d1, d2)
+
+        mock_redis.mget.assert_awaited_once()
+        mock_price_repo.get_by_province_date_pairs.assert_awaited_once_with([
+            ("guangdong", d2), ("shandong", d1), ("shandong", d2),
+        ])
+        mock_source_repo.get_cache_ttls.assert_awaited_once_with(["guangdong", "shandong"])
+        assert pipe.setex.call_count == 2
+        assert pipe.setex.call_args_list[0].args[:2] == ("market_data:guangdong:2026-03-02", 600)
+        assert pipe.setex.call_args_list[1].args[1] == 3600
+        pipe.execute.assert_awaited_once()
+
+        assert result.cache_hits == 1
+        assert result.cache_misses == 3
+        assert [len(item.records) for item in result.items] == [1, 2, 1, 0]
+        assert result.items[0].records[0].clearing_price == Decimal("300.00")
+
+    @pytest.mark.asyncio
+    async def test_works_without_redis(self, mock_price_repo, mock_source_repo, mock_audit_service):
+        service = MarketDataService(mock_price_repo, mock_source_repo, mock_audit_service, None)
+        mock_price_repo.get_by_province_date_pairs.return_value = {}
+
+        result = await service.get_market_data_batch(["guangdong"], date(2026, 3, 1), date(2026, 3, 3))
+
+        assert result.cache_misses == 3
+        assert all(item.records == [] for item in result.items)
+        mock_source_repo.get_cache_ttls.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_query(self, service):
+        with patch("app.services.market_data_service.settings") as mock_settings:
+            mock_settings.MARKET_DATA_BATCH_MAX_KEYS = 10
+            with pytest.raises(BusinessError) as exc_info:
+                await service.get_market_data_batch(
+                    ["guangdong", "shandong"], date(2026, 3, 1), date(2026, 3, 10),
+                )
+        assert exc_info.value.code == "BATCH_QUERY_TOO_LARGE"
+
+
+class TestGetMarketDataCoalescing:
+    """缓存未命中时的请求合并、跨进程回填锁与提前刷新。"""
+
+    KEY = ("guangdong", date(2026, 3, 1))
+    CURVE = [{"period": 1, "clearing_price": "300.00", "source": "api",
+              "fetched_at": "2026-03-01T07:00:00+00:00"}]
+
+    @pytest.fixture(autouse=True)
+    def no_l1(self):
+        with patch("app.services.market_data_service.get_curve_cache", return_value=None):
+            yield
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_fetch_upstream_once(
+        self, service, mock_redis, mock_price_repo,
+    ):
+        import asyncio
+
+        mock_redis.pipeline.return_value.execute.return_value = [None, -2]
+        mock_redis.set.return_value = True
+        mock_price_repo.get_by_province_date_pairs.return_value = {}
+
+        async def slow_fetch(province, trading_date):
+            await asyncio.sleep(0.01)
+            return [MagicMock(period=1, clearing_price=Decimal("300.00"))]
+
+        with patch.object(service, "fetch_market_data", side_effect=slow_fetch) as fetch:
+            results = await asyncio.gather(
+                *[service.get_market_data(*self.KEY) for _ in range(20)]
+            )
+
+        fetch.assert_awaited_once()
+        mock_redis.set.assert_awaited_once()
+        mock_redis.eval.assert_awaited_once()
+        assert all(r[0]["clearing_price"] == "300.00" for r in results)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_other_process_to_fill(
+        self, service, mock_redis, mock_price_repo,
+    ):
+        mock_redis.pipeline.return_value.execute.return_value = [None, -2]
+        # 锁被其他进程持有
+        mock_redis.set.return_value = None
+        mock_redis.mget.side_effect = [[None], [json.dumps(self.CURVE)]]
+
+        with patch("app.services.market_data_service._FILL_POLL_SECONDS", 0):
+            result = await service.get_market_data(*self.KEY)
+
+        assert result == self.CURVE
+        mock_price_repo.get_by_province_date_pairs.assert_not_awaited()
+        mock_redis.eval.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_entry_near_expiry_is_refreshed_early(
+        self, service, mock_redis, mock_price_repo, mock_source_repo,
+    ):
+        mock_redis.pipeline.return_value.execute.return_value = [json.dumps(self.CURVE), 100]
+        mock_redis.set.return_value = True
+        row = MagicMock(
+            period=1, clearing_price=Decimal("310.00"), source="api",
+            fetched_at=datetime(2026, 3, 1, 12, tzinfo=UTC),
+        )
+        mock_price_repo.get_by_province_date_pairs.return_value = {self.KEY: [row]}
+        mock_source_repo.get_cache_ttls.return_value = {"guangdong": 3600}
+
+        with patch("app.services.market_data_service.random.random", return_value=0.5):
+            result = await service.get_market_data(*self.KEY)
+
+        assert result[0]["clearing_price"] == "310.00"
+        mock_redis.pipeline.return_value.setex.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_or_busy_refresh_serves_cache(
+        self, service, mock_redis, mock_price_repo,
+    ):
+        mock_redis.pipeline.return_value.execute.return_value = [
+            json.dumps(self.CURVE), 3_600_000,
+        ]
+        assert await service.get_market_data(*self.KEY) == self.CURVE
+        mock_redis.set.assert_not_awaited()
+
+        # 临近过期但已有其他调用方在刷新
+        mock_redis.pipeline.return_value.execute.return_value = [json.dumps(self.CURVE), 1]
+        mock_redis.set.return_value = None
+        assert await service.get_market_data(*self.KEY) == self.CURVE
+        mock_price_repo.get_by_province_date_pairs.assert_not_awaited()
+
+
+class TestCurveCacheEncoding:
+    """Redis 曲线缓存的二进制编码与旧 JSON 兼容。"""
+
+    RECORDS = [
+        {"period": p, "clearing_price": f"{300 + p:.2f}", "source": "api",
+         "fetched_at": "2026-03-01T07:00:00+00:00"}
+        for p in range(1, 97)
+    ]
+
+    @pytest.mark.asyncio
+    async def test_written_binary_entry_reads_back(self, service, mock_redis):
+        await service._set_cache_many({("guangdong", date(2026, 3, 1)): (self.RECORDS, 600)})
+        raw = mock_redis.pipeline.return_value.setex.call_args.args[2]
+        assert isinstance(raw, bytes)
+
+        mock_redis.mget.return_value = [raw]
+        cached = await service._get_cache_many([("guangdong", date(2026, 3, 1))])
+        assert cached[("guangdong", date(2026, 3, 1))] == self.RECORDS
+
+    @pytest.mark.asyncio
+    async def test_legacy_json_entry_still_readable(self, service, mock_redis):
+        mock_redis.mget.return_value = [json.dumps(self.RECORDS).encode(), b"garbage"]
+
+        cached = await service._get_cache_many([
+            ("guangdong", date(2026, 3, 1)), ("guangdong", date(2026, 3, 2)),
+        ])
+        assert cached == {("guangdong", date(2026, 3, 1)): self.RECORDS}
+
+    @pytest.mark.asyncio
+    async def test_mixed_source_curve_falls_back_to_json(self, service, mock_redis):
+        records = [dict(self.RECORDS[0]), {**self.RECORDS[1], "source": "manual_import"}]
+        await service._set_cache_many({("guangdong", date(2026, 3, 1)): (records, 600)})
+
+        raw = mock_redis.pipeline.return_value.setex.call_args.args[2]
+        assert json.loads(raw) == records
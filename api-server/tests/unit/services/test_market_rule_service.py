@@ -1,5 +1,6 @@
 """MarketRuleService 单元测试 — Mock Repository 依赖，验证业务逻辑。"""
 
+import json
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 from uuid import uuid4
@@ -137,6 +138,101 @@ class TestCreateOrUpdateMarketRule:
         assert call_kwargs["changes_after"]["is_active"] is True
 
 
+class TestRuleChangeNotification:
+    @pytest.mark.asyncio
+    async def test_update_publishes_after_commit(self, mock_market_rule_repo, mock_audit_service):
+        from datetime import datetime, timezone
+
+        calls = []
+        redis_client = AsyncMock()
+        redis_client.publish.side_effect = lambda *args: calls.append("publish")
+        mock_market_rule_repo.session.commit.side_effect = lambda: calls.append("commit")
+        service = MarketRuleService(mock_market_rule_repo, mock_audit_service, redis_client)
+        existing = _make_rule(updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc))
+        mock_market_rule_repo.get_by_province_for_update.return_value = existing
+
+        await service.create_or_update_market_rule(
+            "guangdong", _valid_create_data(price_cap_upper=Decimal("2000.00")), _make_admin(),
+        )
+
+        assert calls == ["commit", "publish"]
+        channel, payload = redis_client.publish.call_args.args
+        assert channel == "market_rule_changed"
+        assert json.loads(payload) == {
+            "province": "guangdong", "updated_at": "2026-01-01T00:00:00+00:00",
+        }
+
+    @pytest.mark.asyncio
+    async def test_delete_refreshes_expired_updated_at(self, mock_market_rule_repo, mock_audit_service):
+        """flush 后 updated_at 已过期：必须先 refresh 再读取，否则会触发隐式懒加载。"""
+        from datetime import datetime, timezone
+
+        from sqlalchemy.orm import Session, make_transient_to_detached
+        from sqlalchemy.orm.attributes import set_committed_value
+
+        rule = ProvinceMarketRule(
+            id=uuid4(), province="guangdong", is_active=True,
+            updated_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        )
+        make_transient_to_detached(rule)
+        sync_session = Session()
+        sync_session.add(rule)
+        sync_session.expire(rule, ["updated_at"])
+        refreshed_at = datetime(2026, 2, 1, tzinfo=timezone.utc)
+        mock_market_rule_repo.session.refresh.side_effect = (
+            lambda obj: set_committed_value(obj, "updated_at", refreshed_at)
+        )
+        mock_market_rule_repo.get_by_province_for_update.return_value = rule
+        redis_client = AsyncMock()
+        service = MarketRuleService(mock_market_rule_repo, mock_audit_service, redis_client)
+
+        await service.delete_market_rule("guangdong", _make_admin())
+
+        mock_market_rule_repo.session.refresh.assert_awaited_once_with(rule)
+        _, payload = redis_client.publish.call_args.args
+        assert json.loads(payload)["updated_at"] == "2026-02-01T00:00:00+00:00"
+
+    @pytest.mark.asyncio
+    async def test_commit_failure_not_published(self, mock_market_rule_repo, mock_audit_service):
+        redis_client = AsyncMock()
+        mock_market_rule_repo.session.commit.side_effect = ConnectionError("db down")
+        service = MarketRuleService(mock_market_rule_repo, mock_audit_service, redis_client)
+        mock_market_rule_repo.get_by_province_for_update.return_value = _make_rule()
+
+        with pytest.raises(ConnectionError):
+            await service.delete_market_rule("guangdong", _make_admin())
+
+        redis_client.publish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unchanged_rule_not_published(self, mock_market_rule_repo, mock_audit_service):
+        redis_client = AsyncMock()
+        service = MarketRuleService(mock_market_rule_repo, mock_audit_service, redis_client)
+        mock_market_rule_repo.get_by_province_for_update.return_value = _make_rule()
+
+        await service.create_or_update_market_rule("guangdong", _valid_create_data(), _make_admin())
+
+        redis_client.publish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_does_not_fail_request(
+        self, mock_market_rule_repo, mock_audit_service,
+    ):
+        redis_client = AsyncMock()
+        redis_client.publish.side_effect = ConnectionError("redis down")
+        service = MarketRuleService(mock_market_rule_repo, mock_audit_service, redis_client)
+        mock_market_rule_repo.get_by_province_for_update.return_value = None
+        mock_market_rule_repo.create.side_effect = lambda r: r
+
+        result = await service.create_or_update_market_rule(
+            "guangdong", _valid_create_data(), _make_admin(),
+        )
+
+        assert result.province == "guangdong"
+        mock_market_rule_repo.session.commit.assert_awaited_once()
+        redis_client.publish.assert_awaited_once()
+
+
 class TestGetMarketRule:
     @pytest.mark.asyncio
     async def test_get_existing_rule(self, service, mock_market_rule_repo):
@@ -1,9 +1,10 @@
 from datetime import date
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from app.services.prediction_adapters.base import PredictionBatch
 from app.services.prediction_adapters.generic import GenericPredictionAdapter
 
 
@@ -40,11 +41,10 @@ class TestGenericPredictionAdapter:
             },
         ]
 
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.get.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             records = await adapter.fetch_predictions("station-1", date(2026, 3, 1))
             assert len(records) == 2
@@ -70,11 +70,10 @@ class TestGenericPredictionAdapter:
             ]
         }
 
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.get.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             records = await adapter.fetch_predictions("station-1", date(2026, 3, 1))
             assert len(records) == 1
@@ -96,14 +95,13 @@ class TestGenericPredictionAdapter:
             },
         ]
 
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.get.side_effect = [
                 httpx.ConnectError("连接失败"),
                 mock_success_response,
             ]
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             with patch("app.services.prediction_adapters.generic.asyncio.sleep", new_callable=AsyncMock):
                 records = await adapter.fetch_predictions("station-1", date(2026, 3, 1))
@@ -114,38 +112,91 @@ class TestGenericPredictionAdapter:
         """测试所有重试都失败后抛出异常。"""
         import httpx
 
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.get.side_effect = httpx.ConnectError("连接失败")
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             with patch("app.services.prediction_adapters.generic.asyncio.sleep", new_callable=AsyncMock):
                 with pytest.raises(RuntimeError, match="功率预测获取失败"):
                     await adapter.fetch_predictions("station-1", date(2026, 3, 1))
 
+    @pytest.mark.asyncio
+    async def test_fetch_prediction_batch_columnar(self, adapter):
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = {"data": [
+            {"period": 1, "predicted_power_kw": 1500, "confidence_upper_kw": 1650.5, "confidence_lower_kw": "1350"},
+            {"period": "2", "predicted_power_kw": -10, "confidence_upper_kw": 0, "confidence_lower_kw": -20},
+        ]}
+
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.return_value = mock_response
+            mock_get_client.return_value = mock_client
+
+            batch = await adapter.fetch_prediction_batch("station-1", date(2026, 3, 1))
+
+        assert batch.period.tolist() == [1, 2]
+        assert batch.predicted.tolist() == [1500.0, -10.0]
+        assert batch.upper.tolist() == [1650.5, 0.0]
+        assert batch.lower.tolist() == [1350.0, -20.0]
+        assert batch.predicted_raw == [1500, -10]
+
+    @pytest.mark.asyncio
+    async def test_fetch_prediction_batch_rejects_non_numeric(self, adapter):
+        """无法解析的功率值与逐条 Decimal 解析一致抛 InvalidOperation，不重试。"""
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = [
+            {"period": 1, "predicted_power_kw": None, "confidence_upper_kw": 1, "confidence_lower_kw": 0},
+        ]
+
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
+            mock_client = AsyncMock()
+            mock_client.get.return_value = mock_response
+            mock_get_client.return_value = mock_client
+
+            with pytest.raises(InvalidOperation):
+                await adapter.fetch_prediction_batch("station-1", date(2026, 3, 1))
+            assert mock_client.get.call_count == 1
+
+    def test_to_records_matches_decimal_parsing(self):
+        """to_records 的 Decimal 与逐条 Decimal(str(原始值)) 完全相等（含 float 往返会改变的值）。"""
+        items = [
+            {"period": 1, "predicted_power_kw": 0.1, "confidence_upper_kw": 1650.55, "confidence_lower_kw": "1350.10"},
+            {"period": 2, "predicted_power_kw": "100.00", "confidence_upper_kw": 1e-7, "confidence_lower_kw": 3},
+        ]
+
+        records = PredictionBatch.from_items(items).to_records()
+
+        for item, record in zip(items, records):
+            for field in ("predicted_power_kw", "confidence_upper_kw", "confidence_lower_kw"):
+                expected = Decimal(str(item[field]))
+                actual = getattr(record, field)
+                assert actual == expected
+                assert actual.as_tuple() == expected.as_tuple()
+
     @pytest.mark.asyncio
     async def test_health_check_success(self, adapter):
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_response = AsyncMock()
             mock_response.status_code = 200
             mock_client.head.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             result = await adapter.health_check()
             assert result is True
 
     @pytest.mark.asyncio
     async def test_health_check_server_error(self, adapter):
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_response = AsyncMock()
             mock_response.status_code = 500
             mock_client.head.return_value = mock_response
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             result = await adapter.health_check()
             assert result is False
@@ -154,11 +205,10 @@ class TestGenericPredictionAdapter:
     async def test_health_check_connection_error(self, adapter):
         import httpx
 
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.head.side_effect = httpx.ConnectError("连接失败")
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             result = await adapter.health_check()
             assert result is False
@@ -168,11 +218,10 @@ class TestGenericPredictionAdapter:
         """测试 asyncio.TimeoutError 路径。"""
         import asyncio
 
-        with patch("app.services.prediction_adapters.generic.httpx.AsyncClient") as MockClient:
+        with patch("app.services.prediction_adapters.generic.get_http_client") as mock_get_client:
             mock_client = AsyncMock()
             mock_client.head.side_effect = asyncio.TimeoutError()
-            MockClient.return_value.__aenter__ = AsyncMock(return_value=mock_client)
-            MockClient.return_value.__aexit__ = AsyncMock(return_value=False)
+            mock_get_client.return_value = mock_client
 
             result = await adapter.health_check()
             assert result is False
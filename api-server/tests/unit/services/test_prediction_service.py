@@ -1,13 +1,17 @@
 import uuid
-from datetime import date
+from datetime import UTC, date, datetime
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from app.core.exceptions import BusinessError
-from app.services.prediction_adapters.base import PredictionRecord
-from app.services.prediction_service import PredictionService, validate_prediction_records
+from app.services.prediction_adapters.base import PredictionBatch, PredictionRecord
+from app.services.prediction_service import (
+    PredictionService,
+    validate_prediction_batch,
+    validate_prediction_records,
+)
 
 
 def _make_model(
@@ -126,6 +130,18 @@ class TestUpdateModel:
         )
         assert result.model_name == "新名称"
 
+    @pytest.mark.asyncio
+    async def test_cron_change_recomputes_next_fetch(self, service, mock_model_repo):
+        model = _make_model()
+        model.next_fetch_at = None
+        mock_model_repo.get_by_id.return_value = model
+        mock_model_repo.session = AsyncMock()
+
+        await service.update_model(model.id, {"call_frequency_cron": "45 * * * *"})
+
+        assert model.next_fetch_at > datetime.now(UTC)
+        assert model.next_fetch_at.minute == 45
+
     @pytest.mark.asyncio
     async def test_update_not_found(self, service, mock_model_repo):
         mock_model_repo.get_by_id.return_value = None
@@ -313,6 +329,62 @@ class TestListModels:
         )
 
 
+class TestGetPredictionCurves:
+    """get_prediction_curves 方法测试。"""
+
+    @pytest.fixture
+    def curve_service(self, mock_model_repo, mock_audit_service):
+        return PredictionService(
+            mock_model_repo, mock_audit_service,
+            prediction_repo=AsyncMock(), station_service=AsyncMock(),
+        )
+
+    @pytest.mark.asyncio
+    async def test_defaults_to_station_models(self, curve_service, mock_model_repo):
+        station_id = uuid.uuid4()
+        models = [_make_model(), _make_model()]
+        mock_model_repo.get_by_station_id.return_value = models
+        curve = {"predicted": [1.0] * 96, "upper": [2.0] * 96, "lower": [0.0] * 96}
+        curve_service.prediction_repo.get_curves.return_value = {
+            (models[0].id, date(2026, 3, 7)): curve,
+            (models[0].id, date(2026, 3, 6)): curve,
+        }
+        access_ctx = MagicMock()
+
+        result = await curve_service.get_prediction_curves(
+            access_ctx, station_id, date(2026, 3, 6), date(2026, 3, 7),
+        )
+
+        curve_service.station_service.get_station_for_user.assert_awaited_once_with(access_ctx, station_id)
+        kwargs = curve_service.prediction_repo.get_curves.await_args.kwargs
+        assert kwargs["model_ids"] == [m.id for m in models]
+        assert [s.prediction_date for s in result.series] == [date(2026, 3, 6), date(2026, 3, 7)]
+
+    @pytest.mark.asyncio
+    async def test_station_without_models_skips_query(self, curve_service, mock_model_repo):
+        mock_model_repo.get_by_station_id.return_value = []
+
+        result = await curve_service.get_prediction_curves(
+            MagicMock(), uuid.uuid4(), date(2026, 3, 6), date(2026, 3, 6),
+        )
+
+        assert result.series == []
+        curve_service.prediction_repo.get_curves.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rejects_range_over_limit(self, curve_service):
+        with patch("app.services.prediction_service.settings") as mock_settings:
+            mock_settings.PREDICTION_RANGE_MAX_SERIES = 10
+            with pytest.raises(BusinessError) as exc_info:
+                await curve_service.get_prediction_curves(
+                    MagicMock(), uuid.uuid4(), date(2026, 3, 1), date(2026, 3, 6),
+                    model_ids=[uuid.uuid4(), uuid.uuid4()],
+                )
+
+        assert exc_info.value.code == "PREDICTION_RANGE_TOO_LARGE"
+        curve_service.prediction_repo.get_curves.assert_not_called()
+
+
 class TestGetAllModelStatuses:
     """get_all_model_statuses 方法测试。"""
 
@@ -381,6 +453,45 @@ class TestValidatePredictionRecords:
         assert len(valid) == 49
         assert any("Incomplete" in e for e in errors)
 
+    def test_mixed_errors_in_record_order(self):
+        records = [
+            self._make_record(period=1),
+            self._make_record(period=97, power=-5),
+            self._make_record(period=3, power=-10.5, upper=0, lower=-20),
+            self._make_record(period=4, power=1500, upper=1400, lower=1300),
+            self._make_record(period=5, power=0, upper=0, lower=0),
+        ]
+        valid, errors = validate_prediction_records(records)
+        assert valid == [records[0], records[4]]
+        assert errors == [
+            "Invalid period 97",
+            "Period 3: negative power -10.5",
+            "Period 4: confidence violation",
+            "Incomplete: 2/96 valid records",
+        ]
+
+    def test_batch_from_json_matches_records(self):
+        items = [
+            {"period": i, "predicted_power_kw": p, "confidence_upper_kw": u, "confidence_lower_kw": lo}
+            for i, p, u, lo in [(1, 1500, 1650, 1350), (2, -10, 0, -20), (0, 1, 2, 0), (4, 10.25, 10.2, 9)]
+        ]
+        records = [
+            PredictionRecord(
+                period=int(item["period"]),
+                predicted_power_kw=Decimal(str(item["predicted_power_kw"])),
+                confidence_upper_kw=Decimal(str(item["confidence_upper_kw"])),
+                confidence_lower_kw=Decimal(str(item["confidence_lower_kw"])),
+            )
+            for item in items
+        ]
+
+        valid, errors = validate_prediction_batch(PredictionBatch.from_items(items))
+        expected_valid, expected_errors = validate_prediction_records(records)
+
+        assert errors == expected_errors
+        assert errors[0] == "Period 2: negative power -10"
+        assert valid.period.tolist() == [r.period for r in expected_valid]
+
 
 class TestFetchPredictions:
     """fetch_predictions 方法测试。"""
@@ -0,0 +1,107 @@
+"""自适应批次大小与提交频率测试。"""
+
+import uuid
+from unittest.mock import MagicMock, patch
+
+from app.tasks.import_batching import AdaptiveBatchSizer, estimate_record_bytes
+from app.tasks.import_tasks import ImportContext
+
+
+def _sizer(**kwargs):
+    params = dict(
+        initial=1000, min_size=200, max_size=20000,
+        target_seconds=0.5, memory_budget=1 << 30, adaptive=True,
+    )
+    params.update(kwargs)
+    return AdaptiveBatchSizer(**params)
+
+
+class TestAdaptiveBatchSizer:
+    def test_grows_towards_target_latency_with_step_limit(self):
+        sizer = _sizer()
+        # 1000 行 0.05s → 20000 行/s，目标 0.5s 对应 10000 行，单次最多放大 2 倍后取平均
+        assert sizer.observe(1000, 0.05) == 1500
+
+        for _ in range(20):
+            sizer.observe(sizer.size, sizer.size / 20000)
+        assert 9000 <= sizer.size <= 10000
+
+    def test_shrinks_on_slow_writes(self):
+        sizer = _sizer()
+        assert sizer.observe(1000, 5.0) == 750
+
+    def test_respects_bounds(self):
+        sizer = _sizer(initial=300)
+        for _ in range(10):
+            sizer.observe(sizer.size, 100.0)
+        assert sizer.size == 200
+
+        sizer = _sizer(initial=15000)
+        for _ in range(10):
+            sizer.observe(sizer.size, 0.001)
+        assert sizer.size == 20000
+
+    def test_memory_budget_caps_size(self):
+        record = {"id": uuid.uuid4(), "soc": "0.5", "cycle_count": 1}
+        budget = estimate_record_bytes(record) * 1200
+        sizer = _sizer(memory_budget=budget)
+
+        for _ in range(10):
+            sizer.observe(sizer.size, 0.001, record)
+
+        assert sizer.size == 1200
+
+    def test_ignores_partial_batches_and_disabled(self):
+        sizer = _sizer()
+        assert sizer.observe(10, 0.0001) == 1000
+
+        sizer = _sizer(adaptive=False)
+        assert sizer.observe(1000, 0.0001) == 1000
+
+
+class TestCommitCadence:
+    def _ctx(self):
+        job = MagicMock()
+        job.id = uuid.uuid4()
+        job.processed_records = job.success_records = job.failed_records = 0
+        job.metrics = None
+        session = MagicMock()
+        return ImportContext(session, job, 0), session, job
+
+    @patch("app.tasks.import_tasks._write_anomalies")
+    @patch("app.tasks.import_tasks.settings")
+    def test_commits_every_n_batches(self, mock_settings, _mock_write):
+        mock_settings.IMPORT_COMMIT_EVERY_BATCHES = 3
+        ctx, session, job = self._ctx()
+        insert_fn = MagicMock(side_effect=lambda records: (len(records), 0))
+
+        for i in range(2):
+            ctx.add_anomaly("format_error", "period", "x")
+            ctx.row_number = i + 1
+            ctx.flush_batch(insert_fn)
+        assert session.commit.call_count == 0
+
+        ctx.add_anomaly("format_error", "period", "x")
+        ctx.row_number = 3
+        ctx.flush_batch(insert_fn)
+        assert session.commit.call_count == 1
+        assert job.last_processed_row == 3
+
+    @patch("app.tasks.import_tasks._write_anomalies")
+    @patch("app.tasks.import_tasks.settings")
+    def test_final_flush_always_commits(self, mock_settings, _mock_write):
+        mock_settings.IMPORT_COMMIT_EVERY_BATCHES = 10
+        ctx, session, job = self._ctx()
+        ctx.add_anomaly("format_error", "period", "x")
+        ctx.row_number = 1
+
+        ctx.flush_batch(MagicMock(), commit=True)
+
+        session.commit.assert_called_once()
+        assert job.failed_records == 1
+
+    def test_should_flush_uses_adaptive_size(self):
+        ctx, _, _ = self._ctx()
+        ctx.batch_sizer.size = 2
+        ctx.batch_records = [{}, {}]
+        assert ctx.should_flush()
@@ -0,0 +1,284 @@
+"""列式解析/校验引擎测试：与逐行引擎逐批次对比结果。"""
+
+import csv
+import uuid
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.tasks.import_columnar import (
+    _bulk_uuid4,
+    _check_decimal,
+    _check_integer,
+    _first_anomaly,
+    _to_array,
+)
+from app.tasks.import_tasks import (
+    ImportContext,
+    _execute_import,
+    _execute_station_output_import,
+    _execute_storage_operation_import,
+)
+
+
+def _write_csv(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+
+
+def _make_mock_job(job_id, station_id, file_name):
+    job = MagicMock()
+    job.id = job_id
+    job.station_id = station_id
+    job.file_name = file_name
+    job.total_records = 0
+    job.processed_records = 0
+    job.success_records = 0
+    job.failed_records = 0
+    job.last_processed_row = 0
+    job.imported_by = uuid.uuid4()
+    job.original_file_name = "test.csv"
+    return job
+
+
+def _make_session(job, station_id, storage, price_cap=(-100.0, 1500.0)):
+    from app.models.data_import import DataImportJob
+    from app.models.station import PowerStation
+
+    station = MagicMock()
+    station.id = station_id
+    station.province = "广东"
+
+    rule = MagicMock()
+    rule.price_cap_lower, rule.price_cap_upper = price_cap
+
+    device = MagicMock()
+    device.id = uuid.uuid4()
+
+    # scalar_one_or_none 同时用于市场规则与储能设备查询
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = device if storage else rule
+    result.rowcount = 0
+    result.all.return_value = []
+
+    session = MagicMock()
+    session.get.side_effect = lambda model, _id: (
+        job if model == DataImportJob else station if model == PowerStation else None
+    )
+    session.execute.return_value = result
+    return session, device
+
+
+def _run(execute_fn, tmp_path, csv_rows, engine, resume_from_row=0, storage=False, **kwargs):
+    """执行一次导入，返回 (flush 轨迹, job, device)。"""
+    job_id, station_id = uuid.uuid4(), uuid.uuid4()
+    file_name = f"{job_id}/test.csv"
+    _write_csv(tmp_path / file_name, csv_rows)
+
+    job = _make_mock_job(job_id, station_id, file_name)
+    session, device = _make_session(job, station_id, storage)
+    task = MagicMock()
+    task.request.id = "celery-task"
+
+    trace = []
+    original_flush = ImportContext.flush_batch
+
+    def recording_flush(ctx, insert_fn, commit=False):
+        trace.append((
+            ctx.row_number,
+            [{k: v for k, v in r.items() if k not in ("id", "import_job_id", "station_id", "device_id")}
+             for r in ctx.batch_records],
+            [(a["row_number"], a["anomaly_type"], a["field_name"], a["raw_value"],
+              a["template_id"], a["template_params"])
+             for a in ctx.batch_anomalies],
+        ))
+        original_flush(ctx, insert_fn, commit)
+
+    with patch("app.tasks.import_tasks.settings") as mock_settings, \
+            patch("app.tasks.import_tasks.BATCH_SIZE", 3), \
+            patch("app.tasks.import_batching.settings.IMPORT_BATCH_ADAPTIVE", False), \
+            patch.object(ImportContext, "flush_batch", recording_flush), \
+            patch("app.tasks.import_columnar.settings") as columnar_settings, \
+            patch("app.tasks.import_tasks._insert_trading_records", side_effect=lambda _s, r: (len(r), 0)), \
+            patch("app.tasks.import_tasks._insert_output_records", side_effect=lambda _s, r: (len(r), 0)), \
+            patch("app.tasks.import_tasks._insert_storage_records", side_effect=lambda _s, r: (len(r), 0)):
+        mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+        mock_settings.IMPORT_ENGINE = engine
+        mock_settings.IMPORT_COMMIT_EVERY_BATCHES = 1
+        columnar_settings.IMPORT_COLUMNAR_CHUNK_SIZE = 4
+        execute_fn(session, task, str(job_id), resume_from_row, **kwargs)
+
+    return trace, job, device
+
+
+def _job_counters(job):
+    return (
+        job.total_records, job.processed_records, job.success_records,
+        job.failed_records, job.last_processed_row, job.data_completeness,
+    )
+
+
+TRADING_ROWS = [
+    ["trading_date", "period", "clearing_price"],
+    ["2025-01-01", "1", "100.00"],
+    ["2025-01-01", "2", "abc"],
+    ["bad-date", "3", "300.00"],
+    ["2025-01-01", "97", "abc"],
+    ["2025-01-01", "5", "9999"],
+    ["2025-01-01", "6", "-50"],
+    ["2025/01/02", "1", "100.00"],
+    ["2025-01-02"],
+    ["2025-01-02", "3", "NaN"],
+    ["20250102", "4", " 88.5 "],
+    ["2025-01-02", "5", "100.00"],
+    ["2025-01-02", "6", "-101"],
+    ["2025-01-02", "7", "1500"],
+]
+
+
+class TestColumnarParity:
+    """列式引擎与逐行引擎的结果一致性。"""
+
+    def test_trading_import_matches_row_engine(self, tmp_path):
+        row_trace, row_job, _ = _run(_execute_import, tmp_path / "row", TRADING_ROWS, "row")
+        col_trace, col_job, _ = _run(_execute_import, tmp_path / "col", TRADING_ROWS, "columnar")
+
+        assert col_trace == row_trace
+        assert _job_counters(col_job) == _job_counters(row_job)
+        assert col_job.status == "completed"
+
+    def test_trading_resume_matches_row_engine(self, tmp_path):
+        row_trace, row_job, _ = _run(_execute_import, tmp_path / "row", TRADING_ROWS, "row", 6)
+        col_trace, col_job, _ = _run(_execute_import, tmp_path / "col", TRADING_ROWS, "columnar", 6)
+
+        assert col_trace == row_trace
+        assert _job_counters(col_job) == _job_counters(row_job)
+        assert col_job.total_records == len(TRADING_ROWS) - 1
+
+    def test_output_import_matches_row_engine(self, tmp_path):
+        rows = [
+            ["trading_date", "period", "actual_output_kw"],
+            ["2025-01-01", "1", "500.5"],
+            ["2025-01-01", "2", "-1"],
+            ["2025-01-01", "3", ""],
+            ["2025-01-01", "0", "10"],
+            ["2025-01-01", "4", "0"],
+            ["2025-01-01", "5", "12"],
+        ]
+        row_trace, row_job, _ = _run(_execute_station_output_import, tmp_path / "row", rows, "row")
+        col_trace, col_job, _ = _run(
+            _execute_station_output_import, tmp_path / "col", rows, "columnar",
+        )
+
+        assert col_trace == row_trace
+        assert _job_counters(col_job) == _job_counters(row_job)
+
+    @pytest.mark.parametrize("ems_format,rows", [
+        ("standard", [
+            ["trading_date", "period", "soc", "charge_power_kw"],
+            ["2025-01-01", "1", "0.5", "10"],
+            ["2025-01-01", "2", "1.5", "10"],
+            ["2025-01-01", "3", "0.6", "-5"],
+            ["2025-01-01", "96", "0.7", ""],
+            ["2025-01-01", "4", "abc", "x"],
+            ["2025-01-01", "96", "0.9", "1"],
+            ["2024-12-31", "96", "0.1", "1"],
+        ]),
+        ("sungrow", [
+            ["数据日期", "时段序号", "SOC(%)", "充电功率(kW)", "放电功率(kW)", "累计循环"],
+            ["2025-01-01", "1", "50", "10", "0", "1"],
+            ["2025-01-01", "2", "150", "10", "0", "1"],
+            ["2025-01-01", "3", "60", "0", "-3", "1"],
+            ["2025-01-01", "4", "70", "0", "3", "x"],
+            ["2025-01-02", "1", "80", "0", "3", "2"],
+        ]),
+    ])
+    def test_storage_import_matches_row_engine(self, tmp_path, ems_format, rows):
+        row_trace, row_job, row_device = _run(
+            _execute_storage_operation_import, tmp_path / "row", rows, "row",
+            storage=True, ems_format=ems_format,
+        )
+        col_trace, col_job, col_device = _run(
+            _execute_storage_operation_import, tmp_path / "col", rows, "columnar",
+            storage=True, ems_format=ems_format,
+        )
+
+        assert col_trace == row_trace
+        assert _job_counters(col_job) == _job_counters(row_job)
+        assert col_device.current_soc == row_device.current_soc
+
+
+class TestColumnarHelpers:
+    def test_first_anomaly_prefers_earlier_check(self):
+        import numpy as np
+
+        a = np.empty(3, dtype=object)
+        b = np.empty(3, dtype=object)
+        a[:] = [None, ("a",), None]
+        b[:] = [("b",), ("b",), None]
+
+        result = _first_anomaly(a, b)
+
+        assert result.tolist() == [("b",), ("a",), None]
+
+    def test_to_array_keeps_trailing_nul(self):
+        arr = _to_array(["1\x00", "2"])
+        assert arr.tolist() == ["1\x00", "2"]
+
+    def test_to_array_not_fixed_width(self):
+        arr = _to_array(["1", "x" * 100_000])
+        # 变长字符串：不会按最长单元格为每行分配定宽空间
+        assert arr.dtype.kind == "T"
+        assert arr.itemsize < 100
+
+    def test_check_integer_matches_period_check(self):
+        from app.tasks.import_tasks import _check_period
+
+        raws = ["1", "96", "0", "97", "+5", "-1", "٣", "0005", "1_0", "", "x", "9" * 30, "1.0"]
+
+        parsed, anomalies = _check_integer(_to_array(raws), _check_period, 1, 96)
+
+        assert list(zip(parsed.tolist(), anomalies.tolist())) == [_check_period(r) for r in raws]
+
+    @pytest.mark.parametrize("lower, upper", [
+        (Decimal("-100"), Decimal("1500.00")),
+        (Decimal("0"), Decimal("1500")),
+        (Decimal("0"), None),
+    ])
+    def test_check_decimal_matches_row_checks(self, lower, upper):
+        from functools import partial
+
+        from app.tasks.import_tasks import _check_clearing_price, _check_output_kw
+
+        raws = [
+            "350.50", "1500.00", "1500", "1500.0000000000000001", "1500.01", "-100", "-100.5",
+            "0", "-0", "0.000", "-0.0000000000000000000001", "+.5", "1.", "٣", "1e3", "NaN",
+            "Infinity", "", "abc", "--1", "1_0", "1" * 400, "-" + "1" * 400,
+        ]
+        if upper is None:
+            check_fn = _check_output_kw
+        else:
+            check_fn = partial(_check_clearing_price, price_cap_lower=lower, price_cap_upper=upper)
+
+        parsed, anomalies = _check_decimal(_to_array(raws), check_fn, lower, upper)
+
+        expected = [check_fn(raw) for raw in raws]
+        assert list(zip(parsed.tolist(), anomalies.tolist())) == expected
+        assert [str(p) for p in parsed.tolist()] == [str(e[0]) for e in expected]
+
+    def test_bulk_uuid4_version(self):
+        ids = _bulk_uuid4(5)
+        assert len(set(ids)) == 5
+        assert all(i.version == 4 for i in ids)
+
+    def test_columnar_engine_falls_back_without_setting(self):
+        from app.tasks.import_tasks import _use_columnar_engine
+
+        with patch("app.tasks.import_tasks.settings") as mock_settings:
+            mock_settings.IMPORT_ENGINE = "row"
+            assert _use_columnar_engine() is False
+            mock_settings.IMPORT_ENGINE = "columnar"
+            assert _use_columnar_engine() is True
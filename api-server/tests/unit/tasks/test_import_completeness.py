@@ -0,0 +1,89 @@
+"""时段覆盖位图与增量完整性检测测试。"""
+
+import uuid
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+from app.models.data_import import TradingRecord
+from app.tasks.import_completeness import PeriodCoverage
+from app.tasks.import_tasks import _check_period_completeness
+
+D1, D2, D3 = date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)
+
+
+def _full_day(d: date) -> tuple[list[date], list[int]]:
+    return [d] * 96, list(range(1, 97))
+
+
+class TestPeriodCoverage:
+    def test_complete_only_when_all_96_periods_seen(self):
+        coverage = PeriodCoverage()
+        coverage.add(*_full_day(D1))
+        coverage.add([D2] * 95, list(range(1, 96)))
+
+        assert coverage.complete_dates() == {D1}
+        coverage.add([D2], [96])
+        assert coverage.complete_dates() == {D1, D2}
+
+    def test_duplicate_periods_and_records(self):
+        coverage = PeriodCoverage()
+        coverage.add_records([{"trading_date": D1, "period": 5}] * 3)
+        coverage.add(*_full_day(D1))
+
+        assert coverage.complete_dates() == {D1}
+        assert len(coverage) == 1
+
+    def test_grows_beyond_initial_capacity(self):
+        coverage = PeriodCoverage()
+        days = [D1 + timedelta(days=i) for i in range(200)]
+        for d in days:
+            coverage.add(*_full_day(d))
+
+        assert coverage.complete_dates() == set(days)
+
+    def test_json_roundtrip_and_merge_across_shards(self):
+        first, second = PeriodCoverage(), PeriodCoverage()
+        first.add([D1] * 50, list(range(1, 51)))
+        second.add([D1] * 46, list(range(51, 97)))
+        second.add(*_full_day(D2))
+
+        merged = PeriodCoverage.from_json(first.to_json())
+        merged.merge(PeriodCoverage.from_json(second.to_json()))
+
+        assert merged.complete_dates() == {D1, D2}
+        assert PeriodCoverage.from_json({}).complete_dates() == set()
+
+
+class TestIncrementalCompleteness:
+    def test_no_query_when_all_dates_covered(self):
+        session = MagicMock()
+        coverage = PeriodCoverage()
+        coverage.add(*_full_day(D1))
+
+        _check_period_completeness(
+            session, uuid.uuid4(), uuid.uuid4(), {D1}, TradingRecord, "station_id",
+            coverage=coverage,
+        )
+
+        session.execute.assert_not_called()
+
+    def test_only_incomplete_dates_queried(self):
+        session = MagicMock()
+        row = MagicMock()
+        row.trading_date, row.periods = D2, list(range(1, 95))
+        session.execute.return_value.all.return_value = [row]
+        coverage = PeriodCoverage()
+        coverage.add(*_full_day(D1))
+        coverage.add([D2], [1])
+
+        with patch("app.tasks.import_tasks._write_anomalies") as mock_write:
+            _check_period_completeness(
+                session, uuid.uuid4(), uuid.uuid4(), {D1, D2, D3}, TradingRecord, "station_id",
+                coverage=coverage,
+            )
+
+        params = session.execute.call_args.args[0].compile().params
+        queried = next(v for k, v in params.items() if k.startswith("trading_date"))
+        assert sorted(queried) == [D2, D3]
+        (anomaly,) = mock_write.call_args.args[1]
+        assert anomaly["template_params"]["missing"] == "95, 96"
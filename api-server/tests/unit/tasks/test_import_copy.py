@@ -0,0 +1,183 @@
+"""COPY 批量写入测试。"""
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from app.models.data_import import ImportAnomaly, StorageOperationRecord, TradingRecord
+from app.tasks.import_copy import copy_insert_records, copy_records
+from app.tasks.import_tasks import ImportContext, _insert_trading_records
+
+
+def _make_session(rowcount: int):
+    cursor = MagicMock()
+    cursor.rowcount = rowcount
+    cursor.__enter__.return_value = cursor
+
+    raw_conn = MagicMock()
+    raw_conn.info = {}
+    raw_conn.cursor.return_value = cursor
+
+    session = MagicMock()
+    session.connection.return_value.connection = raw_conn
+    return session, raw_conn, cursor
+
+
+def _trading_records(n: int) -> list[dict]:
+    job_id, station_id = uuid.uuid4(), uuid.uuid4()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "trading_date": date(2025, 1, 1),
+            "period": i + 1,
+            "station_id": station_id,
+            "clearing_price": Decimal("350.50"),
+            "import_job_id": job_id,
+        }
+        for i in range(n)
+    ]
+
+
+class TestCopyInsertRecords:
+    def test_empty_records(self):
+        session, _, cursor = _make_session(0)
+        assert copy_insert_records(session, TradingRecord, [], ["station_id"]) == (0, 0)
+        session.connection.assert_not_called()
+
+    def test_copy_then_merge_returns_counts(self):
+        session, _, cursor = _make_session(2)
+        records = _trading_records(3)
+
+        result = copy_insert_records(
+            session, TradingRecord, records, ["station_id", "trading_date", "period"],
+        )
+
+        assert result == (2, 1)
+        copy_sql, buffer = cursor.copy_expert.call_args.args
+        assert copy_sql.startswith("COPY _import_stage_trading_records (id, trading_date, period,")
+        lines = buffer.getvalue().splitlines()
+        assert len(lines) == 3
+        assert lines[0] == (
+            f"{records[0]['id']},2025-01-01,1,{records[0]['station_id']},350.50,"
+            f"{records[0]['import_job_id']}"
+        )
+
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        assert statements[0].startswith(
+            "CREATE TEMP TABLE IF NOT EXISTS _import_stage_trading_records "
+            "(LIKE timeseries.trading_records"
+        )
+        assert "INSERT INTO timeseries.trading_records" in statements[1]
+        assert "ON CONFLICT (station_id, trading_date, period) DO NOTHING" in statements[1]
+        assert statements[2] == "TRUNCATE _import_stage_trading_records"
+
+    def test_import_after_rolled_back_import(self):
+        """建表事务回滚后暂存表随之消失，同一池化连接上的下一次导入须重新建表。"""
+
+        class _TempTableConn:
+            """按事务语义模拟 TEMP 表：回滚撤销本事务内创建的表。"""
+
+            def __init__(self):
+                self.info = {}
+                self.committed: set[str] = set()
+                self.pending: set[str] = set()
+                self.cursor_obj = MagicMock()
+                self.cursor_obj.__enter__.return_value = self.cursor_obj
+                self.cursor_obj.rowcount = 1
+                self.cursor_obj.execute.side_effect = self._execute
+                self.cursor_obj.copy_expert.side_effect = self._copy
+
+            def cursor(self):
+                return self.cursor_obj
+
+            def _tables(self):
+                return self.committed | self.pending
+
+            def _execute(self, sql):
+                if sql.startswith("CREATE TEMP TABLE IF NOT EXISTS "):
+                    self.pending.add(sql.split()[6])
+
+            def _copy(self, sql, buffer):
+                stage = sql.split()[1]
+                if stage not in self._tables():
+                    raise RuntimeError(f'relation "{stage}" does not exist')
+
+            def rollback(self):
+                self.pending.clear()
+
+        raw_conn = _TempTableConn()
+        session = MagicMock()
+        session.connection.return_value.connection = raw_conn
+        conflict = ["device_id", "trading_date", "period"]
+        record = {
+            "id": uuid.uuid4(), "trading_date": date(2025, 1, 1), "period": 1,
+            "device_id": uuid.uuid4(), "soc": Decimal("0.5"),
+        }
+
+        copy_insert_records(session, StorageOperationRecord, [record], conflict)
+        raw_conn.rollback()
+
+        assert copy_insert_records(session, StorageOperationRecord, [record], conflict) == (1, 0)
+        creates = [
+            c.args[0] for c in raw_conn.cursor_obj.execute.call_args_list
+            if c.args[0].startswith("CREATE TEMP")
+        ]
+        assert len(creates) == 2
+        assert creates[0].endswith("ON COMMIT DELETE ROWS")
+        assert raw_conn.info == {}
+
+
+class TestBulkLoaderSelection:
+    @patch("app.tasks.import_tasks.settings")
+    def test_copy_loader_used_when_configured(self, mock_settings):
+        mock_settings.IMPORT_BULK_LOADER = "copy"
+        records = _trading_records(2)
+
+        with patch("app.tasks.import_copy.copy_insert_records", return_value=(2, 0)) as mock_copy:
+            assert _insert_trading_records(MagicMock(), records) == (2, 0)
+
+        assert mock_copy.call_args.args[1] is TradingRecord
+        assert mock_copy.call_args.args[3] == ["station_id", "trading_date", "period"]
+
+    @patch("app.tasks.import_tasks.settings")
+    def test_insert_loader_fallback(self, mock_settings):
+        mock_settings.IMPORT_BULK_LOADER = "insert"
+        session = MagicMock()
+        session.execute.return_value.rowcount = 1
+
+        assert _insert_trading_records(session, _trading_records(2)) == (1, 1)
+        session.execute.assert_called_once()
+
+
+class TestCopyAnomalies:
+    def test_copy_records_encodes_jsonb_params(self):
+        session, _, cursor = _make_session(0)
+        job_id = uuid.uuid4()
+        ctx = ImportContext(session, MagicMock(id=job_id), 0)
+        ctx.row_number = 7
+        ctx.add_anomaly("out_of_range", "clearing_price", "2000", {"lower": "-100", "upper": "1500"})
+        ctx.add_anomaly("format_error", "trading_date", "坏日期")
+
+        assert copy_records(session, ImportAnomaly, ctx.batch_anomalies) == 2
+
+        copy_sql, buffer = cursor.copy_expert.call_args.args
+        assert copy_sql.startswith("COPY import_anomalies (id, import_job_id, row_number,")
+        lines = buffer.getvalue().splitlines()
+        assert lines[0].endswith(',7,out_of_range,clearing_price,2000,4,"{""lower"": ""-100"", ""upper"": ""1500""}"')
+        assert lines[1].endswith(",7,format_error,trading_date,坏日期,1,")
+        cursor.execute.assert_not_called()
+
+    @patch("app.tasks.import_tasks.settings")
+    def test_flush_uses_copy_for_anomalies(self, mock_settings):
+        mock_settings.IMPORT_BULK_LOADER = "copy"
+        mock_settings.IMPORT_COMMIT_EVERY_BATCHES = 1
+        session = MagicMock()
+        ctx = ImportContext(session, MagicMock(id=uuid.uuid4()), 0)
+        ctx.add_anomaly("format_error", "period", "0")
+
+        with patch("app.tasks.import_copy.copy_records") as mock_copy:
+            ctx.flush_batch(lambda records: (0, 0))
+
+        assert mock_copy.call_args.args[1] is ImportAnomaly
+        session.execute.assert_not_called()
@@ -0,0 +1,190 @@
+"""导入分阶段耗时统计与 Prometheus 输出测试。"""
+
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.tasks import import_metrics
+from app.tasks.import_metrics import (
+    BATCH_LATENCY_BUCKETS,
+    PHASES,
+    ImportMetrics,
+    aggregate_counters,
+    record_metrics,
+    registry_snapshot,
+    render_prometheus,
+    to_counters,
+)
+from app.tasks.import_tasks import ImportContext
+
+
+def _make_job(resume_metrics=None):
+    job = MagicMock()
+    job.id = uuid.uuid4()
+    job.import_type = "trading_data"
+    job.original_file_name = "test.csv"
+    job.processed_records = job.success_records = job.failed_records = 0
+    job.metrics = resume_metrics
+    return job
+
+
+@pytest.fixture(autouse=True)
+def _isolated_registry():
+    with patch.object(import_metrics, "_registry", {}):
+        yield
+
+
+class TestImportMetrics:
+    def test_timed_rows_splits_read_and_validate(self):
+        metrics = ImportMetrics()
+        clock = iter([0.0, 1.0, 3.0, 3.5, 4.0])
+
+        with patch("app.tasks.import_metrics.time.perf_counter", side_effect=lambda: next(clock)):
+            rows = list(metrics.timed_rows(iter([["a"]])))
+
+        assert rows == [["a"]]
+        # 取行 0→1 与 3→3.5 计入 read；消费方 1→3 计入 validate
+        assert metrics.phase_seconds["read"] == pytest.approx(1.5)
+        assert metrics.phase_seconds["validate"] == pytest.approx(2.0)
+
+    def test_validate_excludes_loop_phases(self):
+        metrics = ImportMetrics()
+        for _ in metrics.timed_rows([1, 2, 3]):
+            metrics.phase_seconds["insert"] += 10.0
+
+        # 消费方实际耗时远小于计入 insert 的时长，validate 不会为负
+        assert metrics.phase_seconds["validate"] == 0.0
+
+    def test_observe_batch_buckets(self):
+        metrics = ImportMetrics()
+        metrics.observe_batch(0.005, 1000)
+        metrics.observe_batch(0.3, 1000)
+        metrics.observe_batch(60.0, 500)
+
+        assert metrics.batches == 3
+        assert metrics.rows == 2500
+        assert metrics.batch_counts[0] == 1
+        assert metrics.batch_counts[BATCH_LATENCY_BUCKETS.index(0.5)] == 1
+        assert metrics.batch_counts[-1] == 1
+
+    def test_json_roundtrip_and_merge(self):
+        metrics = ImportMetrics()
+        metrics.phase_seconds["insert"] = 2.0
+        metrics.observe_batch(0.2, 1000)
+        metrics.elapsed_seconds = 4.0
+
+        data = metrics.to_json()
+        assert data["rows_per_second"] == 250.0
+        assert set(data["phase_seconds"]) == set(PHASES)
+
+        merged = ImportMetrics.from_json(data)
+        merged.merge(ImportMetrics.from_json(data))
+        assert merged.rows == 2000
+        assert merged.phase_seconds["insert"] == 4.0
+        assert merged.batch_counts == [2 * c for c in metrics.batch_counts]
+        assert ImportMetrics.from_json(None).rows == 0
+
+
+class TestImportContextMetrics:
+    def test_flush_observes_batch_and_saves_metrics(self):
+        job = _make_job()
+        ctx = ImportContext(MagicMock(), job, 0)
+        ctx.batch_records = [{"trading_date": None, "period": 1}] * 3
+        ctx.processed_records = 3
+
+        with patch("app.tasks.import_tasks._write_anomalies"), \
+                patch.object(ctx.period_coverage, "add_records"):
+            ctx.flush_batch(lambda records: (len(records), 0))
+
+        assert ctx.metrics.batches == 1
+        assert ctx.metrics.rows == 3
+        assert "phase_seconds" in job.metrics
+
+        # 空批次（最终 flush）不计入直方图
+        with patch("app.tasks.import_tasks._write_anomalies"):
+            ctx.flush_batch(lambda records: (0, 0))
+        assert ctx.metrics.batches == 1
+
+    def test_resume_continues_saved_metrics(self):
+        saved = ImportMetrics()
+        saved.observe_batch(0.1, 500)
+        job = _make_job(saved.to_json())
+        job.processed_records = 500
+
+        ctx = ImportContext(MagicMock(), job, 500)
+
+        assert ctx.metrics.rows == 500
+        assert ImportContext(MagicMock(), job, 0).metrics.rows == 0
+
+    def test_finalize_merges_shard_metrics_and_records(self):
+        job = _make_job()
+        ctx = ImportContext(MagicMock(), job, 0)
+        ctx.metrics.phase_seconds["completeness"] = 0.5
+        shard_metrics = ImportMetrics()
+        shard_metrics.observe_batch(0.1, 1000)
+
+        ctx.finalize("complete_import_job", shard_metrics=shard_metrics)
+
+        assert job.metrics["rows"] == 1000
+        assert job.metrics["phase_seconds"]["completeness"] == 0.5
+        assert job.metrics["phase_seconds"]["finalize"] > 0
+        # 完成统计与 job 状态同一事务累加到 import_metric_counters
+        upsert = ctx.session.execute.call_args.args[0]
+        assert upsert.table.name == "import_metric_counters"
+        rows = [
+            {getattr(column, "key", column): value for column, value in row.items()}
+            for row in upsert._multi_values[0]
+        ]
+        values = {row["name"]: row["value"] for row in rows}
+        assert values["jobs"] == 1
+        assert values["rows"] == 1000
+        # 进程注册表只计入本进程执行的部分
+        snapshot = registry_snapshot()["trading_data"]
+        assert snapshot.jobs == 1
+        assert snapshot.rows == 0
+
+
+class TestPrometheusRendering:
+    def test_render_families_and_cumulative_histogram(self):
+        metrics = ImportMetrics()
+        metrics.observe_batch(0.005, 100)
+        metrics.observe_batch(0.3, 100)
+        record_metrics("trading_data", metrics, job_completed=True)
+
+        text = render_prometheus(registry_snapshot())
+
+        assert '# TYPE import_batch_latency_seconds histogram' in text
+        assert 'import_jobs_total{import_type="trading_data"} 1' in text
+        assert 'import_rows_total{import_type="trading_data"} 200' in text
+        assert 'import_batch_latency_seconds_bucket{import_type="trading_data",le="0.01"} 1' in text
+        assert 'import_batch_latency_seconds_bucket{import_type="trading_data",le="0.5"} 2' in text
+        assert 'import_batch_latency_seconds_bucket{import_type="trading_data",le="+Inf"} 2' in text
+        assert 'import_batch_latency_seconds_count{import_type="trading_data"} 2' in text
+        assert 'import_phase_seconds_total{import_type="trading_data",phase="read"}' in text
+
+    def test_counters_round_trip_and_accumulate(self):
+        data = ImportMetrics()
+        data.observe_batch(0.1, 10)
+        data.phase_seconds["insert"] = 0.25
+        counters = to_counters(data, jobs=1)
+        # 模拟 ON CONFLICT DO UPDATE SET value = value + excluded.value 累加两个任务
+        rows = [("trading_data", name, value * 2) for name, value in counters.items()]
+        rows += [("station_output", name, value) for name, value in counters.items()]
+
+        aggregated = aggregate_counters(rows)
+
+        assert aggregated["trading_data"].jobs == 2
+        assert aggregated["trading_data"].rows == 20
+        assert aggregated["trading_data"].phase_seconds["insert"] == pytest.approx(0.5)
+        assert aggregated["trading_data"].batch_counts[BATCH_LATENCY_BUCKETS.index(0.1)] == 2
+        assert aggregated["station_output"].jobs == 1
+
+    def test_unknown_bucket_counters_ignored(self):
+        aggregated = aggregate_counters([
+            ("trading_data", "batch_count:0.3", 5.0),
+            ("trading_data", "batch_seconds", 1.5),
+        ])
+
+        assert sum(aggregated["trading_data"].batch_counts) == 0
+        assert aggregated["trading_data"].batch_seconds == 1.5
@@ -0,0 +1,136 @@
+"""断点续传（字节偏移 seek / xlsx 行块跳过）测试。"""
+
+import csv
+import uuid
+from unittest.mock import MagicMock, patch
+
+import openpyxl
+import pytest
+
+from app.models.data_import import DataImportJob
+from app.models.station import PowerStation
+from app.tasks import import_tasks
+from app.tasks.import_tasks import _CsvRowReader, _execute_import, _read_xlsx_rows
+
+
+def _trading_rows(n: int) -> list[list[str]]:
+    rows = [["交易日期", "时段", "出清价格"]]
+    for i in range(n):
+        price = "abc" if i % 7 == 3 else f"{100 + i}.00"
+        rows.append(["2025-01-01", str(i + 1), price])
+    return rows
+
+
+def _make_job(file_name: str):
+    job = MagicMock()
+    job.id = uuid.uuid4()
+    job.station_id = uuid.uuid4()
+    job.file_name = file_name
+    job.original_file_name = file_name
+    job.last_processed_row = 0
+    job.resume_offset = None
+    job.processed_records = job.success_records = job.failed_records = 0
+    return job
+
+
+def _make_session(job):
+    station = MagicMock()
+    rule = MagicMock()
+    rule.price_cap_lower, rule.price_cap_upper = -100, 1500
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = rule
+    result.all.return_value = []
+
+    session = MagicMock()
+    session.get.side_effect = lambda model, _id: (
+        job if model is DataImportJob else station if model is PowerStation else None
+    )
+    session.execute.return_value = result
+    return session
+
+
+class _FailingInsert:
+    """第 fail_on 次调用时抛出异常，模拟 worker 中途失败。"""
+
+    def __init__(self, fail_on: int | None = None):
+        self.fail_on = fail_on
+        self.calls = 0
+        self.periods: list[int] = []
+
+    def __call__(self, _session, records):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("worker crashed")
+        self.periods.extend(r["period"] for r in records)
+        return len(records), 0
+
+
+@pytest.mark.parametrize("engine", ["row", "columnar"])
+class TestCsvSeekResume:
+    def _run(self, tmp_path, job, resume_from_row, insert, engine):
+        session = _make_session(job)
+        with patch("app.tasks.import_tasks.settings") as mock_settings, \
+                patch("app.tasks.import_tasks.BATCH_SIZE", 5), \
+                patch("app.tasks.import_batching.settings.IMPORT_BATCH_ADAPTIVE", False), \
+                patch("app.tasks.import_tasks._insert_trading_records", insert), \
+                patch("app.tasks.import_tasks._check_period_completeness"):
+            mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+            mock_settings.IMPORT_ENGINE = engine
+            mock_settings.IMPORT_COLUMNAR_CHUNK_SIZE = 8
+            mock_settings.IMPORT_COMMIT_EVERY_BATCHES = 1
+            _execute_import(session, MagicMock(), str(job.id), resume_from_row)
+
+    def test_resume_seeks_to_last_flush(self, tmp_path, engine):
+        rows = _trading_rows(40)
+        with open(tmp_path / "t.csv", "w", newline="", encoding="utf-8-sig") as f:
+            csv.writer(f).writerows(rows)
+        job = _make_job("t.csv")
+
+        with pytest.raises(RuntimeError):
+            self._run(tmp_path, job, 0, _FailingInsert(fail_on=3), engine)
+
+        checkpoint, offset = job.last_processed_row, job.resume_offset
+        assert checkpoint > 0
+        reader = _CsvRowReader(tmp_path / "t.csv", offset)
+        assert next(iter(reader)) == rows[checkpoint + 1]
+        reader.close()
+
+        insert = _FailingInsert()
+        with patch.object(import_tasks, "_CsvRowReader", wraps=_CsvRowReader) as spy:
+            self._run(tmp_path, job, checkpoint, insert, engine)
+
+        assert offset in [c.args[1] for c in spy.call_args_list if len(c.args) > 1]
+        expected = [i + 1 for i in range(checkpoint, 40) if i % 7 != 3]
+        assert insert.periods == expected
+        assert job.total_records == 40
+        assert job.last_processed_row == 40
+
+    def test_stale_offset_falls_back_to_row_skip(self, tmp_path, engine):
+        rows = _trading_rows(20)
+        with open(tmp_path / "t.csv", "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+        job = _make_job("t.csv")
+        job.last_processed_row = 12
+        job.resume_offset = 1  # 与 resume_from_row 不匹配的旧断点
+
+        insert = _FailingInsert()
+        self._run(tmp_path, job, 10, insert, engine)
+
+        assert insert.periods == [i + 1 for i in range(10, 20) if i % 7 != 3]
+        assert job.total_records == 20
+
+
+class TestXlsxRowCheckpoint:
+    def test_skip_rows_returns_header_then_remaining(self, tmp_path):
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        for row in _trading_rows(10):
+            ws.append(row)
+        path = tmp_path / "t.xlsx"
+        wb.save(path)
+
+        rows = list(_read_xlsx_rows(path, skip_rows=6))
+
+        assert rows[0] == ["交易日期", "时段", "出清价格"]
+        assert [r[1] for r in rows[1:]] == ["7", "8", "9", "10"]
+        assert list(_read_xlsx_rows(path)) == _trading_rows(10)
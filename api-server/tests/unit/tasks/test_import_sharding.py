@@ -0,0 +1,372 @@
+"""分片并行导入测试。"""
+
+import csv
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models.data_import import DataImportShard
+from app.tasks.import_sharding import (
+    _coordinate_shards,
+    _execute_shard,
+    _finalize_shards,
+    _scan_shard_boundaries,
+    should_shard_import,
+)
+from app.tasks.import_tasks import ImportContext, _CsvRowReader, _open_import_rows
+
+
+def _write_csv(path, rows, encoding="utf-8-sig"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding=encoding) as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+
+def _trading_rows(n: int, bad_every: int = 7) -> list[list[str]]:
+    rows = [["交易日期", "时段", "出清价格"]]
+    for i in range(n):
+        day, period = divmod(i, 96)
+        price = "abc" if i % bad_every == 3 else f"{100 + i % 50}.00"
+        rows.append([f"2025-01-{day + 1:02d}", str(period + 1), price])
+    return rows
+
+
+def _make_shard(job_id, index, start, end, first_row):
+    return DataImportShard(
+        import_job_id=job_id, shard_index=index, start_offset=start, end_offset=end,
+        first_row=first_row, last_processed_row=first_row - 1, trading_dates=[],
+        status="pending", total_records=0, processed_records=0,
+        success_records=0, failed_records=0,
+    )
+
+
+class TestCsvRowReader:
+    def test_matches_csv_reader_with_quoted_newlines(self, tmp_path):
+        rows = [["a", "b"], ["1", "line1\nline2"], ["2", 'say "hi"'], ["中文", "x"]]
+        path = _write_csv(tmp_path / "q.csv", rows)
+
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            assert list(_CsvRowReader(path)) == list(csv.reader(f))
+
+    def test_open_import_rows_resumes_at_offset(self, tmp_path):
+        rows = [["a", "b"], ["1", "multi\nline"], ["2", "x"], ["3", "y"]]
+        path = _write_csv(tmp_path / "q.csv", rows)
+        reader = _CsvRowReader(path)
+        it = iter(reader)
+        next(it)
+        next(it)
+        job = MagicMock(resume_offset=reader.offset, last_processed_row=1)
+        reader.close()
+
+        import_rows, csv_reader, start_row = _open_import_rows(path, job, 1)
+
+        assert start_row == 1
+        assert list(import_rows) == [["a", "b"], ["2", "x"], ["3", "y"]]
+        assert csv_reader.offset == path.stat().st_size
+
+    def test_offset_allows_seek_to_next_record(self, tmp_path):
+        rows = [["a", "b"], ["1", "multi\nline"], ["2", "x"], ["3", "y"]]
+        path = _write_csv(tmp_path / "q.csv", rows)
+
+        reader = _CsvRowReader(path)
+        it = iter(reader)
+        next(it)
+        next(it)
+        offset = reader.offset
+        reader.close()
+
+        assert list(_CsvRowReader(path, offset)) == [["2", "x"], ["3", "y"]]
+
+    def test_gbk_file(self, tmp_path):
+        rows = [["交易日期", "时段", "出清价格"], ["2025-01-01", "1", "100"]]
+        path = _write_csv(tmp_path / "g.csv", rows, encoding="gbk")
+
+        assert list(_CsvRowReader(path)) == rows
+
+
+class TestScanShardBoundaries:
+    @pytest.mark.parametrize("shard_count", [1, 3, 4, 50])
+    def test_shards_cover_all_rows_in_order(self, tmp_path, shard_count):
+        rows = _trading_rows(200)
+        path = _write_csv(tmp_path / "t.csv", rows)
+
+        boundaries = _scan_shard_boundaries(path, shard_count)
+
+        assert 1 <= len(boundaries) <= shard_count
+        collected, expected_first_row = [], 1
+        for start, end, first_row in boundaries:
+            assert first_row == expected_first_row
+            shard_rows = list(_CsvRowReader(path, start, end))
+            collected.extend(shard_rows)
+            expected_first_row += len(shard_rows)
+        assert collected == rows[1:]
+        assert boundaries[-1][1] == path.stat().st_size
+
+    def test_empty_file_raises(self, tmp_path):
+        path = tmp_path / "empty.csv"
+        path.write_bytes(b"")
+        with pytest.raises(ValueError, match="文件为空"):
+            _scan_shard_boundaries(path, 4)
+
+
+class TestShouldShardImport:
+    @patch("app.tasks.import_sharding.settings")
+    def test_conditions(self, mock_settings):
+        mock_settings.IMPORT_SHARD_COUNT = 4
+        mock_settings.IMPORT_SHARD_MIN_BYTES = 1000
+
+        assert should_shard_import("trading_data", "a.csv", 1000) is True
+        assert should_shard_import("station_output", "a.CSV", 5000) is True
+        assert should_shard_import("trading_data", "a.csv", 999) is False
+        assert should_shard_import("trading_data", "a.xlsx", 5000) is False
+        assert should_shard_import("storage_operation", "a.csv", 5000) is False
+
+        mock_settings.IMPORT_SHARD_COUNT = 1
+        assert should_shard_import("trading_data", "a.csv", 5000) is False
+
+
+def _make_job(job_id, file_name, status="processing"):
+    job = MagicMock()
+    job.id = job_id
+    job.station_id = uuid.uuid4()
+    job.file_name = file_name
+    job.import_type = "trading_data"
+    job.status = status
+    job.imported_by = uuid.uuid4()
+    job.original_file_name = "t.csv"
+    return job
+
+
+def _make_session(job):
+    from app.models.data_import import DataImportJob
+    from app.models.station import PowerStation
+
+    station = MagicMock()
+    rule = MagicMock()
+    rule.price_cap_lower, rule.price_cap_upper = -100, 1500
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = rule
+    result.all.return_value = []
+
+    session = MagicMock()
+    session.get.side_effect = lambda model, _id, **_kw: (
+        job if model is DataImportJob else station if model is PowerStation else None
+    )
+    session.execute.return_value = result
+    return session
+
+
+class TestShardExecution:
+    def _run_shards(self, tmp_path, rows, shard_count):
+        job_id = uuid.uuid4()
+        path = _write_csv(tmp_path / str(job_id) / "t.csv", rows)
+        job = _make_job(job_id, f"{job_id}/t.csv")
+        session = _make_session(job)
+        shards = [
+            _make_shard(job_id, i, *b)
+            for i, b in enumerate(_scan_shard_boundaries(path, shard_count))
+        ]
+
+        anomaly_rows = []
+        original_add = ImportContext.add_anomaly
+
+        def recording_add(ctx, *args):
+            anomaly_rows.append(ctx.row_number)
+            original_add(ctx, *args)
+
+        with patch("app.tasks.import_tasks.settings") as mock_settings, \
+                patch.object(ImportContext, "add_anomaly", recording_add), \
+                patch("app.tasks.import_tasks._insert_trading_records",
+                      side_effect=lambda _s, r: (len(r), 0)):
+            mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+            mock_settings.IMPORT_ENGINE = "row"
+            for shard in shards:
+                session.execute.return_value.scalar_one.return_value = shard
+                shard.status = "processing"  # 认领 UPDATE 在 mock 会话中不生效
+                _execute_shard(session, MagicMock(), str(job_id), shard.shard_index)
+
+        return job, session, shards, anomaly_rows
+
+    def test_shards_use_global_row_numbers_and_merge(self, tmp_path):
+        rows = _trading_rows(250)
+        job, session, shards, anomaly_rows = self._run_shards(tmp_path, rows, 3)
+
+        assert len(shards) == 3
+        assert all(s.status == "completed" for s in shards)
+        assert sum(s.total_records for s in shards) == 250
+
+        expected_bad = [i + 1 for i in range(250) if i % 7 == 3]
+        assert sorted(anomaly_rows) == expected_bad
+
+        with patch("app.tasks.import_sharding._load_shards", return_value=shards), \
+                patch("app.tasks.import_sharding._check_period_completeness") as mock_check:
+            _finalize_shards(session, str(job.id))
+
+        assert job.status == "completed"
+        assert job.total_records == 250
+        assert job.failed_records == len(expected_bad)
+        assert job.success_records == 250 - len(expected_bad)
+        assert job.last_processed_row == 250
+        mock_check.assert_called_once()
+        assert len(mock_check.call_args.args[3]) == 3  # 250 行覆盖 3 个交易日
+
+    def test_resumed_shard_skips_processed_rows(self, tmp_path):
+        rows = _trading_rows(40)
+        job_id = uuid.uuid4()
+        path = _write_csv(tmp_path / str(job_id) / "t.csv", rows)
+        job = _make_job(job_id, f"{job_id}/t.csv")
+        session = _make_session(job)
+        (start, end, first_row), = _scan_shard_boundaries(path, 1)
+        shard = _make_shard(job_id, 0, start, end, first_row)
+        shard.last_processed_row = 30
+        shard.success_records = shard.processed_records = 30
+        shard.trading_dates = ["2025-01-01"]
+
+        inserted = []
+        with patch("app.tasks.import_tasks.settings") as mock_settings, \
+                patch("app.tasks.import_tasks._insert_trading_records",
+                      side_effect=lambda _s, r: (inserted.extend(r), (len(r), 0))[1]):
+            mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+            mock_settings.IMPORT_ENGINE = "row"
+            session.execute.return_value.scalar_one.return_value = shard
+            _execute_shard(session, MagicMock(), str(job_id), 0)
+
+        assert [r["period"] for r in inserted] == [p for p in range(31, 41) if (p - 1) % 7 != 3]
+        assert shard.total_records == 40
+        assert shard.processed_records == 40
+        assert shard.status == "completed"
+
+    def test_cancelled_job_skips_shard(self):
+        job = _make_job(uuid.uuid4(), "x.csv", status="cancelled")
+        session = _make_session(job)
+
+        _execute_shard(session, MagicMock(), str(job.id), 0)
+
+        session.execute.assert_not_called()
+
+    def test_unclaimed_shard_skipped(self):
+        """已完成或已被其他 worker 认领的分片，认领 UPDATE 返回空，直接跳过。"""
+        job = _make_job(uuid.uuid4(), "t.csv")
+        session = _make_session(job)
+        session.execute.return_value.scalar_one_or_none.return_value = None
+
+        _execute_shard(session, MagicMock(), str(job.id), 0)
+
+        # 只执行了认领 UPDATE，未加载分片也未开始导入
+        assert session.execute.call_count == 1
+        claim_sql = str(session.execute.call_args.args[0])
+        assert claim_sql.startswith("UPDATE data_import_shards")
+        assert "status IN" in claim_sql
+
+    def test_failed_shard_marked(self, tmp_path):
+        job = _make_job(uuid.uuid4(), "missing/t.csv")
+        session = _make_session(job)
+        shard = _make_shard(job.id, 0, 0, 10, 1)
+        session.execute.return_value.scalar_one.return_value = shard
+
+        with patch("app.tasks.import_tasks.settings") as mock_settings:
+            mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+            with pytest.raises(FileNotFoundError):
+                _execute_shard(session, MagicMock(), str(job.id), 0)
+
+        assert shard.status == "failed"
+        assert shard.error_message
+
+
+class TestCoordinateShards:
+    @patch("app.tasks.import_sharding.chord")
+    @patch("app.tasks.import_sharding.settings")
+    def test_creates_shards_and_dispatches_chord(self, mock_settings, mock_chord, tmp_path):
+        job_id = uuid.uuid4()
+        _write_csv(tmp_path / str(job_id) / "t.csv", _trading_rows(100))
+        job = _make_job(job_id, f"{job_id}/t.csv")
+        session = _make_session(job)
+        mock_settings.IMPORT_SHARD_COUNT = 2
+
+        with patch("app.tasks.import_tasks.settings") as task_settings, \
+                patch("app.tasks.import_sharding._load_shards", return_value=[]):
+            task_settings.DATA_IMPORT_DIR = str(tmp_path)
+            _coordinate_shards(session, MagicMock(), str(job_id))
+
+        added = [c.args[0] for c in session.add.call_args_list]
+        assert [s.shard_index for s in added] == [0, 1]
+        assert added[0].first_row == 1
+        assert added[1].first_row > 1
+        header_tasks = list(mock_chord.call_args.args[0])
+        assert [t.args for t in header_tasks] == [(str(job_id), 0), (str(job_id), 1)]
+        mock_chord.return_value.assert_called_once()
+
+    @patch("app.tasks.import_sharding.chord")
+    @patch("app.tasks.import_sharding.finalize_sharded_import")
+    def test_resume_only_dispatches_incomplete(self, mock_finalize, mock_chord):
+        job = _make_job(uuid.uuid4(), "t.csv")
+        session = _make_session(job)
+        done = _make_shard(job.id, 0, 0, 10, 1)
+        done.status = "completed"
+        failed = _make_shard(job.id, 1, 10, 20, 5)
+        failed.status = "failed"
+
+        with patch("app.tasks.import_sharding._load_shards", return_value=[done, failed]):
+            _coordinate_shards(session, MagicMock(), str(job.id))
+
+        header_tasks = list(mock_chord.call_args.args[0])
+        assert [t.args for t in header_tasks] == [(str(job.id), 1)]
+
+    @patch("app.tasks.import_sharding.chord")
+    @patch("app.tasks.import_sharding.finalize_sharded_import")
+    def test_resume_while_shard_processing_raises(self, mock_finalize, mock_chord):
+        """首轮中仍在运行的分片不会被重复派发，恢复直接失败。"""
+        job = _make_job(uuid.uuid4(), "t.csv")
+        session = _make_session(job)
+        failed = _make_shard(job.id, 0, 0, 10, 1)
+        failed.status = "failed"
+        running = _make_shard(job.id, 1, 10, 20, 5)
+        running.status = "processing"
+
+        with patch("app.tasks.import_sharding._load_shards", return_value=[failed, running]), \
+                pytest.raises(ValueError, match="仍在处理中"):
+            _coordinate_shards(session, MagicMock(), str(job.id))
+
+        mock_chord.assert_not_called()
+        mock_finalize.s.return_value.delay.assert_not_called()
+
+    @patch("app.tasks.import_sharding.chord")
+    @patch("app.tasks.import_sharding.finalize_sharded_import")
+    def test_all_completed_runs_callback_directly(self, mock_finalize, mock_chord):
+        job = _make_job(uuid.uuid4(), "t.csv")
+        session = _make_session(job)
+        done = _make_shard(job.id, 0, 0, 10, 1)
+        done.status = "completed"
+
+        with patch("app.tasks.import_sharding._load_shards", return_value=[done]):
+            _coordinate_shards(session, MagicMock(), str(job.id))
+
+        mock_chord.assert_not_called()
+        mock_finalize.s.return_value.delay.assert_called_once_with([])
+
+
+class TestFinalizeShards:
+    def test_skips_when_not_processing(self):
+        job = _make_job(uuid.uuid4(), "t.csv", status="cancelled")
+        session = _make_session(job)
+
+        _finalize_shards(session, str(job.id))
+
+        assert job.status == "cancelled"
+        session.commit.assert_not_called()
+
+    def test_skips_when_shard_unfinished(self):
+        job = _make_job(uuid.uuid4(), "t.csv")
+        session = _make_session(job)
+        done = _make_shard(job.id, 0, 0, 10, 1)
+        done.status = "completed"
+        running = _make_shard(job.id, 1, 10, 20, 5)
+        running.status = "processing"
+
+        with patch("app.tasks.import_sharding._load_shards", return_value=[done, running]):
+            _finalize_shards(session, str(job.id))
+
+        assert job.status == "processing"
+        session.commit.assert_not_called()
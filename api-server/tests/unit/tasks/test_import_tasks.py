@@ -214,13 +214,16 @@ class TestImportContext:
 
         ctx = ImportContext(session, job, 0)
         ctx.row_number = 5
-        ctx.add_anomaly("format_error", "price", "abc", "格式错误")
+        ctx.add_anomaly("format_error", "clearing_price", "abc")
 
         assert ctx.failed_records == 1
         assert ctx.processed_records == 1
         assert len(ctx.batch_anomalies) == 1
         assert ctx.batch_anomalies[0]["anomaly_type"] == "format_error"
         assert ctx.batch_anomalies[0]["row_number"] == 5
+        assert ctx.batch_anomalies[0]["template_id"] == 3
+        assert ctx.batch_anomalies[0]["template_params"] is None
+        assert "description" not in ctx.batch_anomalies[0]
 
     def test_should_flush_on_batch_size(self):
         session = MagicMock()
@@ -257,7 +260,7 @@ class TestImportContext:
         job.processed_records = 0
 
         ctx = ImportContext(session, job, 0)
-        ctx.batch_records = [{"id": uuid.uuid4()}]
+        ctx.batch_records = [{"id": uuid.uuid4(), "trading_date": date(2025, 1, 1), "period": 1}]
         ctx.row_number = 10
         ctx.processed_records = 10
 
@@ -279,7 +282,9 @@ class TestImportContext:
         job.processed_records = 0
 
         ctx = ImportContext(session, job, 0)
-        ctx.batch_records = [{"id": uuid.uuid4()} for _ in range(3)]
+        ctx.batch_records = [
+            {"id": uuid.uuid4(), "trading_date": date(2025, 1, 1), "period": p} for p in (1, 2, 3)
+        ]
 
         insert_fn = MagicMock(return_value=(2, 1))
         ctx.flush_batch(insert_fn)
@@ -0,0 +1,121 @@
+"""导入校验器进程内缓存测试。"""
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.tasks import import_validators
+from app.tasks.import_validators import (
+    _handle_message,
+    get_ems_validator,
+    get_trading_validator,
+)
+
+UPDATED_AT = datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _session_with_rule(upper="1500.00", lower="-100.00", updated_at=UPDATED_AT):
+    rule = MagicMock()
+    rule.price_cap_upper, rule.price_cap_lower = upper, lower
+    rule.updated_at = updated_at
+    session = MagicMock()
+    session.execute.return_value.scalar_one_or_none.return_value = rule
+    return session
+
+
+@pytest.fixture
+def listening():
+    import_validators._trading_cache.clear()
+    import_validators._listener.listening.set()
+    yield
+    import_validators._listener.listening.clear()
+    import_validators._trading_cache.clear()
+
+
+class TestTradingValidatorCache:
+    def test_cached_while_listening(self, listening):
+        session = _session_with_rule()
+
+        first = get_trading_validator(session, "guangdong")
+        second = get_trading_validator(session, "guangdong")
+
+        assert first is second
+        assert first.price_cap_upper == Decimal("1500.00")
+        assert first.price_cap_lower == Decimal("-100.00")
+        session.execute.assert_called_once()
+
+    def test_not_cached_without_listener(self):
+        import_validators._trading_cache.clear()
+        session = _session_with_rule()
+
+        get_trading_validator(session, "guangdong")
+        get_trading_validator(session, "guangdong")
+
+        assert session.execute.call_count == 2
+
+    def test_missing_rule_has_no_caps(self, listening):
+        session = MagicMock()
+        session.execute.return_value.scalar_one_or_none.return_value = None
+
+        config = get_trading_validator(session, "yunnan")
+
+        assert config.price_cap_upper is None and config.price_cap_lower is None
+
+    def test_message_with_new_updated_at_invalidates(self, listening):
+        get_trading_validator(_session_with_rule(), "guangdong")
+
+        _handle_message(json.dumps({"province": "guangdong", "updated_at": UPDATED_AT.isoformat()}))
+        assert "guangdong" in import_validators._trading_cache
+
+        _handle_message(json.dumps({"province": "guangdong", "updated_at": "2026-02-01T00:00:00+00:00"}))
+        assert "guangdong" not in import_validators._trading_cache
+
+        session = _session_with_rule(upper="2000.00")
+        assert get_trading_validator(session, "guangdong").price_cap_upper == Decimal("2000.00")
+
+    def test_invalidation_during_query_not_cached(self, listening):
+        session = _session_with_rule()
+        session.execute.side_effect = lambda *_: (
+            _handle_message(json.dumps({"province": "guangdong", "updated_at": None})),
+            MagicMock(**{"scalar_one_or_none.return_value": None}),
+        )[1]
+
+        get_trading_validator(session, "guangdong")
+
+        assert "guangdong" not in import_validators._trading_cache
+
+    def test_expired_entry_reloaded(self, listening):
+        session = _session_with_rule()
+        get_trading_validator(session, "guangdong")
+
+        with patch.object(import_validators, "_MAX_AGE_SECONDS", 0):
+            get_trading_validator(session, "guangdong")
+
+        assert session.execute.call_count == 2
+
+    def test_bad_message_clears_cache(self, listening):
+        get_trading_validator(_session_with_rule(), "guangdong")
+
+        _handle_message(b"not json")
+
+        assert not import_validators._trading_cache
+
+
+class TestEmsValidatorCache:
+    @pytest.mark.parametrize("ems_format", ["standard", "sungrow", "huawei", "catl"])
+    def test_map_columns_matches_adapter_mapping(self, ems_format):
+        config = get_ems_validator(ems_format)
+        mapping = config.adapter.get_column_mapping()
+        header = [f"  {col.upper()} " for col in mapping] + ["unknown"]
+
+        col_map = config.map_columns(header)
+
+        assert col_map == {i: field for i, field in enumerate(mapping.values())}
+        assert get_ems_validator(ems_format) is config
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError, match="不支持的 EMS 格式"):
+            get_ems_validator("unknown")
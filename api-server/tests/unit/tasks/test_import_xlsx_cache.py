@@ -0,0 +1,122 @@
+"""xlsx 列式缓存测试。"""
+
+import os
+import uuid
+from unittest.mock import MagicMock, patch
+
+import openpyxl
+import pytest
+
+from app.tasks import import_xlsx_cache
+from app.tasks.import_tasks import _open_import_rows, _read_xlsx_rows
+from app.tasks.import_xlsx_cache import (
+    cleanup_expired_cache,
+    ensure_xlsx_cache,
+    open_xlsx_rows,
+    read_cached_rows,
+)
+
+
+def _write_xlsx(path, n: int):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["交易日期", "时段", "出清价格"])
+    for i in range(n):
+        ws.append(["2025-01-01", i + 1, None if i % 5 == 2 else 100.5 + i])
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def import_dir(tmp_path):
+    with patch("app.tasks.import_xlsx_cache.settings") as mock_settings:
+        mock_settings.DATA_IMPORT_DIR = str(tmp_path)
+        yield tmp_path
+
+
+class TestXlsxCache:
+    @pytest.mark.parametrize("batch_rows", [4, 65536])
+    def test_cached_rows_match_openpyxl(self, import_dir, batch_rows):
+        path = _write_xlsx(import_dir / "t.xlsx", 10)
+
+        with patch.object(import_xlsx_cache, "_BATCH_ROWS", batch_rows):
+            ensure_xlsx_cache(path, "abc")
+
+        assert list(read_cached_rows("abc")) == list(_read_xlsx_rows(path))
+
+    @pytest.mark.parametrize("skip_rows", [0, 2, 3, 7, 10, 20])
+    def test_skip_rows_matches_openpyxl(self, import_dir, skip_rows):
+        path = _write_xlsx(import_dir / "t.xlsx", 10)
+        with patch.object(import_xlsx_cache, "_BATCH_ROWS", 4):
+            ensure_xlsx_cache(path, "abc")
+
+        assert list(read_cached_rows("abc", skip_rows)) == list(_read_xlsx_rows(path, skip_rows))
+
+    def test_missing_cache_returns_none(self, import_dir):
+        assert read_cached_rows(None) is None
+        assert read_cached_rows("missing") is None
+
+    def test_existing_cache_reused(self, import_dir):
+        path = _write_xlsx(import_dir / "t.xlsx", 3)
+        ensure_xlsx_cache(path, "abc")
+
+        with patch("app.tasks.import_xlsx_cache.write_columnar_cache") as mock_write:
+            ensure_xlsx_cache(path, "abc")
+
+        mock_write.assert_not_called()
+
+    def test_cleanup_removes_only_stale_entries(self, import_dir):
+        path = _write_xlsx(import_dir / "t.xlsx", 3)
+        stale = ensure_xlsx_cache(path, "old")
+        ensure_xlsx_cache(path, "new")
+        os.utime(stale, (1000, 1000))
+
+        assert cleanup_expired_cache(2000) == 1
+        assert read_cached_rows("old") is None
+        assert read_cached_rows("new") is not None
+
+    def test_read_refreshes_last_used(self, import_dir):
+        path = _write_xlsx(import_dir / "t.xlsx", 3)
+        cached = ensure_xlsx_cache(path, "abc")
+        os.utime(cached, (1000, 1000))
+
+        assert read_cached_rows("abc") is not None
+
+        assert cached.stat().st_mtime > 2000
+        assert cleanup_expired_cache(2000) == 0
+
+
+class TestOpenImportRowsWithCache:
+    def test_xlsx_reads_from_cache(self, import_dir):
+        path = _write_xlsx(import_dir / "t.xlsx", 6)
+        ensure_xlsx_cache(path, "abc")
+        job = MagicMock()
+        job.id = uuid.uuid4()
+        job.content_hash = "abc"
+
+        with patch("app.tasks.import_tasks._read_xlsx_rows") as mock_openpyxl:
+            rows, reader, start_row = _open_import_rows(path, job, 4)
+            result = list(rows)
+
+        mock_openpyxl.assert_not_called()
+        assert reader is None
+        assert start_row == 4
+        assert result[0] == ["交易日期", "时段", "出清价格"]
+        assert [r[1] for r in result[1:]] == ["5", "6"]
+
+    def test_first_import_builds_cache(self, import_dir):
+        path = _write_xlsx(import_dir / "t.xlsx", 6)
+        job = MagicMock()
+        job.content_hash = "abc"
+
+        rows, _, _ = _open_import_rows(path, job, 0)
+
+        assert list(rows) == list(_read_xlsx_rows(path))
+        assert import_xlsx_cache.cache_path("abc").exists()
+
+    def test_build_failure_falls_back_to_openpyxl(self, import_dir):
+        path = import_dir / "broken.xlsx"
+        path.write_bytes(b"not a zip")
+
+        assert open_xlsx_rows(path, "bad") is None
+        assert not import_xlsx_cache.cache_path("bad").exists()
@@ -0,0 +1,442 @@
+"""市场数据定时取数与历史回补任务测试（基于 mock-market-api 的 ASGI 应用，不走网络）。"""
+
+import gc
+import importlib.util
+import time
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert
+
+from app.core import http_client
+from app.services.market_data_adapters.base import MarketPriceRecord, content_hash
+from app.tasks.market_data_tasks import (
+    _schedule_next,
+    _trading_date,
+    backfill_market_data,
+    dispatch_market_data_fetches,
+    fetch_market_data_for_source,
+    fetch_market_data_periodic,
+    month_chunks,
+)
+
+MOCK_API_MAIN = Path(__file__).resolve().parents[4] / "mock-market-api" / "main.py"
+DELAY_SECONDS = 0.3
+PROVINCES = ["广东", "山东", "山西", "甘肃", "蒙西", "四川"]
+
+
+@pytest.fixture
+def mock_market_api():
+    """加载 mock-market-api 并设置 MOCK_DELAY_SECONDS 等价的响应延迟。"""
+    if not MOCK_API_MAIN.exists():
+        pytest.skip("mock-market-api 不存在")
+    spec = importlib.util.spec_from_file_location("mock_market_api_main", MOCK_API_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.DELAY_SECONDS = DELAY_SECONDS
+    module.FAILURE_RATE = 0
+    module.REQUIRED_API_KEY = ""
+
+    def _client(_url):
+        return httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=module.app), base_url="http://mock",
+        )
+
+    # 先回收此前用例遗留的对象（如已关闭事件循环上的客户端），其终结器不应计入耗时断言
+    gc.collect()
+    # 不连接 Redis 发布缓存失效（连接超时会计入耗时断言）
+    with (
+        patch("app.services.market_data_adapters.generic.get_http_client", side_effect=_client),
+        patch("app.tasks.market_data_tasks.notify_market_data_changed_sync"),
+    ):
+        yield module
+    http_client.shutdown_worker_loop()
+
+
+def _sources(provinces):
+    sources = []
+    for province in provinces:
+        source = MagicMock()
+        source.id = uuid.uuid4()
+        source.province = province
+        source.api_endpoint = "http://mock/market-data"
+        source.api_key_encrypted = None
+        source.api_auth_type = "api_key"
+        source.fetch_validated_date = None
+        sources.append(source)
+    return sources
+
+
+def _session(sources):
+    session = MagicMock()
+    session.__enter__ = MagicMock(return_value=session)
+    session.__exit__ = MagicMock(return_value=False)
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = sources
+    session.execute.return_value = result
+
+    def execute(stmt, params=None):
+        # 模拟 upsert 的 RETURNING province：表中无旧数据时每行都写入
+        if isinstance(stmt, Insert):
+            # 直接读取绑定的多行 values，避免在计时用例中编译大语句
+            return [
+                (value,)
+                for row in stmt._multi_values[0]
+                for column, value in row.items()
+                if getattr(column, "key", column) == "province"
+            ]
+        return result
+
+    session.execute.side_effect = execute
+    return session
+
+
+class TestFetchMarketDataPeriodic:
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_wall_time_is_one_slow_fetch(self, mock_session_factory, mock_market_api):
+        session = _session(_sources(PROVINCES))
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        started = time.perf_counter()
+        result = fetch_market_data_periodic()
+        elapsed = time.perf_counter() - started
+
+        assert result == {province: "success:96" for province in PROVINCES}
+        # 串行需 6 × 0.3s；并发应接近单次慢请求
+        assert elapsed < DELAY_SECONDS * 2
+        # 1 次查询数据源 + 1 次多省 upsert + 1 次新鲜度状态 upsert + 1 次批量状态更新
+        assert session.execute.call_count == 4
+        status_params = session.execute.call_args_list[3].args[1]
+        assert len(status_params) == len(PROVINCES)
+        assert all(p["last_fetch_status"] == "success" for p in status_params)
+        session.commit.assert_called_once()
+
+    @patch("app.tasks.market_data_tasks.settings")
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_concurrency_is_bounded(self, mock_session_factory, mock_settings, mock_market_api):
+        mock_settings.MARKET_DATA_FETCH_CONCURRENCY = 2
+        session = _session(_sources(PROVINCES[:4]))
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        started = time.perf_counter()
+        result = fetch_market_data_periodic()
+        elapsed = time.perf_counter() - started
+
+        assert len(result) == 4
+        # 4 个请求、并发 2 → 至少两轮
+        assert elapsed >= DELAY_SECONDS * 2
+
+    @patch("app.tasks.market_data_tasks.get_adapter")
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_failed_province_does_not_block_others(
+        self, mock_session_factory, mock_get_adapter, mock_market_api,
+    ):
+        from app.services.market_data_adapters.generic import GenericMarketDataAdapter
+
+        sources = _sources(PROVINCES[:3])
+        sources.append(MagicMock(province="云南", api_endpoint=None))
+        session = _session(sources)
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        broken = MagicMock()
+        broken.fetch_if_changed = AsyncMock(side_effect=RuntimeError("连接超时"))
+        mock_get_adapter.side_effect = [
+            GenericMarketDataAdapter("http://mock/market-data"),
+            broken,
+            GenericMarketDataAdapter("http://mock/market-data"),
+        ]
+
+        result = fetch_market_data_periodic()
+
+        assert result[PROVINCES[0]] == "success:96"
+        assert result[PROVINCES[1]] == "failed:连接超时"
+        assert result[PROVINCES[2]] == "success:96"
+        assert result["云南"] == "skipped_no_endpoint"
+        # upsert + 新鲜度 + 成功状态更新 + 失败状态更新
+        failure_params = session.execute.call_args_list[4].args[1]
+        assert failure_params == [{
+            "id": sources[1].id,
+            "last_fetch_status": "failed",
+            "last_fetch_error": "连接超时",
+        }]
+        session.commit.assert_called_once()
+
+
+class TestIncrementalFetch:
+    @patch("app.tasks.market_data_tasks.notify_market_data_changed_sync")
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_second_run_sends_validators_and_skips_on_304(
+        self, mock_session_factory, mock_notify, mock_market_api,
+    ):
+        mock_market_api.DELAY_SECONDS = 0
+        sources = _sources(PROVINCES[:1])
+        session = _session(sources)
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        assert fetch_market_data_periodic() == {PROVINCES[0]: "success:96"}
+        params = session.execute.call_args_list[3].args[1][0]
+        assert params["fetch_etag"].startswith('"')
+        assert params["fetch_validated_date"] == _trading_date(datetime.now(UTC))
+        mock_notify.assert_called_once()
+
+        for name in ("fetch_validated_date", "fetch_etag", "fetch_last_modified", "fetch_content_hash"):
+            setattr(sources[0], name, params[name])
+        session.execute.reset_mock()
+        mock_notify.reset_mock()
+
+        assert fetch_market_data_periodic() == {PROVINCES[0]: "not_modified"}
+        # 查询数据源 + 状态更新 + 新鲜度，无价格 upsert
+        assert session.execute.call_count == 3
+        freshness = session.execute.call_args_list[2].args[0]
+        assert freshness.table.name == "market_data_freshness"
+        assert session.execute.call_args_list[1].args[1][0]["fetch_content_hash"] == (
+            params["fetch_content_hash"]
+        )
+        mock_notify.assert_called_once_with([])
+
+    @patch("app.tasks.market_data_tasks.get_adapter")
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_same_content_hash_skips_upsert(self, mock_session_factory, mock_get_adapter):
+        from app.services.market_data_adapters.base import ConditionalFetchResult
+
+        records = [MarketPriceRecord(_trading_date(datetime.now(UTC)), p, 300) for p in range(1, 97)]
+        adapter = MagicMock()
+        adapter.fetch_if_changed = AsyncMock(return_value=ConditionalFetchResult(records))
+        mock_get_adapter.return_value = adapter
+        sources = _sources(PROVINCES[:1])
+        sources[0].fetch_validated_date = _trading_date(datetime.now(UTC))
+        sources[0].fetch_etag = None
+        sources[0].fetch_last_modified = None
+        sources[0].fetch_content_hash = content_hash(list(reversed(records)))
+        session = _session(sources)
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        assert fetch_market_data_periodic() == {PROVINCES[0]: "unchanged:96"}
+        # 内容未变也推进新鲜度
+        assert session.execute.call_count == 3
+        assert session.execute.call_args_list[2].args[0].table.name == "market_data_freshness"
+
+    @patch("app.tasks.market_data_tasks.get_adapter")
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_only_changed_periods_are_written(self, mock_session_factory, mock_get_adapter):
+        from app.services.market_data_adapters.base import ConditionalFetchResult
+
+        records = [MarketPriceRecord(_trading_date(datetime.now(UTC)), p, 300) for p in range(1, 97)]
+        adapter = MagicMock()
+        adapter.fetch_if_changed = AsyncMock(return_value=ConditionalFetchResult(records))
+        mock_get_adapter.return_value = adapter
+        session = _session(_sources(PROVINCES[:1]))
+        statements = []
+
+        def execute(stmt, params=None):
+            if isinstance(stmt, Insert):
+                statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+                # 仅 3 个时段价格有变化
+                return [(PROVINCES[0],)] * 3
+            return session.execute.return_value
+
+        session.execute.side_effect = execute
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        assert fetch_market_data_periodic() == {PROVINCES[0]: "success:3,unchanged:93"}
+        assert "IS DISTINCT FROM" in statements[0]
+        assert "RETURNING" in statements[0]
+        # 有写入的省份在同一事务内推进新鲜度状态
+        assert "market_data_freshness" in statements[1]
+        assert "greatest" in statements[1]
+
+
+class TestPerSourceScheduling:
+    NOW = datetime(2026, 3, 1, 1, 30, tzinfo=UTC)  # 北京时间 9:30
+
+    def _source(self, fast_poll_until=None):
+        source = _sources(["广东"])[0]
+        source.fetch_schedule = "0 7,12,17 * * *"
+        source.fast_poll_until = fast_poll_until
+        return source
+
+    @patch("app.tasks.market_data_tasks.settings")
+    def test_missing_data_starts_fast_polling(self, mock_settings):
+        mock_settings.MARKET_DATA_FAST_POLL_SECONDS = 300
+        mock_settings.MARKET_DATA_FAST_POLL_WINDOW_MINUTES = 120
+        source = self._source()
+
+        assert _schedule_next(source, arrived=False, now=self.NOW) == "fast_poll"
+        assert source.next_fetch_at == self.NOW + timedelta(minutes=5)
+        assert source.fast_poll_until == self.NOW + timedelta(minutes=120)
+
+    def test_arrival_returns_to_cron(self):
+        source = self._source(fast_poll_until=self.NOW + timedelta(minutes=30))
+
+        assert _schedule_next(source, arrived=True, now=self.NOW) == "scheduled"
+        # 下一个 12:00 北京时间
+        assert source.next_fetch_at == datetime(2026, 3, 1, 4, 0, tzinfo=UTC)
+        assert source.fast_poll_until is None
+
+    def test_exhausted_window_waits_for_cron(self):
+        source = self._source(fast_poll_until=self.NOW)
+
+        assert _schedule_next(source, arrived=False, now=self.NOW) == "window_exhausted"
+        assert source.next_fetch_at == datetime(2026, 3, 1, 4, 0, tzinfo=UTC)
+        assert source.fast_poll_until is None
+
+    @patch("app.tasks.market_data_tasks.fetch_market_data_for_source")
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_dispatch_fans_out_due_sources(self, mock_session_factory, mock_task):
+        due_id, new_id, failing_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        session = _session([])
+        session.execute.return_value.all.return_value = [
+            (due_id, "广东", "30 9 * * *", self.NOW),
+            (new_id, "山东", "0 7,12,17 * * *", None),
+            (failing_id, "山西", "not a cron", self.NOW),
+        ]
+        mock_session_factory.return_value = MagicMock(return_value=session)
+        mock_task.apply_async.side_effect = [MagicMock(), RuntimeError("broker down")]
+
+        result = dispatch_market_data_fetches()
+
+        assert result == {"dispatched": 1, "failed": 1, "initialized": 1}
+        dispatched = [c.kwargs["kwargs"]["source_id"] for c in mock_task.apply_async.call_args_list]
+        assert dispatched == [str(due_id), str(failing_id)]
+        # 先批量推进 next_fetch_at 并提交，派发失败的再置为到期
+        advanced = session.execute.call_args_list[1].args[1]
+        assert [p["id"] for p in advanced] == [due_id, new_id, failing_id]
+        assert all(p["next_fetch_at"] > datetime.now(UTC) for p in advanced)
+        retry = session.execute.call_args_list[2].args[1]
+        assert [p["id"] for p in retry] == [failing_id]
+        assert session.commit.call_count == 2
+
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_fetch_for_source_schedules_next_run(self, mock_session_factory, mock_market_api):
+        mock_market_api.DELAY_SECONDS = 0
+        source = self._source()
+        source.is_active = True
+        session = _session([])
+        session.get.return_value = source
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        result = fetch_market_data_for_source.run(str(source.id))
+
+        assert result == {"广东": "success:96", "schedule": "scheduled"}
+        assert source.next_fetch_at > datetime.now(UTC)
+        assert session.commit.call_count == 2
+
+
+class TestTradingDate:
+    def test_uses_beijing_date(self):
+        # UTC 3 月 1 日 16:30 即北京时间 3 月 2 日 00:30
+        assert _trading_date(datetime(2026, 3, 1, 16, 30, tzinfo=UTC)) == date(2026, 3, 2)
+        assert _trading_date(datetime(2026, 3, 1, 15, 59, tzinfo=UTC)) == date(2026, 3, 1)
+
+    @patch("app.tasks.market_data_tasks._fetch_sources", return_value=({}, set()))
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_fetch_for_source_after_beijing_midnight(self, mock_session_factory, mock_fetch):
+        source = MagicMock(is_active=True, province="广东", fetch_schedule="0 12 * * *")
+        source.fast_poll_until = None
+        session = _session([])
+        session.get.return_value = source
+        mock_session_factory.return_value = MagicMock(return_value=session)
+        now = datetime(2026, 3, 1, 16, 30, tzinfo=UTC)
+
+        with patch("app.tasks.market_data_tasks.datetime") as mock_datetime:
+            mock_datetime.now.return_value = now
+            fetch_market_data_for_source.run(str(uuid.uuid4()))
+
+        assert mock_fetch.call_args.args[2] == date(2026, 3, 2)
+
+
+class TestMonthChunks:
+    def test_splits_by_calendar_month(self):
+        assert month_chunks(date(2025, 1, 15), date(2025, 3, 10)) == [
+            (date(2025, 1, 15), date(2025, 1, 31)),
+            (date(2025, 2, 1), date(2025, 2, 28)),
+            (date(2025, 3, 1), date(2025, 3, 10)),
+        ]
+        assert month_chunks(date(2024, 2, 1), date(2024, 2, 29)) == [
+            (date(2024, 2, 1), date(2024, 2, 29)),
+        ]
+
+
+class TestBackfillMarketData:
+    def _job(self, start, end, completed_through=None):
+        job = MagicMock()
+        job.id = uuid.uuid4()
+        job.province = "广东"
+        job.start_date = start
+        job.end_date = end
+        job.status = "pending"
+        job.completed_through = completed_through
+        job.started_at = None
+        job.total_records = 0
+        return job
+
+    def _session(self, job):
+        source = _sources(["广东"])[0]
+        session = _session([])
+        session.get.return_value = job
+        session.execute.return_value.scalar_one_or_none.return_value = source
+        return session
+
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_backfill_writes_month_chunks_via_range_endpoint(
+        self, mock_session_factory, mock_market_api,
+    ):
+        mock_market_api.DELAY_SECONDS = 0
+        job = self._job(date(2025, 1, 20), date(2025, 3, 5))
+        session = self._session(job)
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        result = backfill_market_data.run(str(job.id))
+
+        assert result == {"status": "completed", "records": (12 + 28 + 5) * 96}
+        assert job.status == "completed"
+        assert job.completed_through == date(2025, 3, 5)
+        assert job.total_chunks == 3
+        assert job.completed_chunks == 3
+        # 1 次查询数据源 + 每月 1 次 upsert 与 1 次新鲜度更新
+        assert session.execute.call_count == 7
+
+    @patch("app.tasks.market_data_tasks.get_adapter")
+    @patch("app.tasks.market_data_tasks.get_sync_session_factory")
+    def test_failure_keeps_checkpoint_and_resume_skips_done_months(
+        self, mock_session_factory, mock_get_adapter,
+    ):
+        fetched_ranges = []
+
+        async def fetch_range(start, end):
+            fetched_ranges.append((start, end))
+            if start == date(2025, 2, 1) and len(fetched_ranges) == 2:
+                raise RuntimeError("上游超时")
+            return [MarketPriceRecord(start, 1, 300)]
+
+        adapter = MagicMock()
+        adapter.fetch_range = fetch_range
+        mock_get_adapter.return_value = adapter
+
+        job = self._job(date(2025, 1, 1), date(2025, 3, 31))
+        session = self._session(job)
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        result = backfill_market_data.run(str(job.id))
+
+        assert result["status"] == "failed"
+        assert job.status == "failed"
+        assert job.completed_through == date(2025, 1, 31)
+        assert job.error_message == "上游超时"
+        session.rollback.assert_called_once()
+
+        fetched_ranges.clear()
+        result = backfill_market_data.run(str(job.id))
+
+        assert result["status"] == "completed"
+        assert fetched_ranges == [
+            (date(2025, 2, 1), date(2025, 2, 28)),
+            (date(2025, 3, 1), date(2025, 3, 31)),
+        ]
+        assert job.completed_through == date(2025, 3, 31)
+        assert job.completed_chunks == 3
@@ -1,11 +1,19 @@
 import uuid
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
 from unittest.mock import MagicMock, patch, AsyncMock
 
 import pytest
 
-from app.services.prediction_adapters.base import PredictionRecord
-from app.tasks.prediction_tasks import check_prediction_models_health, fetch_prediction_data_for_all_models
+from app.services.prediction_adapters.base import PredictionBatch, PredictionRecord
+from app.tasks.prediction_tasks import (
+    _business_date,
+    _prediction_date,
+    check_prediction_models_health,
+    dispatch_prediction_fetches,
+    fetch_prediction_data_for_all_models,
+    fetch_prediction_data_for_models,
+)
 
 
 class TestCheckPredictionModelsHealth:
@@ -26,15 +34,18 @@ class TestCheckPredictionModelsHealth:
         result = check_prediction_models_health()
         assert result == {"status": "no_active_models"}
 
-    @patch("app.tasks.prediction_tasks.asyncio.run")
+    @patch("app.tasks.prediction_tasks.run_sync")
     @patch("app.tasks.prediction_tasks.get_adapter")
     @patch("app.tasks.prediction_tasks.get_sync_session_factory")
-    def test_healthy_model(self, mock_session_factory, mock_get_adapter, mock_asyncio_run):
+    def test_healthy_model(self, mock_session_factory, mock_get_adapter, mock_run_sync):
         model = MagicMock()
         model.id = uuid.uuid4()
         model.model_name = "风电预测模型"
         model.api_key_encrypted = None
         model.status = "running"
+        model.api_endpoint = "https://api.example.com/predict"
+        model.next_check_at = None
+        model.check_interval_seconds = None
 
         mock_session = MagicMock()
         mock_session.__enter__ = MagicMock(return_value=mock_session)
@@ -46,23 +57,26 @@ class TestCheckPredictionModelsHealth:
         mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
         # batch health check returns [True]
-        mock_asyncio_run.return_value = [True]
+        mock_run_sync.return_value = [True]
 
         result = check_prediction_models_health()
         assert str(model.id) in result
         assert result[str(model.id)] == "running"
 
-    @patch("app.tasks.prediction_tasks.asyncio.run")
+    @patch("app.tasks.prediction_tasks.run_sync")
     @patch("app.tasks.prediction_tasks.get_adapter")
     @patch("app.tasks.prediction_tasks.get_sync_session_factory")
     def test_unhealthy_model_triggers_warning(
-        self, mock_session_factory, mock_get_adapter, mock_asyncio_run,
+        self, mock_session_factory, mock_get_adapter, mock_run_sync,
     ):
         model = MagicMock()
         model.id = uuid.uuid4()
         model.model_name = "异常模型"
         model.api_key_encrypted = None
         model.status = "running"
+        model.api_endpoint = "https://api.example.com/predict"
+        model.next_check_at = None
+        model.check_interval_seconds = None
 
         mock_session = MagicMock()
         mock_session.__enter__ = MagicMock(return_value=mock_session)
@@ -74,7 +88,7 @@ class TestCheckPredictionModelsHealth:
         mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
         # batch health check returns [False]
-        mock_asyncio_run.return_value = [False]
+        mock_run_sync.return_value = [False]
 
         result = check_prediction_models_health()
         assert result[str(model.id)] == "error"
@@ -84,17 +98,20 @@ class TestCheckPredictionModelsHealth:
         ]
         assert len(update_calls) > 0, "Expected SQL UPDATE to be executed for status change"
 
-    @patch("app.tasks.prediction_tasks.asyncio.run")
+    @patch("app.tasks.prediction_tasks.run_sync")
     @patch("app.tasks.prediction_tasks.get_adapter")
     @patch("app.tasks.prediction_tasks.get_sync_session_factory")
     def test_health_check_exception(
-        self, mock_session_factory, mock_get_adapter, mock_asyncio_run,
+        self, mock_session_factory, mock_get_adapter, mock_run_sync,
     ):
         model = MagicMock()
         model.id = uuid.uuid4()
         model.model_name = "异常模型"
         model.api_key_encrypted = None
         model.status = "running"
+        model.api_endpoint = "https://api.example.com/predict"
+        model.next_check_at = None
+        model.check_interval_seconds = None
 
         mock_session = MagicMock()
         mock_session.__enter__ = MagicMock(return_value=mock_session)
@@ -106,7 +123,7 @@ class TestCheckPredictionModelsHealth:
         mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
         # batch health check returns [Exception]
-        mock_asyncio_run.return_value = [RuntimeError("连接超时")]
+        mock_run_sync.return_value = [RuntimeError("连接超时")]
 
         result = check_prediction_models_health()
         model_key = str(model.id)
@@ -114,87 +131,410 @@ class TestCheckPredictionModelsHealth:
         assert "error" in result[model_key]
 
 
+def _make_running_model(name="风电预测模型", endpoint="https://api.example.com/predict"):
+    model = MagicMock()
+    model.id = uuid.uuid4()
+    model.model_name = name
+    model.station_id = uuid.uuid4()
+    model.api_endpoint = endpoint
+    model.api_key_encrypted = None
+    model.status = "running"
+    return model
+
+
+def _make_fetch_session(models):
+    mock_session = MagicMock()
+    mock_session.__enter__ = MagicMock(return_value=mock_session)
+    mock_session.__exit__ = MagicMock(return_value=False)
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = models
+    mock_session.execute.return_value = mock_result
+    return mock_session
+
+
+def _full_batch():
+    return PredictionBatch.from_records([
+        PredictionRecord(
+            period=i,
+            predicted_power_kw=Decimal("1500"),
+            confidence_upper_kw=Decimal("1650"),
+            confidence_lower_kw=Decimal("1350"),
+        )
+        for i in range(1, 97)
+    ])
+
+
+def _insert_calls(mock_session):
+    return [
+        c for c in mock_session.execute.call_args_list
+        if c.args and c.args[0].__class__.__name__ == "Insert"
+    ]
+
+
 class TestFetchPredictionDataForAllModels:
     """fetch_prediction_data_for_all_models Celery 任务测试。"""
 
     @patch("app.tasks.prediction_tasks.get_sync_session_factory")
     def test_no_running_models(self, mock_session_factory):
-        mock_session = MagicMock()
-        mock_session.__enter__ = MagicMock(return_value=mock_session)
-        mock_session.__exit__ = MagicMock(return_value=False)
+        mock_session = _make_fetch_session([])
+        mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = []
-        mock_session.execute.return_value = mock_result
+        result = fetch_prediction_data_for_all_models()
+        assert result == {"status": "no_running_models"}
 
+    @patch("app.tasks.prediction_tasks.validate_prediction_batch")
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_successful_fetch(self, mock_session_factory, mock_get_adapter, mock_validate):
+        model = _make_running_model()
+        mock_session = _make_fetch_session([model])
         mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
+        batch = _full_batch()
+        adapter = MagicMock()
+        adapter.fetch_prediction_batch = AsyncMock(return_value=batch)
+        mock_get_adapter.return_value = adapter
+        mock_validate.return_value = (batch, [])
+
         result = fetch_prediction_data_for_all_models()
-        assert result == {"status": "no_running_models"}
+        assert str(model.id) in result
+        assert result[str(model.id)] == "success"
+        assert str(model.id) in result["latency_ms"]
 
-    @patch("app.tasks.prediction_tasks.validate_prediction_records")
-    @patch("app.tasks.prediction_tasks.asyncio.run")
     @patch("app.tasks.prediction_tasks.get_adapter")
     @patch("app.tasks.prediction_tasks.get_sync_session_factory")
-    def test_successful_fetch(
-        self, mock_session_factory, mock_get_adapter, mock_asyncio_run, mock_validate,
-    ):
-        model = MagicMock()
-        model.id = uuid.uuid4()
-        model.model_name = "风电预测模型"
-        model.station_id = uuid.uuid4()
-        model.api_key_encrypted = None
-        model.status = "running"
+    def test_fetch_exception_isolated(self, mock_session_factory, mock_get_adapter):
+        failing = _make_running_model("失败模型")
+        healthy = _make_running_model()
+        mock_session = _make_fetch_session([failing, healthy])
+        mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
-        mock_session = MagicMock()
-        mock_session.__enter__ = MagicMock(return_value=mock_session)
-        mock_session.__exit__ = MagicMock(return_value=False)
+        failing_adapter = MagicMock()
+        failing_adapter.fetch_prediction_batch = AsyncMock(side_effect=RuntimeError("API调用失败"))
+        healthy_adapter = MagicMock()
+        healthy_adapter.fetch_prediction_batch = AsyncMock(return_value=_full_batch())
+        mock_get_adapter.side_effect = [failing_adapter, healthy_adapter]
 
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [model]
-        mock_session.execute.return_value = mock_result
+        result = fetch_prediction_data_for_all_models()
+        assert result[str(failing.id)] == "failed"
+        assert result[str(healthy.id)] == "success"
+
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_models_grouped_into_one_upsert(self, mock_session_factory, mock_get_adapter):
+        models = [_make_running_model(f"模型{i}") for i in range(3)]
+        mock_session = _make_fetch_session(models)
         mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
-        records = [
-            PredictionRecord(
-                period=i,
-                predicted_power_kw=Decimal("1500"),
-                confidence_upper_kw=Decimal("1650"),
-                confidence_lower_kw=Decimal("1350"),
-            )
-            for i in range(1, 97)
-        ]
-        mock_asyncio_run.return_value = [records]
-        mock_validate.return_value = (records, [])
+        adapter = MagicMock()
+        adapter.fetch_prediction_batch = AsyncMock(return_value=_full_batch())
+        mock_get_adapter.return_value = adapter
+
+        fetch_prediction_data_for_all_models()
+
+        inserts = _insert_calls(mock_session)
+        assert len(inserts) == 1
+        assert mock_session.commit.call_count == 1
+
+    @patch("app.tasks.prediction_tasks.settings")
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_writes_flushed_per_batch(self, mock_session_factory, mock_get_adapter, mock_settings):
+        mock_settings.PREDICTION_FETCH_CONCURRENCY = 4
+        mock_settings.PREDICTION_FETCH_HOST_RATE_LIMIT = 0
+        mock_settings.PREDICTION_FETCH_WRITE_BATCH_MODELS = 2
+        models = [_make_running_model(f"模型{i}") for i in range(5)]
+        mock_session = _make_fetch_session(models)
+        mock_session_factory.return_value = MagicMock(return_value=mock_session)
+
+        adapter = MagicMock()
+        adapter.fetch_prediction_batch = AsyncMock(return_value=_full_batch())
+        mock_get_adapter.return_value = adapter
 
         result = fetch_prediction_data_for_all_models()
-        assert str(model.id) in result
-        assert result[str(model.id)] == "success"
 
-    @patch("app.tasks.prediction_tasks.asyncio.run")
+        assert len(_insert_calls(mock_session)) == 3
+        assert mock_session.commit.call_count == 3
+        assert all(result[str(m.id)] == "success" for m in models)
+
+    @patch("app.tasks.prediction_tasks.settings")
     @patch("app.tasks.prediction_tasks.get_adapter")
     @patch("app.tasks.prediction_tasks.get_sync_session_factory")
-    def test_fetch_exception_isolated(
-        self, mock_session_factory, mock_get_adapter, mock_asyncio_run,
-    ):
-        model = MagicMock()
-        model.id = uuid.uuid4()
-        model.model_name = "失败模型"
-        model.station_id = uuid.uuid4()
-        model.api_key_encrypted = None
-        model.status = "running"
+    def test_concurrency_bounded(self, mock_session_factory, mock_get_adapter, mock_settings):
+        import asyncio
+
+        mock_settings.PREDICTION_FETCH_CONCURRENCY = 2
+        mock_settings.PREDICTION_FETCH_HOST_RATE_LIMIT = 0
+        mock_settings.PREDICTION_FETCH_WRITE_BATCH_MODELS = 20
+        models = [_make_running_model(f"模型{i}") for i in range(6)]
+        mock_session = _make_fetch_session(models)
+        mock_session_factory.return_value = MagicMock(return_value=mock_session)
 
-        mock_session = MagicMock()
-        mock_session.__enter__ = MagicMock(return_value=mock_session)
-        mock_session.__exit__ = MagicMock(return_value=False)
+        in_flight = 0
+        peak = 0
 
-        mock_result = MagicMock()
-        mock_result.scalars.return_value.all.return_value = [model]
-        mock_session.execute.return_value = mock_result
+        async def _fetch(station_id, prediction_date):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _full_batch()
+
+        adapter = MagicMock()
+        adapter.fetch_prediction_batch = _fetch
+        mock_get_adapter.return_value = adapter
+
+        fetch_prediction_data_for_all_models()
+
+        assert peak == 2
+
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_batch_write_failure_isolates_model(self, mock_session_factory, mock_get_adapter):
+        bad, good = _make_running_model("坏模型"), _make_running_model("好模型")
+        mock_session = _make_fetch_session([bad, good])
         mock_session_factory.return_value = MagicMock(return_value=mock_session)
+        select_result = mock_session.execute.return_value
+
+        def _execute(stmt, *args, **kwargs):
+            if stmt.__class__.__name__ == "Insert":
+                params = stmt.compile().params
+                station_ids = {v for k, v in params.items() if k.startswith("station_id")}
+                if bad.station_id in station_ids:
+                    raise RuntimeError("写入失败")
+            return select_result
 
-        mock_asyncio_run.return_value = [RuntimeError("API调用失败")]
+        mock_session.execute.side_effect = _execute
+
+        adapter = MagicMock()
+        adapter.fetch_prediction_batch = AsyncMock(return_value=_full_batch())
+        mock_get_adapter.return_value = adapter
 
         result = fetch_prediction_data_for_all_models()
-        assert str(model.id) in result
-        assert result[str(model.id)] == "failed"
+
+        assert result[str(bad.id)] == "failed"
+        assert result[str(good.id)] == "success"
+        assert mock_session.rollback.call_count >= 2
+
+
+class TestDispatchPredictionFetches:
+    """dispatch_prediction_fetches 按模型调度测试。"""
+
+    NOW = datetime(2026, 3, 1, 0, 0, tzinfo=UTC)
+
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_nothing_due(self, mock_session_factory):
+        session = _make_fetch_session([])
+        session.execute.return_value.all.return_value = []
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        assert dispatch_prediction_fetches() == {"dispatched": 0, "initialized": 0}
+        session.commit.assert_not_called()
+
+    @patch("app.tasks.prediction_tasks.settings")
+    @patch("app.tasks.prediction_tasks.fetch_prediction_data_for_models")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_groups_due_models_by_host(self, mock_session_factory, mock_task, mock_settings):
+        mock_settings.PREDICTION_DISPATCH_BATCH_SIZE = 100
+        mock_settings.PREDICTION_DISPATCH_GROUP_SIZE = 2
+        a1, a2, a3, b1, new = (uuid.uuid4() for _ in range(5))
+        session = _make_fetch_session([])
+        session.execute.return_value.all.return_value = [
+            (a1, "https://a.example.com/predict", "0 * * * *", self.NOW),
+            (b1, "https://b.example.com/predict", "*/15 * * * *", self.NOW),
+            (a2, "https://a.example.com/predict", "0 6,12 * * *", self.NOW),
+            (a3, "https://a.example.com/other", "not a cron", self.NOW),
+            (new, "https://a.example.com/predict", "0 * * * *", None),
+        ]
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        result = dispatch_prediction_fetches()
+
+        assert result == {"dispatched": 4, "failed": 0, "tasks": 3, "initialized": 1}
+        groups = [c.kwargs["kwargs"]["model_ids"] for c in mock_task.apply_async.call_args_list]
+        assert groups == [[str(a1), str(a2)], [str(a3)], [str(b1)]]
+        # 全部行（含新模型）先推进 next_fetch_at 并提交
+        advanced = session.execute.call_args_list[1].args[1]
+        assert {p["id"] for p in advanced} == {a1, a2, a3, b1, new}
+        assert all(p["next_fetch_at"] > datetime.now(UTC) for p in advanced)
+        assert session.commit.call_count == 1
+
+    @patch("app.tasks.prediction_tasks.fetch_prediction_data_for_models")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_failed_dispatch_made_due_again(self, mock_session_factory, mock_task):
+        model_id = uuid.uuid4()
+        session = _make_fetch_session([])
+        session.execute.return_value.all.return_value = [
+            (model_id, "https://a.example.com/predict", "0 * * * *", self.NOW),
+        ]
+        mock_session_factory.return_value = MagicMock(return_value=session)
+        mock_task.apply_async.side_effect = RuntimeError("broker down")
+
+        result = dispatch_prediction_fetches()
+
+        assert result["dispatched"] == 0
+        assert result["failed"] == 1
+        retry = session.execute.call_args_list[2].args[1]
+        assert [p["id"] for p in retry] == [model_id]
+        assert retry[0]["next_fetch_at"] <= datetime.now(UTC)
+        assert session.commit.call_count == 2
+
+
+class TestFetchPredictionDataForModels:
+    """fetch_prediction_data_for_models 分组拉取测试。"""
+
+    def test_prediction_date_by_horizon(self):
+        model = _make_running_model()
+        model.prediction_horizon = "intraday"
+        assert _prediction_date(model, date(2026, 3, 1)) == date(2026, 3, 1)
+        model.prediction_horizon = "day_ahead"
+        assert _prediction_date(model, date(2026, 3, 1)) == date(2026, 3, 2)
+
+    def test_business_date_uses_beijing_time(self):
+        # UTC 3 月 1 日 17:30 即北京时间 3 月 2 日 01:30：日内取 3 月 2 日，日前取 3 月 3 日
+        today = _business_date(datetime(2026, 3, 1, 17, 30, tzinfo=UTC))
+        assert today == date(2026, 3, 2)
+        model = _make_running_model()
+        model.prediction_horizon = "intraday"
+        assert _prediction_date(model, today) == date(2026, 3, 2)
+        model.prediction_horizon = "day_ahead"
+        assert _prediction_date(model, today) == date(2026, 3, 3)
+        assert _business_date(datetime(2026, 3, 1, 15, 59, tzinfo=UTC)) == date(2026, 3, 1)
+
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_fetches_group_with_model_horizon(self, mock_session_factory, mock_get_adapter):
+        intraday = _make_running_model("日内模型")
+        intraday.prediction_horizon = "intraday"
+        day_ahead = _make_running_model("日前模型")
+        day_ahead.prediction_horizon = "day_ahead"
+        mock_session = _make_fetch_session([intraday, day_ahead])
+        mock_session_factory.return_value = MagicMock(return_value=mock_session)
+
+        adapter = MagicMock()
+        adapter.fetch_prediction_batch = AsyncMock(return_value=_full_batch())
+        mock_get_adapter.return_value = adapter
+
+        result = fetch_prediction_data_for_models.run([str(intraday.id), str(day_ahead.id)])
+
+        assert result[str(intraday.id)] == "success"
+        assert result[str(day_ahead.id)] == "success"
+        dates = {c.args[0]: c.args[1] for c in adapter.fetch_prediction_batch.call_args_list}
+        today = _business_date(datetime.now(UTC))
+        assert dates[str(intraday.station_id)] == today
+        assert dates[str(day_ahead.station_id)] == today + timedelta(days=1)
+
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_skips_when_models_no_longer_running(self, mock_session_factory):
+        mock_session = _make_fetch_session([])
+        mock_session_factory.return_value = MagicMock(return_value=mock_session)
+
+        assert fetch_prediction_data_for_models.run([str(uuid.uuid4())]) == {"status": "skipped"}
+
+
+class TestHealthCheckGrouping:
+    """按探测目标（端点 + 凭据）合并探测与自适应间隔测试。"""
+
+    def _model(self, endpoint, status="running", next_check_at=None, interval=None, api_key=None):
+        model = _make_running_model(endpoint=endpoint)
+        model.api_auth_type = "api_key"
+        model.api_key_encrypted = api_key
+        model.status = status
+        model.next_check_at = next_check_at
+        model.check_interval_seconds = interval
+        return model
+
+    def _bulk_rows(self, session):
+        update_stmt = session.execute.call_args_list[1].args[0]
+        # WHERE prediction_models.id = checked.id 右侧即 VALUES 子句
+        checked = update_stmt.whereclause.clauses[0].right.table
+        names = [c.name for c in checked.columns]
+        return [dict(zip(names, row)) for row in checked._data[0]]
+
+    @patch("app.tasks.prediction_tasks.run_sync")
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_one_probe_per_target_and_single_bulk_update(
+        self, mock_session_factory, mock_get_adapter, mock_run_sync,
+    ):
+        a1 = self._model("https://a.example.com/predict")
+        a2 = self._model("https://a.example.com/predict", status="error")
+        b1 = self._model("https://b.example.com/predict")
+        session = _make_fetch_session([a1, a2, b1])
+        mock_session_factory.return_value = MagicMock(return_value=session)
+        mock_run_sync.side_effect = lambda coro: (coro.close(), [True, False])[1]
+
+        result = check_prediction_models_health()
+
+        assert mock_get_adapter.call_count == 2
+        assert result == {str(a1.id): "running", str(a2.id): "running", str(b1.id): "error"}
+        # 1 次查询 + 1 条批量 UPDATE，只提交一次
+        assert session.execute.call_count == 2
+        session.commit.assert_called_once()
+        rows = {row["id"]: row for row in self._bulk_rows(session)}
+        assert rows[a2.id]["status"] == "running"
+        assert rows[b1.id]["last_check_error"] == "健康检查失败"
+        assert rows[b1.id]["check_interval_seconds"] == 60
+
+    @patch("app.tasks.prediction_tasks.decrypt_api_key", side_effect=lambda v: f"plain-{v}")
+    @patch("app.tasks.prediction_tasks.run_sync")
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_same_host_different_endpoint_or_key_probed_separately(
+        self, mock_session_factory, mock_get_adapter, mock_run_sync, mock_decrypt,
+    ):
+        """同一主机上端点或凭据不同的模型各自探测，一个失败不影响另一个。"""
+        key1 = self._model("https://a.example.com/predict/1", api_key="k1")
+        key2 = self._model("https://a.example.com/predict/1", api_key="k2")
+        other = self._model("https://a.example.com/predict/2", api_key="k1")
+        session = _make_fetch_session([key1, key2, other])
+        mock_session_factory.return_value = MagicMock(return_value=session)
+        mock_run_sync.side_effect = lambda coro: (coro.close(), [True, False, True])[1]
+
+        result = check_prediction_models_health()
+
+        assert [c.kwargs["api_key"] for c in mock_get_adapter.call_args_list] == [
+            "plain-k1", "plain-k2", "plain-k1",
+        ]
+        assert mock_decrypt.call_count == 2
+        assert result == {str(key1.id): "running", str(key2.id): "error", str(other.id): "running"}
+
+    @patch("app.tasks.prediction_tasks.run_sync")
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_skips_hosts_not_due(self, mock_session_factory, mock_get_adapter, mock_run_sync):
+        later = datetime.now(UTC) + timedelta(minutes=10)
+        session = _make_fetch_session([self._model("https://a.example.com/p", next_check_at=later)])
+        mock_session_factory.return_value = MagicMock(return_value=session)
+
+        assert check_prediction_models_health() == {"status": "not_due"}
+        mock_run_sync.assert_not_called()
+        session.commit.assert_not_called()
+
+    @patch("app.tasks.prediction_tasks.run_sync")
+    @patch("app.tasks.prediction_tasks.get_adapter")
+    @patch("app.tasks.prediction_tasks.get_sync_session_factory")
+    def test_healthy_host_backs_off(self, mock_session_factory, mock_get_adapter, mock_run_sync):
+        due = datetime.now(UTC) - timedelta(seconds=1)
+        model = self._model("https://a.example.com/p", next_check_at=due, interval=300)
+        session = _make_fetch_session([model])
+        mock_session_factory.return_value = MagicMock(return_value=session)
+        mock_run_sync.side_effect = lambda coro: (coro.close(), [True])[1]
+
+        check_prediction_models_health()
+
+        row = self._bulk_rows(session)[0]
+        assert row["check_interval_seconds"] == 600
+        assert row["next_check_at"] > datetime.now(UTC) + timedelta(seconds=590)
+
+
+class TestNextCheckInterval:
+    def test_interval_policy(self):
+        from app.tasks.prediction_tasks import _next_check_interval
+
+        assert _next_check_interval(None, True) == 300
+        assert _next_check_interval(60, True) == 300
+        assert _next_check_interval(300, True) == 600
+        assert _next_check_interval(1200, True) == 1800
+        assert _next_check_interval(1800, False) == 60
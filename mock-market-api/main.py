@@ -12,12 +12,14 @@
 
 import asyncio
 import hashlib
+import json
 import math
 import os
 import random
-from datetime import date
+from datetime import UTC, date, datetime, time, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
 
-from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 
 app = FastAPI(title="Mock 省级电力交易中心 API", version="1.0.0")
 
@@ -26,6 +28,8 @@ DELAY_SECONDS = float(os.environ.get("MOCK_DELAY_SECONDS", "0"))
 REQUIRED_API_KEY = os.environ.get("MOCK_API_KEY", "")
 
 PERIODS_PER_DAY = 96
+# 区间接口单次最多返回的天数
+MAX_RANGE_DAYS = 366
 
 # 时段价格基准 (元/MWh) — 模拟日内价格曲线
 # 谷段(23:00-07:00, 时段69-96+1-28): 低价, 平段: 中价, 峰段(10:00-12:00, 17:00-21:00): 高价
@@ -66,14 +70,31 @@ def _check_auth(request: Request) -> None:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
 
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """按 If-None-Match（优先）或 If-Modified-Since 判断客户端缓存是否仍有效。"""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(",")]
+    if_modified_since = request.headers.get("If-Modified-Since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= last_modified
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
 @app.get("/market-data")
 async def get_market_data(
     request: Request,
+    response: Response,
     trading_date: date = Query(..., description="交易日期 YYYY-MM-DD"),
 ):
     """返回指定交易日的 96 时段出清价格数据。
 
     响应格式与 GenericMarketDataAdapter 期望的标准 JSON API 格式一致。
+    响应带 ETag / Last-Modified（交易日前一日 17:00 UTC 发布）；
+    条件请求命中时返回 304（不含响应体）。
     """
     _check_auth(request)
 
@@ -94,6 +115,52 @@ async def get_market_data(
         for period in range(1, PERIODS_PER_DAY + 1)
     ]
 
+    etag = '"' + hashlib.md5(json.dumps(data).encode()).hexdigest() + '"'
+    last_modified = datetime.combine(trading_date - timedelta(days=1), time(17), tzinfo=UTC)
+    validators = {"ETag": etag, "Last-Modified": format_datetime(last_modified, usegmt=True)}
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=validators)
+    response.headers.update(validators)
+    return {"data": data}
+
+
+@app.get("/market-data/range")
+async def get_market_data_range(
+    request: Request,
+    start_date: date = Query(..., description="起始交易日期 YYYY-MM-DD（含）"),
+    end_date: date = Query(..., description="结束交易日期 YYYY-MM-DD（含）"),
+):
+    """返回日期区间内每日 96 时段出清价格（单次请求最多 MAX_RANGE_DAYS 天）。
+
+    每条记录带 trading_date，价格与 /market-data 单日接口一致。
+    """
+    _check_auth(request)
+
+    days = (end_date - start_date).days + 1
+    if days < 1:
+        raise HTTPException(status_code=422, detail="end_date 不能早于 start_date")
+    if days > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=422, detail=f"单次最多查询 {MAX_RANGE_DAYS} 天")
+
+    if DELAY_SECONDS > 0:
+        await asyncio.sleep(DELAY_SECONDS)
+
+    if FAILURE_RATE > 0 and random.random() < FAILURE_RATE:
+        raise HTTPException(status_code=503, detail="模拟: 服务暂时不可用")
+
+    data = []
+    for offset in range(days):
+        trading_date = start_date + timedelta(days=offset)
+        seed = trading_date.isoformat()
+        data.extend(
+            {
+                "trading_date": seed,
+                "period": period,
+                "clearing_price": _generate_price(period, seed),
+            }
+            for period in range(1, PERIODS_PER_DAY + 1)
+        )
+
     return {"data": data}
 
 